@@ -11,8 +11,22 @@ from app.models.user import User, UserRole, UserStatus
 from app.models.interview import InterviewSession, InterviewStatus
 from app.models import get_database, get_redis
 from app.auth.dependencies import check_permissions
+from app.auth.cache import token_cache, user_cache
+from app.auth.revocation import token_revocations
+from app.auth.hashing import password_hasher
+from app.auth.lockout import login_throttle, last_login_recorder
+from app.ai.service import ai_service
+from app.ai.batching import evaluation_batcher
+from app.ai.question_cache import question_cache
+from app.ai.conversations import conversation_store
+from app.ai.metrics import ai_metrics
+from app.jobs.events import job_events
+from app.resume.blobs import resume_blobs
+from app.jobs.queue import job_queue
 from app.config import settings
 from app.utils.database import db_manager, reset_database, delete_user_data, create_test_user
+from app.utils.pagination import paginate
+from app.utils.counts import count_service
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +81,7 @@ async def get_system_metrics(
     # Calculate time range
     hours = {"1h": 1, "24h": 24, "7d": 168, "30d": 720}[period]
     start_time = datetime.utcnow() - timedelta(hours=hours)
+    ai_usage = ai_metrics.report(await ai_metrics.totals(hours))
 
     # Mock metrics - in real implementation, these would come from monitoring systems
     metrics = {
@@ -93,7 +108,34 @@ async def get_system_metrics(
             "total_interviews": 5420,
             "completed_interviews": 4230,
             "average_duration": 1800,  # seconds
-            "ai_processing_time": 120  # seconds
+            "ai_processing_time": round(ai_usage["totals"]["avg_latency_ms"] / 1000, 2)  # seconds
+        },
+        "cache_metrics": {
+            "user_cache": user_cache.get_stats(),
+            "token_cache": token_cache.get_stats(),
+            "question_cache": question_cache.get_stats(),
+            "count_cache": count_service.get_stats(),
+            "resume_blobs": resume_blobs.get_stats()
+        },
+        "auth_metrics": {
+            "password_hashing": password_hasher.get_stats(),
+            "login_throttle": login_throttle.get_stats(),
+            "token_revocation": token_revocations.get_stats(),
+            "last_login_flush": last_login_recorder.get_stats()
+        },
+        "ai_metrics": {
+            "providers": ai_service.get_stats(),
+            "router": ai_service.router.get_stats(),
+            "result_cache": ai_service.result_cache.get_stats(),
+            "offline_scorer": ai_service.offline_scorer.get_stats(),
+            "conversations": conversation_store.get_stats(),
+            "evaluation_batcher": evaluation_batcher.get_stats(),
+            "usage": ai_usage,
+            "metrics_flusher": ai_metrics.get_stats()
+        },
+        "job_metrics": {
+            "queue": await job_queue.get_stats(),
+            "events": job_events.get_stats()
         }
     }
 
@@ -103,6 +145,7 @@ async def get_system_metrics(
 async def get_audit_logs(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     action: Optional[str] = None,
     user_id: Optional[str] = None,
     start_date: Optional[datetime] = None,
@@ -129,8 +172,10 @@ async def get_audit_logs(
 
     # Get audit logs (assuming audit_logs collection exists)
     try:
-        cursor = db.audit_logs.find(query).sort("timestamp", -1).skip(skip).limit(limit)
-        logs = await cursor.to_list(length=None)
+        logs, next_cursor = await paginate(
+            db.audit_logs, query, "timestamp", limit, cursor=cursor, skip=skip
+        )
+        total, total_exact = await count_service.count(db.audit_logs, query)
 
         # Format logs
         formatted_logs = []
@@ -148,17 +193,22 @@ async def get_audit_logs(
 
         return {
             "logs": formatted_logs,
-            "total": len(formatted_logs),  # In real implementation, use count_documents
+            "total": total,
+            "total_exact": total_exact,
             "skip": skip,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         # If audit_logs collection doesn't exist, return empty result
         logger.warning(f"Audit logs not available: {e}")
         return {
             "logs": [],
             "total": 0,
+            "total_exact": True,
             "skip": skip,
             "limit": limit,
             "message": "Audit logging not configured"
@@ -533,6 +583,7 @@ async def reset_user_data(
     """Reset user data while preserving authentication info."""
     try:
         await db_manager.reset_user_data(user_id)
+        await user_cache.invalidate(user_id)
         logger.info(f"User data reset for {user_id} by {current_user.email}")
         return {"message": f"User data reset successfully for user {user_id}"}
     except Exception as e:
@@ -551,6 +602,8 @@ async def delete_user_database_data(
     try:
         success = await delete_user_data(user_id, current_user.role)
         if success:
+            await token_revocations.revoke_user(user_id)
+            await user_cache.invalidate(user_id)
             logger.info(f"User data deleted for {user_id} by {current_user.email}")
             return {"message": f"User data deleted successfully for user {user_id}"}
         else:
@@ -0,0 +1,198 @@
+"""
+Micro-batching for interview response evaluation.
+
+Submitted answers wait up to a short window (or until a batch fills up),
+are evaluated with one multi-item AI call per batch and written back with
+one unordered bulk_write. Each answer's share of a batch call is charged
+to the user who submitted it.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.ai.service import AIService, ai_service
+
+logger = logging.getLogger(__name__)
+
+class EvaluationBatcher:
+    """Collects (question, response) pairs across sessions and evaluates them in batches."""
+
+    def __init__(self, service: AIService, window_seconds: float = 0.25, max_batch_size: int = 8):
+        self.service = service
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        # (interview_id, question_index) -> (question, response, user_id); a resubmitted answer replaces the queued one
+        self._pending: Dict[Tuple[str, int], Tuple[str, str, Optional[str]]] = {}
+        # Callers of evaluate() waiting for a pending answer's written evaluation
+        self._waiters: Dict[Tuple[str, int], List[asyncio.Future]] = {}
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+        self._has_work = asyncio.Event()
+        self._full = asyncio.Event()
+
+        # Counters
+        self.batches = 0
+        self.evaluated = 0
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the batcher is accepting work."""
+        return self._task is not None
+
+    def submit(
+        self,
+        interview_id: str,
+        question_index: int,
+        question: str,
+        response: str,
+        user_id: Optional[str] = None
+    ) -> None:
+        """Queue a response for evaluation, charged to user_id."""
+        self._pending[(interview_id, question_index)] = (question, response, user_id)
+        self._has_work.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+
+    async def evaluate(
+        self,
+        interview_id: str,
+        question_index: int,
+        question: str,
+        response: str,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Queue a response and wait until its evaluation has been written."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault((interview_id, question_index), []).append(waiter)
+        self.submit(interview_id, question_index, question, response, user_id)
+        return await waiter
+
+    def start(self, db) -> None:
+        """Start the batching task."""
+        if self._task is not None:
+            return
+        self._db = db
+        self._has_work = asyncio.Event()
+        self._full = asyncio.Event()
+        if self._pending:
+            self._has_work.set()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Evaluation batcher started")
+
+    async def stop(self) -> None:
+        """Stop the batching task and evaluate anything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        self._db = None
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_work.wait()
+            # Give other sessions a short window to join the batch
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.window_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._has_work.clear()
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Evaluation batch flush failed: {e}")
+
+    async def flush(self) -> int:
+        """Evaluate all pending responses, one AI call per batch, and write the results."""
+        if self._db is None or not self._pending:
+            return 0
+
+        pending, self._pending = list(self._pending.items()), {}
+        waiters = {key: self._waiters.pop(key) for key, _ in pending if key in self._waiters}
+        batches = [pending[start:start + self.max_batch_size] for start in range(0, len(pending), self.max_batch_size)]
+        written = await asyncio.gather(*[self._evaluate_batch(batch, waiters) for batch in batches])
+        return sum(written)
+
+    async def _evaluate_batch(
+        self,
+        batch: List[Tuple[Tuple[str, int], Tuple[str, str, Optional[str]]]],
+        waiters: Dict[Tuple[str, int], List[asyncio.Future]]
+    ) -> int:
+        try:
+            evaluations = await self.service.evaluate_responses(
+                [(question, response) for _, (question, response, _) in batch],
+                users=[user_id for _, (_, _, user_id) in batch]
+            )
+        except Exception as e:
+            self._resolve(batch, waiters, error=e)
+            raise
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": interview_id, f"responses.{question_index}": {"$exists": True}},
+                {
+                    "$set": {
+                        f"responses.{question_index}.ai_score": evaluation["score"],
+                        f"responses.{question_index}.ai_feedback": evaluation["feedback"],
+                        f"responses.{question_index}.strengths": evaluation["strengths"],
+                        f"responses.{question_index}.improvements": evaluation["improvements"],
+                        "updated_at": now
+                    }
+                }
+            )
+            for ((interview_id, question_index), _), evaluation in zip(batch, evaluations)
+        ]
+        try:
+            await self._db.interviews.bulk_write(operations, ordered=False)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Failed to write {len(operations)} response evaluations: {e}")
+            self._resolve(batch, waiters, error=e)
+            return 0
+
+        self._resolve(batch, waiters, evaluations=evaluations)
+        self.batches += 1
+        self.evaluated += len(operations)
+        logger.info(f"Evaluated {len(operations)} responses in one batch")
+        return len(operations)
+
+    @staticmethod
+    def _resolve(batch, waiters, evaluations=None, error: Optional[Exception] = None) -> None:
+        """Hand each waiting caller its evaluation, or the error that lost it."""
+        for index, (key, _) in enumerate(batch):
+            for waiter in waiters.get(key, ()):
+                if waiter.done():
+                    continue
+                if error is not None:
+                    waiter.set_exception(error)
+                else:
+                    waiter.set_result(evaluations[index])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batcher statistics."""
+        return {
+            "pending": len(self._pending),
+            "window_ms": round(self.window_seconds * 1000),
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "evaluated": self.evaluated,
+            "avg_batch_size": round(self.evaluated / self.batches, 2) if self.batches else 0.0,
+            "errors": self.errors
+        }
+
+# Global evaluation batcher instance
+evaluation_batcher = EvaluationBatcher(
+    ai_service,
+    window_seconds=settings.EVALUATION_BATCH_WINDOW_MS / 1000,
+    max_batch_size=settings.EVALUATION_BATCH_MAX_SIZE
+)
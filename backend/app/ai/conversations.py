@@ -0,0 +1,298 @@
+"""
+Server-side AI chat conversations with rolling summaries.
+
+Turns are stored per user in Redis (with a per-worker in-memory fallback),
+so clients send a conversation_id instead of resending their history.
+Each prompt carries the running summary plus the newest turns that fit a
+token budget. When stored turns outgrow the budget, a background job
+folds the oldest ones into the summary and drops them, so prompt size
+stays bounded however long the conversation runs.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from app import models
+from app.config import settings
+from app.ai.metrics import CHARS_PER_TOKEN, estimate_tokens
+from app.ai.service import AIService, ai_service
+
+logger = logging.getLogger(__name__)
+
+# Redis key prefix; a conversation has ":turns" (list) and ":summary" (string) keys
+CONVERSATION_PREFIX = "ai:conversation:"
+
+SUMMARY_PROMPT = """Update the running summary of an interview-preparation chat between a user and an AI assistant.
+Keep facts about the user (target role, experience, goals), advice already given and open questions.
+Write at most {max_words} words of plain prose, no preamble.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+
+Updated summary:"""
+
+class Conversation(NamedTuple):
+    """Running summary of older turns plus the turns not yet summarized."""
+    summary: str
+    turns: List[Dict[str, str]]
+
+class ConversationStore:
+    """Per-user chat history with token-budgeted windows and background compaction."""
+
+    def __init__(
+        self,
+        service: AIService,
+        history_tokens: int = 1500,
+        summary_tokens: int = 300,
+        max_turns: int = 100,
+        ttl_seconds: int = 86400,
+        max_local: int = 1000
+    ):
+        self.service = service
+        self.history_tokens = history_tokens
+        self.summary_tokens = summary_tokens
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self.max_local = max_local
+
+        # Used when Redis is unavailable: key -> (expires_at, conversation)
+        self._local: "OrderedDict[str, Tuple[float, Conversation]]" = OrderedDict()
+        self._compacting: Set[str] = set()
+        self._background: Set[asyncio.Task] = set()
+
+        self.compactions = 0
+        self.compaction_failures = 0
+
+    @staticmethod
+    def new_id() -> str:
+        """Identifier for a new conversation."""
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def _key(user_id: str, conversation_id: str) -> str:
+        return f"{CONVERSATION_PREFIX}{user_id}:{conversation_id}"
+
+    async def load(self, user_id: str, conversation_id: str) -> Conversation:
+        """Summary and unsummarized turns; empty for unknown or expired conversations."""
+        key = self._key(user_id, conversation_id)
+        client = models.redis_client
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                pipe.get(f"{key}:summary")
+                pipe.lrange(f"{key}:turns", 0, -1)
+                summary, turns = await pipe.execute()
+                return Conversation(summary or "", [json.loads(turn) for turn in turns])
+            except Exception as e:
+                logger.warning(f"Conversation read failed: {e}")
+
+        entry = self._local.get(key)
+        if entry is None:
+            return Conversation("", [])
+        expires_at, conversation = entry
+        if expires_at <= time.time():
+            del self._local[key]
+            return Conversation("", [])
+        return Conversation(conversation.summary, list(conversation.turns))
+
+    def window(self, conversation: Conversation, budget: Optional[int] = None) -> List[Dict[str, str]]:
+        """The newest turns whose combined size fits the token budget."""
+        budget = self.history_tokens if budget is None else budget
+        used = 0
+        start = len(conversation.turns)
+        for turn in reversed(conversation.turns):
+            used += estimate_tokens(turn["content"])
+            if used > budget:
+                break
+            start -= 1
+        return conversation.turns[start:]
+
+    def context(self, conversation: Conversation) -> str:
+        """Prompt context: the running summary followed by the windowed turns."""
+        lines = []
+        if conversation.summary:
+            lines.append(f"summary of earlier messages: {conversation.summary}")
+        lines.extend(f"{turn['role']}: {turn['content']}" for turn in self.window(conversation))
+        return "\n".join(lines)
+
+    async def record(
+        self,
+        user_id: str,
+        conversation_id: str,
+        conversation: Conversation,
+        message: str,
+        reply: str
+    ) -> None:
+        """
+        Append a user message and the assistant reply; start compaction in
+        the background once stored turns exceed the history budget.
+        """
+        turns = [{"role": "user", "content": message}, {"role": "assistant", "content": reply}]
+        key = self._key(user_id, conversation_id)
+        await self._append(key, turns)
+
+        stored = conversation.turns + turns
+        if sum(estimate_tokens(turn["content"]) for turn in stored) > self.history_tokens:
+            self._compact_in_background(user_id, conversation_id)
+
+    async def delete(self, user_id: str, conversation_id: str) -> None:
+        """Forget a conversation."""
+        key = self._key(user_id, conversation_id)
+        self._local.pop(key, None)
+        client = models.redis_client
+        if client is None:
+            return
+        try:
+            await client.delete(f"{key}:turns", f"{key}:summary")
+        except Exception as e:
+            logger.warning(f"Conversation delete failed: {e}")
+
+    async def _append(self, key: str, turns: List[Dict[str, str]]) -> None:
+        client = models.redis_client
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                pipe.rpush(f"{key}:turns", *[json.dumps(turn) for turn in turns])
+                # Bounds storage even if summaries cannot be generated
+                pipe.ltrim(f"{key}:turns", -self.max_turns, -1)
+                pipe.expire(f"{key}:turns", self.ttl_seconds)
+                pipe.expire(f"{key}:summary", self.ttl_seconds)
+                await pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"Conversation write failed, keeping it locally: {e}")
+
+        entry = self._local.get(key)
+        conversation = entry[1] if entry is not None and entry[0] > time.time() else Conversation("", [])
+        stored = (conversation.turns + turns)[-self.max_turns:]
+        self._local[key] = (time.time() + self.ttl_seconds, Conversation(conversation.summary, stored))
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_local:
+            self._local.popitem(last=False)
+
+    def _compact_in_background(self, user_id: str, conversation_id: str) -> None:
+        key = self._key(user_id, conversation_id)
+        # One compaction per conversation at a time
+        if key in self._compacting or self.service.provider is None:
+            return
+        self._compacting.add(key)
+
+        async def run():
+            try:
+                await self.compact(user_id, conversation_id)
+            except Exception as e:
+                self.compaction_failures += 1
+                logger.error(f"Conversation compaction failed: {e}")
+            finally:
+                self._compacting.discard(key)
+
+        task = asyncio.create_task(run())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def compact(self, user_id: str, conversation_id: str) -> bool:
+        """
+        Fold the oldest turns into the summary, keeping the newest turns that
+        fit half the history budget so compaction does not run every turn.
+        """
+        key = self._key(user_id, conversation_id)
+        if not await self._claim(key):
+            return False
+        try:
+            conversation = await self.load(user_id, conversation_id)
+            folded = len(conversation.turns) - len(self.window(conversation, self.history_tokens // 2))
+            provider = self.service.provider
+            if folded <= 0 or provider is None:
+                return False
+
+            messages = "\n".join(f"{turn['role']}: {turn['content']}" for turn in conversation.turns[:folded])
+            summary = await provider.generate(
+                SUMMARY_PROMPT.format(
+                    max_words=self.summary_tokens * 3 // 4,
+                    summary=conversation.summary or "(none)",
+                    messages=messages
+                ),
+                temperature=0.2,
+                max_tokens=self.summary_tokens,
+                operation="summary"
+            )
+            summary = summary.strip()[:self.summary_tokens * CHARS_PER_TOKEN]
+            if not summary:
+                return False
+
+            await self._replace_head(key, folded, summary)
+            self.compactions += 1
+            return True
+        finally:
+            await self._release(key)
+
+    async def _replace_head(self, key: str, folded: int, summary: str) -> None:
+        """Store the new summary and drop the folded turns (new turns only arrive at the tail)."""
+        client = models.redis_client
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                pipe.set(f"{key}:summary", summary, ex=self.ttl_seconds)
+                pipe.ltrim(f"{key}:turns", folded, -1)
+                await pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"Conversation summary write failed, keeping it locally: {e}")
+
+        entry = self._local.get(key)
+        turns = entry[1].turns[folded:] if entry is not None else []
+        self._local[key] = (time.time() + self.ttl_seconds, Conversation(summary, turns))
+
+    async def _claim(self, key: str) -> bool:
+        """Let one worker compact a conversation at a time."""
+        client = models.redis_client
+        if client is None:
+            return True
+        try:
+            return bool(await client.set(f"{key}:compacting", 1, ex=120, nx=True))
+        except Exception as e:
+            logger.warning(f"Conversation compaction lock failed: {e}")
+            return True
+
+    async def _release(self, key: str) -> None:
+        client = models.redis_client
+        if client is None:
+            return
+        try:
+            await client.delete(f"{key}:compacting")
+        except Exception as e:
+            logger.warning(f"Conversation compaction unlock failed: {e}")
+
+    async def stop(self) -> None:
+        """Cancel in-flight compactions."""
+        tasks = list(self._background)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get conversation store statistics."""
+        return {
+            "local_conversations": len(self._local),
+            "compacting": len(self._compacting),
+            "compactions": self.compactions,
+            "compaction_failures": self.compaction_failures,
+            "history_tokens": self.history_tokens,
+            "summary_tokens": self.summary_tokens
+        }
+
+# Global conversation store instance
+conversation_store = ConversationStore(
+    ai_service,
+    history_tokens=settings.AI_CHAT_HISTORY_TOKENS,
+    summary_tokens=settings.AI_CHAT_SUMMARY_TOKENS,
+    max_turns=settings.AI_CHAT_MAX_TURNS,
+    ttl_seconds=settings.AI_CHAT_CONVERSATION_TTL_HOURS * 3600
+)
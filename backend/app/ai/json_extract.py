@@ -0,0 +1,203 @@
+"""
+Linear-time extraction of JSON from LLM output.
+
+Model replies wrap JSON in prose, code fences or trailing commentary, and
+long replies get cut off at max_tokens. JSONExtractor scans for the first
+balanced object or array, jumping between structural characters with
+single character-class searches (no backtracking), so each character is
+examined once however long or malformed the text is. It accepts text in
+chunks, reports top-level members (object fields or array items) as soon
+as each one is complete, and salvages the complete members of a
+truncated reply.
+"""
+import json
+import re
+from typing import Any, List, Optional
+
+OBJECT = "{"
+ARRAY = "["
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+# Characters that matter outside and inside JSON strings
+_STRUCTURAL = re.compile(r'[\[\]{}",]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+def strip_code_fences(text: str) -> str:
+    """Drop a markdown code fence (and its language tag) around the whole reply."""
+    stripped = text.strip()
+    if not stripped.startswith("```"):
+        return stripped
+    start = 3
+    while start < len(stripped) and stripped[start].isalpha():
+        start += 1
+    stripped = stripped[start:]
+    if stripped.endswith("```"):
+        stripped = stripped[:-3]
+    return stripped.strip()
+
+class JSONExtractor:
+    """Incremental scanner for the first balanced JSON value of a given kind."""
+
+    def __init__(
+        self,
+        root: str = OBJECT,
+        max_chars: int = 1_000_000,
+        max_candidates: int = 32,
+        max_depth: int = 64
+    ):
+        if root not in _CLOSERS:
+            raise ValueError(f"root must be {OBJECT!r} or {ARRAY!r}")
+        self.root = root
+        self.max_chars = max_chars
+        self.max_candidates = max_candidates
+        self.max_depth = max_depth
+
+        self.value: Any = None
+        self.done = False
+        self.truncated = False
+        self.members: List[Any] = []
+        self._drained = 0
+
+        self._text = ""
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._stack: List[str] = []
+        self._in_string = False
+        self._member_start = 0
+        self._candidates = 0
+
+    def feed(self, chunk: str) -> None:
+        """Scan another chunk of the reply."""
+        if self.done:
+            return
+        if len(self._text) + len(chunk) > self.max_chars:
+            chunk = chunk[:max(0, self.max_chars - len(self._text))]
+            self.truncated = True
+        self._text += chunk
+        self._scan()
+        if self.truncated:
+            self.done = True
+
+    def drain(self) -> List[Any]:
+        """Members completed since the last drain: (key, value) pairs for objects, items for arrays."""
+        members = self.members[self._drained:]
+        self._drained = len(self.members)
+        return members
+
+    def finish(self) -> Any:
+        """The complete value, or what could be salvaged from a truncated one."""
+        if self.value is not None:
+            return self.value
+        if self._start is None or not self.members:
+            return None
+        if self.root == OBJECT:
+            return dict(self.members)
+        return list(self.members)
+
+    def _scan(self) -> None:
+        text = self._text
+        pos = self._pos
+        end = len(text)
+
+        while pos < end and not self.done:
+            if self._start is None:
+                pos = text.find(self.root, pos)
+                if pos < 0:
+                    pos = end
+                    break
+                self._begin(pos)
+                pos += 1
+                continue
+
+            if self._in_string:
+                match = _STRING_SPECIAL.search(text, pos)
+                if match is None:
+                    pos = end
+                    break
+                if match.group() == "\\":
+                    if match.end() >= end:
+                        # The escaped character has not arrived yet
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                continue
+
+            match = _STRUCTURAL.search(text, pos)
+            if match is None:
+                pos = end
+                break
+            char, index = match.group(), match.start()
+            pos = match.end()
+
+            if char == '"':
+                self._in_string = True
+            elif char in _CLOSERS:
+                self._stack.append(char)
+                if len(self._stack) > self.max_depth:
+                    # AI outputs are shallow; deep nesting is noise (and would exhaust the json recursion limit)
+                    self._reject()
+            elif char == ",":
+                if len(self._stack) == 1:
+                    self._add_member(text[self._member_start:index])
+                    self._member_start = pos
+            elif _CLOSERS[self._stack[-1]] != char:
+                self._reject()
+            else:
+                self._stack.pop()
+                if not self._stack:
+                    self._add_member(text[self._member_start:index])
+                    self._close(text[self._start:pos])
+
+        self._pos = pos
+
+    def _begin(self, index: int) -> None:
+        self._start = index
+        self._stack = [self.root]
+        self._in_string = False
+        self._member_start = index + 1
+
+    def _close(self, span: str) -> None:
+        try:
+            self.value = json.loads(span)
+            self.done = True
+        except (ValueError, RecursionError):
+            # Not JSON after all (e.g. "{like this}" in prose); keep looking after it
+            self._reject()
+
+    def _reject(self) -> None:
+        self._candidates += 1
+        del self.members[self._drained:]
+        self._start = None
+        self._stack = []
+        if self._candidates >= self.max_candidates:
+            self.done = True
+
+    def _add_member(self, segment: str) -> None:
+        segment = segment.strip()
+        if not segment:
+            return
+        try:
+            if self.root == OBJECT:
+                member = json.loads("{" + segment + "}")
+                self.members.extend(member.items())
+            else:
+                self.members.append(json.loads(segment))
+        except (ValueError, RecursionError):
+            pass
+
+def extract_json(text: str, root: str = OBJECT, max_chars: int = 1_000_000) -> Any:
+    """Parse the first JSON object/array in text; None if there is none."""
+    stripped = strip_code_fences(text)
+    if stripped.startswith(root) and len(stripped) <= max_chars:
+        try:
+            return json.loads(stripped)
+        except (ValueError, RecursionError):
+            pass
+
+    extractor = JSONExtractor(root, max_chars=max_chars)
+    extractor.feed(text)
+    return extractor.finish()
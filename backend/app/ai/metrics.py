@@ -0,0 +1,389 @@
+"""
+Token, cost and latency accounting for AI calls, with per-user token quotas.
+
+Every provider call records its operation, prompt/completion tokens and
+latency (as a fixed-bucket histogram); AIService records whether each
+operation was answered by AI or fell back, and replies that failed to
+parse. Counters are kept per hour in process and a background task adds
+them to Redis hashes, so reports cover every worker. Each user's tokens
+are also counted per day in Redis, and calls are refused once a user
+reaches AI_USER_DAILY_TOKEN_QUOTA.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app import models
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis keys: one hash of counters per hour, one counter per user and day
+METRICS_PREFIX = "ai:metrics:"
+USAGE_PREFIX = "ai:usage:"
+
+# Latency histogram bucket upper bounds, in milliseconds (plus an overflow bucket)
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Rough size of a token in characters, for providers that do not report usage
+CHARS_PER_TOKEN = 4
+
+# User whose quota AI calls in this context are charged to
+_current_user: ContextVar[Optional[str]] = ContextVar("ai_user", default=None)
+
+# Token counts reported by the upstream API for the provider call in progress
+_call_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("ai_call_usage", default=None)
+
+class QuotaExceededError(Exception):
+    """Raised when a user has used up their daily AI token quota."""
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def bind_user(user_id: Optional[str]) -> None:
+    """Charge AI calls made for the rest of this request (and tasks it starts) to user_id."""
+    _current_user.set(str(user_id) if user_id is not None else None)
+
+@contextmanager
+def charged_to(user_id: Optional[str]):
+    """Charge AI calls made inside the block to user_id, then restore the previous user."""
+    token = _current_user.set(str(user_id) if user_id is not None else None)
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
+
+def report_usage(prompt_tokens: Any, completion_tokens: Any) -> None:
+    """Called by providers whose API reports token usage for the current call."""
+    usage = _call_usage.get()
+    if usage is not None and isinstance(prompt_tokens, int) and isinstance(completion_tokens, int):
+        usage["prompt_tokens"] = prompt_tokens
+        usage["completion_tokens"] = completion_tokens
+
+def call_usage() -> Dict[str, int]:
+    """Token counts the upstream API reported for the latest provider call in this context."""
+    return dict(_call_usage.get() or {})
+
+def start_call() -> Dict[str, int]:
+    """Open a usage slot for a provider call; report_usage() fills it."""
+    usage: Dict[str, int] = {}
+    _call_usage.set(usage)
+    return usage
+
+class AIMetrics:
+    """Per-hour AI call counters shared through Redis, plus daily per-user token quotas."""
+
+    def __init__(
+        self,
+        daily_token_quota: int = 0,
+        flush_interval_seconds: float = 15,
+        retention_hours: int = 720,
+        prices_per_1k: Optional[Dict[str, List[float]]] = None
+    ):
+        self.daily_token_quota = daily_token_quota
+        self.flush_interval_seconds = flush_interval_seconds
+        self.retention_hours = retention_hours
+        self.prices_per_1k = prices_per_1k or {}
+
+        # hour -> field -> value; _pending holds what Redis has not seen yet
+        self._hours: Dict[str, Counter] = defaultdict(Counter)
+        self._pending: Dict[str, Counter] = defaultdict(Counter)
+        # "user:day" -> tokens: this worker's view, refreshed with other workers' usage on flush
+        self._usage: Dict[str, int] = {}
+        self._pending_usage: Counter = Counter()
+        self._usage_synced: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.flushes = 0
+        self.flush_errors = 0
+        self.quota_rejections = 0
+
+    @staticmethod
+    def _hour(when: Optional[datetime] = None) -> str:
+        return (when or datetime.utcnow()).strftime("%Y%m%d%H")
+
+    def _add(self, fields: Dict[str, int]) -> None:
+        hour = self._hour()
+        for field, value in fields.items():
+            self._hours[hour][field] += value
+            self._pending[hour][field] += value
+
+    async def check_quota(self, user_id: Optional[str] = None) -> None:
+        """Raise QuotaExceededError if user_id (default: the current user) has no tokens left today."""
+        user_id = str(user_id) if user_id is not None else _current_user.get()
+        if user_id is None or self.daily_token_quota <= 0:
+            return
+        key = f"{user_id}:{datetime.utcnow():%Y%m%d}"
+
+        # Pick up other workers' usage, at most once per flush interval per user
+        client = models.redis_client
+        now = time.monotonic()
+        if client is not None and now - self._usage_synced.get(key, float("-inf")) >= self.flush_interval_seconds:
+            self._usage_synced[key] = now
+            try:
+                shared = int(await client.get(f"{USAGE_PREFIX}{key}") or 0)
+                self._usage[key] = max(self._usage.get(key, 0), shared + self._pending_usage.get(key, 0))
+            except Exception as e:
+                logger.warning(f"AI token usage read failed: {e}")
+
+        if self._usage.get(key, 0) >= self.daily_token_quota:
+            self.quota_rejections += 1
+            raise QuotaExceededError(f"Daily AI token quota of {self.daily_token_quota} reached")
+
+    def record_call(
+        self,
+        provider: str,
+        operation: str,
+        prompt: str,
+        completion: str,
+        latency_seconds: float,
+        usage: Optional[Dict[str, int]] = None,
+        status: str = "ok"
+    ) -> None:
+        """
+        Record one provider call. Token counts come from the provider's usage
+        report when there is one and are estimated from text otherwise;
+        failed calls are not charged to the user.
+        """
+        usage = usage or {}
+        prompt_tokens = usage.get("prompt_tokens", estimate_tokens(prompt))
+        completion_tokens = usage.get("completion_tokens", estimate_tokens(completion) if completion else 0)
+        latency_ms = int(latency_seconds * 1000)
+        bucket = next((f"le_{bound}" for bound in LATENCY_BUCKETS_MS if latency_ms <= bound), "le_inf")
+
+        prefix = f"call|{provider}|{operation}|"
+        fields = {f"{prefix}calls": 1, f"{prefix}latency_ms": latency_ms, f"{prefix}{bucket}": 1}
+        if status != "ok":
+            fields[f"{prefix}{status}"] = 1
+        if status != "failed":
+            fields[f"{prefix}prompt_tokens"] = prompt_tokens
+            fields[f"{prefix}completion_tokens"] = completion_tokens
+        self._add(fields)
+
+        if status != "failed":
+            self.charge(_current_user.get(), prompt_tokens + completion_tokens)
+
+    def charge(self, user_id: Optional[str], tokens: int) -> None:
+        """
+        Add tokens to a user's usage today. Calls made for several users at
+        once (batched evaluations) are charged with this, share by share.
+        """
+        if user_id is None or tokens <= 0:
+            return
+        key = f"{user_id}:{datetime.utcnow():%Y%m%d}"
+        self._usage[key] = self._usage.get(key, 0) + tokens
+        self._pending_usage[key] += tokens
+
+    def record_outcome(self, operation: str, outcome: str, count: int = 1) -> None:
+        """Record how an operation was answered: "ai", "fallback" or "parse_failure"."""
+        if count:
+            self._add({f"outcome|{operation}|{outcome}": count})
+
+    async def user_usage(self, user_id: str) -> int:
+        """Tokens a user has used today."""
+        key = f"{user_id}:{datetime.utcnow():%Y%m%d}"
+        client = models.redis_client
+        if client is not None:
+            try:
+                return int(await client.get(f"{USAGE_PREFIX}{key}") or 0)
+            except Exception as e:
+                logger.warning(f"AI token usage read failed: {e}")
+        return self._usage.get(key, 0)
+
+    async def totals(self, hours: int) -> Counter:
+        """Counters summed over the last `hours` hours, across workers when Redis is available."""
+        now = datetime.utcnow()
+        keys = [self._hour(now - timedelta(hours=offset)) for offset in range(hours)]
+
+        client = models.redis_client
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for hour in keys:
+                    pipe.hgetall(f"{METRICS_PREFIX}{hour}")
+                totals: Counter = Counter()
+                for values in await pipe.execute():
+                    for field, value in values.items():
+                        totals[field] += int(value)
+                # Add what this worker has not flushed yet
+                for hour in keys:
+                    totals.update(self._pending.get(hour, {}))
+                return totals
+            except Exception as e:
+                logger.warning(f"AI metrics read failed, reporting this worker only: {e}")
+
+        totals = Counter()
+        for hour in keys:
+            totals.update(self._hours.get(hour, {}))
+        return totals
+
+    def report(self, totals: Counter) -> Dict[str, Any]:
+        """Structure counters into per-provider/operation and per-operation figures."""
+        calls: Dict[str, Dict[str, Counter]] = defaultdict(lambda: defaultdict(Counter))
+        outcomes: Dict[str, Counter] = defaultdict(Counter)
+        for field, value in totals.items():
+            kind, *parts = field.split("|")
+            if kind == "call":
+                provider, operation, name = parts
+                calls[provider][operation][name] += value
+            elif kind == "outcome":
+                operation, name = parts
+                outcomes[operation][name] += value
+
+        overall = Counter()
+        cost = 0.0
+        providers: Dict[str, Dict[str, Any]] = {}
+        for provider, operations in calls.items():
+            providers[provider] = {}
+            for operation, counts in operations.items():
+                entry = self._call_report(provider, counts)
+                providers[provider][operation] = entry
+                overall.update({name: counts[name] for name in ("calls", "prompt_tokens", "completion_tokens", "latency_ms")})
+                cost += entry["cost_usd"]
+
+        return {
+            "totals": {
+                "calls": overall["calls"],
+                "prompt_tokens": overall["prompt_tokens"],
+                "completion_tokens": overall["completion_tokens"],
+                "cost_usd": round(cost, 4),
+                "avg_latency_ms": round(overall["latency_ms"] / overall["calls"], 1) if overall["calls"] else 0.0
+            },
+            "providers": providers,
+            "operations": {
+                operation: {
+                    "ai": counts["ai"],
+                    "fallback": counts["fallback"],
+                    "parse_failures": counts["parse_failure"],
+                    "fallback_rate": self._rate(counts["fallback"], counts["ai"] + counts["fallback"]),
+                    "parse_failure_rate": self._rate(counts["parse_failure"], counts["ai"] + counts["parse_failure"])
+                }
+                for operation, counts in outcomes.items()
+            }
+        }
+
+    def _call_report(self, provider: str, counts: Counter) -> Dict[str, Any]:
+        prompt_price, completion_price = self.prices_per_1k.get(provider, (0.0, 0.0))
+        histogram = {f"le_{bound}": counts[f"le_{bound}"] for bound in LATENCY_BUCKETS_MS}
+        histogram["le_inf"] = counts["le_inf"]
+        return {
+            "calls": counts["calls"],
+            "failures": counts["failed"],
+            "cancelled": counts["cancelled"],
+            "prompt_tokens": counts["prompt_tokens"],
+            "completion_tokens": counts["completion_tokens"],
+            "cost_usd": round(
+                counts["prompt_tokens"] / 1000 * prompt_price + counts["completion_tokens"] / 1000 * completion_price, 4
+            ),
+            "avg_latency_ms": round(counts["latency_ms"] / counts["calls"], 1) if counts["calls"] else 0.0,
+            "p50_ms": self._percentile(histogram, counts["calls"], 0.5),
+            "p95_ms": self._percentile(histogram, counts["calls"], 0.95),
+            "latency_histogram_ms": histogram
+        }
+
+    @staticmethod
+    def _percentile(histogram: Dict[str, int], total: int, fraction: float) -> Optional[int]:
+        """Upper bound of the bucket holding the percentile (None if in the overflow bucket)."""
+        if not total:
+            return None
+        seen = 0
+        for bound in LATENCY_BUCKETS_MS:
+            seen += histogram[f"le_{bound}"]
+            if seen >= fraction * total:
+                return bound
+        return None
+
+    @staticmethod
+    def _rate(part: int, whole: int) -> float:
+        return round(part / whole, 4) if whole else 0.0
+
+    def start(self) -> None:
+        """Start the periodic flush to Redis."""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("AI metrics flusher started")
+
+    async def stop(self) -> None:
+        """Stop flushing and write out anything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await self.flush()
+
+    async def flush(self) -> bool:
+        """Add pending counters and token usage to the shared Redis keys."""
+        self._prune()
+        client = models.redis_client
+        if client is None or not (self._pending or self._pending_usage):
+            return False
+
+        pending, self._pending = self._pending, defaultdict(Counter)
+        pending_usage, self._pending_usage = self._pending_usage, Counter()
+        try:
+            pipe = client.pipeline(transaction=False)
+            for hour, fields in pending.items():
+                for field, value in fields.items():
+                    pipe.hincrby(f"{METRICS_PREFIX}{hour}", field, value)
+                pipe.expire(f"{METRICS_PREFIX}{hour}", self.retention_hours * 3600)
+            for key, tokens in pending_usage.items():
+                pipe.incrby(f"{USAGE_PREFIX}{key}", tokens)
+                pipe.expire(f"{USAGE_PREFIX}{key}", 2 * 86400)
+            results = await pipe.execute()
+        except Exception as e:
+            self.flush_errors += 1
+            logger.error(f"Failed to flush AI metrics: {e}")
+            # Merge back so nothing is lost; a partial apply may double count a little
+            for hour, fields in pending.items():
+                self._pending[hour].update(fields)
+            self._pending_usage.update(pending_usage)
+            return False
+
+        # INCRBY returns the total across workers, so quota checks see everyone's usage
+        usage_totals = results[len(results) - 2 * len(pending_usage)::2]
+        for key, total in zip(pending_usage, usage_totals):
+            self._usage[key] = int(total) + self._pending_usage.get(key, 0)
+        self.flushes += 1
+        return True
+
+    def _prune(self) -> None:
+        oldest = self._hour(datetime.utcnow() - timedelta(hours=self.retention_hours))
+        for hour in [hour for hour in self._hours if hour < oldest]:
+            del self._hours[hour]
+        today = f"{datetime.utcnow():%Y%m%d}"
+        for key in [key for key in self._usage if not key.endswith(today)]:
+            del self._usage[key]
+            self._usage_synced.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get flusher and quota statistics."""
+        return {
+            "pending_fields": sum(len(fields) for fields in self._pending.values()),
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "daily_token_quota": self.daily_token_quota,
+            "quota_rejections": self.quota_rejections
+        }
+
+# Global AI metrics instance
+ai_metrics = AIMetrics(
+    daily_token_quota=settings.AI_USER_DAILY_TOKEN_QUOTA,
+    flush_interval_seconds=settings.AI_METRICS_FLUSH_INTERVAL_SECONDS,
+    prices_per_1k=settings.AI_TOKEN_PRICES_PER_1K
+)
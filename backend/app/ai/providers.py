@@ -0,0 +1,333 @@
+"""
+Async LLM providers with per-provider concurrency and queue-depth limits.
+
+Every provider call goes through LLMProvider.generate(), which admits at
+most max_concurrency requests at once and rejects new work with
+ProviderOverloadedError once max_queue callers are already waiting, so a
+slow upstream sheds load instead of piling up requests. Each call's
+latency and token usage is recorded in ai_metrics under its operation,
+and a user who has used up their daily token quota is refused before a
+slot is taken.
+"""
+import asyncio
+import inspect
+from abc import ABC, abstractmethod
+import logging
+import re
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Union
+
+import httpx
+
+from app.ai.metrics import ai_metrics, report_usage, start_call
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ProviderOverloadedError(Exception):
+    """Raised when a provider's wait queue is full."""
+
+class LLMProvider(ABC):
+    """Base class: subclasses implement _generate()."""
+
+    name = "base"
+    model = ""
+
+    def __init__(self, max_concurrency: int = 16, max_queue: int = 256, timeout_seconds: float = 60.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self._in_flight = 0
+
+        # Counters
+        self.requests = 0
+        self.failures = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.peak_in_flight = 0
+        self.total_latency = 0.0
+
+    async def generate(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        operation: str = "generate"
+    ) -> str:
+        """Generate a completion for prompt, waiting for a free slot."""
+        await ai_metrics.check_quota()
+        await self._acquire()
+        start = time.perf_counter()
+        usage = start_call()
+        text, status = "", "failed"
+        try:
+            text = await asyncio.wait_for(
+                self._generate(prompt, system, temperature, max_tokens),
+                timeout=self.timeout_seconds
+            )
+            self.requests += 1
+            status = "ok"
+            return text
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self._release(start)
+            ai_metrics.record_call(
+                self.name, operation, prompt, text, time.perf_counter() - start, usage, status
+            )
+
+    async def stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        operation: str = "stream"
+    ) -> AsyncIterator[str]:
+        """
+        Yield the completion in chunks as the provider emits them. Closing the
+        iterator early (e.g. the client went away) closes the upstream stream.
+        timeout_seconds applies to the wait for each chunk.
+        """
+        await ai_metrics.check_quota()
+        await self._acquire()
+        start = time.perf_counter()
+        usage = start_call()
+        emitted, status = [], "failed"
+        try:
+            async with aclosing(self._stream(prompt, system, temperature, max_tokens)) as chunks:
+                iterator = chunks.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(iterator.__anext__(), timeout=self.timeout_seconds)
+                    except StopAsyncIteration:
+                        break
+                    emitted.append(chunk)
+                    yield chunk
+            self.requests += 1
+            status = "ok"
+        except (GeneratorExit, asyncio.CancelledError):
+            self.cancelled += 1
+            status = "cancelled"
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self._release(start)
+            ai_metrics.record_call(
+                self.name, operation, prompt, "".join(emitted), time.perf_counter() - start, usage, status
+            )
+
+    async def _acquire(self) -> None:
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise ProviderOverloadedError(f"{self.name} provider queue is full ({self.max_queue} waiting)")
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+
+    def saturated(self, max_waiting: int) -> bool:
+        """Whether every slot is busy and at least max_waiting callers are queued."""
+        return self._semaphore.locked() and self._waiting >= max_waiting
+
+    def _release(self, start: float) -> None:
+        self.total_latency += time.perf_counter() - start
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    @abstractmethod
+    async def _generate(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> str:
+        """Send one completion request upstream and return the reply text."""
+
+    async def _stream(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        """Providers without native streaming emit the whole reply as one chunk."""
+        yield await self._generate(prompt, system, temperature, max_tokens)
+
+    async def close(self) -> None:
+        """Release pooled connections."""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get provider statistics."""
+        completed = self.requests + self.failures
+        return {
+            "provider": self.name,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "peak_in_flight": self.peak_in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "avg_latency_ms": round(self.total_latency / completed * 1000, 1) if completed else 0.0
+        }
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through the async generate_content API."""
+
+    name = "gemini"
+
+    def __init__(self, client, **kwargs):
+        super().__init__(**kwargs)
+        # One GenerativeModel per process so its gRPC channel is shared
+        self.client = client
+        self.model = getattr(client, "model_name", None) or settings.AI_MODEL
+
+    async def _generate(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> str:
+        contents = f"{system}\n\n{prompt}" if system else prompt
+        generation_config = {"temperature": temperature, "max_output_tokens": max_tokens}
+
+        generate_async = getattr(self.client, "generate_content_async", None)
+        if inspect.iscoroutinefunction(generate_async):
+            response = await generate_async(contents, generation_config=generation_config)
+        else:
+            # Synchronous clients run in a worker thread so the event loop keeps serving
+            response = await asyncio.to_thread(
+                self.client.generate_content, contents, generation_config=generation_config
+            )
+        return response.text.strip()
+
+    async def _stream(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        generate_async = getattr(self.client, "generate_content_async", None)
+        if not inspect.iscoroutinefunction(generate_async):
+            yield await self._generate(prompt, system, temperature, max_tokens)
+            return
+
+        contents = f"{system}\n\n{prompt}" if system else prompt
+        response = await generate_async(
+            contents,
+            generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
+            stream=True
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI chat completions through AsyncOpenAI on a shared connection pool."""
+
+    name = "openai"
+
+    def __init__(self, client, model: str = "gpt-4", http_client: Optional[httpx.AsyncClient] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+        self.model = model
+        self._http_client = http_client
+
+    @classmethod
+    def from_api_key(cls, api_key: str, model: str = "gpt-4", max_connections: int = 100, **kwargs) -> "OpenAIProvider":
+        """Build a provider whose requests share one pooled HTTP client."""
+        from openai import AsyncOpenAI
+
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(kwargs.get("timeout_seconds", 60.0), connect=10.0)
+        )
+        client = AsyncOpenAI(api_key=api_key, http_client=http_client)
+        return cls(client, model=model, http_client=http_client, **kwargs)
+
+    async def _generate(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> str:
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+
+        create = self.client.chat.completions.create
+        kwargs = {"model": self.model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+        if inspect.iscoroutinefunction(create):
+            response = await create(**kwargs)
+        else:
+            response = await asyncio.to_thread(create, **kwargs)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            report_usage(usage.prompt_tokens, usage.completion_tokens)
+        return response.choices[0].message.content.strip()
+
+    async def _stream(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        create = self.client.chat.completions.create
+        if not inspect.iscoroutinefunction(create):
+            yield await self._generate(prompt, system, temperature, max_tokens)
+            return
+
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        stream = await create(
+            model=self.model, messages=messages, temperature=temperature, max_tokens=max_tokens, stream=True
+        )
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        finally:
+            # Closing the HTTP response stops generation upstream
+            response = getattr(stream, "response", None)
+            if response is not None:
+                await response.aclose()
+
+    async def close(self) -> None:
+        if self._http_client is not None:
+            await self._http_client.aclose()
+
+class FakeProvider(LLMProvider):
+    """In-process provider with configurable latency, for tests and benchmarks."""
+
+    name = "fake"
+    model = "fake"
+
+    def __init__(
+        self,
+        response: Union[str, Callable[[str], str]] = "{}",
+        latency: float = 0.0,
+        error: Optional[Exception] = None,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.response = response
+        self.latency = latency
+        self.error = error
+        self.prompts = []
+        self.chunks_sent = 0
+
+    async def _generate(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> str:
+        self.prompts.append(prompt)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        return self.response(prompt) if callable(self.response) else self.response
+
+    async def _stream(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        """Emit the reply word by word, spreading latency across the chunks."""
+        self.prompts.append(prompt)
+        if self.error is not None:
+            raise self.error
+        text = self.response(prompt) if callable(self.response) else self.response
+        chunks = re.findall(r"\s*\S+", text) or [text]
+        for chunk in chunks:
+            if self.latency:
+                await asyncio.sleep(self.latency / len(chunks))
+            self.chunks_sent += 1
+            yield chunk
+
+def provider_limits() -> Dict[str, Any]:
+    """Concurrency settings shared by the configured providers."""
+    return {
+        "max_concurrency": settings.AI_PROVIDER_MAX_CONCURRENCY,
+        "max_queue": settings.AI_PROVIDER_MAX_QUEUE,
+        "timeout_seconds": settings.AI_PROVIDER_TIMEOUT_SECONDS
+    }
@@ -0,0 +1,446 @@
+"""
+Content-addressed cache of AI-generated interview question sets.
+
+Sets are keyed by a digest of the normalized generation inputs, keep
+several variants per key (rotated per user so repeat interviews differ)
+and expire after QUESTION_CACHE_TTL_HOURS. Requests without a job
+description can also reuse a near-identical job title. A background job
+keeps the most requested keys filled so interviews start with AI
+questions instead of waiting on the model.
+"""
+import asyncio
+import copy
+import difflib
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from app import models
+from app.config import settings
+from app.ai.service import AIService, ai_service
+
+logger = logging.getLogger(__name__)
+
+# Redis keys
+QUESTION_SET_PREFIX = "ai:questions:set:"
+QUESTION_SEEN_PREFIX = "ai:questions:seen:"
+QUESTION_TITLES_PREFIX = "ai:questions:titles:"
+POPULAR_QUESTION_SETS = "ai:questions:popular"
+QUESTION_WARM_LOCK = "ai:questions:warm-lock"
+
+# Popularity entries kept between warm cycles
+MAX_TRACKED_REQUESTS = 1000
+
+_TITLE_SPLIT = re.compile(r"[^0-9a-z+#]+")
+
+# Abbreviations expanded before comparing titles
+TITLE_SYNONYMS = {
+    "sr": "senior",
+    "jr": "junior",
+    "eng": "engineer",
+    "engg": "engineer",
+    "dev": "developer",
+    "swe": "software engineer",
+    "sde": "software engineer",
+    "mgr": "manager",
+    "pm": "product manager",
+    "qa": "quality assurance",
+    "ml": "machine learning",
+    "fe": "frontend",
+    "be": "backend",
+    "ui": "user interface",
+    "ux": "user experience"
+}
+
+# Seniority words duplicate experience_level, which is part of the key
+SENIORITY_WORDS = {"senior", "junior", "mid", "entry", "level"}
+
+def canonical_title(job_title: str) -> str:
+    """Lowercase, expand abbreviations, drop seniority words and sort tokens."""
+    tokens = []
+    for token in _TITLE_SPLIT.split(job_title.casefold()):
+        if token:
+            tokens.extend(TITLE_SYNONYMS.get(token, token).split())
+    return " ".join(sorted(token for token in tokens if token not in SENIORITY_WORDS))
+
+def _normalize_text(text: Optional[str]) -> str:
+    return " ".join((text or "").casefold().split())
+
+class QuestionSetRequest(NamedTuple):
+    """Normalized inputs that determine a generated question set."""
+    title: str
+    description: str
+    experience_level: str
+    interview_mode: str
+    question_count: int
+    interview_type: str = "mixed"
+
+    @classmethod
+    def build(
+        cls,
+        job_title: str,
+        job_description: Optional[str],
+        experience_level: str,
+        question_count: int,
+        interview_mode: str,
+        interview_type: str = "mixed"
+    ) -> "QuestionSetRequest":
+        return cls(
+            canonical_title(job_title),
+            _normalize_text(job_description),
+            experience_level.casefold(),
+            interview_mode.casefold(),
+            question_count,
+            interview_type.casefold()
+        )
+
+    @property
+    def digest(self) -> str:
+        payload = json.dumps(list(self), separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @property
+    def group(self) -> str:
+        """Requests whose titles may be matched against each other."""
+        return f"{self.experience_level}:{self.interview_mode}:{self.question_count}:{self.interview_type}"
+
+class QuestionSetCache:
+    """Cached question set variants with per-user rotation and background warming."""
+
+    def __init__(
+        self,
+        service: AIService,
+        ttl_seconds: int = 24 * 3600,
+        variants: int = 3,
+        title_similarity: float = 0.9,
+        warm_interval_seconds: int = 1800,
+        warm_top: int = 50
+    ):
+        self.service = service
+        self.ttl_seconds = ttl_seconds
+        self.variants = variants
+        self.title_similarity = title_similarity
+        self.warm_interval_seconds = warm_interval_seconds
+        self.warm_top = warm_top
+
+        # In-process fallback when Redis is unavailable
+        self._local_sets: Dict[str, Tuple[float, Deque[List[Dict[str, Any]]]]] = {}
+        self._local_titles: Dict[str, Set[str]] = {}
+        self._local_seen: Dict[Tuple[str, str], int] = {}
+        self._local_popular: Counter = Counter()
+
+        self._filling: Set[str] = set()
+        self._background: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.warm_cycles = 0
+
+    async def get(
+        self,
+        user_id: str,
+        job_title: str,
+        job_description: Optional[str],
+        experience_level: str,
+        question_count: int,
+        interview_mode: str,
+        interview_type: str = "mixed"
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return a cached question set, rotating variants per user, or None on a miss.
+        Keys with fewer than `variants` sets are topped up in the background;
+        on a miss the caller generates with fill().
+        """
+        request = QuestionSetRequest.build(
+            job_title, job_description, experience_level, question_count, interview_mode, interview_type
+        )
+        if not request.description:
+            await self._record_request(job_title, request)
+
+        variants = await self._load(request.digest)
+        if variants:
+            self.hits += 1
+        elif not request.description:
+            matched = await self._near_match(request)
+            matched_variants = await self._load(matched.digest) if matched is not None else []
+            if matched_variants:
+                request, variants = matched, matched_variants
+                self.near_hits += 1
+
+        if variants and len(variants) < self.variants:
+            self._fill_in_background(request, job_title, job_description, interview_mode)
+        if not variants:
+            self.misses += 1
+            return None
+
+        index = await self._next_variant(user_id, request.digest)
+        return copy.deepcopy(variants[index % len(variants)])
+
+    async def fill(
+        self,
+        job_title: str,
+        job_description: Optional[str],
+        experience_level: str,
+        question_count: int,
+        interview_mode: str,
+        interview_type: str = "mixed"
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Generate one more variant for a request and cache it."""
+        request = QuestionSetRequest.build(
+            job_title, job_description, experience_level, question_count, interview_mode, interview_type
+        )
+        return await self._fill(request, job_title, job_description, interview_mode)
+
+    async def _fill(
+        self,
+        request: QuestionSetRequest,
+        job_title: str,
+        job_description: Optional[str],
+        interview_mode: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        questions = await self.service.generate_question_set(
+            job_title, job_description, request.experience_level, request.question_count,
+            interview_mode, request.interview_type
+        )
+        if not questions:
+            return None
+
+        questions = questions[:request.question_count]
+        await self._store(request, questions)
+        self.generated += 1
+        return questions
+
+    def _fill_in_background(
+        self,
+        request: QuestionSetRequest,
+        job_title: str,
+        job_description: Optional[str],
+        interview_mode: str
+    ) -> None:
+        # One generation per key at a time
+        if request.digest in self._filling or self.service.provider is None:
+            return
+        self._filling.add(request.digest)
+
+        async def run():
+            try:
+                await self._fill(request, job_title, job_description, interview_mode)
+            except Exception as e:
+                logger.error(f"Question set generation failed for '{request.title}': {e}")
+            finally:
+                self._filling.discard(request.digest)
+
+        task = asyncio.create_task(run())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _load(self, digest: str) -> List[List[Dict[str, Any]]]:
+        client = models.redis_client
+        if client is not None:
+            try:
+                return [json.loads(item) for item in await client.lrange(f"{QUESTION_SET_PREFIX}{digest}", 0, -1)]
+            except Exception as e:
+                logger.warning(f"Question cache read failed: {e}")
+
+        entry = self._local_sets.get(digest)
+        if entry is None:
+            return []
+        expires_at, variants = entry
+        if expires_at <= time.time():
+            del self._local_sets[digest]
+            return []
+        return list(variants)
+
+    async def _store(self, request: QuestionSetRequest, questions: List[Dict[str, Any]]) -> None:
+        client = models.redis_client
+        if client is not None:
+            try:
+                key = f"{QUESTION_SET_PREFIX}{request.digest}"
+                titles_key = f"{QUESTION_TITLES_PREFIX}{request.group}"
+                pipe = client.pipeline(transaction=False)
+                pipe.lpush(key, json.dumps(questions))
+                pipe.ltrim(key, 0, self.variants - 1)
+                pipe.expire(key, self.ttl_seconds)
+                if not request.description:
+                    pipe.sadd(titles_key, request.title)
+                    pipe.expire(titles_key, self.ttl_seconds)
+                await pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"Question cache write failed: {e}")
+
+        _, variants = self._local_sets.get(request.digest, (0, deque(maxlen=self.variants)))
+        variants.appendleft(questions)
+        self._local_sets[request.digest] = (time.time() + self.ttl_seconds, variants)
+        if not request.description:
+            self._local_titles.setdefault(request.group, set()).add(request.title)
+
+    async def _near_match(self, request: QuestionSetRequest) -> Optional[QuestionSetRequest]:
+        """Find a cached request in the same group whose title is nearly identical."""
+        if self.title_similarity <= 0:
+            return None
+
+        titles = None
+        client = models.redis_client
+        if client is not None:
+            try:
+                titles = await client.smembers(f"{QUESTION_TITLES_PREFIX}{request.group}")
+            except Exception as e:
+                logger.warning(f"Question title index read failed: {e}")
+        if titles is None:
+            titles = self._local_titles.get(request.group, set())
+
+        matches = difflib.get_close_matches(request.title, list(titles), n=1, cutoff=self.title_similarity)
+        if not matches or matches[0] == request.title:
+            return None
+        return request._replace(title=matches[0])
+
+    async def _next_variant(self, user_id: str, digest: str) -> int:
+        """Index of the next variant for this user, so repeat interviews rotate."""
+        client = models.redis_client
+        if client is not None:
+            try:
+                key = f"{QUESTION_SEEN_PREFIX}{user_id}:{digest}"
+                pipe = client.pipeline(transaction=False)
+                pipe.incr(key)
+                pipe.expire(key, self.ttl_seconds)
+                count, _ = await pipe.execute()
+                return count - 1
+            except Exception as e:
+                logger.warning(f"Question rotation counter failed: {e}")
+
+        seen_key = (str(user_id), digest)
+        index = self._local_seen.get(seen_key, 0)
+        self._local_seen[seen_key] = index + 1
+        return index
+
+    async def _record_request(self, job_title: str, request: QuestionSetRequest) -> None:
+        member = json.dumps(
+            [
+                job_title.strip(), request.experience_level, request.question_count,
+                request.interview_mode, request.interview_type
+            ],
+            separators=(",", ":")
+        )
+        client = models.redis_client
+        if client is not None:
+            try:
+                await client.zincrby(POPULAR_QUESTION_SETS, 1, member)
+                return
+            except Exception as e:
+                logger.warning(f"Question popularity update failed: {e}")
+        self._local_popular[member] += 1
+
+    async def _popular_requests(self) -> List[Tuple[str, str, int, str, str]]:
+        """Most requested (job_title, experience_level, question_count, interview_mode, interview_type)."""
+        client = models.redis_client
+        members = None
+        if client is not None:
+            try:
+                members = await client.zrevrange(POPULAR_QUESTION_SETS, 0, self.warm_top - 1)
+                # Forget the long tail so the set stays small
+                await client.zremrangebyrank(POPULAR_QUESTION_SETS, 0, -(MAX_TRACKED_REQUESTS + 1))
+            except Exception as e:
+                logger.warning(f"Question popularity read failed: {e}")
+        if members is None:
+            members = [member for member, _ in self._local_popular.most_common(self.warm_top)]
+            self._local_popular = Counter(dict(self._local_popular.most_common(MAX_TRACKED_REQUESTS)))
+        # Entries recorded before interview_type was tracked were mixed sets
+        return [tuple(json.loads(member) + ["mixed"])[:5] for member in members]
+
+    async def warm(self) -> int:
+        """Fill missing variants for the most requested question sets."""
+        if self.service.provider is None:
+            return 0
+
+        generated = 0
+        warmed = set()
+        for job_title, experience_level, question_count, interview_mode, interview_type in await self._popular_requests():
+            request = QuestionSetRequest.build(
+                job_title, None, experience_level, question_count, interview_mode, interview_type
+            )
+            # Spellings of the same title share one key
+            if request.digest in warmed:
+                continue
+            warmed.add(request.digest)
+
+            missing = self.variants - len(await self._load(request.digest))
+            for _ in range(max(missing, 0)):
+                if await self._fill(request, job_title, None, interview_mode):
+                    generated += 1
+        self.warm_cycles += 1
+        if generated:
+            logger.info(f"Question cache warmed with {generated} new question sets")
+        return generated
+
+    def start(self) -> None:
+        """Start the periodic warming task."""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Question cache warmer started")
+
+    async def stop(self) -> None:
+        """Stop warming and cancel in-flight background generation."""
+        tasks = list(self._background)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _claim_warm_cycle(self) -> bool:
+        """Let one worker per interval run the warm cycle."""
+        client = models.redis_client
+        if client is None:
+            return True
+        try:
+            return bool(await client.set(QUESTION_WARM_LOCK, 1, ex=max(self.warm_interval_seconds - 1, 1), nx=True))
+        except Exception as e:
+            logger.warning(f"Question warm lock failed: {e}")
+            return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self._claim_warm_cycle():
+                    await self.warm()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Question cache warm cycle failed: {e}")
+            await asyncio.sleep(self.warm_interval_seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get question cache statistics."""
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.near_hits) / lookups, 4) if lookups else 0.0,
+            "generated": self.generated,
+            "generating": len(self._filling),
+            "warm_cycles": self.warm_cycles,
+            "variants_per_key": self.variants,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+# Global question set cache instance
+question_cache = QuestionSetCache(
+    ai_service,
+    ttl_seconds=settings.QUESTION_CACHE_TTL_HOURS * 3600,
+    variants=settings.QUESTION_CACHE_VARIANTS,
+    title_similarity=settings.QUESTION_CACHE_TITLE_SIMILARITY,
+    warm_interval_seconds=settings.QUESTION_CACHE_WARM_INTERVAL_MINUTES * 60,
+    warm_top=settings.QUESTION_CACHE_WARM_TOP
+)
@@ -0,0 +1,269 @@
+"""
+Record and replay LLM provider traffic.
+
+RecordingProvider wraps a real provider and captures each completion with
+its latency and token counts into a ReplayCorpus, saved as gzipped JSON
+lines (prompts are kept only as digests). ReplayProvider serves a corpus
+back deterministically, optionally scaling and jittering the recorded
+latencies, so AI paths can be regression-tested and benchmarked offline
+against real output shapes and timing.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.ai.metrics import call_usage, estimate_tokens, report_usage
+from app.ai.providers import LLMProvider
+
+CORPUS_VERSION = 1
+
+class ReplayMissError(Exception):
+    """Raised by a strict ReplayProvider for a request the corpus has no recording of."""
+
+class ReplayCorpus:
+    """Recorded completions, looked up by request digest."""
+
+    def __init__(self, entries: Optional[List[Dict[str, Any]]] = None):
+        self.entries: List[Dict[str, Any]] = []
+        self._by_key: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._by_signature: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._served: Counter = Counter()
+        for entry in entries or []:
+            self.add(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._by_key
+
+    @staticmethod
+    def key(prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> str:
+        """Digest of everything that determines a completion."""
+        payload = json.dumps([system, prompt, temperature, max_tokens], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def signature(system: Optional[str], temperature: float, max_tokens: int) -> str:
+        """
+        Request shape without the prompt. Operations use distinct settings
+        (questions 0.7/2000, evaluation 0.3/1000, feedback 0.3/1500), so a
+        miss is answered with a recording of the same kind of call.
+        """
+        digest = hashlib.sha256((system or "").encode("utf-8")).hexdigest()[:12]
+        return f"{temperature}:{max_tokens}:{digest}"
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        self.entries.append(entry)
+        self._by_key[entry["key"]].append(entry)
+        self._by_signature[entry["signature"]].append(entry)
+
+    def lookup(self, key: str, signature: str, strict: bool = False) -> Dict[str, Any]:
+        """
+        The recording for key; repeated recordings of one request are served
+        in turn. Misses get a recording with the same signature (any
+        recording if none), chosen by the key so the choice is stable.
+        """
+        recordings = self._by_key.get(key)
+        if recordings:
+            entry = recordings[self._served[key] % len(recordings)]
+            self._served[key] += 1
+            return entry
+
+        candidates = self._by_signature.get(signature) or self.entries
+        if strict or not candidates:
+            raise ReplayMissError(f"No recording for request {key[:12]}")
+        return candidates[int(key[:12], 16) % len(candidates)]
+
+    def save(self, path: str) -> None:
+        """Write the corpus as gzipped JSON lines."""
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"version": CORPUS_VERSION, "entries": len(self.entries)}) + "\n")
+            for entry in self.entries:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "ReplayCorpus":
+        """Read a corpus written by save()."""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != CORPUS_VERSION:
+                raise ValueError(f"Unsupported replay corpus version: {header.get('version')}")
+            return cls([json.loads(line) for line in f if line.strip()])
+
+class RecordingProvider(LLMProvider):
+    """Passes calls through to a provider and records each completed call."""
+
+    def __init__(self, provider: LLMProvider, corpus: Optional[ReplayCorpus] = None):
+        super().__init__(
+            max_concurrency=provider.max_concurrency,
+            max_queue=provider.max_queue,
+            timeout_seconds=provider.timeout_seconds
+        )
+        self.provider = provider
+        self.corpus = corpus if corpus is not None else ReplayCorpus()
+        self.name = provider.name
+        self.model = provider.model
+
+    async def generate(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        operation: str = "generate"
+    ) -> str:
+        start = time.perf_counter()
+        text = await self.provider.generate(
+            prompt, system=system, temperature=temperature, max_tokens=max_tokens, operation=operation
+        )
+        self._record(operation, prompt, system, temperature, max_tokens, time.perf_counter() - start, response=text)
+        return text
+
+    async def stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        operation: str = "stream"
+    ) -> AsyncIterator[str]:
+        start = time.perf_counter()
+        first_chunk_latency = None
+        chunks = []
+        async with aclosing(self.provider.stream(prompt, system, temperature, max_tokens, operation)) as stream:
+            async for chunk in stream:
+                if first_chunk_latency is None:
+                    first_chunk_latency = time.perf_counter() - start
+                chunks.append(chunk)
+                yield chunk
+        # Only complete streams are recorded
+        self._record(
+            operation, prompt, system, temperature, max_tokens, time.perf_counter() - start,
+            chunks=chunks, first_chunk_latency=first_chunk_latency
+        )
+
+    def _record(
+        self,
+        operation: str,
+        prompt: str,
+        system: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        latency: float,
+        response: Optional[str] = None,
+        chunks: Optional[List[str]] = None,
+        first_chunk_latency: Optional[float] = None
+    ) -> None:
+        text = response if chunks is None else "".join(chunks)
+        usage = call_usage()
+        entry = {
+            "key": ReplayCorpus.key(prompt, system, temperature, max_tokens),
+            "signature": ReplayCorpus.signature(system, temperature, max_tokens),
+            "provider": self.provider.name,
+            "model": self.provider.model,
+            "operation": operation,
+            "prompt_chars": len(prompt),
+            "latency": round(latency, 4),
+            "prompt_tokens": usage.get("prompt_tokens", estimate_tokens(prompt)),
+            "completion_tokens": usage.get("completion_tokens", estimate_tokens(text) if text else 0)
+        }
+        if chunks is None:
+            entry["response"] = response
+        else:
+            entry["chunks"] = chunks
+            entry["first_chunk_latency"] = round(first_chunk_latency or latency, 4)
+        self.corpus.add(entry)
+
+    async def _generate(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> str:
+        return await self.provider._generate(prompt, system, temperature, max_tokens)
+
+    def saturated(self, max_waiting: int) -> bool:
+        return self.provider.saturated(max_waiting)
+
+    async def close(self) -> None:
+        await self.provider.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the wrapped provider's statistics and the number of recordings."""
+        return {**self.provider.get_stats(), "recorded": len(self.corpus)}
+
+class ReplayProvider(LLMProvider):
+    """Serves recorded completions with their recorded (scaled) latency."""
+
+    name = "replay"
+
+    def __init__(
+        self,
+        corpus: ReplayCorpus,
+        latency_scale: float = 1.0,
+        latency_jitter: float = 0.0,
+        seed: int = 0,
+        strict: bool = False,
+        name: Optional[str] = None,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.corpus = corpus
+        # 0 replays instantly, 1 at recorded speed; jitter varies each delay by up to +/- that fraction
+        self.latency_scale = latency_scale
+        self.latency_jitter = latency_jitter
+        self.seed = seed
+        self.strict = strict
+        if name is not None:
+            self.name = name
+        self.model = "replay"
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self._calls: Counter = Counter()
+
+    def _lookup(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> Dict[str, Any]:
+        key = ReplayCorpus.key(prompt, system, temperature, max_tokens)
+        exact = key in self.corpus
+        entry = self.corpus.lookup(key, ReplayCorpus.signature(system, temperature, max_tokens), self.strict)
+        if exact:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def _delay(self, seconds: float, prompt: str) -> float:
+        """Scaled latency; jitter is seeded per request so a replay run is repeatable."""
+        if self.latency_jitter:
+            self._calls[prompt] += 1
+            rng = random.Random(f"{self.seed}:{prompt}:{self._calls[prompt]}")
+            seconds *= 1 + self.latency_jitter * rng.uniform(-1, 1)
+        return max(seconds * self.latency_scale, 0.0)
+
+    async def _generate(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> str:
+        entry = self._lookup(prompt, system, temperature, max_tokens)
+        delay = self._delay(entry["latency"], prompt)
+        if delay:
+            await asyncio.sleep(delay)
+        report_usage(entry.get("prompt_tokens"), entry.get("completion_tokens"))
+        return entry["response"] if "response" in entry else "".join(entry["chunks"])
+
+    async def _stream(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        """Recorded chunks, the first after the recorded time to first chunk and the rest spread evenly."""
+        entry = self._lookup(prompt, system, temperature, max_tokens)
+        chunks = entry.get("chunks") or [entry["response"]]
+        first = self._delay(entry.get("first_chunk_latency", entry["latency"]), prompt)
+        rest = max(self._delay(entry["latency"], prompt) - first, 0.0)
+        for position, chunk in enumerate(chunks):
+            delay = first if position == 0 else rest / max(len(chunks) - 1, 1)
+            if delay:
+                await asyncio.sleep(delay)
+            yield chunk
+        report_usage(entry.get("prompt_tokens"), entry.get("completion_tokens"))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get provider statistics with replay hits and misses."""
+        return {**super().get_stats(), "corpus": len(self.corpus), "hits": self.hits, "misses": self.misses}
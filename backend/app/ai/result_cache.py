@@ -0,0 +1,195 @@
+"""
+Two-tier cache of AI results with single-flight request coalescing.
+
+Results are keyed by a digest of (model, system prompt, normalized
+prompt, temperature). A bounded in-process LRU answers repeat requests
+without a network hop, Redis shares results across workers, and
+concurrent identical requests wait on one in-flight provider call
+instead of each paying for their own.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+# Redis key prefix for cached results
+AI_RESULT_PREFIX = "ai:result:"
+
+def normalize_prompt(prompt: str) -> str:
+    """Casefold and collapse whitespace so trivially different prompts share a key."""
+    return " ".join(prompt.casefold().split())
+
+class AIResultCache:
+    """In-process LRU in front of Redis, with per-operation hit metrics."""
+
+    def __init__(self, max_size: int = 2048, ttl_seconds: float = 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+        # Counters per operation (evaluation, feedback, chat, ...)
+        self._stats: Dict[str, Counter] = defaultdict(Counter)
+        self.evictions = 0
+
+    @staticmethod
+    def key(model: str, system: Optional[str], prompt: str, temperature: float) -> str:
+        """Digest of everything that determines a completion."""
+        payload = json.dumps(
+            [model, normalize_prompt(system or ""), normalize_prompt(prompt), round(temperature, 3)],
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def get_or_compute(
+        self,
+        operation: str,
+        key: str,
+        compute: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Optional[Any]:
+        """
+        Return the cached result for key, computing it at most once across
+        concurrent callers. compute() returning None means "do not cache".
+        """
+        value = self._get_local(key)
+        if value is not None:
+            self._stats[operation]["local_hits"] += 1
+            return copy.deepcopy(value)
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(operation, key, compute))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self._stats[operation]["coalesced"] += 1
+
+        # Shielded so one caller giving up does not cancel the call others wait on
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a computation for key is running right now."""
+        return key in self._in_flight
+
+    async def get_many(self, operation: str, keys: List[str]) -> List[Optional[Any]]:
+        """Look up several keys with one Redis round trip; no computation on miss."""
+        results: List[Optional[Any]] = [self._get_local(key) for key in keys]
+        missing = [index for index, value in enumerate(results) if value is None]
+
+        redis_client = models.redis_client
+        if missing and redis_client is not None:
+            try:
+                raw_values = await redis_client.mget([AI_RESULT_PREFIX + keys[index] for index in missing])
+                for index, raw in zip(missing, raw_values):
+                    if raw is not None:
+                        results[index] = json.loads(raw)
+                        self._set_local(keys[index], results[index])
+                        self._stats[operation]["shared_hits"] += 1
+            except Exception as e:
+                logger.warning(f"AI result cache lookup failed: {e}")
+
+        stats = self._stats[operation]
+        for index, value in enumerate(results):
+            if value is None:
+                stats["misses"] += 1
+            elif index not in missing:
+                stats["local_hits"] += 1
+        return [copy.deepcopy(value) for value in results]
+
+    async def set(self, key: str, value: Any) -> None:
+        """Store a result in both tiers."""
+        self._set_local(key, value)
+
+        redis_client = models.redis_client
+        if redis_client is None:
+            return
+        try:
+            await redis_client.set(AI_RESULT_PREFIX + key, json.dumps(value), ex=int(self.ttl_seconds))
+        except Exception as e:
+            logger.warning(f"Failed to store AI result: {e}")
+
+    async def _load(self, operation: str, key: str, compute: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        redis_client = models.redis_client
+        if redis_client is not None:
+            try:
+                raw = await redis_client.get(AI_RESULT_PREFIX + key)
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._set_local(key, value)
+                    self._stats[operation]["shared_hits"] += 1
+                    return value
+            except Exception as e:
+                logger.warning(f"AI result cache lookup failed: {e}")
+
+        self._stats[operation]["misses"] += 1
+        value = await compute()
+        if value is not None:
+            await self.set(key, value)
+        return value
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Retrieve the exception so an unawaited failure is not logged as lost
+        if not task.cancelled():
+            task.exception()
+
+    def _get_local(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all local entries and reset counters."""
+        self._entries.clear()
+        self._stats.clear()
+        self.evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics, with hit rates per operation."""
+        operations = {}
+        for operation, stats in self._stats.items():
+            hits = stats["local_hits"] + stats["shared_hits"] + stats["coalesced"]
+            lookups = hits + stats["misses"]
+            operations[operation] = {
+                "local_hits": stats["local_hits"],
+                "shared_hits": stats["shared_hits"],
+                "coalesced": stats["coalesced"],
+                "misses": stats["misses"],
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+            }
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "in_flight": len(self._in_flight),
+            "evictions": self.evictions,
+            "operations": operations
+        }
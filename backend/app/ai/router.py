@@ -0,0 +1,356 @@
+"""
+Latency-aware routing across the configured LLM providers.
+
+The router keeps a rolling window of latencies and outcomes per provider,
+sends each request to the fastest healthy provider and, when the primary
+runs past its own p95, hedges with a second request to the alternate;
+whichever answers first wins and the other is cancelled. Repeated
+failures open a provider's circuit breaker so callers stop waiting on it,
+and with every breaker open AIService degrades to its basic paths at once.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+
+from app.ai.metrics import QuotaExceededError, ai_metrics
+from app.ai.providers import LLMProvider
+
+logger = logging.getLogger(__name__)
+
+class NoProviderAvailableError(Exception):
+    """Raised when every provider's circuit breaker is open."""
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets a single probe through after reset_seconds."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.opened = 0
+        # Ticket of the half-open probe in flight (0 when none)
+        self.probe = 0
+        self.probes = 0
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now (checking does not take the probe slot)."""
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            return not self.probe
+        return self.state == self.CLOSED
+
+    def acquire(self) -> Optional[int]:
+        """
+        Admit a request: None if rejected, otherwise a ticket for release().
+        While half-open only one probe is admitted until its outcome is recorded.
+        """
+        if not self.allow():
+            return None
+        if self.state != self.HALF_OPEN:
+            return 0
+        self.probes += 1
+        self.probe = self.probes
+        return self.probe
+
+    def release(self, ticket: int) -> None:
+        """Free the probe slot if ticket still holds it (the probe ended without an outcome)."""
+        if ticket and ticket == self.probe:
+            self.probe = 0
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.probe = 0
+
+    def record_failure(self) -> None:
+        self.probe = 0
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+def _discard_outcome(task: asyncio.Task) -> None:
+    """Retrieve a hedge loser's exception so asyncio does not log it as unhandled."""
+    if not task.cancelled():
+        task.exception()
+
+class ProviderHealth:
+    """Rolling latency and outcome window for one provider."""
+
+    def __init__(self, window: int, breaker: CircuitBreaker):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.breaker = breaker
+
+    def record_success(self, latency: Optional[float] = None) -> None:
+        if latency is not None:
+            self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.breaker.record_success()
+
+    def record_failure(self) -> None:
+        self.outcomes.append(False)
+        self.breaker.record_failure()
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+class ProviderRouter:
+    """Routes generate() calls to the fastest healthy provider, hedging slow ones."""
+
+    name = "router"
+
+    def __init__(
+        self,
+        providers: Callable[[], List[Optional[LLMProvider]]],
+        hedging: bool = True,
+        hedge_default_seconds: float = 8.0,
+        min_samples: int = 20,
+        window: int = 100,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0
+    ):
+        # Called on every request so providers swapped on AIService take effect at once
+        self._providers = providers
+        self.hedging = hedging
+        self.hedge_default_seconds = hedge_default_seconds
+        self.min_samples = min_samples
+        self.window = window
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._health: Dict[int, ProviderHealth] = {}
+
+        # Counters
+        self.routed: Counter = Counter()
+        self.wins: Counter = Counter()
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+        self.short_circuits = 0
+
+    @property
+    def providers(self) -> List[LLMProvider]:
+        """Configured providers in preference order."""
+        return [provider for provider in self._providers() if provider is not None]
+
+    @property
+    def model(self) -> str:
+        return "+".join(f"{provider.name}:{provider.model}" for provider in self.providers)
+
+    def health(self, provider: LLMProvider) -> ProviderHealth:
+        health = self._health.get(id(provider))
+        if health is None:
+            health = ProviderHealth(self.window, CircuitBreaker(self.failure_threshold, self.reset_seconds))
+            self._health[id(provider)] = health
+        return health
+
+    def available(self) -> List[LLMProvider]:
+        """Providers whose breaker is closed, fastest first once every one has enough samples."""
+        providers = [provider for provider in self.providers if self.health(provider).breaker.allow()]
+        if all(len(self.health(provider).latencies) >= self.min_samples for provider in providers):
+            providers.sort(key=lambda provider: self.health(provider).percentile(0.5))
+        return providers
+
+    def saturated(self, max_waiting: int) -> bool:
+        """Whether every available provider is saturated (see LLMProvider.saturated)."""
+        providers = self.available()
+        return bool(providers) and all(provider.saturated(max_waiting) for provider in providers)
+
+    def hedge_delay(self, provider: LLMProvider) -> float:
+        """How long to wait on provider before hedging: its rolling p95."""
+        health = self.health(provider)
+        if len(health.latencies) < self.min_samples:
+            return self.hedge_default_seconds
+        return health.percentile(0.95)
+
+    async def generate(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        operation: str = "generate"
+    ) -> str:
+        """Generate with the best provider, hedging or failing over to the alternate."""
+        await ai_metrics.check_quota()
+        candidates = self.available()
+        if not candidates:
+            self.short_circuits += 1
+            raise NoProviderAvailableError("Every AI provider's circuit breaker is open")
+
+        primary = candidates[0]
+        alternate = candidates[1] if len(candidates) > 1 else None
+        self.routed[primary.name] += 1
+
+        def start(provider: LLMProvider) -> bool:
+            ticket = self.health(provider).breaker.acquire()
+            if ticket is None:
+                # Half-open and its probe is already in flight
+                return False
+            task = asyncio.create_task(self._call(provider, prompt, system, temperature, max_tokens, operation, ticket))
+            tasks[task] = provider
+            return True
+
+        tasks: Dict[asyncio.Task, LLMProvider] = {}
+        start(primary)
+        hedged = alternate_started = False
+        error: Optional[BaseException] = NoProviderAvailableError("Every AI provider's circuit breaker is open")
+        try:
+            if alternate is not None and self.hedging:
+                done, _ = await asyncio.wait(set(tasks), timeout=self.hedge_delay(primary))
+                if not done:
+                    alternate_started = True
+                    if start(alternate):
+                        self.hedges += 1
+                        hedged = True
+
+            while tasks:
+                done, _ = await asyncio.wait(set(tasks), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider = tasks.pop(task)
+                    if task.exception() is None:
+                        self.wins[provider.name] += 1
+                        if hedged and provider is alternate:
+                            self.hedge_wins += 1
+                        return task.result()
+
+                    error = task.exception()
+                    if isinstance(error, QuotaExceededError):
+                        raise error
+                    if alternate is not None and not alternate_started:
+                        # The alternate was never started; fail over now
+                        self.failovers += 1
+                        alternate_started = True
+                        start(alternate)
+            raise error
+        finally:
+            # Cancel the loser of a hedged pair; its outcome is never awaited
+            for task in tasks:
+                task.cancel()
+                task.add_done_callback(_discard_outcome)
+
+    async def stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        operation: str = "stream"
+    ) -> AsyncIterator[str]:
+        """
+        Stream from the best provider. Streams are not hedged; a provider that
+        fails before its first chunk is replaced by the alternate.
+        """
+        await ai_metrics.check_quota()
+        candidates = self.available()[:2]
+        if not candidates:
+            self.short_circuits += 1
+            raise NoProviderAvailableError("Every AI provider's circuit breaker is open")
+
+        self.routed[candidates[0].name] += 1
+        error: Exception = NoProviderAvailableError("Every AI provider's circuit breaker is open")
+        for position, provider in enumerate(candidates):
+            health = self.health(provider)
+            ticket = health.breaker.acquire()
+            if ticket is None:
+                # Half-open and its probe is already in flight
+                continue
+            started = False
+            try:
+                async with aclosing(provider.stream(prompt, system, temperature, max_tokens, operation)) as chunks:
+                    async for chunk in chunks:
+                        started = True
+                        yield chunk
+            except QuotaExceededError:
+                raise
+            except Exception as e:
+                health.record_failure()
+                if started or position == len(candidates) - 1:
+                    raise
+                logger.warning(f"{provider.name} stream failed before its first chunk, failing over: {e}")
+                self.failovers += 1
+                error = e
+                continue
+            finally:
+                health.breaker.release(ticket)
+
+            # Stream durations are not comparable with single calls, so only the outcome is recorded
+            health.record_success()
+            self.wins[provider.name] += 1
+            return
+        raise error
+
+    async def _call(
+        self,
+        provider: LLMProvider,
+        prompt: str,
+        system: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        operation: str,
+        ticket: int = 0
+    ) -> str:
+        health = self.health(provider)
+        start = time.perf_counter()
+        try:
+            text = await provider.generate(
+                prompt, system=system, temperature=temperature, max_tokens=max_tokens, operation=operation
+            )
+        except (asyncio.CancelledError, QuotaExceededError):
+            # A user out of quota says nothing about the provider's health
+            raise
+        except Exception as e:
+            health.record_failure()
+            logger.warning(f"{provider.name} request failed: {e}")
+            raise
+        finally:
+            health.breaker.release(ticket)
+        health.record_success(time.perf_counter() - start)
+        return text
+
+    async def close(self) -> None:
+        """Providers are closed by their owner."""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing decisions and per-provider health."""
+        providers = {}
+        for provider in self.providers:
+            health = self.health(provider)
+            p50, p95 = health.percentile(0.5), health.percentile(0.95)
+            providers[provider.name] = {
+                "breaker": health.breaker.state,
+                "breaker_opened": health.breaker.opened,
+                "breaker_probes": health.breaker.probes,
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "error_rate": round(health.error_rate, 4),
+                "routed": self.routed[provider.name],
+                "wins": self.wins[provider.name]
+            }
+        return {
+            "hedging": self.hedging,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "short_circuits": self.short_circuits,
+            "providers": providers
+        }
@@ -1,20 +1,21 @@
 """
 AI Assistant routes for conversational AI support.
 """
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
-
-from app.models.user import User
-from app.auth.dependencies import get_current_user, get_optional_current_user
+from contextlib import aclosing
+from typing import List, Dict, Any, AsyncIterator, NamedTuple, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+
+from app.models.user import User, UserRole
+from app.auth.dependencies import get_current_user, get_optional_current_user, get_websocket_user
+from app.ai.conversations import Conversation, conversation_store
+from app.ai.metrics import QuotaExceededError, bind_user
+from app.ai.providers import LLMProvider
 from app.ai.service import ai_service
-
-# Import Google AI
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
+from app.utils.streaming import SSE_HEADERS, SSE_MEDIA_TYPE, sse_event
 
 logger = logging.getLogger(__name__)
 
@@ -28,12 +29,16 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     message: str
     model: str = "grok"  # Default to grok-like behavior
+    # Server-side conversation to continue; omit to start a new one
+    conversation_id: Optional[str] = Field(None, max_length=64, pattern=r"^[A-Za-z0-9_-]+$")
+    # Deprecated: history resent by the client, used only without conversation_id
     context: Optional[List[ChatMessage]] = None
 
 class ChatResponse(BaseModel):
     response: str
     model_used: str
     confidence: Optional[float] = None
+    conversation_id: Optional[str] = None
 
 class QuickAction(BaseModel):
     label: str
@@ -49,30 +54,29 @@ async def chat_with_ai(
     Chat with AI assistant using specified model.
     """
     try:
-        # Build context from previous messages
-        context = ""
-        if request.context:
-            # Include last 5 messages for context
-            recent_messages = request.context[-5:]
-            context = "\n".join([
-                f"{msg.role}: {msg.content}"
-                for msg in recent_messages
-            ])
+        session = await open_chat_session(request, current_user)
 
         # Generate AI response based on selected model
         response = await generate_ai_response(
             message=request.message,
             model=request.model,
-            context=context,
+            context=session.context,
             user_role=current_user.role.value
         )
+        await record_chat_turn(session, current_user, request.message, response["content"])
 
         return ChatResponse(
             response=response["content"],
             model_used=request.model,
-            confidence=response.get("confidence", 0.8)
+            confidence=response.get("confidence", 0.8),
+            conversation_id=session.conversation_id
         )
 
+    except QuotaExceededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"AI chat failed: {e}")
         raise HTTPException(
@@ -80,6 +84,149 @@ async def chat_with_ai(
             detail="AI service temporarily unavailable"
         )
 
+@router.post("/chat/stream")
+async def stream_chat_with_ai(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Chat with AI assistant, streaming the reply as Server-Sent Events:
+    "delta" events carry text chunks and a final "done" event closes the reply.
+    Generation stops when the client disconnects.
+    """
+    session = await open_chat_session(request, current_user)
+    chunks = stream_ai_response(
+        message=request.message,
+        model=request.model,
+        context=session.context,
+        user_role=current_user.role.value
+    )
+
+    async def events():
+        parts = []
+        async with aclosing(chunks):
+            try:
+                async for chunk in chunks:
+                    parts.append(chunk)
+                    yield sse_event({"content": chunk}, event="delta")
+            except QuotaExceededError as e:
+                yield sse_event({"detail": str(e)}, event="error")
+                return
+            except Exception as e:
+                logger.error(f"AI chat stream failed: {e}")
+                yield sse_event({"detail": "AI service temporarily unavailable"}, event="error")
+                return
+        await record_chat_turn(session, current_user, request.message, "".join(parts))
+        yield sse_event({"model_used": request.model, "conversation_id": session.conversation_id}, event="done")
+
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+@router.websocket("/chat/ws")
+async def chat_websocket(
+    websocket: WebSocket,
+    current_user: User = Depends(get_websocket_user)
+):
+    """
+    Streaming chat over a WebSocket. Send {"message", "model", "conversation_id"}
+    and receive {"type": "delta"} chunks followed by {"type": "done"}. Sending
+    {"type": "cancel"} or a new message stops the reply in progress.
+    Authenticate with ?token=<access token> or an Authorization header.
+    """
+    await websocket.accept()
+    reply: Optional[asyncio.Task] = None
+
+    try:
+        while True:
+            data = await websocket.receive_json()
+
+            if data.get("type") == "ping":
+                await websocket.send_json({"type": "pong"})
+                continue
+
+            if reply is not None:
+                reply.cancel()
+                reply = None
+            if data.get("type") == "cancel":
+                continue
+
+            try:
+                request = ChatRequest(**data)
+            except ValidationError:
+                await websocket.send_json({"type": "error", "detail": "Invalid chat request"})
+                continue
+
+            reply = asyncio.create_task(send_chat_reply(websocket, request, current_user))
+
+    except WebSocketDisconnect:
+        logger.info(f"AI chat WebSocket disconnected for user: {current_user.id}")
+    finally:
+        # Stop generating for a client that is gone
+        if reply is not None:
+            reply.cancel()
+
+async def send_chat_reply(websocket: WebSocket, request: ChatRequest, current_user: User) -> None:
+    """Stream one chat reply to a WebSocket."""
+    try:
+        session = await open_chat_session(request, current_user)
+        parts = []
+        async with aclosing(stream_ai_response(
+            message=request.message,
+            model=request.model,
+            context=session.context,
+            user_role=current_user.role.value
+        )) as chunks:
+            async for chunk in chunks:
+                parts.append(chunk)
+                await websocket.send_json({"type": "delta", "content": chunk})
+        await record_chat_turn(session, current_user, request.message, "".join(parts))
+        await websocket.send_json({
+            "type": "done",
+            "model_used": request.model,
+            "conversation_id": session.conversation_id
+        })
+    except asyncio.CancelledError:
+        raise
+    except QuotaExceededError as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+    except Exception as e:
+        logger.error(f"AI chat WebSocket reply failed: {e}")
+        try:
+            await websocket.send_json({"type": "error", "detail": "AI service temporarily unavailable"})
+        except Exception:
+            pass
+
+@router.get("/conversations/{conversation_id}")
+async def get_conversation(
+    conversation_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the stored summary and recent messages of a chat conversation.
+    """
+    conversation = await conversation_store.load(str(current_user.id), conversation_id)
+    if not conversation.summary and not conversation.turns:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+
+    return {
+        "conversation_id": conversation_id,
+        "summary": conversation.summary,
+        "messages": conversation.turns
+    }
+
+@router.delete("/conversations/{conversation_id}")
+async def delete_conversation(
+    conversation_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Forget a chat conversation.
+    """
+    await conversation_store.delete(str(current_user.id), conversation_id)
+    return {"message": "Conversation deleted"}
+
 @router.get("/models")
 async def get_available_models(current_user: User = Depends(get_current_user)):
     """
@@ -188,18 +335,9 @@ async def get_suggested_topics(current_user: User = Depends(get_current_user)):
 
     return {"topics": topics}
 
-async def generate_ai_response(
-    message: str,
-    model: str,
-    context: str = "",
-    user_role: str = "candidate"
-) -> Dict[str, Any]:
-    """
-    Generate AI response based on selected model and user context.
-    """
-    # Build system prompt based on model
-    system_prompts = {
-        "grok": """You are Grok, a helpful and maximally truthful AI built by xAI.
+# Chat system prompts per model, formatted with the user's role
+CHAT_SYSTEM_PROMPTS = {
+    "grok": """You are Grok, a helpful and maximally truthful AI built by xAI.
 You are not based on any other companies and their models. You are witty, helpful,
 and have a rebellious streak. You provide clear, direct answers and don't shy away
 from difficult topics. You're particularly knowledgeable about technology, science,
@@ -215,7 +353,7 @@ For interview preparation, you should:
 
 Current user is a {user_role} looking for interview/career advice.""",
 
-        "gemini": """You are Gemini, Google's advanced AI assistant.
+    "gemini": """You are Gemini, Google's advanced AI assistant.
 You are helpful, knowledgeable, and provide comprehensive responses.
 You excel at analysis, problem-solving, and giving detailed explanations.
 
@@ -228,7 +366,7 @@ For interview preparation, you should:
 
 Current user is a {user_role} seeking interview assistance.""",
 
-        "gpt-4": """You are GPT-4, OpenAI's advanced language model.
+    "gpt-4": """You are GPT-4, OpenAI's advanced language model.
 You are knowledgeable, helpful, and provide detailed responses.
 You excel at understanding context and giving nuanced advice.
 
@@ -241,7 +379,7 @@ For interview preparation, you should:
 
 Current user is a {user_role} preparing for interviews.""",
 
-        "claude": """You are Claude, an AI built by Anthropic.
+    "claude": """You are Claude, an AI built by Anthropic.
 You are helpful, honest, and focused on being maximally truthful.
 You provide clear, direct answers and prioritize user safety and success.
 
@@ -253,62 +391,143 @@ For interview preparation, you should:
 - Use structured responses
 
 Current user is a {user_role} seeking career guidance."""
-    }
-
-    system_prompt = system_prompts.get(model, system_prompts["grok"]).format(user_role=user_role)
+}
+
+# System prompts formatted once per (model, role) instead of on every message
+_FORMATTED_SYSTEM_PROMPTS = {
+    (model, role.value): prompt.format(user_role=role.value)
+    for model, prompt in CHAT_SYSTEM_PROMPTS.items()
+    for role in UserRole
+}
+
+def chat_system_prompt(model: str, user_role: str) -> str:
+    """System prompt for a chat model and user role."""
+    model = model if model in CHAT_SYSTEM_PROMPTS else "grok"
+    prompt = _FORMATTED_SYSTEM_PROMPTS.get((model, user_role))
+    if prompt is None:
+        prompt = CHAT_SYSTEM_PROMPTS[model].format(user_role=user_role)
+    return prompt
+
+
+class ChatCall(NamedTuple):
+    """How a chat message is sent: provider (None means fallback reply), prompt and cache key."""
+    fallback_model: str
+    provider: Optional[LLMProvider]
+    prompt: str
+    system: Optional[str]
+    temperature: float
+    confidence: float
+    cache_key: Optional[str]
+
+class ChatSession(NamedTuple):
+    """Server-side conversation a message belongs to, and the prompt context built from it."""
+    conversation_id: Optional[str]
+    conversation: Optional[Conversation]
+    context: str
+
+async def open_chat_session(request: ChatRequest, current_user: User) -> ChatSession:
+    """
+    Load the conversation a message continues, or start a new one. Clients
+    that still resend their history without a conversation_id keep the
+    old stateless behavior. AI calls for the message are charged to the
+    user's token quota.
+    """
+    bind_user(current_user.id)
+    if request.conversation_id is None and request.context:
+        return ChatSession(None, None, chat_context(request.context))
+
+    conversation_id = request.conversation_id or conversation_store.new_id()
+    conversation = await conversation_store.load(str(current_user.id), conversation_id)
+    return ChatSession(conversation_id, conversation, conversation_store.context(conversation))
+
+async def record_chat_turn(session: ChatSession, current_user: User, message: str, reply: str) -> None:
+    """Store a message and its reply in the session's conversation."""
+    if session.conversation_id is None or not reply:
+        return
+    try:
+        await conversation_store.record(
+            str(current_user.id), session.conversation_id, session.conversation, message, reply
+        )
+    except Exception as e:
+        logger.warning(f"Failed to record chat turn: {e}")
+
+def chat_context(messages: Optional[List[ChatMessage]]) -> str:
+    """Format the last 5 messages of a client-sent conversation for the prompt."""
+    if not messages:
+        return ""
+    return "\n".join([
+        f"{msg.role}: {msg.content}"
+        for msg in messages[-5:]
+    ])
+
+def build_chat_call(
+    message: str,
+    model: str,
+    context: str = "",
+    user_role: str = "candidate"
+) -> ChatCall:
+    """
+    Pick the provider for a chat model and build its prompt.
+    """
+    system_prompt = chat_system_prompt(model, user_role)
 
     # Build full prompt
-    full_prompt = f"{system_prompt}\n\n"
+    conversation = ""
     if context:
-        full_prompt += f"Previous conversation:\n{context}\n\n"
-    full_prompt += f"User: {message}\n\nAssistant:"
+        conversation += f"Previous conversation:\n{context}\n\n"
+    conversation += f"User: {message}\n\nAssistant:"
+
+    if model == "grok" or model == "gemini":
+        # Use Google AI (Gemini); the system prompt is sent as part of the text
+        provider = ai_service.google_provider
+        temperature = 0.7 if model == "grok" else 0.3
+        prompt, system, cache_prompt, confidence = f"{system_prompt}\n\n{conversation}", None, conversation, 0.85
+    elif model == "gpt-4":
+        # Use OpenAI; the system prompt goes in its own message
+        provider = ai_service.openai_provider
+        temperature = 0.7
+        prompt, system, cache_prompt, confidence = conversation, system_prompt, conversation, 0.9
+    else:
+        # Default to grok-like behavior
+        return ChatCall("grok", None, message, None, 0.7, 0.6, None)
 
-    try:
-        if model == "grok" or model == "gemini":
-            # Use Google AI (Gemini)
-            if ai_service.google_client:
-                response = ai_service.google_client.generate_content(
-                    full_prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=0.7 if model == "grok" else 0.3,
-                        max_output_tokens=2000,
-                    )
-                )
-                content = response.text.strip()
-                confidence = 0.85
-            else:
-                content = generate_fallback_response(message, model)
-                confidence = 0.5
-
-        elif model == "gpt-4":
-            # Use OpenAI
-            if ai_service.openai_client:
-                response = ai_service.openai_client.chat.completions.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": message}
-                    ],
-                    temperature=0.7,
-                    max_tokens=2000
-                )
-                content = response.choices[0].message.content.strip()
-                confidence = 0.9
-            else:
-                content = generate_fallback_response(message, model)
-                confidence = 0.5
+    if provider is None:
+        return ChatCall(model, None, message, None, temperature, 0.5, None)
+
+    cache_key = ai_service.result_key(provider, cache_prompt, temperature, system=system_prompt)
+    return ChatCall(model, provider, prompt, system, temperature, confidence, cache_key)
 
+async def generate_ai_response(
+    message: str,
+    model: str,
+    context: str = "",
+    user_role: str = "candidate"
+) -> Dict[str, Any]:
+    """
+    Generate AI response based on selected model and user context.
+    """
+    call = build_chat_call(message, model, context, user_role)
+
+    try:
+        if call.provider is None:
+            content = generate_fallback_response(message, call.fallback_model)
         else:
-            # Default to grok-like behavior
-            content = generate_fallback_response(message, "grok")
-            confidence = 0.6
+            content = await ai_service.result_cache.get_or_compute(
+                "chat",
+                call.cache_key,
+                lambda: call.provider.generate(
+                    call.prompt, system=call.system, temperature=call.temperature, max_tokens=2000, operation="chat"
+                )
+            )
 
         return {
             "content": content,
-            "confidence": confidence,
+            "confidence": call.confidence,
             "model": model
         }
 
+    except QuotaExceededError:
+        raise
     except Exception as e:
         logger.error(f"AI response generation failed for model {model}: {e}")
         return {
@@ -317,6 +536,45 @@ Current user is a {user_role} seeking career guidance."""
             "model": model
         }
 
+async def stream_ai_response(
+    message: str,
+    model: str,
+    context: str = "",
+    user_role: str = "candidate"
+) -> AsyncIterator[str]:
+    """
+    Stream an AI response chunk by chunk. Cached replies and fallback replies
+    arrive as a single chunk; a completed stream is added to the chat cache.
+    """
+    call = build_chat_call(message, model, context, user_role)
+    if call.provider is None:
+        yield generate_fallback_response(message, call.fallback_model)
+        return
+
+    cached = (await ai_service.result_cache.get_many("chat", [call.cache_key]))[0]
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    try:
+        async with aclosing(call.provider.stream(
+            call.prompt, system=call.system, temperature=call.temperature, max_tokens=2000, operation="chat"
+        )) as chunks:
+            async for chunk in chunks:
+                parts.append(chunk)
+                yield chunk
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        logger.error(f"AI response stream failed for model {model}: {e}")
+        if parts:
+            raise
+        yield generate_fallback_response(message, model)
+        return
+
+    await ai_service.result_cache.set(call.cache_key, "".join(parts).strip())
+
 def generate_fallback_response(message: str, model: str) -> str:
     """
     Generate fallback response when AI services are unavailable.
@@ -378,12 +636,3 @@ Remember to prepare specific examples and practice your answers out loud!"""
 • Body language and virtual interview tips
 
 What specific aspect of interview preparation would you like help with? Feel free to ask me anything - I'm here to help you succeed!"""
-
-# Import here to avoid circular imports
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
-
-# Make genai available in the function scope
-genai_client = genai
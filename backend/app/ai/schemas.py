@@ -0,0 +1,70 @@
+"""
+Typed schemas for AI outputs.
+
+Model replies are validated before they are stored or returned: missing
+optional fields get defaults, numbers given as strings are coerced, and
+replies without the required fields are rejected so callers fall back
+to their basic paths.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+logger = logging.getLogger(__name__)
+
+class GeneratedQuestion(BaseModel):
+    """One generated interview question."""
+    question_text: str = Field(..., min_length=1)
+    type: str = "text"
+    category: str = "mixed"
+    difficulty_level: str = "medium"
+    skills_assessed: List[str] = Field(default_factory=list)
+    time_limit: int = 300
+
+    class Config:
+        extra = "allow"
+
+class ResponseEvaluation(BaseModel):
+    """Evaluation of one interview response."""
+    score: float = Field(..., ge=0, le=10)
+    feedback: str = ""
+    strengths: List[str] = Field(default_factory=list)
+    improvements: List[str] = Field(default_factory=list)
+    communication_score: Optional[float] = None
+    content_score: Optional[float] = None
+
+    class Config:
+        extra = "allow"
+
+class OverallFeedback(BaseModel):
+    """Overall feedback for an interview."""
+    overall_score: float = Field(..., ge=0, le=100)
+    overall_feedback: str = ""
+    strengths: List[str] = Field(default_factory=list)
+    weaknesses: List[str] = Field(default_factory=list)
+    recommendations: List[Any] = Field(default_factory=list)
+    communication_score: Optional[float] = None
+    technical_score: Optional[float] = None
+    problem_solving_score: Optional[float] = None
+    behavioral_score: Optional[float] = None
+
+    class Config:
+        extra = "allow"
+
+def validate_output(schema: type, value: Any) -> Optional[Dict[str, Any]]:
+    """Validated dict for one object, or None if it does not fit the schema."""
+    if not isinstance(value, dict):
+        return None
+    try:
+        return schema(**value).dict(exclude_none=True)
+    except ValidationError as e:
+        logger.warning(f"AI output failed {schema.__name__} validation: {e.error_count()} errors")
+        return None
+
+def validate_questions(value: Any) -> Optional[List[Dict[str, Any]]]:
+    """Valid questions from a generated list; None if there are none."""
+    if not isinstance(value, list):
+        return None
+    questions = [question for question in (validate_output(GeneratedQuestion, item) for item in value) if question]
+    return questions or None
@@ -0,0 +1,274 @@
+"""
+Offline rubric scoring of interview responses.
+
+Scores answers without a model call from features computed for a whole
+batch at once with NumPy and scikit-learn: relevance to the question
+(coverage of the question's hashed term vector), STAR structure cues,
+specificity and quantification signals, and how well the length fits a
+spoken answer. AIService uses it when no provider is available, as
+overflow when providers are saturated, and as a cheap first pass that
+settles degenerate answers without an AI call.
+"""
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, HashingVectorizer
+
+FEATURES = ("relevance", "star", "specificity", "quantification", "length")
+
+# Weights of each feature in the 0-10 score
+SCORE_WEIGHTS = np.array([0.3, 0.2, 0.15, 0.15, 0.2])
+
+# Share of the question's weighted terms an on-topic answer covers
+FULL_RELEVANCE = 0.5
+
+_WORD = re.compile(r"[a-z0-9']+", re.IGNORECASE)
+_SUFFIX = re.compile(r"(ations?|ments?|ances?|ing|ed|es|s|e)$")
+
+def _terms(text: str) -> List[str]:
+    """Lowercased content words with common suffixes stripped, so "improved" matches "improving"."""
+    return [
+        _SUFFIX.sub("", word) if len(word) > 4 else word
+        for word in _WORD.findall(text.lower())
+        if word not in ENGLISH_STOP_WORDS
+    ]
+
+# Phrases that signal each part of a STAR answer
+STAR_CUES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    # Situation
+    r"\b(when I was|at my (previous|last|current|old)|in my (previous|last|current) (role|job|position|team)"
+    r"|the situation|we were|our team|there was a|at the time)\b",
+    # Task
+    r"\b(my (task|goal|job|responsibility|role) was|I was (asked|responsible|tasked|assigned)|needed to|had to"
+    r"|the (goal|challenge|problem|task) was)\b",
+    # Action
+    r"\bI (led|built|designed|implemented|created|organi[sz]ed|wrote|set up|introduced|decided|analy[sz]ed"
+    r"|proposed|started|developed|coordinated|negotiated|refactored|automated|migrated|mentored|resolved|fixed)\b",
+    # Result
+    r"\b(as a result|result(ed)? in|which (led|resulted)|in the end|ultimately|reduced|increased|improved|saved"
+    r"|delivered|achieved|grew|cut|launched|shipped)\b",
+))
+
+_ACTION = STAR_CUES[2]
+
+# Numbers, money, percentages and measured quantities
+_QUANTITY = re.compile(
+    r"(\$\s?\d|\d[\d,.]*\s?(%|percent|x\b|k\b|ms\b|seconds?|minutes?|hours?|days?|weeks?|months?|years?"
+    r"|users?|people|customers?|engineers?|requests?)|\b\d{2,}\b)",
+    re.IGNORECASE
+)
+
+_FILLER = re.compile(r"\b(um+|uh+|you know|kind of|sort of|i guess|basically|like,)", re.IGNORECASE)
+
+# Per feature: (strength, weakness, recommendation)
+RUBRIC_NOTES = {
+    "relevance": (
+        "Answers stay on the question's topic",
+        "Answers drift from the question",
+        "Address the question directly before adding context"
+    ),
+    "star": (
+        "Clear situation-task-action-result structure",
+        "Answers lack a clear structure",
+        "Structure answers with the STAR method: situation, task, action, result"
+    ),
+    "specificity": (
+        "Describes concrete personal actions",
+        "Answers stay general",
+        "Describe what you personally did, with concrete detail"
+    ),
+    "quantification": (
+        "Backs claims with numbers",
+        "Impact is not quantified",
+        "Quantify impact with numbers, percentages or time saved"
+    ),
+    "length": (
+        "Answers are well sized",
+        "Answers are too short or too long",
+        "Aim for one to two minutes of speaking per answer"
+    ),
+}
+
+# Feature values above/below which a feature is called out
+STRENGTH_THRESHOLD = 0.6
+WEAKNESS_THRESHOLD = 0.4
+
+class OfflineScorer:
+    """Vectorized rubric scoring for batches of (question, response) pairs."""
+
+    def __init__(self, n_features: int = 2 ** 18, ideal_words: Tuple[int, int] = (80, 250)):
+        # Stateless hashing: no vocabulary to fit or keep in memory
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            tokenizer=_terms,
+            token_pattern=None,
+            alternate_sign=False,
+            norm=None
+        )
+        self.ideal_words = ideal_words
+
+        # Counters
+        self.scored = 0
+        self.batches = 0
+        self.total_seconds = 0.0
+        self.used: Counter = Counter()
+
+    @staticmethod
+    def confidence(response: str) -> float:
+        """How settled an offline score is without a model: empty and very short answers leave little to judge."""
+        words = len(_WORD.findall(response or ""))
+        return 1.0 if words == 0 else 0.9 if words < 5 else 0.6
+
+    def features(self, items: List[Tuple[str, str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Feature matrix (one row per item, columns in FEATURES order, each in
+        0-1), word counts and filler-word rates.
+        """
+        questions = [question or "" for question, _ in items]
+        responses = [response or "" for _, response in items]
+        n = len(items)
+
+        # Relevance: share of each question's (sublinear) term weight carried by terms the answer
+        # uses. Weights depend only on the pair, so a score does not change with the batch around it.
+        vectors = self.vectorizer.transform(questions + responses)
+        vectors.data = 1 + np.log(vectors.data)
+        question_vectors, answer_terms = vectors[:n], vectors[n:] > 0
+        covered = np.asarray(question_vectors.multiply(answer_terms).sum(axis=1)).ravel()
+        weight = np.asarray(question_vectors.sum(axis=1)).ravel()
+        coverage = covered / np.maximum(weight, 1e-9)
+
+        words = [_WORD.findall(response) for response in responses]
+        counts = np.array([len(tokens) for tokens in words], dtype=float)
+        safe_counts = np.maximum(counts, 1)
+        long_words = np.array([sum(len(token) >= 7 for token in tokens) for tokens in words], dtype=float)
+        star = np.array([[bool(cue.search(response)) for cue in STAR_CUES] for response in responses], dtype=float)
+        actions = np.array([len(_ACTION.findall(response)) for response in responses], dtype=float)
+        quantities = np.array([len(_QUANTITY.findall(response)) for response in responses], dtype=float)
+        fillers = np.array([len(_FILLER.findall(response)) for response in responses], dtype=float)
+
+        low, high = self.ideal_words
+        length = np.clip(counts / low, 0, 1) * np.clip(1 - (counts - high) / (2 * high), 0.5, 1)
+        specificity = (
+            0.5 * np.clip(actions / 3, 0, 1) + 0.5 * np.clip(long_words / safe_counts / 0.25, 0, 1)
+        ) * np.clip(counts / 30, 0, 1)
+
+        matrix = np.column_stack([
+            np.clip(coverage / FULL_RELEVANCE, 0, 1),
+            star.mean(axis=1),
+            specificity,
+            np.clip(quantities / 3, 0, 1),
+            length
+        ])
+        # An empty answer scores nothing on any feature
+        matrix[counts == 0] = 0
+        return matrix, counts, fillers / safe_counts
+
+    def score_batch(self, items: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Evaluate (question, response) pairs, in the shape AI evaluations use."""
+        if not items:
+            return []
+        return self._score(items)[1]
+
+    def score(self, question: str, response: str) -> Dict[str, Any]:
+        """Evaluate one response."""
+        return self.score_batch([(question, response)])[0]
+
+    def feedback(self, responses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Overall interview feedback from the responses' rubric features."""
+        # Stored interview responses, as has_actual_responses() reads them
+        answered = [r for r in responses if (r.get("response_text") or "").strip()]
+        means = np.zeros(len(FEATURES))
+        evaluations: List[Dict[str, Any]] = []
+        if answered:
+            matrix, evaluations = self._score([(r.get("question_text") or "", r["response_text"]) for r in answered])
+            means = matrix.mean(axis=0)
+
+        # Unanswered questions count as zero
+        total = sum(evaluation["score"] for evaluation in evaluations)
+        overall_score = total / len(responses) * 10 if responses else 0
+
+        def average(field: str) -> float:
+            return round(sum(e[field] for e in evaluations) / len(evaluations), 1) if evaluations else 0
+
+        strengths = [RUBRIC_NOTES[name][0] for name, value in zip(FEATURES, means) if value >= STRENGTH_THRESHOLD]
+        weak = [name for name, value in zip(FEATURES, means) if value < WEAKNESS_THRESHOLD]
+        weaknesses = [RUBRIC_NOTES[name][1] for name in weak]
+        unanswered = len(responses) - len(answered)
+        if unanswered:
+            weaknesses.insert(0, f"{unanswered} of {len(responses)} questions left unanswered")
+
+        return {
+            "overall_score": round(overall_score, 1),
+            "overall_feedback": (
+                f"Completed {len(answered)} out of {len(responses)} questions. Scored automatically on "
+                "relevance, structure, specificity and length; AI analysis not available."
+            ),
+            "strengths": strengths or (["Completed interview"] if answered else []),
+            "weaknesses": weaknesses,
+            "recommendations": [RUBRIC_NOTES[name][2] for name in weak] or ["Complete more practice interviews"],
+            "communication_score": average("communication_score"),
+            "technical_score": average("content_score"),
+            "problem_solving_score": round(10 * float(means[1] + means[2]) / 2, 1),
+            "behavioral_score": round(10 * float(means[1] + means[4]) / 2, 1),
+            "evaluator": "offline"
+        }
+
+    def _score(self, items: List[Tuple[str, str]]) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        start = time.perf_counter()
+        matrix, counts, filler_rates = self.features(items)
+
+        scores = 10 * matrix @ SCORE_WEIGHTS
+        fluency = 1 - np.clip(filler_rates * 10, 0, 1)
+        communication = 10 * (0.4 * matrix[:, 4] + 0.3 * matrix[:, 1] + 0.3 * fluency) * (counts > 0)
+        content = 10 * (0.45 * matrix[:, 0] + 0.3 * matrix[:, 2] + 0.25 * matrix[:, 3])
+
+        results = [
+            self._evaluation(row, words, filler_rate, score, communication_score, content_score)
+            for row, words, filler_rate, score, communication_score, content_score
+            in zip(matrix, counts, filler_rates, scores, communication, content)
+        ]
+
+        self.scored += len(items)
+        self.batches += 1
+        self.total_seconds += time.perf_counter() - start
+        return matrix, results
+
+    def _evaluation(
+        self,
+        row: np.ndarray,
+        words: float,
+        filler_rate: float,
+        score: float,
+        communication_score: float,
+        content_score: float
+    ) -> Dict[str, Any]:
+        if words == 0:
+            strengths, improvements = [], ["Provide an answer to the question"]
+        else:
+            strengths = [RUBRIC_NOTES[name][0] for name, value in zip(FEATURES, row) if value >= STRENGTH_THRESHOLD]
+            improvements = [RUBRIC_NOTES[name][2] for name, value in zip(FEATURES, row) if value < WEAKNESS_THRESHOLD]
+            if filler_rate > 0.03:
+                improvements.append("Cut filler words such as \"um\" and \"you know\"")
+
+        return {
+            "score": round(float(score), 1),
+            "feedback": "Scored automatically on relevance, structure, specificity and length. AI evaluation not available.",
+            "strengths": strengths or (["Completed response"] if words else []),
+            "improvements": improvements,
+            "communication_score": round(float(communication_score), 1),
+            "content_score": round(float(content_score), 1),
+            "confidence": 1.0 if words == 0 else 0.9 if words < 5 else 0.6,
+            "evaluator": "offline"
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scoring statistics."""
+        return {
+            "scored": self.scored,
+            "batches": self.batches,
+            "avg_batch_ms": round(self.total_seconds / self.batches * 1000, 2) if self.batches else 0.0,
+            "used": dict(self.used)
+        }
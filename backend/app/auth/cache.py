@@ -0,0 +1,269 @@
+"""
+Process-local caches for authentication: verified tokens and hydrated users.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.config import settings
+from app.models.user import TokenData, User
+
+logger = logging.getLogger(__name__)
+
+# Redis pub/sub channel used to broadcast invalidations to every worker
+USER_CACHE_CHANNEL = "user_cache:invalidate"
+
+# Message payload that clears the whole cache
+INVALIDATE_ALL = "*"
+
+class UserCache:
+    """Bounded TTL + LRU cache of hydrated User models keyed by user id."""
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 60.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[User, float]]" = OrderedDict()
+        self._listener_task: Optional[asyncio.Task] = None
+        self._redis_client = None
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str) -> Optional[User]:
+        """Return cached user or None on miss/expiry."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        user, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return user
+
+    def set(self, user: User) -> None:
+        """Store a user, evicting the least recently used entry if full."""
+        if self.max_size <= 0 or not user.id:
+            return
+
+        self._entries[user.id] = (user, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(user.id)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_local(self, user_id: str) -> None:
+        """Drop a user from this worker's cache only."""
+        if user_id == INVALIDATE_ALL:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+        elif self._entries.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    async def invalidate(self, user_id: str) -> None:
+        """Drop a user from the cache on every worker."""
+        self.invalidate_local(str(user_id))
+
+        if self._redis_client is None:
+            return
+
+        try:
+            await self._redis_client.publish(USER_CACHE_CHANNEL, str(user_id))
+        except Exception as e:
+            logger.warning(f"Failed to publish user cache invalidation for {user_id}: {e}")
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    async def start_listener(self, redis_client) -> None:
+        """Subscribe to invalidation messages published by other workers."""
+        if redis_client is None or self._listener_task is not None:
+            return
+
+        self._redis_client = redis_client
+        self._listener_task = asyncio.create_task(self._listen())
+        logger.info("User cache invalidation listener started")
+
+    async def stop_listener(self) -> None:
+        """Cancel the invalidation listener."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        self._redis_client = None
+
+    async def _listen(self) -> None:
+        """Apply invalidations received over Redis pub/sub."""
+        while True:
+            pubsub = self._redis_client.pubsub()
+            try:
+                await pubsub.subscribe(USER_CACHE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    self.invalidate_local(data)
+            except asyncio.CancelledError:
+                await pubsub.close()
+                raise
+            except Exception as e:
+                # Entries may be stale while disconnected; drop everything and resubscribe
+                logger.error(f"User cache listener error: {e}")
+                self.invalidate_local(INVALIDATE_ALL)
+                await pubsub.close()
+                await asyncio.sleep(1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
+
+class TokenCache:
+    """Bounded cache of decoded tokens that expire together with the JWT."""
+
+    def __init__(self, max_size: int = 50000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[TokenData, str, float]]" = OrderedDict()
+        self._user_tokens: Dict[str, Set[str]] = {}
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.revocations = 0
+
+    @staticmethod
+    def digest(token: str) -> str:
+        """Key tokens by digest so raw credentials are never held as keys."""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str, token_type: str) -> Optional[TokenData]:
+        """Return decoded token data or None on miss/expiry."""
+        key = self.digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        token_data, cached_type, expires_at = entry
+        if expires_at <= time.time():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        if cached_type != token_type:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return token_data
+
+    def set(self, token: str, token_type: str, token_data: TokenData, expires_at: float) -> None:
+        """Cache decoded token data until the token's own expiry."""
+        if self.max_size <= 0 or expires_at <= time.time():
+            return
+
+        key = self.digest(token)
+        self._entries[key] = (token_data, token_type, expires_at)
+        self._entries.move_to_end(key)
+        self._user_tokens.setdefault(token_data.user_id, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def revoke(self, token: str) -> None:
+        """Evict a single token (e.g. on logout)."""
+        if self._remove(self.digest(token)):
+            self.revocations += 1
+
+    def revoke_user(self, user_id: str) -> None:
+        """Evict every cached token belonging to a user (e.g. on password change)."""
+        for key in list(self._user_tokens.get(str(user_id), ())):
+            if self._remove(key):
+                self.revocations += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        self._entries.clear()
+        self._user_tokens.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.revocations = 0
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+
+        user_id = entry[0].user_id
+        keys = self._user_tokens.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_tokens[user_id]
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "revocations": self.revocations
+        }
+
+# Global token cache instance
+token_cache = TokenCache(max_size=settings.TOKEN_CACHE_MAX_SIZE)
+
+# Global user cache instance
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS
+)
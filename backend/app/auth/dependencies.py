@@ -1,11 +1,18 @@
 """
 FastAPI dependencies for authentication and authorization.
 """
-from typing import Optional
-from fastapi import Depends, HTTPException, status, Request
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+from fastapi import Depends, HTTPException, status, Request, WebSocket, WebSocketException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.models.user import User, UserRole, TokenData
 from app.auth.utils import verify_token
+from app.auth.cache import user_cache
+from app.auth.revocation import token_revocations
+from app.users.search import with_search_terms
+from app.auth.permissions import (
+    RESOURCE_PERMISSIONS, compile_permissions, has_permissions,
+    missing_permissions, role_mask
+)
 from app.models import get_database
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
@@ -48,7 +55,7 @@ async def get_current_user(
                 "preferred_language": "en",
                 "timezone": "UTC+5:30"
             }
-            await db.users.insert_one(test_user_data)
+            await db.users.insert_one(with_search_terms(test_user_data))
             test_user_doc = test_user_data
 
         # Convert to User model
@@ -68,24 +75,27 @@ async def get_current_user(
         token = auth_header.split(" ")[1]
         token_data = verify_token(token)
 
-        if token_data is None:
+        if token_data is None or await token_revocations.is_revoked(token_data):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # Get user from database
-        user_doc = await db.users.find_one({"_id": token_data.user_id})
-        if user_doc is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        # Get user from cache, falling back to the database
+        user = user_cache.get(token_data.user_id)
+        if user is None:
+            user_doc = await db.users.find_one({"_id": token_data.user_id})
+            if user_doc is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
 
-        # Convert to User model
-        user = User(**user_doc)
+            # Convert to User model
+            user = User(**user_doc)
+            user_cache.set(user)
 
         # Check if account is active
         if user.status != "active":
@@ -109,10 +119,20 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     """
     return current_user
 
+# Dependencies are built once per distinct requirement so every route shares
+# the same callable (FastAPI also caches it per request)
+_role_dependencies: Dict[UserRole, Callable] = {}
+_permission_dependencies: Dict[FrozenSet[str], Callable] = {}
+_scope_dependencies: Dict[Tuple[str, str], Callable] = {}
+
 def get_current_user_with_role(required_role: UserRole):
     """
     Dependency factory for role-based access control.
     """
+    dependency = _role_dependencies.get(required_role)
+    if dependency is not None:
+        return dependency
+
     async def dependency(current_user: User = Depends(get_current_user)) -> User:
         if current_user.role != required_role:
             raise HTTPException(
@@ -120,25 +140,36 @@ def get_current_user_with_role(required_role: UserRole):
                 detail=f"Insufficient permissions. Required role: {required_role}"
             )
         return current_user
+
+    _role_dependencies[required_role] = dependency
     return dependency
 
-async def get_current_candidate(current_user: User = Depends(get_current_user)) -> User:
-    """
-    Get current user with candidate role.
-    """
-    return get_current_user_with_role(UserRole.CANDIDATE)(current_user)
+# Role dependencies
+get_current_candidate = get_current_user_with_role(UserRole.CANDIDATE)
+get_current_recruiter = get_current_user_with_role(UserRole.RECRUITER)
+get_current_admin = get_current_user_with_role(UserRole.ADMIN)
 
-async def get_current_recruiter(current_user: User = Depends(get_current_user)) -> User:
-    """
-    Get current user with recruiter role.
-    """
-    return get_current_user_with_role(UserRole.RECRUITER)(current_user)
+async def _user_from_token(token: str, db: AsyncIOMotorDatabase) -> Optional[User]:
+    """Active user for an access token, or None if it is invalid, revoked or inactive."""
+    token_data = verify_token(token)
+    if token_data is None or await token_revocations.is_revoked(token_data):
+        return None
 
-async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
-    """
-    Get current user with admin role.
-    """
-    return get_current_user_with_role(UserRole.ADMIN)(current_user)
+    # Get user from cache, falling back to the database
+    user = user_cache.get(token_data.user_id)
+    if user is None:
+        user_doc = await db.users.find_one({"_id": token_data.user_id})
+        if user_doc is None:
+            return None
+
+        user = User(**user_doc)
+        user_cache.set(user)
+
+    # Check if account is active
+    if user.status != "active":
+        return None
+
+    return user
 
 async def get_optional_current_user(
     request: Request,
@@ -153,75 +184,104 @@ async def get_optional_current_user(
             return None
 
         token = auth_header.split(" ")[1]
-        token_data = verify_token(token)
-
-        if token_data is None:
-            return None
-
-        # Get user from database
-        user_doc = await db.users.find_one({"_id": token_data.user_id})
-        if user_doc is None:
-            return None
-
-        user = User(**user_doc)
+        return await _user_from_token(token, db)
 
-        # Check if account is active
-        if user.status != "active":
-            return None
+    except Exception:
+        return None
 
-        return user
+async def get_websocket_user(
+    websocket: WebSocket,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+) -> User:
+    """
+    Get the authenticated user of a WebSocket handshake.
+    Browsers cannot set headers on a WebSocket, so the access token may
+    also be passed as the "token" query parameter.
+    """
+    token = websocket.query_params.get("token")
+    auth_header = websocket.headers.get("authorization")
+    if not token and auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
 
+    try:
+        user = await _user_from_token(token, db) if token else None
     except Exception:
-        return None
+        user = None
+
+    if user is None:
+        # Closes the handshake with a policy violation instead of accepting it
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason="Could not validate credentials"
+        )
+    return user
 
 def check_permissions(required_permissions: list):
     """
     Dependency factory for permission-based access control.
     """
+    key = frozenset(required_permissions)
+    dependency = _permission_dependencies.get(key)
+    if dependency is not None:
+        return dependency
+
+    required_mask = compile_permissions(key)
+
     async def dependency(current_user: User = Depends(get_current_user)) -> User:
-        # Define role permissions
-        role_permissions = {
-            UserRole.CANDIDATE: [
-                "read_own_profile",
-                "update_own_profile",
-                "create_interview",
-                "read_own_interviews",
-                "take_interview",
-                "read_own_resume",
-                "upload_resume",
-                "read_dashboard"
-            ],
-            UserRole.RECRUITER: [
-                "read_own_profile",
-                "update_own_profile",
-                "create_interview",
-                "read_own_interviews",
-                "read_candidate_profiles",
-                "read_candidate_resumes",
-                "conduct_live_interview",
-                "read_dashboard",
-                "read_analytics"
-            ],
-            UserRole.ADMIN: [
-                "read_own_profile",
-                "update_own_profile",
-                "manage_users",
-                "manage_interviews",
-                "manage_system",
-                "read_all_analytics",
-                "configure_system",
-                "audit_logs"
-            ]
-        }
-
-        user_permissions = role_permissions.get(current_user.role, [])
-
-        for permission in required_permissions:
-            if permission not in user_permissions:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"Insufficient permissions. Missing: {permission}"
-                )
+        if not has_permissions(current_user.role, required_mask):
+            missing = missing_permissions(current_user.role, required_mask)
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Insufficient permissions. Missing: {missing[0]}"
+            )
 
         return current_user
+
+    _permission_dependencies[key] = dependency
+    return dependency
+
+class ResourceScope:
+    """Ownership filter for a resource type, resolved once per request."""
+
+    def __init__(self, user: User, owner_field: str, any_access: bool):
+        self.user = user
+        self.owner_field = owner_field
+        self.any_access = any_access
+
+    def filter(self, query: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Restrict a MongoDB query to documents the user may access."""
+        scoped = dict(query or {})
+        if not self.any_access:
+            scoped[self.owner_field] = self.user.id
+        return scoped
+
+    def can_access(self, owner_id: Optional[str]) -> bool:
+        """Check access to an already-loaded document."""
+        return self.any_access or owner_id == self.user.id
+
+def resource_scope(resource: str, owner_field: str = "user_id"):
+    """
+    Dependency factory for own-vs-any access to a resource type.
+    """
+    key = (resource, owner_field)
+    dependency = _scope_dependencies.get(key)
+    if dependency is not None:
+        return dependency
+
+    own_permission, any_permission = RESOURCE_PERMISSIONS[resource]
+    own_mask = compile_permissions([own_permission])
+    any_mask = compile_permissions([any_permission])
+
+    async def dependency(current_user: User = Depends(get_current_user)) -> ResourceScope:
+        mask = role_mask(current_user.role)
+        if mask & any_mask:
+            return ResourceScope(current_user, owner_field, any_access=True)
+        if mask & own_mask:
+            return ResourceScope(current_user, owner_field, any_access=False)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Insufficient permissions. Missing: {own_permission}"
+        )
+
+    _scope_dependencies[key] = dependency
     return dependency
@@ -0,0 +1,138 @@
+"""
+Off-event-loop password hashing with bounded concurrency and load shedding.
+"""
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.auth.utils import pwd_context
+
+logger = logging.getLogger(__name__)
+
+def _hash(password: str) -> str:
+    """Hash a password (runs in the worker pool)."""
+    return pwd_context.hash(password)
+
+def _verify(password: str, password_hash: str) -> bool:
+    """Verify a password against its hash (runs in the worker pool)."""
+    return pwd_context.verify(password, password_hash)
+
+def _verify_and_update(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a new hash if the stored one is outdated."""
+    return pwd_context.verify_and_update(password, password_hash)
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated executor so it never blocks the event loop."""
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_queue_size: int = 32,
+        executor_type: str = "thread",
+        retry_after_seconds: int = 1
+    ):
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.executor_type = executor_type
+        self.retry_after_seconds = retry_after_seconds
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+
+        # Counters
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of operations running or queued at once."""
+        return self.max_workers + self.max_queue_size
+
+    def _get_executor(self) -> Executor:
+        """Create the executor on first use."""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hash"
+                )
+            logger.info(f"Password hashing pool started ({self.executor_type}, {self.max_workers} workers)")
+        return self._executor
+
+    async def _run(self, func, *args):
+        """Submit work to the pool, shedding load when the queue is full."""
+        if self._in_flight >= self.capacity:
+            self.rejected += 1
+            logger.warning("Password hashing pool saturated, rejecting request")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy. Please try again shortly.",
+                headers={"Retry-After": str(self.retry_after_seconds)}
+            )
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), func, *args)
+            self.completed += 1
+            return result
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password."""
+        return await self._run(_hash, password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Hash a batch of passwords in parallel. At most max_workers run at
+        once, so queue slots stay free for interactive logins.
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def hash_one(password: str) -> str:
+            async with semaphore:
+                return await self._run(_hash, password)
+
+        return await asyncio.gather(*(hash_one(password) for password in passwords))
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """Verify a password against its hash."""
+        return await self._run(_verify, password, password_hash)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password, returning a replacement hash when the stored hash
+        was created with a different cost than BCRYPT_ROUNDS.
+        """
+        return await self._run(_verify_and_update, password, password_hash)
+
+    def shutdown(self) -> None:
+        """Shut down the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hashing pool statistics."""
+        return {
+            "executor_type": self.executor_type,
+            "max_workers": self.max_workers,
+            "max_queue_size": self.max_queue_size,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+# Global password hasher instance
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+    retry_after_seconds=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS
+)
@@ -0,0 +1,291 @@
+"""
+Login throttling and deferred last-login bookkeeping.
+
+Failed attempts and lockouts live in Redis (with a per-worker in-memory
+fallback) so the login hot path never writes to MongoDB.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app import models
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Sliding-window failure counter. Records one failure and, once the window
+# holds max_attempts entries, sets the lock key for the lockout duration.
+# KEYS[1] = attempts sorted set, KEYS[2] = lock key
+# ARGV = now_ms, window_ms, max_attempts, lockout_ms, member
+RECORD_FAILURE_SCRIPT = """
+local now = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[2]))
+redis.call('ZADD', KEYS[1], now, ARGV[5])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+local count = redis.call('ZCARD', KEYS[1])
+if count >= tonumber(ARGV[3]) then
+    redis.call('SET', KEYS[2], count, 'PX', ARGV[4])
+    redis.call('DEL', KEYS[1])
+end
+return count
+"""
+
+class LoginThrottle:
+    """Per-account and per-IP sliding-window login lockout."""
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        ip_max_attempts: int = 50,
+        window_seconds: int = 900,
+        lockout_seconds: int = 1800
+    ):
+        self.max_attempts = max_attempts
+        self.ip_max_attempts = ip_max_attempts
+        self.window_seconds = window_seconds
+        self.lockout_seconds = lockout_seconds
+        self._script = None
+        self._script_client = None
+
+        # In-memory fallback when Redis is unavailable
+        self._attempts: Dict[str, Deque[float]] = {}
+        self._locks: Dict[str, float] = {}
+
+        # Counters
+        self.failures = 0
+        self.lockouts = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _keys(scope: str, identifier: str) -> Tuple[str, str]:
+        return f"login:attempts:{scope}:{identifier}", f"login:lock:{scope}:{identifier}"
+
+    def _redis(self):
+        """Return the shared Redis client and its registered script, if any."""
+        client = models.redis_client
+        if client is None:
+            return None, None
+        if self._script_client is not client:
+            self._script = client.register_script(RECORD_FAILURE_SCRIPT)
+            self._script_client = client
+        return client, self._script
+
+    async def check(self, email: str, ip_address: Optional[str]) -> Tuple[int, bool]:
+        """
+        Return (retry_after_seconds, has_failures) for a login attempt.
+        retry_after_seconds is 0 when neither the account nor the IP is locked.
+        """
+        account_keys = self._keys("account", email.lower())
+        ip_keys = self._keys("ip", ip_address) if ip_address else None
+        retry_after, has_failures = await self._check_redis(account_keys, ip_keys)
+
+        if retry_after is None:
+            now = time.time()
+            retry_after = 0
+            for keys in filter(None, (account_keys, ip_keys)):
+                locked_until = self._locks.get(keys[1], 0)
+                if locked_until > now:
+                    retry_after = max(retry_after, int(locked_until - now) + 1)
+                else:
+                    self._locks.pop(keys[1], None)
+            has_failures = bool(self._attempts.get(account_keys[0]))
+
+        if retry_after:
+            self.rejected += 1
+        return retry_after, has_failures
+
+    async def _check_redis(self, account_keys, ip_keys) -> Tuple[Optional[int], bool]:
+        """Read lock TTLs from Redis in one round trip; (None, False) if unavailable."""
+        client, _ = self._redis()
+        if client is None:
+            return None, False
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.exists(account_keys[0])
+            pipe.pttl(account_keys[1])
+            if ip_keys:
+                pipe.pttl(ip_keys[1])
+            has_failures, *lock_ttls = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis login throttle check failed, using local state: {e}")
+            return None, False
+
+        retry_after_ms = max((ttl for ttl in lock_ttls if ttl > 0), default=0)
+        return -(-retry_after_ms // 1000), bool(has_failures)
+
+    async def record_failure(self, email: str, ip_address: Optional[str]) -> bool:
+        """Record a failed attempt; return True if the account or IP is now locked."""
+        self.failures += 1
+        scopes = [("account", email.lower(), self.max_attempts)]
+        if ip_address:
+            scopes.append(("ip", ip_address, self.ip_max_attempts))
+
+        locked = await self._record_failure_redis(scopes)
+        if locked is None:
+            now = time.time()
+            locked = False
+            for scope, identifier, limit in scopes:
+                attempts_key, lock_key = self._keys(scope, identifier)
+                attempts = self._attempts.setdefault(attempts_key, deque())
+                while attempts and attempts[0] <= now - self.window_seconds:
+                    attempts.popleft()
+                attempts.append(now)
+                if len(attempts) >= limit:
+                    self._locks[lock_key] = now + self.lockout_seconds
+                    del self._attempts[attempts_key]
+                    locked = True
+
+        if locked:
+            self.lockouts += 1
+        return locked
+
+    async def _record_failure_redis(self, scopes) -> Optional[bool]:
+        """Run the sliding-window script per scope; None if Redis is unavailable."""
+        client, script = self._redis()
+        if client is None:
+            return None
+
+        now_ms = int(time.time() * 1000)
+        try:
+            counts = await asyncio.gather(*(
+                script(
+                    keys=list(self._keys(scope, identifier)),
+                    args=[now_ms, self.window_seconds * 1000, limit,
+                          self.lockout_seconds * 1000, uuid.uuid4().hex]
+                )
+                for scope, identifier, limit in scopes
+            ))
+        except Exception as e:
+            logger.warning(f"Redis login throttle update failed, using local state: {e}")
+            return None
+
+        return any(int(count) >= limit for count, (_, _, limit) in zip(counts, scopes))
+
+    async def reset(self, email: str) -> None:
+        """Clear failed attempts and any lockout for an account."""
+        attempts_key, lock_key = self._keys("account", email.lower())
+        self._attempts.pop(attempts_key, None)
+        self._locks.pop(lock_key, None)
+
+        client, _ = self._redis()
+        if client is not None:
+            try:
+                await client.delete(attempts_key, lock_key)
+            except Exception as e:
+                logger.warning(f"Failed to reset login throttle for {email}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get throttle statistics."""
+        return {
+            "backend": "redis" if models.redis_client is not None else "memory",
+            "failures": self.failures,
+            "lockouts": self.lockouts,
+            "rejected": self.rejected
+        }
+
+class LastLoginRecorder:
+    """Buffers last_login timestamps and flushes them to MongoDB in bulk."""
+
+    def __init__(self, flush_interval_seconds: float = 30, max_pending: int = 1000):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self._pending: Dict[str, datetime] = {}
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+        # Counters
+        self.flushes = 0
+        self.flushed_users = 0
+        self.errors = 0
+
+    def record(self, user_id: str, when: Optional[datetime] = None) -> None:
+        """Queue a last_login update without touching the database."""
+        self._pending[str(user_id)] = when or datetime.utcnow()
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    def start(self, db) -> None:
+        """Start the periodic flush task."""
+        if self._task is not None:
+            return
+        self._db = db
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Last-login flusher started")
+
+    async def stop(self) -> None:
+        """Stop the flush task and write out anything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        self._db = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write pending timestamps with one unordered bulk_write."""
+        if self._db is None or not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        operations = [
+            UpdateOne({"_id": user_id}, {"$set": {"last_login": when}})
+            for user_id, when in pending.items()
+        ]
+        try:
+            await self._db.users.bulk_write(operations, ordered=False)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Failed to flush last_login for {len(pending)} users: {e}")
+            # Keep the newest timestamp for anything recorded while flushing
+            for user_id, when in pending.items():
+                self._pending.setdefault(user_id, when)
+            return 0
+
+        self.flushes += 1
+        self.flushed_users += len(operations)
+        return len(operations)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get flusher statistics."""
+        return {
+            "pending": len(self._pending),
+            "flush_interval_seconds": self.flush_interval_seconds,
+            "flushes": self.flushes,
+            "flushed_users": self.flushed_users,
+            "errors": self.errors
+        }
+
+# Global login throttle instance
+login_throttle = LoginThrottle(
+    max_attempts=settings.ACCOUNT_LOCKOUT_ATTEMPTS,
+    ip_max_attempts=settings.LOGIN_IP_MAX_ATTEMPTS,
+    window_seconds=settings.LOGIN_ATTEMPT_WINDOW_MINUTES * 60,
+    lockout_seconds=settings.ACCOUNT_LOCKOUT_DURATION_MINUTES * 60
+)
+
+# Global last-login recorder instance
+last_login_recorder = LastLoginRecorder(
+    flush_interval_seconds=settings.LAST_LOGIN_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.LAST_LOGIN_FLUSH_MAX_PENDING
+)
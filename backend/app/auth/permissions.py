@@ -0,0 +1,95 @@
+"""
+Role permission registry compiled to per-role bitmasks.
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from app.models.user import UserRole
+
+# Role -> granted permissions
+ROLE_PERMISSIONS: Dict[UserRole, Tuple[str, ...]] = {
+    UserRole.CANDIDATE: (
+        "read_own_profile",
+        "update_own_profile",
+        "create_interview",
+        "read_own_interviews",
+        "take_interview",
+        "read_own_resume",
+        "upload_resume",
+        "read_own_feedback",
+        "read_dashboard"
+    ),
+    UserRole.RECRUITER: (
+        "read_own_profile",
+        "update_own_profile",
+        "create_interview",
+        "read_own_interviews",
+        "read_candidate_profiles",
+        "read_candidate_resumes",
+        "conduct_live_interview",
+        "read_own_feedback",
+        "manage_feedback",
+        "read_dashboard",
+        "read_analytics"
+    ),
+    UserRole.ADMIN: (
+        "read_own_profile",
+        "update_own_profile",
+        "manage_users",
+        "manage_interviews",
+        "read_own_feedback",
+        "manage_feedback",
+        "manage_system",
+        "read_all_analytics",
+        "configure_system",
+        "audit_logs"
+    )
+}
+
+# Resource -> (permission for own documents, permission for any document)
+RESOURCE_PERMISSIONS: Dict[str, Tuple[str, str]] = {
+    "interview": ("read_own_interviews", "manage_interviews"),
+    "resume": ("read_own_resume", "read_candidate_resumes"),
+    "feedback": ("read_own_feedback", "manage_feedback")
+}
+
+# Every known permission, in bit order
+ALL_PERMISSIONS: Tuple[str, ...] = tuple(sorted({
+    permission
+    for permissions in ROLE_PERMISSIONS.values()
+    for permission in permissions
+}))
+
+PERMISSION_BITS: Dict[str, int] = {
+    permission: 1 << index for index, permission in enumerate(ALL_PERMISSIONS)
+}
+
+def compile_permissions(permissions: Iterable[str]) -> int:
+    """Compile permission names to a bitmask, rejecting unknown names."""
+    mask = 0
+    for permission in permissions:
+        try:
+            mask |= PERMISSION_BITS[permission]
+        except KeyError:
+            raise ValueError(f"Unknown permission: {permission}") from None
+    return mask
+
+ROLE_MASKS: Dict[UserRole, int] = {
+    role: compile_permissions(permissions) for role, permissions in ROLE_PERMISSIONS.items()
+}
+
+def role_mask(role: UserRole) -> int:
+    """Return the compiled permission mask for a role."""
+    return ROLE_MASKS.get(role, 0)
+
+def has_permissions(role: UserRole, mask: int) -> bool:
+    """Check that a role holds every permission in mask."""
+    return ROLE_MASKS.get(role, 0) & mask == mask
+
+def missing_permissions(role: UserRole, mask: int) -> List[str]:
+    """Names of the permissions in mask that a role lacks."""
+    missing = mask & ~ROLE_MASKS.get(role, 0)
+    return [permission for permission in ALL_PERMISSIONS if PERMISSION_BITS[permission] & missing]
+
+def get_role_permissions(role: UserRole) -> List[str]:
+    """List the permissions granted to a role."""
+    return list(ROLE_PERMISSIONS.get(role, ()))
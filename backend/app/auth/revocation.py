@@ -0,0 +1,287 @@
+"""
+JWT revocation store backed by Redis with a per-worker Bloom filter.
+
+Revoked jtis are stored as Redis keys that expire with the token and are
+appended to a Redis stream. Every worker replays the stream into a local
+Bloom filter, so checking a token that was never revoked needs no network
+round trip; only Bloom hits are confirmed against Redis.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.models.user import TokenData
+from app.auth.utils import revoke_token as evict_cached_token, revoke_user_tokens as evict_cached_user_tokens
+
+logger = logging.getLogger(__name__)
+
+# Redis stream that carries revocations to every worker
+REVOCATION_STREAM = "auth:revocations"
+
+# Redis key prefixes for revocation records
+REVOKED_JTI_PREFIX = "auth:revoked:jti:"
+REVOKED_USER_PREFIX = "auth:revoked:user:"
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing."""
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str) -> None:
+        """Add an item to the filter."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def clear(self) -> None:
+        """Remove every item."""
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
+
+class TokenRevocationStore:
+    """Revokes individual tokens by jti and all of a user's tokens by issue time."""
+
+    def __init__(
+        self,
+        bloom_capacity: int = 100000,
+        bloom_error_rate: float = 0.001,
+        max_token_lifetime_seconds: int = 7 * 24 * 3600
+    ):
+        self.max_token_lifetime_seconds = max_token_lifetime_seconds
+        self._bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._revoked_users: Dict[str, Tuple[float, float]] = {}
+        self._local_jtis: Dict[str, float] = {}
+        self._redis_client = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._last_id = "0-0"
+        self._rebuild_at = bloom_capacity
+
+        # Counters
+        self.checks = 0
+        self.bloom_hits = 0
+        self.false_positives = 0
+        self.rejected = 0
+        self.rebuilds = 0
+
+    @staticmethod
+    def _expires_at(token_data: TokenData) -> float:
+        if token_data.exp is None:
+            return time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        # TokenData.exp is a naive local datetime (see verify_token)
+        return token_data.exp.timestamp()
+
+    async def revoke_token(self, token_data: TokenData, token: Optional[str] = None) -> None:
+        """Revoke a single token until it expires (e.g. on logout)."""
+        if token:
+            evict_cached_token(token)
+        if not token_data.jti:
+            return
+
+        expires_at = self._expires_at(token_data)
+        ttl = int(expires_at - time.time()) + 1
+        if ttl <= 0:
+            return
+
+        self._apply({"kind": "jti", "id": token_data.jti, "until": str(expires_at)})
+        if self._redis_client is None:
+            self._local_jtis[token_data.jti] = expires_at
+            return
+
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            pipe.set(f"{REVOKED_JTI_PREFIX}{token_data.jti}", 1, ex=ttl)
+            self._publish(pipe, {"kind": "jti", "id": token_data.jti, "until": str(expires_at)})
+            await pipe.execute()
+        except Exception as e:
+            self._local_jtis[token_data.jti] = expires_at
+            logger.error(f"Failed to publish token revocation {token_data.jti}: {e}")
+
+    async def revoke_user(self, user_id: str) -> None:
+        """Revoke every token issued to a user before now (e.g. on password or role change)."""
+        user_id = str(user_id)
+        evict_cached_user_tokens(user_id)
+
+        entry = {
+            "kind": "user",
+            "id": user_id,
+            "before": str(time.time()),
+            "until": str(time.time() + self.max_token_lifetime_seconds)
+        }
+        self._apply(entry)
+        if self._redis_client is None:
+            return
+
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            pipe.set(f"{REVOKED_USER_PREFIX}{user_id}", entry["before"], ex=self.max_token_lifetime_seconds)
+            self._publish(pipe, entry)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to publish user token revocation for {user_id}: {e}")
+
+    def _publish(self, pipe, entry: Dict[str, str]) -> None:
+        """Append to the stream, trimming entries older than any live token."""
+        min_id = int((time.time() - self.max_token_lifetime_seconds) * 1000)
+        pipe.xadd(REVOCATION_STREAM, entry, minid=min_id, approximate=True)
+
+    async def is_revoked(self, token_data: TokenData) -> bool:
+        """Check whether a verified token has been revoked."""
+        self.checks += 1
+
+        revoked_user = self._revoked_users.get(token_data.user_id)
+        if revoked_user is not None:
+            before, until = revoked_user
+            if until <= time.time():
+                del self._revoked_users[token_data.user_id]
+            elif (token_data.iat or 0) < before:
+                self.rejected += 1
+                return True
+
+        if not token_data.jti or token_data.jti not in self._bloom:
+            return False
+
+        self.bloom_hits += 1
+        if await self._confirm_jti(token_data.jti):
+            self.rejected += 1
+            return True
+
+        self.false_positives += 1
+        return False
+
+    async def _confirm_jti(self, jti: str) -> bool:
+        """Resolve a Bloom hit against the authoritative store."""
+        local_until = self._local_jtis.get(jti)
+        if local_until is not None:
+            if local_until > time.time():
+                return True
+            del self._local_jtis[jti]
+
+        if self._redis_client is None:
+            return False
+
+        try:
+            return bool(await self._redis_client.exists(f"{REVOKED_JTI_PREFIX}{jti}"))
+        except Exception as e:
+            # Fail closed: a Bloom hit is almost always a real revocation
+            logger.warning(f"Could not confirm token revocation {jti}: {e}")
+            return True
+
+    def _apply(self, entry: Dict[str, str], bloom: Optional[BloomFilter] = None, revoked_users=None) -> None:
+        """Apply a stream entry to local state."""
+        bloom = self._bloom if bloom is None else bloom
+        revoked_users = self._revoked_users if revoked_users is None else revoked_users
+
+        until = float(entry.get("until", 0))
+        if until <= time.time():
+            return
+
+        if entry.get("kind") == "jti":
+            bloom.add(entry["id"])
+        elif entry.get("kind") == "user":
+            before = float(entry["before"])
+            current = revoked_users.get(entry["id"])
+            if current is None or current[0] < before:
+                revoked_users[entry["id"]] = (before, until)
+
+    async def start(self, redis_client) -> None:
+        """Load the revocation stream and follow it for new entries."""
+        if redis_client is None or self._listener_task is not None:
+            return
+
+        self._redis_client = redis_client
+        await self._rebuild()
+        self._listener_task = asyncio.create_task(self._listen())
+        logger.info(f"Token revocation listener started ({self._bloom.count} revoked tokens loaded)")
+
+    async def stop(self) -> None:
+        """Stop following the revocation stream."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        self._redis_client = None
+
+    async def _rebuild(self) -> None:
+        """Rebuild local state from every live entry in the stream, then swap it in."""
+        bloom = BloomFilter(self._bloom.capacity, self._bloom.error_rate)
+        revoked_users: Dict[str, Tuple[float, float]] = {}
+        last_id = "0-0"
+
+        while True:
+            entries = await self._redis_client.xrange(REVOCATION_STREAM, min=f"({last_id}", count=1000)
+            if not entries:
+                break
+            for entry_id, fields in entries:
+                self._apply(fields, bloom, revoked_users)
+                last_id = entry_id
+
+        self._bloom = bloom
+        self._revoked_users = revoked_users
+        self._last_id = last_id
+        self._rebuild_at = max(bloom.capacity, bloom.count * 2)
+        self.rebuilds += 1
+
+    async def _listen(self) -> None:
+        """Apply revocations published by any worker."""
+        while True:
+            try:
+                response = await self._redis_client.xread(
+                    {REVOCATION_STREAM: self._last_id}, count=1000, block=5000
+                )
+                for _, entries in response or []:
+                    for entry_id, fields in entries:
+                        self._apply(fields)
+                        self._last_id = entry_id
+
+                # Expired jtis never leave a Bloom filter; start over once it is full
+                if self._bloom.count > self._rebuild_at:
+                    await self._rebuild()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Token revocation listener error: {e}")
+                await asyncio.sleep(1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get revocation statistics."""
+        return {
+            "bloom_entries": self._bloom.count,
+            "bloom_capacity": self._bloom.capacity,
+            "bloom_bits": self._bloom.num_bits,
+            "bloom_hashes": self._bloom.num_hashes,
+            "revoked_users": len(self._revoked_users),
+            "checks": self.checks,
+            "bloom_hits": self.bloom_hits,
+            "false_positives": self.false_positives,
+            "rejected": self.rejected,
+            "rebuilds": self.rebuilds
+        }
+
+# Global token revocation store instance
+token_revocations = TokenRevocationStore(
+    bloom_capacity=settings.TOKEN_REVOCATION_BLOOM_CAPACITY,
+    bloom_error_rate=settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE,
+    max_token_lifetime_seconds=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+)
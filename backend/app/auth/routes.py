@@ -1,10 +1,10 @@
 """
 Authentication routes for user registration, login, and password management.
 """
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
@@ -15,12 +15,17 @@ from app.models.user import (
 )
 from app.models import get_database
 from app.auth.utils import (
-    verify_password, get_password_hash, create_access_token,
+    create_access_token,
     create_refresh_token, create_password_reset_token,
     verify_password_reset_token, create_email_verification_token,
-    validate_password_strength
+    validate_password_strength, verify_token
 )
 from app.auth.dependencies import get_current_user
+from app.auth.cache import user_cache
+from app.auth.hashing import password_hasher
+from app.auth.lockout import login_throttle, last_login_recorder
+from app.auth.revocation import token_revocations
+from app.users.search import with_search_terms
 from app.config import settings
 from app.utils.database import db_manager
 
@@ -58,7 +63,7 @@ async def register_user(
 
     # Create user
     user_dict = user_data.dict()
-    user_dict["password_hash"] = get_password_hash(user_data.password)
+    user_dict["password_hash"] = await password_hasher.hash(user_data.password)
     user_dict["status"] = UserStatus.ACTIVE  # Set to ACTIVE for immediate access in development
     user_dict["email_verified"] = True  # Skip email verification in development
     user_dict["created_at"] = datetime.utcnow()
@@ -67,7 +72,7 @@ async def register_user(
     # Remove password from dict
     del user_dict["password"]
 
-    result = await db.users.insert_one(user_dict)
+    result = await db.users.insert_one(with_search_terms(user_dict))
     user_id = result.inserted_id
 
     # Get created user
@@ -122,14 +127,27 @@ async def register_user(
 @router.post("/login", response_model=Token)
 async def login_user(
     login_data: UserLogin,
+    request: Request,
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """
     Authenticate user and return JWT tokens.
     """
+    client_ip = request.client.host if request.client else None
+
+    # Check account/IP lockout before touching the database
+    retry_after, has_failures = await login_throttle.check(login_data.email, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_423_LOCKED,
+            detail="Account is temporarily locked due to failed login attempts",
+            headers={"Retry-After": str(retry_after)}
+        )
+
     # Find user by email
     user_doc = await db.users.find_one({"email": login_data.email})
     if not user_doc:
+        await login_throttle.record_failure(login_data.email, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -137,29 +155,19 @@ async def login_user(
 
     user = User.from_mongo(user_doc)
 
-    # Check if account is locked
+    # Honour lockouts set directly on the user document
     if user.locked_until and user.locked_until > datetime.utcnow():
         raise HTTPException(
             status_code=status.HTTP_423_LOCKED,
             detail="Account is temporarily locked due to failed login attempts"
         )
 
-    # Verify password
-    if not verify_password(login_data.password, user.password_hash):
-        # Increment failed attempts
-        failed_attempts = user.failed_login_attempts + 1
-        update_data = {"failed_login_attempts": failed_attempts}
-
-        # Lock account if too many attempts
-        if failed_attempts >= settings.ACCOUNT_LOCKOUT_ATTEMPTS:
-            lock_until = datetime.utcnow() + timedelta(minutes=settings.ACCOUNT_LOCKOUT_DURATION_MINUTES)
-            update_data["locked_until"] = lock_until
-
-        await db.users.update_one(
-            {"_id": user.id},
-            {"$set": update_data}
-        )
-
+    # Verify password (rehashes transparently if BCRYPT_ROUNDS changed)
+    password_valid, new_password_hash = await password_hasher.verify_and_update(
+        login_data.password, user.password_hash
+    )
+    if not password_valid:
+        await login_throttle.record_failure(login_data.email, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -183,18 +191,18 @@ async def login_user(
                 detail="Account is not active"
             )
 
-    # Reset failed attempts and update last login
-    await db.users.update_one(
-        {"_id": user.id},
-        {
-            "$set": {
-                "failed_login_attempts": 0,
-                "locked_until": None,
-                "last_login": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-        }
-    )
+    # Clear failed attempts only when there are any; last_login is flushed in bulk
+    if has_failures:
+        await login_throttle.reset(login_data.email)
+    last_login_recorder.record(user.id)
+
+    # Persist an upgraded hash (only after BCRYPT_ROUNDS changes)
+    if new_password_hash:
+        await db.users.update_one(
+            {"_id": user.id},
+            {"$set": {"password_hash": new_password_hash, "updated_at": datetime.utcnow()}}
+        )
+        await user_cache.invalidate(user.id)
 
     # Create tokens
     token_data = {
@@ -245,10 +253,8 @@ async def refresh_access_token(
     """
     Refresh access token using refresh token.
     """
-    from app.auth.utils import verify_token
-
     token_data = verify_token(refresh_token, "refresh")
-    if not token_data:
+    if not token_data or await token_revocations.is_revoked(token_data):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token"
@@ -279,6 +285,9 @@ async def refresh_access_token(
 
     access_token = create_access_token(new_token_data)
     new_refresh_token = create_refresh_token(new_token_data)
+
+    # Rotate: the presented refresh token cannot be used again
+    await token_revocations.revoke_token(token_data, refresh_token)
     expires_in = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
 
     return Token(
@@ -307,6 +316,31 @@ async def refresh_access_token(
         )
     )
 
+@router.post("/logout")
+async def logout(
+    request: Request,
+    refresh_token: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Log out the current session, revoking its access and refresh tokens.
+    """
+    auth_header = request.headers.get("authorization", "")
+    if auth_header.startswith("Bearer "):
+        access_token = auth_header.split(" ")[1]
+        token_data = verify_token(access_token)
+        if token_data:
+            await token_revocations.revoke_token(token_data, access_token)
+
+    if refresh_token:
+        refresh_data = verify_token(refresh_token, "refresh")
+        if refresh_data and refresh_data.user_id == current_user.id:
+            await token_revocations.revoke_token(refresh_data, refresh_token)
+
+    logger.info(f"User logged out: {current_user.email}")
+
+    return {"message": "Logged out successfully"}
+
 @router.post("/forgot-password")
 async def forgot_password(
     request: PasswordResetRequest,
@@ -385,11 +419,12 @@ async def reset_password(
         )
 
     # Update password and clear reset token
+    new_password_hash = await password_hasher.hash(reset_data.new_password)
     await db.users.update_one(
         {"_id": user.id},
         {
             "$set": {
-                "password_hash": get_password_hash(reset_data.new_password),
+                "password_hash": new_password_hash,
                 "password_reset_token": None,
                 "updated_at": datetime.utcnow()
             },
@@ -398,6 +433,9 @@ async def reset_password(
             }
         }
     )
+    await token_revocations.revoke_user(user.id)
+    await user_cache.invalidate(user.id)
+    await login_throttle.reset(user.email)
 
     logger.info(f"Password reset completed for: {user.email}")
 
@@ -413,7 +451,7 @@ async def change_password(
     Change current user's password.
     """
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.password_hash):
+    if not await password_hasher.verify(password_data.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
@@ -428,15 +466,18 @@ async def change_password(
         )
 
     # Update password
+    new_password_hash = await password_hasher.hash(password_data.new_password)
     await db.users.update_one(
         {"_id": current_user.id},
         {
             "$set": {
-                "password_hash": get_password_hash(password_data.new_password),
+                "password_hash": new_password_hash,
                 "updated_at": datetime.utcnow()
             }
         }
     )
+    await token_revocations.revoke_user(current_user.id)
+    await user_cache.invalidate(current_user.id)
 
     logger.info(f"Password changed for user: {current_user.email}")
 
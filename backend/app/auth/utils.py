@@ -3,13 +3,20 @@ Authentication utilities for password hashing, JWT tokens, and security.
 """
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+import time
+import uuid
 import jwt
 from passlib.context import CryptContext
 from app.config import settings
 from app.models.user import TokenData, UserRole
+from app.auth.cache import token_cache
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -27,7 +34,7 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex, "iat": time.time()})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
@@ -35,12 +42,16 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     """Create JWT refresh token."""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex, "iat": time.time()})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 def verify_token(token: str, token_type: str = "access") -> Optional[TokenData]:
-    """Verify and decode JWT token."""
+    """Verify and decode JWT token, reusing cached results for repeat tokens."""
+    cached = token_cache.get(token, token_type)
+    if cached is not None:
+        return cached
+
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
         token_type_in_payload = payload.get("type")
@@ -67,13 +78,31 @@ def verify_token(token: str, token_type: str = "access") -> Optional[TokenData]:
         else:
             exp_datetime = None
 
-        return TokenData(user_id=user_id, email=email, role=user_role, exp=exp_datetime)
+        token_data = TokenData(
+            user_id=user_id,
+            email=email,
+            role=user_role,
+            exp=exp_datetime,
+            jti=payload.get("jti"),
+            iat=payload.get("iat")
+        )
+        if exp:
+            token_cache.set(token, token_type, token_data, exp)
+        return token_data
 
     except jwt.ExpiredSignatureError:
         return None
     except jwt.JWTError:
         return None
 
+def revoke_token(token: str) -> None:
+    """Evict a verified token from the cache (e.g. on logout)."""
+    token_cache.revoke(token)
+
+def revoke_user_tokens(user_id: str) -> None:
+    """Evict all cached tokens for a user (e.g. on password or role change)."""
+    token_cache.revoke_user(user_id)
+
 def create_password_reset_token(email: str) -> str:
     """Create password reset token."""
     expire = datetime.utcnow() + timedelta(hours=settings.PASSWORD_RESET_TOKEN_EXPIRE_HOURS)
@@ -2,7 +2,7 @@
 Configuration settings for CandidateX backend.
 """
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 import os
 from pathlib import Path
 from pydantic import field_validator
@@ -58,6 +58,48 @@ class Settings(BaseSettings):
     GOOGLE_AI_API_KEY: Optional[str] = None
     OPENAI_API_KEY: Optional[str] = None
     AI_MODEL: str = "gemini-pro"
+    OPENAI_MODEL: str = "gpt-4"
+    AI_PROVIDER_MAX_CONCURRENCY: int = 16
+    AI_PROVIDER_MAX_QUEUE: int = 256
+    AI_PROVIDER_TIMEOUT_SECONDS: float = 60.0
+    AI_HTTP_MAX_CONNECTIONS: int = 100
+    AI_RESULT_CACHE_MAX_SIZE: int = 2048
+    AI_RESULT_CACHE_TTL_SECONDS: int = 3600
+    AI_ROUTER_HEDGING: bool = True
+    AI_ROUTER_HEDGE_DEFAULT_MS: int = 8000
+    AI_ROUTER_MIN_SAMPLES: int = 20
+    AI_ROUTER_BREAKER_FAILURES: int = 5
+    AI_ROUTER_BREAKER_RESET_SECONDS: float = 30.0
+    AI_OFFLINE_FIRST_PASS_CONFIDENCE: float = 1.0
+    AI_OFFLINE_OVERFLOW_QUEUE: int = 32
+    AI_CHAT_HISTORY_TOKENS: int = 1500
+    AI_CHAT_SUMMARY_TOKENS: int = 300
+    AI_CHAT_MAX_TURNS: int = 100
+    AI_CHAT_CONVERSATION_TTL_HOURS: int = 24
+    AI_USER_DAILY_TOKEN_QUOTA: int = 0  # 0 = unlimited
+    AI_METRICS_FLUSH_INTERVAL_SECONDS: float = 15.0
+    # USD per 1K (prompt, completion) tokens, by provider name
+    AI_TOKEN_PRICES_PER_1K: Dict[str, List[float]] = {"gemini": [0.0005, 0.0015], "openai": [0.03, 0.06]}
+    # Background job settings
+    JOB_POOL_CONCURRENCY: Dict[str, int] = {"evaluation": 8, "questions": 4, "feedback": 4, "resume": 2}
+    JOB_WORKER_POOLS: Optional[List[str]] = None  # pools the API process works on; None = all, [] = none
+    JOB_RETRY_BASE_SECONDS: float = 2.0
+    JOB_RETRY_MAX_SECONDS: float = 300.0
+    JOB_POLL_INTERVAL_SECONDS: float = 0.5
+    JOB_SHUTDOWN_GRACE_SECONDS: float = 10.0
+    JOB_RESULT_TTL_HOURS: int = 24
+    JOB_EVENTS_SUBSCRIBER_BUFFER: int = 100
+    JOB_WAIT_MAX_SECONDS: int = 30
+    JOB_EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    FEEDBACK_STREAM_FALLBACK_SECONDS: float = 120.0  # streamed feedback is generated by a job after this if never saved
+
+    EVALUATION_BATCH_WINDOW_MS: int = 250
+    EVALUATION_BATCH_MAX_SIZE: int = 8
+    QUESTION_CACHE_TTL_HOURS: int = 24
+    QUESTION_CACHE_VARIANTS: int = 3
+    QUESTION_CACHE_TITLE_SIMILARITY: float = 0.9
+    QUESTION_CACHE_WARM_INTERVAL_MINUTES: int = 30
+    QUESTION_CACHE_WARM_TOP: int = 50
 
     # Cloud Storage settings
     AWS_ACCESS_KEY_ID: Optional[str] = None
@@ -71,6 +113,29 @@ class Settings(BaseSettings):
     PASSWORD_RESET_TOKEN_EXPIRE_HOURS: int = 1
     ACCOUNT_LOCKOUT_ATTEMPTS: int = 5
     ACCOUNT_LOCKOUT_DURATION_MINUTES: int = 30
+    LOGIN_ATTEMPT_WINDOW_MINUTES: int = 15
+    LOGIN_IP_MAX_ATTEMPTS: int = 50
+    LAST_LOGIN_FLUSH_INTERVAL_SECONDS: int = 30
+    LAST_LOGIN_FLUSH_MAX_PENDING: int = 1000
+
+    # Password hashing pool settings
+    PASSWORD_HASH_EXECUTOR: Literal['thread', 'process'] = 'thread'
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+
+    # Auth cache settings
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    TOKEN_CACHE_MAX_SIZE: int = 50000
+
+    # Token revocation settings
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = 100000
+    TOKEN_REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+
+    # Count settings
+    COUNT_EXACT_LIMIT: int = 10000
+    COUNT_CACHE_TTL_SECONDS: int = 300
 
     # File upload settings
     MAX_UPLOAD_SIZE: int = 10485760  # 10MB
@@ -94,6 +159,9 @@ class Settings(BaseSettings):
     # Admin settings
     ADMIN_EMAIL: str = "admin@candidatex.com"
     SUPPORT_EMAIL: str = "support@candidatex.com"
+    BULK_PROVISION_BATCH_SIZE: int = 500
+    BULK_PROVISION_MAX_ROWS: int = 50000
+    USER_SEARCH_CANDIDATE_LIMIT: int = 100
 
     # External API settings
     LINKEDIN_CLIENT_ID: Optional[str] = None
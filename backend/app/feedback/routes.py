@@ -11,7 +11,9 @@ from app.models.user import (
     Feedback, FeedbackCreate, FeedbackResponse, User
 )
 from app.models import get_database
-from app.auth.dependencies import get_current_user, get_optional_current_user
+from app.auth.dependencies import (
+    get_optional_current_user, check_permissions, resource_scope, ResourceScope
+)
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +64,7 @@ async def submit_feedback(
 async def get_feedback_list(
     feedback_type: Optional[str] = None,
     status: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
+    scope: ResourceScope = Depends(resource_scope("feedback")),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """
@@ -70,11 +72,8 @@ async def get_feedback_list(
     Admin and recruiter roles can view all feedback.
     Regular users can only view their own feedback.
     """
-    query = {}
-
     # Filter by user if not admin/recruiter
-    if current_user.role.value not in ["admin", "recruiter"]:
-        query["user_id"] = current_user.id
+    query = scope.filter()
 
     # Additional filters
     if feedback_type:
@@ -106,7 +105,7 @@ async def get_feedback_list(
 @router.get("/{feedback_id}", response_model=FeedbackResponse)
 async def get_feedback(
     feedback_id: str,
-    current_user: User = Depends(get_current_user),
+    scope: ResourceScope = Depends(resource_scope("feedback")),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """
@@ -125,8 +124,7 @@ async def get_feedback(
     feedback = Feedback.from_mongo(feedback_doc)
 
     # Check permissions
-    if (current_user.role.value not in ["admin", "recruiter"] and
-        feedback.user_id != current_user.id):
+    if not scope.can_access(feedback.user_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this feedback"
@@ -149,19 +147,12 @@ async def get_feedback(
 async def update_feedback_status(
     feedback_id: str,
     status: str,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(check_permissions(["manage_feedback"])),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """
     Update feedback status (admin/recruiter only).
     """
-    # Check permissions
-    if current_user.role.value not in ["admin", "recruiter"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update feedback status"
-        )
-
     from bson import ObjectId
 
     # Validate status
@@ -211,7 +202,7 @@ async def update_feedback_status(
 @router.delete("/{feedback_id}")
 async def delete_feedback(
     feedback_id: str,
-    current_user: User = Depends(get_current_user),
+    scope: ResourceScope = Depends(resource_scope("feedback")),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """
@@ -231,8 +222,7 @@ async def delete_feedback(
     feedback = Feedback.from_mongo(feedback_doc)
 
     # Check permissions
-    if (current_user.role.value not in ["admin", "recruiter"] and
-        feedback.user_id != current_user.id):
+    if not scope.can_access(feedback.user_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this feedback"
@@ -253,27 +243,21 @@ async def delete_feedback(
 
 @router.get("/stats/summary")
 async def get_feedback_stats(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(check_permissions(["manage_feedback"])),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """
     Get feedback statistics summary (admin/recruiter only).
     """
-    if current_user.role.value not in ["admin", "recruiter"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view feedback statistics"
-        )
-
-    # Get total feedback count
-    total_count = await db.feedback.count_documents({})
-
     # Get feedback by type
     type_pipeline = [
         {"$group": {"_id": "$feedback_type", "count": {"$sum": 1}}}
     ]
     type_stats = await db.feedback.aggregate(type_pipeline).to_list(length=None)
 
+    # The type buckets cover every document, so they add up to the total
+    total_count = sum(stat["count"] for stat in type_stats)
+
     # Get feedback by status
     status_pipeline = [
         {"$group": {"_id": "$status", "count": {"$sum": 1}}}
@@ -2,10 +2,13 @@
 Interview management routes for creating, conducting, and managing interviews.
 """
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from contextlib import aclosing
+from typing import List, Optional, Dict, Any, AsyncIterator
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, Query, HTTPException, status, WebSocket, WebSocketDisconnect, Response
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
+import hashlib
 import json
 
 from app.models.interview import (
@@ -14,9 +17,16 @@ from app.models.interview import (
     AntiCheatEvent
 )
 from app.models.user import User
+from app.config import settings
 from app.models import get_database, get_redis
-from app.auth.dependencies import get_current_user, check_permissions
+from app.auth.dependencies import get_current_user, check_permissions, resource_scope, ResourceScope
+from app.ai.metrics import bind_user
 from app.ai.service import ai_service
+from app.ai.batching import evaluation_batcher
+from app.ai.question_cache import question_cache
+from app.jobs.queue import PRIORITY_HIGH, job_queue
+from app.utils.pagination import paginate, set_next_cursor
+from app.utils.streaming import SSE_HEADERS, SSE_MEDIA_TYPE, sse_event
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +40,6 @@ async def test_interview_creation():
 @router.post("/", response_model=InterviewSessionResponse)
 async def create_interview(
     interview_data: InterviewCreate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
@@ -45,7 +54,21 @@ async def create_interview(
     interview_dict["updated_at"] = datetime.utcnow()
     interview_dict["created_by"] = current_user.id
 
-    # Create basic fallback questions directly (skip AI service for now)
+    # Serve AI questions from the cache; on a miss start with stock questions
+    # and swap in a generated set in the background. A variant top-up the
+    # cache starts from here is charged to this user.
+    bind_user(current_user.id)
+    cached_questions = await question_cache.get(
+        current_user.id,
+        interview_data.job_title,
+        interview_data.job_description,
+        interview_data.experience_level,
+        interview_data.question_count,
+        interview_data.mode.value,
+        interview_data.type.value
+    )
+
+    # Create basic fallback questions directly
     fallback_questions = []
     base_questions = [
         {
@@ -96,15 +119,32 @@ async def create_interview(
         question["question_text"] = f"{question['question_text']} (Question {i+1})"
         fallback_questions.append(question)
 
-    interview_dict["questions"] = fallback_questions
+    interview_dict["questions"] = cached_questions or fallback_questions
     interview_dict["status"] = InterviewStatus.CREATED
-    logger.info(f"Created {len(fallback_questions)} questions for interview")
+    logger.info(f"Created {len(interview_dict['questions'])} questions for interview (cached: {bool(cached_questions)})")
 
     try:
         result = await db.interviews.insert_one(interview_dict)
         interview_id = str(result.inserted_id)
         logger.info(f"Database insertion successful, ID: {interview_id}")
 
+        if not cached_questions:
+            await job_queue.enqueue(
+                "interview.questions",
+                {
+                    "interview_id": interview_id,
+                    "job_title": interview_data.job_title,
+                    "job_description": interview_data.job_description,
+                    "experience_level": interview_data.experience_level,
+                    "question_count": interview_data.question_count,
+                    "interview_mode": interview_data.mode.value,
+                    "interview_type": interview_data.type.value,
+                    "user_id": current_user.id
+                },
+                idempotency_key=interview_id,
+                user_id=current_user.id
+            )
+
         # Get created interview
         interview_doc = await db.interviews.find_one({"_id": interview_id})
         if not interview_doc:
@@ -124,8 +164,10 @@ async def create_interview(
 
 @router.get("/", response_model=List[InterviewSummary])
 async def list_user_interviews(
+    response: Response,
     skip: int = 0,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     status: Optional[InterviewStatus] = None,
     type: Optional[InterviewType] = None,
     current_user: User = Depends(get_current_user),
@@ -133,6 +175,7 @@ async def list_user_interviews(
 ):
     """
     List user's interview sessions.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
     # Build query
     query = {"user_id": current_user.id}
@@ -142,8 +185,10 @@ async def list_user_interviews(
         query["type"] = type.value
 
     # Get interviews
-    cursor = db.interviews.find(query).skip(skip).limit(limit).sort("created_at", -1)
-    interviews_docs = await cursor.to_list(length=None)
+    interviews_docs, next_cursor = await paginate(
+        db.interviews, query, "created_at", limit, cursor=cursor, skip=skip
+    )
+    set_next_cursor(response, next_cursor)
 
     interviews = [InterviewSession(**doc) for doc in interviews_docs]
 
@@ -167,13 +212,13 @@ async def list_user_interviews(
 @router.get("/{interview_id}", response_model=InterviewSessionResponse)
 async def get_interview(
     interview_id: str,
-    current_user: User = Depends(get_current_user),
+    scope: ResourceScope = Depends(resource_scope("interview")),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """
     Get interview session details.
     """
-    interview_doc = await db.interviews.find_one({"_id": interview_id, "user_id": current_user.id})
+    interview_doc = await db.interviews.find_one(scope.filter({"_id": interview_id}))
     if not interview_doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -357,7 +402,6 @@ async def submit_response(
     question_index: int,
     response_text: Optional[str] = None,
     time_spent: Optional[int] = None,
-    background_tasks: BackgroundTasks = BackgroundTasks(),
     current_user: User = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
@@ -388,52 +432,64 @@ async def submit_response(
             detail="Invalid question index"
         )
 
-    # Update response
-    responses = interview.responses.copy()
-    if question_index >= len(responses):
-        responses.extend([{}] * (question_index - len(responses) + 1))
-
-    response_data = responses[question_index]
-    response_data["response_text"] = response_text
-    response_data["submitted_at"] = datetime.utcnow()
-    response_data["time_spent"] = time_spent or response_data.get("time_spent", 0)
-
-    # Evaluate response with AI (background task)
-    question = interview.questions[question_index]
-    if response_text:
-        background_tasks.add_task(
-            evaluate_response_background,
-            interview_id,
-            question_index,
-            question.get("question_text", ""),
-            response_text
+    # Pad skipped questions so the answer lands at its own index, not after null gaps
+    existing = len(interview.responses)
+    if question_index > existing:
+        await db.interviews.update_one(
+            {"_id": interview_id, "responses": {"$size": existing}},
+            {"$push": {"responses": {"$each": [{} for _ in range(question_index - existing)]}}}
         )
 
-    # Update interview
+    # Update only the fields this route owns; the evaluation writes its own
+    previous = interview.responses[question_index] if question_index < existing else {}
     await db.interviews.update_one(
         {"_id": interview_id},
         {
             "$set": {
-                "responses": responses,
+                f"responses.{question_index}.response_text": response_text,
+                f"responses.{question_index}.submitted_at": datetime.utcnow(),
+                f"responses.{question_index}.time_spent": time_spent or previous.get("time_spent", 0),
                 "updated_at": datetime.utcnow()
             }
         }
     )
 
+    # Evaluate response with AI (background job, ahead of bulk work); enqueued
+    # after the write so the worker always finds the response to score
+    question = interview.questions[question_index]
+    job_id = None
+    if response_text:
+        response_digest = hashlib.sha256(response_text.encode()).hexdigest()[:16]
+        job_id = await job_queue.enqueue(
+            "interview.evaluate",
+            {
+                "interview_id": interview_id,
+                "question_index": question_index,
+                "question_text": question.get("question_text", ""),
+                "response_text": response_text,
+                "user_id": current_user.id
+            },
+            priority=PRIORITY_HIGH,
+            idempotency_key=f"{interview_id}:{question_index}:{response_digest}",
+            user_id=current_user.id
+        )
+
     logger.info(f"Response submitted for interview {interview_id}, question {question_index}")
 
-    return {"message": "Response submitted successfully"}
+    return {"message": "Response submitted successfully", "job_id": job_id}
 
 @router.post("/{interview_id}/complete")
 async def complete_interview(
     interview_id: str,
-    background_tasks: BackgroundTasks,
+    stream_feedback: bool = False,
     current_user: User = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database),
     redis_client = Depends(get_redis)
 ):
     """
     Complete an interview session.
+    With stream_feedback the client reads feedback from /feedback/stream;
+    the background job then only runs if the stream never saved it.
     """
     # Check if interview exists and belongs to user
     interview_doc = await db.interviews.find_one({"_id": interview_id, "user_id": current_user.id})
@@ -469,12 +525,19 @@ async def complete_interview(
         {"$set": update_data}
     )
 
-    # Generate overall feedback (background task)
-    background_tasks.add_task(
-        generate_overall_feedback_background,
-        interview_id,
-        interview.job_title,
-        interview.experience_level
+    # Generate overall feedback (background job). A streaming client gets a
+    # head start; the job no-ops once the stream has saved the feedback, and
+    # otherwise covers a stream that was never opened or did not finish
+    job_id = await job_queue.enqueue(
+        "interview.feedback",
+        {
+            "interview_id": interview_id,
+            "job_title": interview.job_title,
+            "experience_level": interview.experience_level
+        },
+        idempotency_key=interview_id,
+        user_id=current_user.id,
+        delay_seconds=settings.FEEDBACK_STREAM_FALLBACK_SECONDS if stream_feedback else 0
     )
 
     # Clean up Redis session
@@ -482,7 +545,67 @@ async def complete_interview(
 
     logger.info(f"Interview completed: {interview_id}")
 
-    return {"message": "Interview completed successfully"}
+    if stream_feedback:
+        return {
+            "message": "Interview completed successfully",
+            "feedback_stream": f"/api/v1/interviews/{interview_id}/feedback/stream",
+            "job_id": job_id
+        }
+    return {"message": "Interview completed successfully", "job_id": job_id}
+
+@router.get("/{interview_id}/feedback/stream")
+async def stream_interview_feedback(
+    interview_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Stream overall feedback for a completed interview as Server-Sent Events.
+    "section" events carry each feedback field as soon as it is parsed and a
+    final "feedback" event the complete result, which is saved to the
+    interview. Saved feedback is replayed without calling the AI, and
+    generation stops if the client disconnects.
+    """
+    interview_doc = await db.interviews.find_one({"_id": interview_id, "user_id": current_user.id})
+    if not interview_doc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Interview not found"
+        )
+
+    interview = InterviewSession(**interview_doc)
+    if interview.status != InterviewStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Interview is not completed"
+        )
+
+    async def events():
+        bind_user(current_user.id)
+        if interview.ai_feedback:
+            feedback_events = replay_events(interview.ai_feedback)
+        elif not has_actual_responses(interview.responses):
+            feedback_events = replay_events(no_response_feedback())
+        else:
+            feedback_events = ai_service.stream_overall_feedback(
+                feedback_responses(interview), interview.job_title, interview.experience_level
+            )
+
+        async with aclosing(feedback_events):
+            async for event in feedback_events:
+                if "feedback" not in event:
+                    yield sse_event(event, event="section")
+                    continue
+                if not interview.ai_feedback:
+                    await save_overall_feedback(db, interview_id, event["feedback"])
+                yield sse_event(event["feedback"], event="feedback")
+
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+async def replay_events(feedback: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Feedback events for feedback that is already complete."""
+    for event in ai_service.feedback_events(feedback):
+        yield event
 
 @router.get("/analytics/overview", response_model=InterviewAnalytics)
 async def get_interview_analytics(
@@ -578,19 +701,23 @@ async def generate_interview_questions_background(
     experience_level: str,
     question_count: int,
     interview_mode: str,
-    interview_type: str
+    interview_type: str,
+    user_id: Optional[str] = None
 ):
     """Background task to generate interview questions."""
+    bind_user(user_id)
     try:
         db = await get_database()
-        questions = await ai_service.generate_interview_questions(
+        questions = await question_cache.fill(
             job_title, job_description, experience_level,
             question_count, interview_mode, interview_type
         )
+        if not questions:
+            return {"interview_id": interview_id, "questions_updated": False}
 
-        # Update interview with generated questions
-        await db.interviews.update_one(
-            {"_id": interview_id},
+        # Replace the stock questions unless the interview has already started
+        result = await db.interviews.update_one(
+            {"_id": interview_id, "status": InterviewStatus.CREATED},
             {
                 "$set": {
                     "questions": questions,
@@ -599,18 +726,30 @@ async def generate_interview_questions_background(
             }
         )
 
-        logger.info(f"Questions generated for interview: {interview_id}")
+        if result.modified_count:
+            logger.info(f"Questions generated for interview: {interview_id}")
+        return {"interview_id": interview_id, "questions_updated": bool(result.modified_count)}
 
     except Exception as e:
         logger.error(f"Failed to generate questions for interview {interview_id}: {e}")
+        raise
 
 async def evaluate_response_background(
     interview_id: str,
     question_index: int,
     question_text: str,
-    response_text: str
+    response_text: str,
+    user_id: Optional[str] = None
 ):
     """Background task to evaluate response."""
+    bind_user(user_id)
+    # Batched with other sessions' answers when the batcher is running
+    if evaluation_batcher.running:
+        evaluation = await evaluation_batcher.evaluate(
+            interview_id, question_index, question_text, response_text, user_id=user_id
+        )
+        return {"interview_id": interview_id, "question_index": question_index, "ai_score": evaluation["score"]}
+
     try:
         db = await get_database()
         evaluation = await ai_service.evaluate_response(question_text, response_text)
@@ -630,9 +769,11 @@ async def evaluate_response_background(
         )
 
         logger.info(f"Response evaluated for interview {interview_id}, question {question_index}")
+        return {"interview_id": interview_id, "question_index": question_index, "ai_score": evaluation["score"]}
 
     except Exception as e:
         logger.error(f"Failed to evaluate response for interview {interview_id}: {e}")
+        raise
 
 async def generate_overall_feedback_background(
     interview_id: str,
@@ -649,29 +790,15 @@ async def generate_overall_feedback_background(
             return
 
         interview = InterviewSession(**interview_doc)
-        responses = interview.responses
-
-        # Check if there are any actual responses (not empty/null)
-        has_actual_responses = any(
-            r.get("response_text") and r.get("response_text").strip()
-            for r in responses
-        )
+        if interview.ai_feedback:
+            # Already streamed to the client and saved
+            return {"interview_id": interview_id, "overall_score": interview.overall_score}
+        bind_user(interview.user_id)
+        responses = feedback_responses(interview)
 
-        if not has_actual_responses:
+        if not has_actual_responses(responses):
             # No actual responses provided - don't generate fake feedback
-            feedback = {
-                "overall_score": 0,
-                "overall_feedback": "No responses were provided for evaluation.",
-                "strengths": [],
-                "weaknesses": ["No responses submitted"],
-                "recommendations": [
-                    {"title": "Complete the Interview", "description": "Please provide answers to the interview questions to receive personalized feedback."}
-                ],
-                "communication_score": 0,
-                "technical_score": 0,
-                "problem_solving_score": 0,
-                "behavioral_score": 0
-            }
+            feedback = no_response_feedback()
         else:
             # Generate feedback using AI
             feedback = await ai_service.generate_overall_feedback(
@@ -679,21 +806,62 @@ async def generate_overall_feedback_background(
             )
 
         # Update interview with feedback
-        await db.interviews.update_one(
-            {"_id": interview_id},
-            {
-                "$set": {
-                    "overall_score": feedback["overall_score"],
-                    "ai_feedback": feedback,
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
+        await save_overall_feedback(db, interview_id, feedback)
 
         logger.info(f"Overall feedback generated for interview: {interview_id}")
+        return {"interview_id": interview_id, "overall_score": feedback["overall_score"]}
 
     except Exception as e:
         logger.error(f"Failed to generate feedback for interview {interview_id}: {e}")
+        raise
+
+def feedback_responses(interview: InterviewSession) -> List[Dict[str, Any]]:
+    """Stored responses with the text of the question each one answers."""
+    return [
+        {"question_text": question.get("question_text", ""), **response}
+        for response, question in zip(interview.responses, interview.questions + [{}] * len(interview.responses))
+    ]
+
+def has_actual_responses(responses: List[Dict[str, Any]]) -> bool:
+    """Check if there are any actual responses (not empty/null)."""
+    return any(
+        r.get("response_text") and r.get("response_text").strip()
+        for r in responses
+    )
+
+def no_response_feedback() -> Dict[str, Any]:
+    """Feedback for an interview completed without answers."""
+    return {
+        "overall_score": 0,
+        "overall_feedback": "No responses were provided for evaluation.",
+        "strengths": [],
+        "weaknesses": ["No responses submitted"],
+        "recommendations": [
+            {"title": "Complete the Interview", "description": "Please provide answers to the interview questions to receive personalized feedback."}
+        ],
+        "communication_score": 0,
+        "technical_score": 0,
+        "problem_solving_score": 0,
+        "behavioral_score": 0
+    }
+
+async def save_overall_feedback(db: AsyncIOMotorDatabase, interview_id: str, feedback: Dict[str, Any]) -> None:
+    """Store overall feedback unless the interview already has some."""
+    await db.interviews.update_one(
+        {"_id": interview_id, "ai_feedback": None},
+        {
+            "$set": {
+                "overall_score": feedback["overall_score"],
+                "ai_feedback": feedback,
+                "updated_at": datetime.utcnow()
+            }
+        }
+    )
+
+# Background job handlers
+job_queue.register("interview.questions", generate_interview_questions_background, pool="questions")
+job_queue.register("interview.evaluate", evaluate_response_background, pool="evaluation", max_attempts=5, timeout_seconds=120)
+job_queue.register("interview.feedback", generate_overall_feedback_background, pool="feedback")
 
 # WebSocket endpoint for real-time interview management
 @router.websocket("/{interview_id}/ws")
@@ -0,0 +1,358 @@
+"""
+Storage backends for the job queue.
+
+Both backends keep one priority queue per worker pool (lower priority
+value first, FIFO within a priority), a delayed set for retries waiting
+out their backoff, a running set with lease deadlines, a dead-letter set
+and idempotency keys. RedisJobBackend is durable and shared by every
+process; claims and lease recovery run as Lua scripts so a job is never
+handed to two workers. MemoryJobBackend has the same semantics within
+one process, for tests and deployments without Redis.
+"""
+import heapq
+import itertools
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+# Redis keys
+JOB_PREFIX = "jobs:job:"
+READY_PREFIX = "jobs:ready:"
+DELAYED_PREFIX = "jobs:delayed:"
+RUNNING_KEY = "jobs:running"
+DEAD_KEY = "jobs:dead"
+IDEMPOTENCY_PREFIX = "jobs:idempotency:"
+
+# Queue score: priority first, then enqueue time in milliseconds
+PRIORITY_SCALE = 10 ** 13
+
+QUEUED = "queued"
+RUNNING = "running"
+RETRYING = "retrying"
+SUCCEEDED = "succeeded"
+DEAD = "dead"
+
+def queue_score(priority: int, now: float) -> float:
+    return priority * PRIORITY_SCALE + int(now * 1000)
+
+def new_job(
+    job_type: str,
+    pool: str,
+    payload: Dict[str, Any],
+    priority: int,
+    max_attempts: int,
+    idempotency_key: Optional[str] = None,
+    user_id: Optional[str] = None,
+    run_at: Optional[float] = None
+) -> Dict[str, Any]:
+    now = time.time()
+    return {
+        "id": uuid.uuid4().hex,
+        "type": job_type,
+        "pool": pool,
+        "payload": payload,
+        "priority": priority,
+        "status": QUEUED,
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "idempotency_key": idempotency_key,
+        "user_id": user_id,
+        "created_at": now,
+        "updated_at": now,
+        "run_at": run_at or now,
+        "error": None,
+        "result": None
+    }
+
+# Moves due retries into the ready queue, then claims the first ready job.
+# KEYS: ready, delayed, running. ARGV: now, lease deadline, job key prefix, priority scale.
+CLAIM_SCRIPT = """
+local now = tonumber(ARGV[1])
+local due = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+for _, id in ipairs(due) do
+    local priority = tonumber(redis.call('HGET', ARGV[3] .. id, 'priority') or '5')
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('ZADD', KEYS[1], priority * tonumber(ARGV[4]) + math.floor(now * 1000), id)
+    redis.call('HSET', ARGV[3] .. id, 'status', 'queued')
+end
+local ids = redis.call('ZRANGE', KEYS[1], 0, 0)
+if #ids == 0 then
+    return nil
+end
+local id = ids[1]
+redis.call('ZREM', KEYS[1], id)
+redis.call('ZADD', KEYS[3], tonumber(ARGV[2]), id)
+redis.call('HINCRBY', ARGV[3] .. id, 'attempts', 1)
+redis.call('HSET', ARGV[3] .. id, 'status', 'running', 'updated_at', ARGV[1])
+return id
+"""
+
+# Requeues jobs whose lease expired (their worker died); dead-letters those out of attempts.
+# KEYS: running, dead. ARGV: now, job key prefix, ready key prefix, priority scale.
+REAP_SCRIPT = """
+local now = tonumber(ARGV[1])
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now)
+for _, id in ipairs(expired) do
+    local key = ARGV[2] .. id
+    redis.call('ZREM', KEYS[1], id)
+    local job = redis.call('HMGET', key, 'pool', 'priority', 'attempts', 'max_attempts')
+    if job[1] then
+        if tonumber(job[3]) >= tonumber(job[4]) then
+            redis.call('HSET', key, 'status', 'dead', 'error', 'worker lease expired', 'updated_at', ARGV[1])
+            redis.call('ZADD', KEYS[2], now, id)
+        else
+            redis.call('HSET', key, 'status', 'queued', 'updated_at', ARGV[1])
+            redis.call('ZADD', ARGV[3] .. job[1], tonumber(job[2]) * tonumber(ARGV[4]) + math.floor(now * 1000), id)
+        end
+    end
+end
+return #expired
+"""
+
+def _encode(job: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        field: json.dumps(value) if field in ("payload", "result") else ("" if value is None else str(value))
+        for field, value in job.items()
+    }
+
+def _decode(fields: Dict[str, str]) -> Dict[str, Any]:
+    job: Dict[str, Any] = dict(fields)
+    for field in ("payload", "result"):
+        job[field] = json.loads(fields[field]) if fields.get(field) else None
+    for field in ("priority", "attempts", "max_attempts"):
+        job[field] = int(fields.get(field) or 0)
+    for field in ("created_at", "updated_at", "run_at"):
+        job[field] = float(fields.get(field) or 0)
+    for field in ("idempotency_key", "user_id", "error"):
+        job[field] = fields.get(field) or None
+    return job
+
+class RedisJobBackend:
+    """Durable queue shared by every process through Redis."""
+
+    name = "redis"
+
+    def __init__(self, client, result_ttl_seconds: int = 86400, dead_ttl_seconds: int = 7 * 86400):
+        self.client = client
+        self.result_ttl_seconds = result_ttl_seconds
+        self.dead_ttl_seconds = dead_ttl_seconds
+
+    async def enqueue(self, job: Dict[str, Any]) -> Tuple[str, bool]:
+        """Store and queue a job; with an idempotency key already used, return that job's id instead."""
+        key = job["idempotency_key"]
+        if key:
+            claimed = await self.client.set(f"{IDEMPOTENCY_PREFIX}{key}", job["id"], nx=True, ex=self.result_ttl_seconds)
+            if not claimed:
+                existing = await self.client.get(f"{IDEMPOTENCY_PREFIX}{key}")
+                if existing and await self.client.exists(f"{JOB_PREFIX}{existing}"):
+                    return existing, False
+                # The earlier enqueue never stored its job; take the key over
+                await self.client.set(f"{IDEMPOTENCY_PREFIX}{key}", job["id"], ex=self.result_ttl_seconds)
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(f"{JOB_PREFIX}{job['id']}", mapping=_encode(job))
+        if job["run_at"] > time.time():
+            pipe.zadd(f"{DELAYED_PREFIX}{job['pool']}", {job["id"]: job["run_at"]})
+        else:
+            pipe.zadd(f"{READY_PREFIX}{job['pool']}", {job["id"]: queue_score(job["priority"], job["created_at"])})
+        await pipe.execute()
+        return job["id"], True
+
+    async def claim(self, pool: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        job_id = await self.client.eval(
+            CLAIM_SCRIPT, 3,
+            f"{READY_PREFIX}{pool}", f"{DELAYED_PREFIX}{pool}", RUNNING_KEY,
+            now, now + lease_seconds, JOB_PREFIX, PRIORITY_SCALE
+        )
+        if job_id is None:
+            return None
+        return await self.get(job_id)
+
+    async def complete(self, job: Dict[str, Any], result: Any) -> None:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(RUNNING_KEY, job["id"])
+        pipe.hset(f"{JOB_PREFIX}{job['id']}", mapping={
+            "status": SUCCEEDED, "result": json.dumps(result), "error": "", "updated_at": str(time.time())
+        })
+        pipe.expire(f"{JOB_PREFIX}{job['id']}", self.result_ttl_seconds)
+        await pipe.execute()
+
+    async def retry(self, job: Dict[str, Any], error: str, run_at: float) -> None:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(RUNNING_KEY, job["id"])
+        pipe.hset(f"{JOB_PREFIX}{job['id']}", mapping={
+            "status": RETRYING, "error": error, "run_at": str(run_at), "updated_at": str(time.time())
+        })
+        pipe.zadd(f"{DELAYED_PREFIX}{job['pool']}", {job["id"]: run_at})
+        await pipe.execute()
+
+    async def release(self, job: Dict[str, Any]) -> None:
+        """Put a job interrupted by shutdown back in its queue without using up an attempt."""
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(RUNNING_KEY, job["id"])
+        pipe.hincrby(f"{JOB_PREFIX}{job['id']}", "attempts", -1)
+        pipe.hset(f"{JOB_PREFIX}{job['id']}", mapping={"status": QUEUED, "updated_at": str(time.time())})
+        pipe.zadd(f"{READY_PREFIX}{job['pool']}", {job["id"]: queue_score(job["priority"], job["created_at"])})
+        await pipe.execute()
+
+    async def dead_letter(self, job: Dict[str, Any], error: str) -> None:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(RUNNING_KEY, job["id"])
+        pipe.hset(f"{JOB_PREFIX}{job['id']}", mapping={"status": DEAD, "error": error, "updated_at": str(time.time())})
+        pipe.expire(f"{JOB_PREFIX}{job['id']}", self.dead_ttl_seconds)
+        pipe.zadd(DEAD_KEY, {job["id"]: time.time()})
+        await pipe.execute()
+
+    async def requeue_expired(self) -> int:
+        """Recover jobs whose worker stopped renewing them (crashed or killed)."""
+        return int(await self.client.eval(
+            REAP_SCRIPT, 2, RUNNING_KEY, DEAD_KEY, time.time(), JOB_PREFIX, READY_PREFIX, PRIORITY_SCALE
+        ))
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        fields = await self.client.hgetall(f"{JOB_PREFIX}{job_id}")
+        return _decode(fields) if fields else None
+
+    async def dead_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        ids = await self.client.zrevrange(DEAD_KEY, 0, limit - 1)
+        jobs = [await self.get(job_id) for job_id in ids]
+        return [job for job in jobs if job is not None]
+
+    async def requeue_dead(self, job_id: str) -> bool:
+        """Give a dead-lettered job a fresh set of attempts."""
+        job = await self.get(job_id)
+        if job is None or job["status"] != DEAD:
+            return False
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(DEAD_KEY, job_id)
+        pipe.persist(f"{JOB_PREFIX}{job_id}")
+        pipe.hset(f"{JOB_PREFIX}{job_id}", mapping={"status": QUEUED, "attempts": "0", "updated_at": str(time.time())})
+        pipe.zadd(f"{READY_PREFIX}{job['pool']}", {job_id: queue_score(job["priority"], time.time())})
+        await pipe.execute()
+        return True
+
+    async def depths(self, pools: List[str]) -> Dict[str, Dict[str, int]]:
+        pipe = self.client.pipeline(transaction=False)
+        for pool in pools:
+            pipe.zcard(f"{READY_PREFIX}{pool}")
+            pipe.zcard(f"{DELAYED_PREFIX}{pool}")
+        pipe.zcard(RUNNING_KEY)
+        pipe.zcard(DEAD_KEY)
+        counts = await pipe.execute()
+        depths = {
+            pool: {"ready": counts[2 * position], "delayed": counts[2 * position + 1]}
+            for position, pool in enumerate(pools)
+        }
+        depths["all"] = {"running": counts[-2], "dead": counts[-1]}
+        return depths
+
+class MemoryJobBackend:
+    """Single-process queue with the Redis backend's semantics; jobs are lost on restart."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._ready: Dict[str, List[Tuple[int, float, int, str]]] = {}
+        self._delayed: Dict[str, List[Tuple[float, int, str]]] = {}
+        self._running: Dict[str, float] = {}
+        self._dead: List[str] = []
+        self._idempotency: Dict[str, str] = {}
+        self._sequence = itertools.count()
+
+    def _push(self, job: Dict[str, Any], now: Optional[float] = None) -> None:
+        if job["run_at"] > time.time():
+            heapq.heappush(self._delayed.setdefault(job["pool"], []), (job["run_at"], next(self._sequence), job["id"]))
+            return
+        entry = (job["priority"], now or job["created_at"], next(self._sequence), job["id"])
+        heapq.heappush(self._ready.setdefault(job["pool"], []), entry)
+
+    async def enqueue(self, job: Dict[str, Any]) -> Tuple[str, bool]:
+        key = job["idempotency_key"]
+        if key:
+            existing = self._idempotency.get(key)
+            if existing in self.jobs:
+                return existing, False
+            self._idempotency[key] = job["id"]
+        self.jobs[job["id"]] = job
+        self._push(job)
+        return job["id"], True
+
+    async def claim(self, pool: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        delayed = self._delayed.get(pool, [])
+        while delayed and delayed[0][0] <= now:
+            _, _, job_id = heapq.heappop(delayed)
+            job = self.jobs[job_id]
+            job["status"] = QUEUED
+            self._push(job, now)
+
+        ready = self._ready.get(pool)
+        if not ready:
+            return None
+        job = self.jobs[heapq.heappop(ready)[-1]]
+        job["attempts"] += 1
+        job["status"] = RUNNING
+        job["updated_at"] = now
+        self._running[job["id"]] = now + lease_seconds
+        return dict(job)
+
+    async def complete(self, job: Dict[str, Any], result: Any) -> None:
+        self._running.pop(job["id"], None)
+        self.jobs[job["id"]].update(status=SUCCEEDED, result=result, error=None, updated_at=time.time())
+
+    async def retry(self, job: Dict[str, Any], error: str, run_at: float) -> None:
+        self._running.pop(job["id"], None)
+        stored = self.jobs[job["id"]]
+        stored.update(status=RETRYING, error=error, run_at=run_at, updated_at=time.time())
+        heapq.heappush(self._delayed.setdefault(job["pool"], []), (run_at, next(self._sequence), job["id"]))
+
+    async def release(self, job: Dict[str, Any]) -> None:
+        self._running.pop(job["id"], None)
+        stored = self.jobs[job["id"]]
+        stored.update(status=QUEUED, attempts=stored["attempts"] - 1, updated_at=time.time())
+        self._push(stored)
+
+    async def dead_letter(self, job: Dict[str, Any], error: str) -> None:
+        self._running.pop(job["id"], None)
+        self.jobs[job["id"]].update(status=DEAD, error=error, updated_at=time.time())
+        self._dead.append(job["id"])
+
+    async def requeue_expired(self) -> int:
+        now = time.time()
+        expired = [job_id for job_id, deadline in self._running.items() if deadline <= now]
+        for job_id in expired:
+            job = self.jobs[job_id]
+            if job["attempts"] >= job["max_attempts"]:
+                await self.dead_letter(job, "worker lease expired")
+            else:
+                self._running.pop(job_id)
+                job.update(status=QUEUED, updated_at=now)
+                self._push(job, now)
+        return len(expired)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def dead_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        return [dict(self.jobs[job_id]) for job_id in reversed(self._dead[-limit:])]
+
+    async def requeue_dead(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job["status"] != DEAD:
+            return False
+        self._dead.remove(job_id)
+        job.update(status=QUEUED, attempts=0, run_at=time.time(), updated_at=time.time())
+        self._push(job, time.time())
+        return True
+
+    async def depths(self, pools: List[str]) -> Dict[str, Dict[str, int]]:
+        depths = {
+            pool: {"ready": len(self._ready.get(pool, [])), "delayed": len(self._delayed.get(pool, []))}
+            for pool in pools
+        }
+        depths["all"] = {"running": len(self._running), "dead": len(self._dead)}
+        return depths
@@ -0,0 +1,169 @@
+"""
+Job status push channel.
+
+When a job succeeds, is scheduled for a retry or is dead-lettered the
+queue publishes an event on one Redis channel. Each API process keeps a
+single subscription to it and fans events out to the local WebSocket,
+SSE and long-poll subscribers of the job's owner, so clients no longer
+poll resumes and interviews for results. Without Redis, events are
+delivered within the publishing process only.
+"""
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from app import models
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "jobs:events"
+
+# Job fields returned to clients
+PUBLIC_FIELDS = (
+    "id", "type", "status", "priority", "attempts", "max_attempts",
+    "error", "result", "created_at", "updated_at", "run_at"
+)
+
+# Statuses after which a job does not change again on its own
+FINAL_STATUSES = ("succeeded", "dead")
+
+def public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: job.get(field) for field in PUBLIC_FIELDS}
+
+class JobEvents:
+    """Publishes job status changes and delivers them to this process's subscribers."""
+
+    def __init__(self, subscriber_buffer: int = 100):
+        self.subscriber_buffer = subscriber_buffer
+        # user_id -> queues of connected clients
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._redis_client = None
+        self._listener_task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    async def publish(self, job: Dict[str, Any]) -> None:
+        """Announce a job's current status to its owner."""
+        if not job.get("user_id"):
+            return
+        event = {"user_id": job["user_id"], "job": public_job(job)}
+        self.published += 1
+
+        client = models.redis_client
+        if client is not None:
+            try:
+                await client.publish(EVENTS_CHANNEL, json.dumps(event, default=str))
+                if self._listener_task is not None:
+                    # Our own listener delivers it locally
+                    return
+            except Exception as e:
+                logger.warning(f"Failed to publish job event for {job['id']}: {e}")
+        self._deliver(event)
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        for queue in self._subscribers.get(event["user_id"], ()):
+            if queue.full():
+                # A slow client loses its oldest event rather than stalling everyone
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event["job"])
+            self.delivered += 1
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Receive a user's job events for the duration of the block."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_buffer)
+        subscribers = self._subscribers.setdefault(str(user_id), set())
+        subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers.discard(queue)
+            if not subscribers:
+                self._subscribers.pop(str(user_id), None)
+
+    async def wait(self, job_id: str, user_id: str, load, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Long-poll: return the job once it reaches a final status, or its
+        current state after timeout seconds. load reads the stored job.
+        """
+        async with self.subscribe(user_id) as events:
+            # Subscribed before reading, so a completion in between is not missed
+            job = await load(job_id)
+            if job is None or job["status"] in FINAL_STATUSES:
+                return job
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return job
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return job
+                if event["id"] == job_id:
+                    job.update(event)
+                    if job["status"] in FINAL_STATUSES:
+                        return job
+
+    async def start(self, redis_client) -> None:
+        """Subscribe to job events published by any process."""
+        if redis_client is None or self._listener_task is not None:
+            return
+
+        self._redis_client = redis_client
+        self._listener_task = asyncio.create_task(self._listen())
+        logger.info("Job event listener started")
+
+    async def stop(self) -> None:
+        """Cancel the event listener."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        self._redis_client = None
+
+    async def _listen(self) -> None:
+        """Deliver events received over Redis pub/sub."""
+        while True:
+            pubsub = self._redis_client.pubsub()
+            try:
+                await pubsub.subscribe(EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        self._deliver(json.loads(message["data"]))
+                    except (ValueError, KeyError) as e:
+                        logger.warning(f"Ignoring malformed job event: {e}")
+            except asyncio.CancelledError:
+                await pubsub.close()
+                raise
+            except Exception as e:
+                logger.error(f"Job event listener error: {e}")
+                await pubsub.close()
+                await asyncio.sleep(1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get push channel statistics."""
+        return {
+            "listening": self._listener_task is not None,
+            "subscribed_users": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+# Global job events instance
+job_events = JobEvents(subscriber_buffer=settings.JOB_EVENTS_SUBSCRIBER_BUFFER)
@@ -0,0 +1,294 @@
+"""
+Durable, prioritized background jobs.
+
+Work that used to run as in-process BackgroundTasks is enqueued here
+instead. Each job type is registered with a handler and belongs to a
+worker pool; a pool's workers take the highest-priority job first, so a
+live candidate's answer evaluation runs ahead of bulk resume parsing.
+Failed jobs are retried with exponential backoff and dead-lettered once
+out of attempts, and an idempotency key makes enqueueing the same work
+twice return the first job. With Redis the queue survives restarts and
+pools can run in separate worker processes (python -m app.jobs.worker);
+without it an in-memory backend keeps the same behavior in one process.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Set, Union
+
+from app import models
+from app.config import settings
+from app.jobs.backends import DEAD, RETRYING, SUCCEEDED, MemoryJobBackend, RedisJobBackend, new_job
+from app.jobs.events import job_events
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+# Extra time a worker holds a job beyond its timeout before other workers may recover it
+LEASE_GRACE_SECONDS = 30
+
+class UnknownJobTypeError(Exception):
+    """Raised when enqueueing a job type no handler is registered for."""
+
+class JobSpec(NamedTuple):
+    """How a job type runs."""
+    handler: Callable[..., Awaitable[Any]]
+    pool: str
+    max_attempts: int
+    timeout_seconds: float
+
+class JobQueue:
+    """Registry of job handlers, enqueueing API and per-pool worker tasks."""
+
+    def __init__(
+        self,
+        pool_concurrency: Optional[Dict[str, int]] = None,
+        retry_base_seconds: float = 2.0,
+        retry_max_seconds: float = 300.0,
+        poll_interval_seconds: float = 0.5,
+        shutdown_grace_seconds: float = 10.0,
+        result_ttl_seconds: int = 86400
+    ):
+        self.pool_concurrency = pool_concurrency or {}
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.shutdown_grace_seconds = shutdown_grace_seconds
+        self.result_ttl_seconds = result_ttl_seconds
+
+        self.specs: Dict[str, JobSpec] = {}
+        self.backend: Union[MemoryJobBackend, RedisJobBackend] = MemoryJobBackend()
+        self._workers: List[asyncio.Task] = []
+        self._reaper: Optional[asyncio.Task] = None
+        self._running: Dict[asyncio.Task, Dict[str, Any]] = {}
+        self._wakeup: Dict[str, asyncio.Event] = {}
+        self._stopping = False
+        self.pools: Set[str] = set()
+
+        # Counters per job type
+        self.enqueued: Counter = Counter()
+        self.duplicates: Counter = Counter()
+        self.succeeded: Counter = Counter()
+        self.retried: Counter = Counter()
+        self.dead: Counter = Counter()
+
+    @property
+    def running(self) -> bool:
+        """Whether this process runs workers."""
+        return bool(self._workers)
+
+    def register(
+        self,
+        job_type: str,
+        handler: Callable[..., Awaitable[Any]],
+        pool: str = "default",
+        max_attempts: int = 3,
+        timeout_seconds: float = 300
+    ) -> None:
+        """Register the coroutine function that runs job_type; it is called with the job payload as kwargs."""
+        self.specs[job_type] = JobSpec(handler, pool, max_attempts, timeout_seconds)
+
+    async def enqueue(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        priority: int = PRIORITY_NORMAL,
+        idempotency_key: Optional[str] = None,
+        user_id: Optional[str] = None,
+        delay_seconds: float = 0
+    ) -> str:
+        """Queue a job and return its id (the existing job's id for a repeated idempotency key)."""
+        spec = self.specs.get(job_type)
+        if spec is None:
+            raise UnknownJobTypeError(f"No handler registered for job type {job_type}")
+
+        job = new_job(
+            job_type, spec.pool, payload, priority, spec.max_attempts,
+            idempotency_key=f"{job_type}:{idempotency_key}" if idempotency_key else None,
+            user_id=str(user_id) if user_id is not None else None,
+            run_at=time.time() + delay_seconds if delay_seconds else None
+        )
+        job_id, created = await self.backend.enqueue(job)
+        if created:
+            self.enqueued[job_type] += 1
+            wakeup = self._wakeup.get(spec.pool)
+            if wakeup is not None:
+                wakeup.set()
+        else:
+            self.duplicates[job_type] += 1
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job's status record."""
+        return await self.backend.get(job_id)
+
+    async def dead_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recently dead-lettered jobs."""
+        return await self.backend.dead_jobs(limit)
+
+    async def requeue_dead(self, job_id: str) -> bool:
+        """Retry a dead-lettered job from scratch."""
+        requeued = await self.backend.requeue_dead(job_id)
+        if requeued:
+            job = await self.backend.get(job_id)
+            wakeup = self._wakeup.get(job["pool"]) if job else None
+            if wakeup is not None:
+                wakeup.set()
+        return requeued
+
+    def start(self, pools: Optional[List[str]] = None) -> None:
+        """
+        Start workers for the given pools (every registered pool by default),
+        on Redis when it is available.
+        """
+        if self._workers:
+            return
+        client = models.redis_client
+        if client is not None:
+            if not isinstance(self.backend, RedisJobBackend):
+                self.backend = RedisJobBackend(client, result_ttl_seconds=self.result_ttl_seconds)
+        else:
+            logger.warning("Redis unavailable, jobs are queued in memory and lost on restart")
+
+        self._stopping = False
+        self.pools = set(pools if pools is not None else {spec.pool for spec in self.specs.values()})
+        for pool in sorted(self.pools):
+            self._wakeup[pool] = asyncio.Event()
+            for _ in range(self.pool_concurrency.get(pool, 1)):
+                self._workers.append(asyncio.create_task(self._work(pool)))
+        if self._workers:
+            self._reaper = asyncio.create_task(self._reap())
+        logger.info(f"Job workers started for pools {sorted(self.pools)} on {self.backend.name} backend")
+
+    async def stop(self) -> None:
+        """
+        Stop taking jobs and give running ones shutdown_grace_seconds to
+        finish; the rest go back to their queue.
+        """
+        self._stopping = True
+        for wakeup in self._wakeup.values():
+            wakeup.set()
+        if self._running:
+            await asyncio.wait(list(self._running), timeout=self.shutdown_grace_seconds)
+
+        # Jobs still running are cancelled and put back in their queue
+        tasks = self._workers + list(self._running) + ([self._reaper] if self._reaper else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._workers, self._reaper, self._running, self._wakeup = [], None, {}, {}
+
+    async def _work(self, pool: str) -> None:
+        wakeup = self._wakeup[pool]
+        while not self._stopping:
+            try:
+                job = await self.backend.claim(pool, self._lease(pool))
+            except Exception as e:
+                logger.error(f"Job claim from pool {pool} failed: {e}")
+                job = None
+
+            if job is None:
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Run in its own task so stop() can wait for it without waiting for the claim loop
+            task = asyncio.create_task(self._execute(job))
+            self._running[task] = job
+            try:
+                await asyncio.shield(task)
+            finally:
+                self._running.pop(task, None)
+
+    def _lease(self, pool: str) -> float:
+        timeouts = [spec.timeout_seconds for spec in self.specs.values() if spec.pool == pool]
+        return max(timeouts, default=300) + LEASE_GRACE_SECONDS
+
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        spec = self.specs.get(job["type"])
+        if spec is None:
+            await self.backend.dead_letter(job, f"No handler registered for job type {job['type']}")
+            self.dead[job["type"]] += 1
+            return
+
+        try:
+            result = await asyncio.wait_for(spec.handler(**(job["payload"] or {})), timeout=spec.timeout_seconds)
+        except asyncio.CancelledError:
+            try:
+                await self.backend.release(job)
+            except Exception as e:
+                logger.error(f"Failed to release interrupted job {job['id']}: {e}")
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            if job["attempts"] >= job["max_attempts"]:
+                logger.error(f"Job {job['id']} ({job['type']}) failed {job['attempts']} times, dead-lettering: {error}")
+                await self.backend.dead_letter(job, error)
+                self.dead[job["type"]] += 1
+                await job_events.publish({**job, "status": DEAD, "error": error, "updated_at": time.time()})
+            else:
+                delay = self.backoff(job["attempts"])
+                logger.warning(f"Job {job['id']} ({job['type']}) failed, retrying in {delay:.1f}s: {error}")
+                run_at = time.time() + delay
+                await self.backend.retry(job, error, run_at)
+                self.retried[job["type"]] += 1
+                await job_events.publish({**job, "status": RETRYING, "error": error, "run_at": run_at, "updated_at": time.time()})
+            return
+
+        await self.backend.complete(job, result)
+        self.succeeded[job["type"]] += 1
+        await job_events.publish({**job, "status": SUCCEEDED, "result": result, "error": None, "updated_at": time.time()})
+
+    def backoff(self, attempts: int) -> float:
+        """Exponential backoff with jitter, so failing jobs do not retry in lockstep."""
+        delay = min(self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _reap(self) -> None:
+        while True:
+            await asyncio.sleep(LEASE_GRACE_SECONDS)
+            try:
+                recovered = await self.backend.requeue_expired()
+                if recovered:
+                    logger.warning(f"Recovered {recovered} jobs from workers that stopped")
+            except Exception as e:
+                logger.error(f"Job lease recovery failed: {e}")
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get queue depths and per-type counters."""
+        pools = sorted({spec.pool for spec in self.specs.values()})
+        try:
+            depths = await self.backend.depths(pools)
+        except Exception as e:
+            logger.warning(f"Job queue depth read failed: {e}")
+            depths = {}
+        return {
+            "backend": self.backend.name,
+            "worker_pools": sorted(self.pools) if self.running else [],
+            "in_flight": len(self._running),
+            "depths": depths,
+            "enqueued": dict(self.enqueued),
+            "duplicates": dict(self.duplicates),
+            "succeeded": dict(self.succeeded),
+            "retried": dict(self.retried),
+            "dead": dict(self.dead)
+        }
+
+# Global job queue instance
+job_queue = JobQueue(
+    pool_concurrency=settings.JOB_POOL_CONCURRENCY,
+    retry_base_seconds=settings.JOB_RETRY_BASE_SECONDS,
+    retry_max_seconds=settings.JOB_RETRY_MAX_SECONDS,
+    poll_interval_seconds=settings.JOB_POLL_INTERVAL_SECONDS,
+    shutdown_grace_seconds=settings.JOB_SHUTDOWN_GRACE_SECONDS,
+    result_ttl_seconds=settings.JOB_RESULT_TTL_HOURS * 3600
+)
@@ -0,0 +1,106 @@
+"""
+Background job status, push and dead-letter routes.
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.auth.dependencies import check_permissions, get_current_user
+from app.config import settings
+from app.jobs.events import job_events, public_job
+from app.jobs.queue import job_queue
+from app.models.user import User, UserRole
+from app.utils.streaming import SSE_HEADERS, SSE_MEDIA_TYPE, sse_event
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("")
+async def get_job_stats(current_user: User = Depends(check_permissions(["configure_system"]))):
+    """
+    Queue depths and per-type job counters.
+    """
+    return await job_queue.get_stats()
+
+@router.get("/dead")
+async def list_dead_jobs(
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(check_permissions(["configure_system"]))
+):
+    """
+    Most recently dead-lettered jobs.
+    """
+    return {"jobs": [public_job(job) for job in await job_queue.dead_jobs(limit)]}
+
+@router.post("/dead/{job_id}/retry")
+async def retry_dead_job(
+    job_id: str,
+    current_user: User = Depends(check_permissions(["configure_system"]))
+):
+    """
+    Queue a dead-lettered job again with a fresh set of attempts.
+    """
+    if not await job_queue.requeue_dead(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dead-lettered job not found"
+        )
+    logger.info(f"Dead-lettered job {job_id} requeued by {current_user.email}")
+    return {"message": "Job requeued", "job_id": job_id}
+
+@router.get("/events")
+async def stream_job_events(current_user: User = Depends(get_current_user)):
+    """
+    Server-Sent Events stream of the current user's job status changes.
+    """
+    async def events() -> AsyncIterator[str]:
+        async with job_events.subscribe(current_user.id) as queue:
+            yield sse_event({"subscribed": True}, event="ready")
+            while True:
+                try:
+                    job = await asyncio.wait_for(queue.get(), timeout=settings.JOB_EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle stream
+                    yield ": heartbeat\n\n"
+                    continue
+                yield sse_event(job, event="job")
+
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+def owned_job(job: Optional[Dict[str, Any]], current_user: User) -> Dict[str, Any]:
+    """The job if the user may see it, 404 otherwise."""
+    if job is None or (job.get("user_id") != str(current_user.id) and current_user.role != UserRole.ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@router.get("/{job_id}")
+async def get_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Status of a job started by the current user.
+    """
+    return public_job(owned_job(await job_queue.get(job_id), current_user))
+
+@router.get("/{job_id}/wait")
+async def wait_for_job(
+    job_id: str,
+    timeout: int = Query(25, ge=0, le=settings.JOB_WAIT_MAX_SECONDS),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Long-poll fallback for clients without WebSocket or SSE: returns as
+    soon as the job succeeds or is dead-lettered, or its current status
+    after timeout seconds.
+    """
+    owner_id = owned_job(await job_queue.get(job_id), current_user)["user_id"]
+    job = await job_events.wait(job_id, owner_id, job_queue.get, timeout)
+    return public_job(owned_job(job, current_user))
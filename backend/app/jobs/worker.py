@@ -0,0 +1,65 @@
+"""
+Standalone job worker process.
+
+Runs the chosen pools' workers outside the API process, so background
+work does not compete with request handling. Needs Redis: the in-memory
+backend cannot be shared between processes. Set JOB_WORKER_POOLS=[] on
+the API processes when every pool runs in dedicated workers.
+
+Usage:
+    python -m app.jobs.worker --pool resume
+    python -m app.jobs.worker --pool evaluation --pool feedback --concurrency 16
+"""
+import argparse
+import asyncio
+import importlib
+import logging
+import signal
+
+from app import models
+from app.ai.metrics import ai_metrics
+from app.ai.service import ai_service
+from app.jobs.queue import job_queue
+from app.utils.database import db_manager
+
+logger = logging.getLogger(__name__)
+
+# Modules that register job handlers when imported
+HANDLER_MODULES = ("app.interviews.routes", "app.resume.routes")
+
+async def main(args) -> None:
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+
+    await db_manager.connect()
+    if db_manager.redis_client is None:
+        raise SystemExit("Job workers need Redis")
+    models.init_database(db_manager.db_client)
+    models.init_redis(db_manager.redis_client)
+
+    # Share AI token, cost and latency counters with the API processes
+    ai_metrics.start()
+
+    if args.concurrency:
+        for pool in args.pool or []:
+            job_queue.pool_concurrency[pool] = args.concurrency
+    job_queue.start(args.pool)
+
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopped.set)
+    await stopped.wait()
+
+    logger.info("Stopping job workers...")
+    await job_queue.stop()
+    await ai_metrics.stop()
+    await db_manager.disconnect()
+    await ai_service.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pool", action="append", help="pool to work on (repeatable); all pools if omitted")
+    parser.add_argument("--concurrency", type=int, help="workers per pool, overriding JOB_POOL_CONCURRENCY")
+    asyncio.run(main(parser.parse_args()))
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 import logging
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, WebSocket
+from fastapi import APIRouter, Depends, Query, HTTPException, status, BackgroundTasks, WebSocket, Response
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.models.live_interview import (
@@ -18,6 +18,7 @@ from app.models.user import User, UserRole
 from app.models import get_database, get_redis
 from app.auth.dependencies import get_current_user, check_permissions
 from app.websocket.routes import manager
+from app.utils.pagination import paginate, set_next_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -89,16 +90,19 @@ async def create_live_interview(
 
 @router.get("/", response_model=List[LiveInterviewResponse])
 async def list_live_interviews(
+    response: Response,
     status_filter: Optional[LiveInterviewStatus] = None,
     type_filter: Optional[LiveInterviewType] = None,
     upcoming_only: bool = False,
     skip: int = 0,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """
     List live interviews for the current user.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
     # Build query based on user role
     query = {}
@@ -120,8 +124,10 @@ async def list_live_interviews(
         query["scheduled_at"] = {"$gte": datetime.utcnow()}
 
     # Get interviews
-    cursor = db.live_interviews.find(query).sort("scheduled_at", -1).skip(skip).limit(limit)
-    interviews_docs = await cursor.to_list(length=None)
+    interviews_docs, next_cursor = await paginate(
+        db.live_interviews, query, "scheduled_at", limit, cursor=cursor, skip=skip
+    )
+    set_next_cursor(response, next_cursor)
 
     interviews = [LiveInterviewSession(**doc) for doc in interviews_docs]
 
@@ -20,7 +20,19 @@ from app.admin.routes import router as admin_router
 from app.ai.routes import router as ai_router
 from app.feedback.routes import router as feedback_router
 from app.websocket.routes import router as websocket_router
+from app.jobs.routes import router as jobs_router
 from app.utils.database import init_database, db_manager
+from app.auth.cache import user_cache
+from app.auth.hashing import password_hasher
+from app.auth.lockout import last_login_recorder
+from app.auth.revocation import token_revocations
+from app.ai.service import ai_service
+from app.ai.batching import evaluation_batcher
+from app.ai.question_cache import question_cache
+from app.ai.conversations import conversation_store
+from app.ai.metrics import ai_metrics
+from app.jobs.queue import job_queue
+from app.jobs.events import job_events
 from app.middleware.security import (
     SecurityHeadersMiddleware,
     RequestLoggingMiddleware,
@@ -78,9 +90,33 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             db_client = db_manager.db_client
             redis_client = db_manager.redis_client
 
-            # Initialize the global database client for dependency injection
-            from app.models import init_database as init_db_client
+            # Initialize the global database clients for dependency injection
+            from app.models import init_database as init_db_client, init_redis
             init_db_client(db_client)
+            if redis_client is not None:
+                init_redis(redis_client)
+
+            # Keep per-worker user caches coherent across workers
+            await user_cache.start_listener(redis_client)
+            await token_revocations.start(redis_client)
+
+            # Flush buffered last_login timestamps in the background
+            last_login_recorder.start(db_client[settings.MONGODB_DATABASE])
+
+            # Evaluate submitted answers in micro-batches
+            evaluation_batcher.start(db_client[settings.MONGODB_DATABASE])
+
+            # Keep popular AI question sets generated ahead of demand
+            question_cache.start()
+
+            # Share AI token, cost and latency counters across workers
+            ai_metrics.start()
+
+            # Run queued background jobs (JOB_WORKER_POOLS=[] leaves them to app.jobs.worker)
+            job_queue.start(settings.JOB_WORKER_POOLS)
+
+            # Push job status changes to connected clients instead of them polling
+            await job_events.start(redis_client)
 
             logger.info("Database initialized with default data")
 
@@ -97,7 +133,18 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Shutdown
     logger.info("Shutting down CandidateX backend...")
     if not is_testing:
+        await user_cache.stop_listener()
+        await token_revocations.stop()
+        await question_cache.stop()
+        await conversation_store.stop()
+        await job_queue.stop()
+        await job_events.stop()
+        await evaluation_batcher.stop()
+        await ai_metrics.stop()
+        await last_login_recorder.stop()
         await db_manager.disconnect()
+    await ai_service.close()
+    password_hasher.shutdown()
 
 # Create FastAPI application
 app = FastAPI(
@@ -194,6 +241,12 @@ app.include_router(
     tags=["WebSocket"]
 )
 
+app.include_router(
+    jobs_router,
+    prefix="/api/v1/jobs",
+    tags=["Jobs"]
+)
+
 # Health check endpoint
 @app.get("/health", tags=["Health"])
 async def health_check():
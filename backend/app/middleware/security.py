@@ -246,6 +246,7 @@ def create_cors_middleware() -> dict:
             "Authorization",
             "X-Requested-With",
         ],
+        "expose_headers": ["X-Next-Cursor"],
         "max_age": 86400,  # 24 hours
     }
 
@@ -284,7 +285,8 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
 
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None)
     )
 
 async def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
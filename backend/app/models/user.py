@@ -143,6 +143,8 @@ class TokenData(BaseModel):
     email: str
     role: UserRole
     exp: Optional[datetime] = None
+    jti: Optional[str] = None
+    iat: Optional[float] = None
 
 class Token(BaseModel):
     """JWT token response model."""
@@ -0,0 +1,142 @@
+"""
+Content-addressed resume storage.
+
+Resume bytes are stored once per SHA-256 in resume_blobs, with a
+reference count of the resumes pointing at them; a file is deleted only
+when its last resume goes. Analyses are stored in resume_analyses keyed
+by content hash and ANALYZER_VERSION, so a re-uploaded CV gets its
+analysis without being downloaded or parsed again.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.utils.cloud_storage import cloud_storage
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever resume analysis output changes; older analyses are then recomputed
+ANALYZER_VERSION = 1
+
+def analysis_key(sha256: str) -> str:
+    return f"{sha256}:{ANALYZER_VERSION}"
+
+class ResumeBlobStore:
+    """Reference-counted resume files and their cached analyses."""
+
+    def __init__(self):
+        # Counters
+        self.stored = 0
+        self.deduplicated = 0
+        self.deleted = 0
+        self.analysis_hits = 0
+        self.analysis_misses = 0
+
+    async def acquire(
+        self,
+        db,
+        sha256: str,
+        storage_info: Dict[str, Any],
+        size: int,
+        content_type: str
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Reference the blob for sha256, registering the just-uploaded copy
+        if it is new and deleting that copy otherwise. Returns the blob's
+        storage info and whether it was created.
+        """
+        now = datetime.utcnow()
+        for attempt in range(2):
+            try:
+                result = await db.resume_blobs.update_one(
+                    {"_id": sha256},
+                    {
+                        "$inc": {"refcount": 1},
+                        "$set": {"updated_at": now},
+                        "$setOnInsert": {
+                            "storage_info": storage_info,
+                            "size": size,
+                            "content_type": content_type,
+                            "created_at": now
+                        }
+                    },
+                    upsert=True
+                )
+                break
+            except DuplicateKeyError:
+                # A concurrent upload of the same bytes inserted it first; now it is an update
+                if attempt:
+                    raise
+
+        if result.upserted_id is not None:
+            self.stored += 1
+            return storage_info, True
+
+        # Same bytes are already stored; the reference we hold keeps them from being deleted
+        await cloud_storage.delete_file(storage_info["file_path"])
+        blob = await db.resume_blobs.find_one({"_id": sha256})
+        self.deduplicated += 1
+        return blob["storage_info"], False
+
+    async def release(self, db, sha256: str) -> bool:
+        """Drop one reference; returns True if that removed the file."""
+        blob = await db.resume_blobs.find_one_and_update(
+            {"_id": sha256},
+            {"$inc": {"refcount": -1}, "$set": {"updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
+        if blob is None or blob["refcount"] > 0:
+            return False
+
+        # Deleted only if no upload took a new reference in the meantime
+        blob = await db.resume_blobs.find_one_and_delete({"_id": sha256, "refcount": {"$lte": 0}})
+        if blob is None:
+            return False
+        await cloud_storage.delete_file(blob["storage_info"]["file_path"])
+        await db.resume_analyses.delete_many({"sha256": sha256})
+        self.deleted += 1
+        logger.info(f"Deleted resume blob {sha256[:12]} after its last reference")
+        return True
+
+    async def get_analysis(self, db, sha256: str) -> Optional[Dict[str, Any]]:
+        """Cached analysis of this content by the current analyzer."""
+        doc = await db.resume_analyses.find_one({"_id": analysis_key(sha256)})
+        if doc is None:
+            self.analysis_misses += 1
+            return None
+        self.analysis_hits += 1
+        return doc["analysis"]
+
+    async def save_analysis(self, db, sha256: str, analysis: Dict[str, Any]) -> None:
+        """Store the analysis of this content for later duplicates."""
+        await db.resume_analyses.update_one(
+            {"_id": analysis_key(sha256)},
+            {
+                "$set": {
+                    "sha256": sha256,
+                    "analyzer_version": ANALYZER_VERSION,
+                    "analysis": analysis,
+                    "created_at": datetime.utcnow()
+                }
+            },
+            upsert=True
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get deduplication statistics."""
+        lookups = self.analysis_hits + self.analysis_misses
+        return {
+            "analyzer_version": ANALYZER_VERSION,
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "deleted": self.deleted,
+            "analysis_hits": self.analysis_hits,
+            "analysis_misses": self.analysis_misses,
+            "analysis_hit_rate": round(self.analysis_hits / lookups, 4) if lookups else 0.0
+        }
+
+# Global resume blob store instance
+resume_blobs = ResumeBlobStore()
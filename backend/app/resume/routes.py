@@ -4,11 +4,10 @@ Resume processing routes for upload, parsing, and ATS analysis.
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 import logging
-import os
 from pathlib import Path
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, Query, HTTPException, status, UploadFile, File, Form
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pydantic import BaseModel
 
@@ -17,6 +16,11 @@ from app.models import get_database
 from app.auth.dependencies import get_current_user
 from app.config import settings
 from app.utils.cloud_storage import cloud_storage
+from app.utils.pagination import paginate
+from app.utils.counts import count_service
+from app.utils.uploads import DOC, DOCX, PDF, TEXT, UploadContentError, UploadStream, UploadTooLargeError
+from app.jobs.queue import PRIORITY_LOW, job_queue
+from app.resume.blobs import resume_blobs
 
 # Resume processing service would be imported here
 # from app.services.resume_processor import process_resume_file
@@ -25,6 +29,14 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Content type each accepted extension must actually contain
+RESUME_CONTENT_TYPES = {
+    ".pdf": PDF,
+    ".docx": DOCX,
+    ".doc": DOC,
+    ".txt": TEXT
+}
+
 class ResumeUploadResponse(BaseModel):
     """Resume upload response model."""
     resume_id: str
@@ -33,6 +45,8 @@ class ResumeUploadResponse(BaseModel):
     content_type: str
     upload_status: str
     message: str
+    processing_status: str = "pending"
+    job_id: Optional[str] = None
 
 class ResumeAnalysisResponse(BaseModel):
     """Resume analysis response model."""
@@ -65,7 +79,6 @@ class ResumeComparisonResponse(BaseModel):
 
 @router.post("/upload", response_model=ResumeUploadResponse)
 async def upload_resume(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database)
@@ -74,39 +87,34 @@ async def upload_resume(
     Upload and process a resume file.
     """
     # Validate file type
-    allowed_extensions = [".pdf", ".docx", ".doc", ".txt"]
     file_extension = Path(file.filename).suffix.lower()
 
-    if file_extension not in allowed_extensions:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type not supported. Allowed types: {', '.join(allowed_extensions)}"
-        )
-
-    # Validate file size (10MB limit)
-    file_content = await file.read()
-    file_size = len(file_content)
-
-    if file_size > settings.MAX_UPLOAD_SIZE:
+    if file_extension not in RESUME_CONTENT_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE} bytes"
+            detail=f"File type not supported. Allowed types: {', '.join(RESUME_CONTENT_TYPES)}"
         )
 
     # Generate unique resume ID
     resume_id = str(uuid.uuid4())
 
-    # Upload file to cloud storage
-    from io import BytesIO
-    file_stream = BytesIO(file_content)
+    # Stream the file to cloud storage chunk by chunk, enforcing the size
+    # limit (10MB) and checking the real content type as it arrives
+    upload = UploadStream(file, settings.MAX_UPLOAD_SIZE, expected_type=RESUME_CONTENT_TYPES[file_extension])
 
     try:
-        upload_result = await cloud_storage.upload_file(
-            file_stream,
-            file.filename,
-            file.content_type,
+        await upload.start()
+        upload_result = await cloud_storage.upload_stream(
+            upload.chunks(),
+            f"{resume_id}{file_extension}",
+            upload.content_type,
             folder="resumes"
         )
+    except (UploadTooLargeError, UploadContentError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Failed to upload resume to cloud storage: {e}")
         raise HTTPException(
@@ -114,49 +122,87 @@ async def upload_resume(
             detail="Failed to upload resume file"
         )
 
+    # Keep one stored copy per content hash; a re-uploaded CV reuses its analysis
+    storage_info, _ = await resume_blobs.acquire(
+        db, upload.sha256, upload_result, upload.size, upload.content_type
+    )
+    analysis = await resume_blobs.get_analysis(db, upload.sha256)
+
     # Store resume metadata in database
     resume_doc = {
         "id": resume_id,
         "user_id": current_user.id,
         "filename": file.filename,
-        "storage_info": upload_result,
-        "file_size": file_size,
-        "content_type": file.content_type,
+        "storage_info": storage_info,
+        "file_size": upload.size,
+        "sha256": upload.sha256,
+        "content_type": upload.content_type,
         "file_extension": file_extension,
         "upload_status": "uploaded",
-        "processing_status": "pending",
+        "processing_status": "completed" if analysis else "pending",
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow()
     }
+    if analysis:
+        resume_doc["analysis"] = analysis
 
-    await db.resumes.insert_one(resume_doc)
-
-    # Start background processing
-    background_tasks.add_task(process_resume_background, resume_id)
+    try:
+        await db.resumes.insert_one(resume_doc)
+    except Exception:
+        await resume_blobs.release(db, upload.sha256)
+        raise
+    await count_service.adjust(count_service.counter_key("resumes", "user_id", current_user.id), 1)
+
+    logger.info(f"Resume uploaded: {resume_id} for user {current_user.email} (analysis reused: {bool(analysis)})")
+
+    if analysis:
+        return ResumeUploadResponse(
+            resume_id=resume_id,
+            filename=file.filename,
+            file_size=upload.size,
+            content_type=upload.content_type,
+            upload_status="uploaded",
+            message="Resume uploaded successfully. Analysis is ready.",
+            processing_status="completed"
+        )
 
-    logger.info(f"Resume uploaded: {resume_id} for user {current_user.email}")
+    # Queue background processing behind interactive work
+    job_id = await job_queue.enqueue(
+        "resume.process",
+        {"resume_id": resume_id},
+        priority=PRIORITY_LOW,
+        idempotency_key=resume_id,
+        user_id=current_user.id
+    )
 
     return ResumeUploadResponse(
         resume_id=resume_id,
         filename=file.filename,
-        file_size=file_size,
-        content_type=file.content_type,
+        file_size=upload.size,
+        content_type=upload.content_type,
         upload_status="uploaded",
-        message="Resume uploaded successfully. Processing will begin shortly."
+        message="Resume uploaded successfully. Processing will begin shortly.",
+        job_id=job_id
     )
 
 @router.get("/list")
 async def list_user_resumes(
     skip: int = 0,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """
     List user's uploaded resumes.
     """
-    cursor = db.resumes.find({"user_id": current_user.id}).sort("created_at", -1).skip(skip).limit(limit)
-    resumes = await cursor.to_list(length=None)
+    query = {"user_id": current_user.id}
+    resumes, next_cursor = await paginate(
+        db.resumes, query, "created_at", limit, cursor=cursor, skip=skip
+    )
+    total, total_exact = await count_service.count(
+        db.resumes, query, counter_key=count_service.counter_key("resumes", "user_id", current_user.id)
+    )
 
     # Format response
     resume_list = []
@@ -174,9 +220,11 @@ async def list_user_resumes(
 
     return {
         "resumes": resume_list,
-        "total": len(resume_list),  # In production, use count_documents
+        "total": total,
+        "total_exact": total_exact,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor
     }
 
 @router.get("/{resume_id}")
@@ -329,16 +377,16 @@ async def delete_resume(
             detail="Resume not found"
         )
 
-    # Delete file from storage
-    file_path = resume_doc.get("file_path")
-    if file_path and os.path.exists(file_path):
-        try:
-            os.remove(file_path)
-        except Exception as e:
-            logger.warning(f"Failed to delete resume file {file_path}: {e}")
-
     # Delete from database
-    await db.resumes.delete_one({"id": resume_id, "user_id": current_user.id})
+    result = await db.resumes.delete_one({"id": resume_id, "user_id": current_user.id})
+    if result.deleted_count:
+        await count_service.adjust(count_service.counter_key("resumes", "user_id", current_user.id), -1)
+
+        # Delete the file from storage once no other resume shares its content
+        if resume_doc.get("sha256"):
+            await resume_blobs.release(db, resume_doc["sha256"])
+        elif resume_doc.get("storage_info", {}).get("file_path"):
+            await cloud_storage.delete_file(resume_doc["storage_info"]["file_path"])
 
     # Delete related comparisons
     await db.resume_comparisons.delete_many({"resume_id": resume_id, "user_id": current_user.id})
@@ -434,16 +482,23 @@ async def process_resume_background(resume_id: str):
             {"$set": {"processing_status": "processing", "updated_at": datetime.utcnow()}}
         )
 
-        # Download file from cloud storage for processing
-        storage_info = resume_doc.get("storage_info", {})
-        file_path = storage_info.get("file_path", "")
-        file_content = await cloud_storage.download_file(file_path)
+        # An identical file may have been analyzed since this upload was queued
+        sha256 = resume_doc.get("sha256")
+        analysis_result = await resume_blobs.get_analysis(db, sha256) if sha256 else None
 
-        if file_content is None:
-            raise Exception("Failed to download resume file from storage")
+        if analysis_result is None:
+            # Download file from cloud storage for processing
+            storage_info = resume_doc.get("storage_info", {})
+            file_path = storage_info.get("file_path", "")
+            file_content = await cloud_storage.download_file(file_path)
 
-        # Process the resume file content
-        analysis_result = await process_resume_file_content(file_content, resume_doc)
+            if file_content is None:
+                raise Exception("Failed to download resume file from storage")
+
+            # Process the resume file content
+            analysis_result = await process_resume_file_content(file_content, resume_doc)
+            if sha256:
+                await resume_blobs.save_analysis(db, sha256, analysis_result)
 
         # Update resume with analysis results
         await db.resumes.update_one(
@@ -458,6 +513,7 @@ async def process_resume_background(resume_id: str):
         )
 
         logger.info(f"Resume processing completed: {resume_id}")
+        return {"resume_id": resume_id, "processing_status": "completed", "ats_score": analysis_result.get("ats_score")}
 
     except Exception as e:
         logger.error(f"Resume processing failed for {resume_id}: {e}")
@@ -473,6 +529,10 @@ async def process_resume_background(resume_id: str):
                 }
             }
         )
+        raise
+
+# Background job handlers
+job_queue.register("resume.process", process_resume_background, pool="resume", timeout_seconds=600)
 
 async def process_resume_file_content(file_content: bytes, resume_doc: Dict[str, Any]) -> Dict[str, Any]:
     """Process resume file and extract information."""
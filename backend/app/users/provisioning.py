@@ -0,0 +1,230 @@
+"""
+Bulk user provisioning from streamed NDJSON or CSV uploads.
+"""
+import csv
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from app.config import settings
+from app.models.user import UserCreate, UserStatus
+from app.auth.hashing import password_hasher
+from app.auth.utils import validate_password_strength
+from app.users.search import with_search_terms
+from app.utils.database import db_manager
+
+logger = logging.getLogger(__name__)
+
+# Supported upload formats
+CSV_FORMAT = "csv"
+NDJSON_FORMAT = "ndjson"
+
+# MongoDB duplicate key error code
+DUPLICATE_KEY_ERROR = 11000
+
+def detect_format(content_type: Optional[str]) -> str:
+    """Pick the upload format from the request content type."""
+    if content_type and "csv" in content_type.lower():
+        return CSV_FORMAT
+    return NDJSON_FORMAT
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without buffering the whole body."""
+    buffer = b""
+    first = True
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield _decode_line(line, first)
+            first = False
+    if buffer:
+        yield _decode_line(buffer, first)
+
+def _decode_line(line: bytes, first: bool) -> str:
+    text = line.decode("utf-8").rstrip("\r")
+    # Spreadsheet exports often start with a byte order mark
+    return text.lstrip("\ufeff") if first else text
+
+async def iter_records(
+    lines: AsyncIterator[str],
+    upload_format: str
+) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Yield (row_number, record, error) for each non-empty data row."""
+    header: Optional[List[str]] = None
+    row_number = 0
+
+    async for line in lines:
+        if not line.strip():
+            continue
+
+        if upload_format == CSV_FORMAT and header is None:
+            header = [column.strip().lower() for column in next(csv.reader([line]))]
+            continue
+
+        row_number += 1
+        try:
+            if upload_format == CSV_FORMAT:
+                values = next(csv.reader([line]))
+                record = {key: value.strip() for key, value in zip(header, values) if value.strip()}
+            else:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+        except (ValueError, csv.Error) as e:
+            yield row_number, None, f"Malformed row: {e}"
+            continue
+
+        yield row_number, record, None
+
+class BulkProvisioner:
+    """Creates users in batches: one $in lookup, parallel hashing and unordered inserts."""
+
+    def __init__(self, db, batch_size: Optional[int] = None, max_rows: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.BULK_PROVISION_BATCH_SIZE
+        self.max_rows = max_rows or settings.BULK_PROVISION_MAX_ROWS
+        self._seen_emails = set()
+        self.summary = {"total": 0, "created": 0, "failed": 0}
+
+    async def run(
+        self,
+        records: AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Process records and yield one result per row, then a summary."""
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+
+        async for row, record, error in records:
+            if row > self.max_rows:
+                self.summary["truncated"] = True
+                break
+
+            if error:
+                yield self._failed(row, None, error)
+                continue
+
+            batch.append((row, record))
+            if len(batch) >= self.batch_size:
+                for result in await self._process_batch(batch):
+                    yield result
+                batch = []
+
+        if batch:
+            for result in await self._process_batch(batch):
+                yield result
+
+        yield {"summary": self.summary}
+
+    def _failed(self, row: int, email: Optional[str], error: str) -> Dict[str, Any]:
+        self.summary["total"] += 1
+        self.summary["failed"] += 1
+        return {"row": row, "email": email, "status": "error", "error": error}
+
+    def _created(self, row: int, email: str, user_id: str) -> Dict[str, Any]:
+        self.summary["total"] += 1
+        self.summary["created"] += 1
+        return {"row": row, "email": email, "status": "created", "id": user_id}
+
+    async def _process_batch(self, batch: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        results: Dict[int, Dict[str, Any]] = {}
+        candidates: List[Tuple[int, UserCreate]] = []
+
+        # Validate rows and reject duplicates within the upload
+        for row, record in batch:
+            try:
+                user = UserCreate(**record)
+            except ValidationError as e:
+                error = e.errors()[0]
+                field = ".".join(str(part) for part in error["loc"])
+                results[row] = self._failed(row, record.get("email"), f"{field}: {error['msg']}")
+                continue
+
+            email_key = user.email.lower()
+            if email_key in self._seen_emails:
+                results[row] = self._failed(row, user.email, "Duplicate email in upload")
+                continue
+            if not validate_password_strength(user.password)["valid"]:
+                results[row] = self._failed(row, user.email, "Password does not meet requirements")
+                continue
+
+            self._seen_emails.add(email_key)
+            candidates.append((row, user))
+
+        # One uniqueness query for the whole batch
+        if candidates:
+            cursor = self.db.users.find(
+                {"email": {"$in": [user.email for _, user in candidates]}},
+                {"email": 1}
+            )
+            existing = {doc["email"].lower() async for doc in cursor}
+            remaining = []
+            for row, user in candidates:
+                if user.email.lower() in existing:
+                    results[row] = self._failed(row, user.email, "Email already registered")
+                else:
+                    remaining.append((row, user))
+            candidates = remaining
+
+        if candidates:
+            await self._create_users(candidates, results)
+
+        return [results[row] for row, _ in batch]
+
+    async def _create_users(self, candidates: List[Tuple[int, UserCreate]], results: Dict[int, Dict[str, Any]]):
+        try:
+            password_hashes = await password_hasher.hash_many([user.password for _, user in candidates])
+        except Exception as e:
+            logger.error(f"Bulk provisioning hashing failed for {len(candidates)} users: {e}")
+            for row, user in candidates:
+                results[row] = self._failed(row, user.email, "Password hashing unavailable, retry later")
+            return
+
+        now = datetime.utcnow()
+        documents = []
+        for (_, user), password_hash in zip(candidates, password_hashes):
+            user_dict = user.dict()
+            del user_dict["password"]
+            user_dict.update({
+                "_id": ObjectId(),
+                "password_hash": password_hash,
+                "status": UserStatus.ACTIVE,
+                "email_verified": True,
+                "created_at": now,
+                "updated_at": now
+            })
+            documents.append(with_search_terms(user_dict))
+
+        # Unordered insert: one bad row does not stop the rest
+        write_errors: Dict[int, str] = {}
+        try:
+            await self.db.users.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                if write_error.get("code") == DUPLICATE_KEY_ERROR:
+                    write_errors[write_error["index"]] = "Email already registered"
+                else:
+                    write_errors[write_error["index"]] = write_error.get("errmsg", "Insert failed")
+
+        default_data: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for index, ((row, user), document) in enumerate(zip(candidates, documents)):
+            if index in write_errors:
+                results[row] = self._failed(row, user.email, write_errors[index])
+                continue
+
+            user_id = str(document["_id"])
+            results[row] = self._created(row, user.email, user_id)
+            for collection, docs in db_manager.build_user_default_data(user_id, user.role).items():
+                default_data[collection].extend(docs)
+
+        # Default data mirrors registration: failures are logged, not fatal
+        for collection, docs in default_data.items():
+            try:
+                await self.db[collection].insert_many(docs, ordered=False)
+            except Exception as e:
+                logger.warning(f"Bulk provisioning default data insert into {collection} failed: {e}")
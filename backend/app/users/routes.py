@@ -2,13 +2,22 @@
 User management routes for profile operations and user administration.
 """
 from typing import List, Optional
+import json
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.models.user import User, UserUpdate, UserProfile, UserStatus, UserRole
 from app.models import get_database
 from app.auth.dependencies import get_current_user, get_current_admin, check_permissions
+from app.auth.cache import user_cache
+from app.auth.revocation import token_revocations
+from app.users.provisioning import BulkProvisioner, detect_format, iter_lines, iter_records
+from app.users.search import build_search_terms, rank_users, search_filter, SEARCH_TERMS_FIELD
+from app.config import settings
+from app.utils.pagination import paginate, set_next_cursor
+from app.utils.counts import count_service
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +47,10 @@ async def update_user_profile(
             detail="No fields to update"
         )
 
+    # Keep the search index in step with the name
+    if "full_name" in update_data:
+        update_data[SEARCH_TERMS_FIELD] = build_search_terms(current_user.email, update_data["full_name"])
+
     # Add updated timestamp
     update_data["updated_at"] = current_user.created_at.utcnow().replace(tzinfo=None)
 
@@ -53,6 +66,8 @@ async def update_user_profile(
             detail="Profile update failed"
         )
 
+    await user_cache.invalidate(current_user.id)
+
     # Get updated user
     updated_user_doc = await db.users.find_one({"_id": current_user.id})
     updated_user = User(**updated_user_doc)
@@ -63,8 +78,10 @@ async def update_user_profile(
 
 @router.get("/users", response_model=List[UserProfile])
 async def list_users(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     role: Optional[UserRole] = None,
     status: Optional[UserStatus] = None,
     search: Optional[str] = None,
@@ -73,6 +90,8 @@ async def list_users(
 ):
     """
     List users with filtering and pagination (Admin only).
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    With `search`, results are ranked by match quality and paged with skip/limit.
     """
     # Build query
     query = {}
@@ -83,20 +102,48 @@ async def list_users(
     if status:
         query["status"] = status.value
 
-    if search:
-        query["$or"] = [
-            {"email": {"$regex": search, "$options": "i"}},
-            {"full_name": {"$regex": search, "$options": "i"}}
-        ]
-
-    # Get users
-    cursor = db.users.find(query).skip(skip).limit(limit).sort("created_at", -1)
-    users_docs = await cursor.to_list(length=None)
+    terms_query = search_filter(search) if search else None
+
+    if terms_query:
+        # Rank the newest matching candidates, then page through the ranking
+        query.update(terms_query)
+        candidate_limit = max(settings.USER_SEARCH_CANDIDATE_LIMIT, skip + limit)
+        candidates = await db.users.find(query).sort(
+            [("created_at", -1), ("_id", -1)]
+        ).limit(candidate_limit).to_list(length=candidate_limit)
+        users_docs = rank_users(candidates, search)[skip:skip + limit]
+    else:
+        # Get users
+        users_docs, next_cursor = await paginate(
+            db.users, query, "created_at", limit, cursor=cursor, skip=skip
+        )
+        set_next_cursor(response, next_cursor)
 
     users = [User(**doc) for doc in users_docs]
 
     return [UserProfile(**user.dict()) for user in users]
 
+@router.post("/users/bulk")
+async def bulk_provision_users(
+    request: Request,
+    current_user: User = Depends(check_permissions(["manage_users"])),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Create users from an NDJSON or CSV upload (Admin only).
+    Streams one NDJSON result per row followed by a summary line.
+    """
+    upload_format = detect_format(request.headers.get("content-type"))
+    provisioner = BulkProvisioner(db)
+
+    async def results():
+        records = iter_records(iter_lines(request.stream()), upload_format)
+        async for result in provisioner.run(records):
+            yield json.dumps(result) + "\n"
+        logger.info(f"Bulk provisioning by {current_user.email}: {provisioner.summary}")
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 @router.get("/users/{user_id}", response_model=UserProfile)
 async def get_user_by_id(
     user_id: str,
@@ -142,6 +189,13 @@ async def update_user(
             detail="No fields to update"
         )
 
+    # Keep the search index in step with the name and email
+    if "full_name" in update_data or "email" in update_data:
+        update_data[SEARCH_TERMS_FIELD] = build_search_terms(
+            update_data.get("email", existing_user_doc.get("email", "")),
+            update_data.get("full_name", existing_user_doc.get("full_name", ""))
+        )
+
     # Add updated timestamp and updater info
     update_data["updated_at"] = current_user.created_at.utcnow().replace(tzinfo=None)
     update_data["updated_by"] = current_user.id
@@ -158,6 +212,8 @@ async def update_user(
             detail="User update failed"
         )
 
+    await user_cache.invalidate(user_id)
+
     # Get updated user
     updated_user_doc = await db.users.find_one({"_id": user_id})
     updated_user = User(**updated_user_doc)
@@ -209,6 +265,9 @@ async def update_user_status(
             detail="Status update failed"
         )
 
+    await token_revocations.revoke_user(user_id)
+    await user_cache.invalidate(user_id)
+
     logger.info(f"User status updated by admin {current_user.email}: {user_id} -> {status.value}")
 
     return {"message": f"User status updated to {status.value}"}
@@ -256,6 +315,9 @@ async def update_user_role(
             detail="Role update failed"
         )
 
+    await token_revocations.revoke_user(user_id)
+    await user_cache.invalidate(user_id)
+
     logger.info(f"User role updated by admin {current_user.email}: {user_id} -> {role.value}")
 
     return {"message": f"User role updated to {role.value}"}
@@ -293,6 +355,9 @@ async def delete_user(
             detail="User deletion failed"
         )
 
+    await token_revocations.revoke_user(user_id)
+    await user_cache.invalidate(user_id)
+
     logger.info(f"User deleted by admin {current_user.email}: {user_id}")
 
     return {"message": "User deleted successfully"}
@@ -319,17 +384,20 @@ async def get_user_statistics(
     ]
     status_stats = await db.users.aggregate(pipeline).to_list(length=None)
 
-    # Get total users
-    total_users = await db.users.count_documents({})
+    # Every user has a role, so the role buckets already add up to the total
+    total_users = sum(stat["count"] for stat in role_stats)
 
     # Get recent registrations (last 30 days)
     from datetime import datetime, timedelta
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    recent_users = await db.users.count_documents({"created_at": {"$gte": thirty_days_ago}})
+    recent_users, recent_exact = await count_service.count(
+        db.users, {"created_at": {"$gte": thirty_days_ago}}
+    )
 
     return {
         "total_users": total_users,
         "recent_registrations": recent_users,
+        "recent_registrations_exact": recent_exact,
         "role_distribution": {stat["_id"]: stat["count"] for stat in role_stats},
         "status_distribution": {stat["_id"]: stat["count"] for stat in status_stats}
     }
@@ -0,0 +1,83 @@
+"""
+Prefix search over users through an indexed edge n-gram field.
+
+Each user document carries `search_terms`: every prefix of every
+normalized token in the email and full name. A search becomes an $all
+match on that multikey index instead of an unanchored $regex scan, and
+the matching candidates are ranked in process by match quality.
+"""
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+# Field holding the edge n-grams, indexed together with created_at
+SEARCH_TERMS_FIELD = "search_terms"
+
+# Prefixes longer than this are not stored; longer query tokens are
+# truncated for the index lookup and checked exactly when ranking
+MAX_PREFIX_LENGTH = 12
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+def normalize_tokens(text: Optional[str]) -> List[str]:
+    """Lowercase, strip accents and split text into alphanumeric tokens."""
+    if not text:
+        return []
+    decomposed = unicodedata.normalize("NFKD", text)
+    folded = "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+    return [token for token in _TOKEN_SPLIT.split(folded) if token]
+
+def _user_tokens(email: Optional[str], full_name: Optional[str]) -> List[str]:
+    return normalize_tokens(full_name) + normalize_tokens(email)
+
+def build_search_terms(email: Optional[str], full_name: Optional[str]) -> List[str]:
+    """Edge n-grams for a user's email and full name."""
+    terms = set()
+    for token in _user_tokens(email, full_name):
+        for length in range(1, min(len(token), MAX_PREFIX_LENGTH) + 1):
+            terms.add(token[:length])
+    return sorted(terms)
+
+def with_search_terms(user_doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Set search_terms on a user document before it is written."""
+    user_doc[SEARCH_TERMS_FIELD] = build_search_terms(user_doc.get("email"), user_doc.get("full_name"))
+    return user_doc
+
+def search_filter(search: str) -> Optional[Dict[str, Any]]:
+    """
+    MongoDB filter matching users with a token starting with every search token.
+    Returns None when the search has no searchable characters.
+    """
+    terms = {token[:MAX_PREFIX_LENGTH] for token in normalize_tokens(search)}
+    if not terms:
+        return None
+    # MongoDB bounds the index scan on the first $all element, so lead with
+    # the longest (most selective) term
+    return {SEARCH_TERMS_FIELD: {"$all": sorted(terms, key=lambda term: (-len(term), term))}}
+
+def score_user(user_doc: Dict[str, Any], search: str) -> int:
+    """Rank a candidate: exact email, then email prefix, then whole-word over prefix matches."""
+    query = search.strip().casefold()
+    email = (user_doc.get("email") or "").casefold()
+    if query == email:
+        return 1000
+
+    score = 500 if query and email.startswith(query) else 0
+    tokens = _user_tokens(user_doc.get("email"), user_doc.get("full_name"))
+    for position, query_token in enumerate(normalize_tokens(search)):
+        if query_token in tokens:
+            score += 20
+        elif any(token.startswith(query_token) for token in tokens):
+            score += 10
+        else:
+            # Only the truncated prefix matched the index
+            return 0
+        # Matching the leading token in order (e.g. first name first) ranks higher
+        if position < len(tokens) and tokens[position].startswith(query_token):
+            score += 5
+    return score
+
+def rank_users(user_docs: List[Dict[str, Any]], search: str) -> List[Dict[str, Any]]:
+    """Order candidates by score, keeping the incoming (newest first) order on ties."""
+    scored = [(score_user(doc, search), index, doc) for index, doc in enumerate(user_docs)]
+    return [doc for score, _, doc in sorted(scored, key=lambda item: (-item[0], item[1])) if score > 0]
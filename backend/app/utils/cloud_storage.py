@@ -1,8 +1,9 @@
 """
 Cloud storage utilities for file uploads and management.
 """
+import asyncio
 import logging
-from typing import Optional, Dict, Any, BinaryIO
+from typing import Optional, Dict, Any, AsyncIterator, BinaryIO
 from pathlib import Path
 import aiofiles
 import os
@@ -18,6 +19,53 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Firebase resumable upload part size (must be a multiple of 256 KB); without
+# one the client reads the whole stream into memory for a single request
+FIREBASE_CHUNK_SIZE = 8 * 1024 * 1024
+
+class ChunkReader:
+    """
+    Blocking file-like view of an async chunk iterator, for SDKs that upload
+    from a file object. It must be read from a worker thread (e.g. via
+    asyncio.to_thread) while loop keeps running; each read pulls chunks from
+    the iterator on the loop, so memory stays at about one read's worth.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop):
+        self._chunks = chunks.__aiter__()
+        self._loop = loop
+        self._buffer = bytearray()
+        self._done = False
+        self._position = 0
+
+    async def _next_chunk(self) -> Optional[bytes]:
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._done and (size < 0 or len(self._buffer) < size):
+            # Errors from the iterator (e.g. the upload is too large) surface here
+            chunk = asyncio.run_coroutine_threadsafe(self._next_chunk(), self._loop).result()
+            if chunk is None:
+                self._done = True
+            else:
+                self._buffer += chunk
+
+        if size < 0 or size > len(self._buffer):
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self._position += len(data)
+        return data
+
+    def tell(self) -> int:
+        return self._position
+
+    def readable(self) -> bool:
+        return True
+
 class CloudStorageService:
     """Unified cloud storage service supporting AWS S3 and Firebase."""
 
@@ -97,6 +145,49 @@ class CloudStorageService:
             logger.error(f"File upload failed: {e}")
             raise
 
+    async def upload_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        content_type: str,
+        folder: str = "uploads",
+        storage_type: str = "auto"
+    ) -> Dict[str, Any]:
+        """
+        Upload a file from an async iterator of chunks, holding one chunk
+        in memory at a time. Nothing is left behind if the iterator raises
+        (e.g. the upload exceeded its size limit).
+
+        Args:
+            chunks: File content, chunk by chunk
+            filename: Original filename
+            content_type: MIME content type
+            folder: Storage folder/path
+            storage_type: Preferred storage type
+
+        Returns:
+            Dict with upload result information
+        """
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        full_path = f"{folder}/{timestamp}_{filename}"
+
+        try:
+            if storage_type == "s3" and self.s3_client:
+                return await self._stream_to_s3(chunks, full_path, content_type)
+            elif storage_type == "firebase" and self.firebase_bucket:
+                return await self._stream_to_firebase(chunks, full_path, content_type)
+            elif storage_type == "local" or not (self.s3_client or self.firebase_bucket):
+                return await self._stream_to_local(chunks, full_path, content_type)
+            elif self.s3_client:
+                # Auto-select: prefer S3, then Firebase, as upload_file does
+                return await self._stream_to_s3(chunks, full_path, content_type)
+            else:
+                return await self._stream_to_firebase(chunks, full_path, content_type)
+
+        except Exception as e:
+            logger.error(f"Streaming file upload failed: {e}")
+            raise
+
     async def download_file(self, file_path: str, storage_type: str = "auto") -> Optional[bytes]:
         """
         Download a file from cloud storage.
@@ -285,6 +376,90 @@ class CloudStorageService:
             logger.error(f"Local upload failed: {e}")
             raise
 
+    async def _stream_to_s3(self, chunks: AsyncIterator[bytes], file_path: str, content_type: str) -> Dict[str, Any]:
+        """Upload file to AWS S3 as a multipart upload."""
+        size = 0
+        # upload = self.s3_client.create_multipart_upload(
+        #     Bucket=settings.S3_BUCKET_NAME, Key=file_path, ContentType=content_type, ACL='private'
+        # )
+        try:
+            async for chunk in chunks:
+                # S3 parts must be at least 5 MB except the last; buffer chunks up to that
+                # self.s3_client.upload_part(...)
+                size += len(chunk)
+            # self.s3_client.complete_multipart_upload(...)
+        except Exception:
+            # self.s3_client.abort_multipart_upload(...)
+            raise
+
+        # Mock response for now
+        return {
+            "success": True,
+            "storage_type": "s3",
+            "file_path": file_path,
+            "file_url": f"s3://{settings.S3_BUCKET_NAME}/{file_path}",
+            "public_url": await self._get_s3_signed_url(file_path, 3600),
+            "bucket": settings.S3_BUCKET_NAME,
+            "size": size,
+            "content_type": content_type,
+            "uploaded_at": datetime.utcnow().isoformat()
+        }
+
+    async def _stream_to_firebase(self, chunks: AsyncIterator[bytes], file_path: str, content_type: str) -> Dict[str, Any]:
+        """Upload file to Firebase Storage as a resumable upload fed from the chunks."""
+        reader = ChunkReader(chunks, asyncio.get_running_loop())
+        # blob = self.firebase_bucket.blob(file_path, chunk_size=FIREBASE_CHUNK_SIZE)
+        # An error raised by the chunks aborts the upload before it is finalized
+        # await asyncio.to_thread(blob.upload_from_file, reader, content_type=content_type)
+        # blob.make_private()
+
+        # Mock upload: drain the reader the way the client would
+        await asyncio.to_thread(self._drain, reader)
+
+        return {
+            "success": True,
+            "storage_type": "firebase",
+            "file_path": file_path,
+            "file_url": f"firebase://{file_path}",
+            "public_url": await self._get_firebase_signed_url(file_path, 3600),
+            "size": reader.tell(),
+            "content_type": content_type,
+            "uploaded_at": datetime.utcnow().isoformat()
+        }
+
+    @staticmethod
+    def _drain(reader: ChunkReader) -> None:
+        while reader.read(FIREBASE_CHUNK_SIZE):
+            pass
+
+    async def _stream_to_local(self, chunks: AsyncIterator[bytes], file_path: str, content_type: str) -> Dict[str, Any]:
+        """Upload file to local storage, written under a temporary name until complete."""
+        file_path_obj = Path("uploads") / file_path
+        file_path_obj.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = file_path_obj.with_name(f"{file_path_obj.name}.part")
+
+        size = 0
+        try:
+            async with aiofiles.open(partial_path, "wb") as f:
+                async for chunk in chunks:
+                    await f.write(chunk)
+                    size += len(chunk)
+            os.replace(partial_path, file_path_obj)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+
+        return {
+            "success": True,
+            "storage_type": "local",
+            "file_path": str(file_path_obj),
+            "file_url": f"file://{file_path_obj.absolute()}",
+            "public_url": f"/files/{file_path}",
+            "size": size,
+            "content_type": content_type,
+            "uploaded_at": datetime.utcnow().isoformat()
+        }
+
     async def _download_from_s3(self, file_path: str) -> Optional[bytes]:
         """Download file from AWS S3."""
         try:
@@ -311,10 +486,16 @@ class CloudStorageService:
             logger.error(f"Firebase download failed: {e}")
             return None
 
+    @staticmethod
+    def _local_path(file_path: str) -> Path:
+        """Local file for a storage path, with or without the uploads/ prefix uploads return."""
+        path = Path(file_path)
+        return path if path.parts[:1] == ("uploads",) else Path("uploads") / path
+
     async def _download_from_local(self, file_path: str) -> Optional[bytes]:
         """Download file from local storage."""
         try:
-            file_path_obj = Path("uploads") / file_path
+            file_path_obj = self._local_path(file_path)
             if file_path_obj.exists():
                 async with aiofiles.open(file_path_obj, "rb") as f:
                     return await f.read()
@@ -348,7 +529,7 @@ class CloudStorageService:
     async def _delete_from_local(self, file_path: str) -> bool:
         """Delete file from local storage."""
         try:
-            file_path_obj = Path("uploads") / file_path
+            file_path_obj = self._local_path(file_path)
             if file_path_obj.exists():
                 file_path_obj.unlink()
             return True
@@ -0,0 +1,148 @@
+"""
+Count service that picks the cheapest accurate-enough strategy per call.
+
+- Unfiltered collections use collection metadata (estimated_document_count).
+- Hot per-user filters use Redis counters maintained by the write paths.
+- Everything else uses count_documents capped at COUNT_EXACT_LIMIT.
+
+Every call returns (total, exact) so responses can say whether the total
+is exact.
+"""
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from app import models
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Increment a cached counter only if it is already populated, so a missing
+# key is rebuilt from MongoDB instead of starting from zero.
+# KEYS[1] = counter key, ARGV[1] = delta
+INCREMENT_IF_EXISTS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+class CountService:
+    """Returns (total, exact) using estimated, capped or cached counts."""
+
+    def __init__(self, exact_limit: int = 10000, cache_ttl_seconds: int = 300):
+        self.exact_limit = exact_limit
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._script = None
+        self._script_client = None
+
+        # Counters
+        self.estimated_counts = 0
+        self.capped_counts = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _redis(self):
+        """Return the shared Redis client and its registered script, if any."""
+        client = models.redis_client
+        if client is None:
+            return None, None
+        if self._script_client is not client:
+            self._script = client.register_script(INCREMENT_IF_EXISTS_SCRIPT)
+            self._script_client = client
+        return client, self._script
+
+    @staticmethod
+    def counter_key(collection_name: str, field: str, value: Any) -> str:
+        """Redis key for a cached count of documents where field == value."""
+        return f"count:{collection_name}:{field}:{value}"
+
+    async def count(
+        self,
+        collection,
+        query: Optional[Dict[str, Any]] = None,
+        counter_key: Optional[str] = None
+    ) -> Tuple[int, bool]:
+        """Count documents using the cheapest strategy for the query."""
+        if not query:
+            return await self.estimated(collection)
+        if counter_key:
+            return await self.cached(collection, query, counter_key)
+        return await self.capped(collection, query)
+
+    async def estimated(self, collection) -> Tuple[int, bool]:
+        """Collection size from metadata; approximate after unclean shutdowns."""
+        self.estimated_counts += 1
+        return await collection.estimated_document_count(), False
+
+    async def capped(self, collection, query: Dict[str, Any]) -> Tuple[int, bool]:
+        """Exact count up to exact_limit; beyond that the total is a lower bound."""
+        self.capped_counts += 1
+        total = await collection.count_documents(query, limit=self.exact_limit + 1)
+        if total > self.exact_limit:
+            return self.exact_limit, False
+        return total, True
+
+    async def cached(self, collection, query: Dict[str, Any], counter_key: str) -> Tuple[int, bool]:
+        """Count served from a Redis counter, rebuilt from MongoDB on a miss."""
+        client, _ = self._redis()
+        if client is None:
+            return await self.capped(collection, query)
+
+        try:
+            cached = await client.get(counter_key)
+        except Exception as e:
+            logger.warning(f"Count cache read failed for {counter_key}: {e}")
+            return await self.capped(collection, query)
+
+        if cached is not None:
+            self.cache_hits += 1
+            return max(int(cached), 0), True
+
+        self.cache_misses += 1
+        total = await collection.count_documents(query)
+        try:
+            await client.set(counter_key, total, ex=self.cache_ttl_seconds, nx=True)
+        except Exception as e:
+            logger.warning(f"Count cache write failed for {counter_key}: {e}")
+        return total, True
+
+    async def adjust(self, counter_key: str, delta: int) -> None:
+        """Apply a write-path change to a cached counter if it is populated."""
+        client, script = self._redis()
+        if client is None:
+            return
+
+        try:
+            await script(keys=[counter_key], args=[delta])
+        except Exception as e:
+            # Drop the counter so the next read rebuilds it from MongoDB
+            logger.warning(f"Count cache update failed for {counter_key}: {e}")
+            await self.invalidate(counter_key)
+
+    async def invalidate(self, counter_key: str) -> None:
+        """Forget a cached counter."""
+        client, _ = self._redis()
+        if client is None:
+            return
+
+        try:
+            await client.delete(counter_key)
+        except Exception as e:
+            logger.warning(f"Count cache invalidation failed for {counter_key}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get count service statistics."""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "estimated_counts": self.estimated_counts,
+            "capped_counts": self.capped_counts,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": round(self.cache_hits / lookups, 4) if lookups else 0.0
+        }
+
+# Global count service instance
+count_service = CountService(
+    exact_limit=settings.COUNT_EXACT_LIMIT,
+    cache_ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS
+)
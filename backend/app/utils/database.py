@@ -6,10 +6,14 @@ import logging
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import UpdateOne
 import redis.asyncio as redis
 
 from app.config import settings
 from app.auth.utils import get_password_hash
+from app.utils.counts import count_service
+from app.resume.blobs import resume_blobs
+from app.users.search import SEARCH_TERMS_FIELD, build_search_terms, with_search_terms
 from app.models.user import User, UserRole, UserStatus
 
 logger = logging.getLogger(__name__)
@@ -66,6 +70,9 @@ class DatabaseManager:
         # Create indexes
         await self._create_indexes()
 
+        # Index users created before search terms existed
+        await self._backfill_user_search_terms()
+
         # Create default users
         await self._create_default_users()
 
@@ -74,6 +81,27 @@ class DatabaseManager:
 
         logger.info("Database initialization completed")
 
+    async def _backfill_user_search_terms(self, batch_size: int = 1000):
+        """Add search_terms to users that do not have them yet."""
+        cursor = self.database.users.find(
+            {SEARCH_TERMS_FIELD: {"$exists": False}},
+            {"email": 1, "full_name": 1}
+        )
+        updates = []
+        updated = 0
+        async for user_doc in cursor:
+            terms = build_search_terms(user_doc.get("email"), user_doc.get("full_name"))
+            updates.append(UpdateOne({"_id": user_doc["_id"]}, {"$set": {SEARCH_TERMS_FIELD: terms}}))
+            if len(updates) >= batch_size:
+                await self.database.users.bulk_write(updates, ordered=False)
+                updated += len(updates)
+                updates = []
+        if updates:
+            await self.database.users.bulk_write(updates, ordered=False)
+            updated += len(updates)
+        if updated:
+            logger.info(f"Backfilled search terms for {updated} users")
+
     async def _create_indexes(self):
         """Create database indexes for performance."""
         logger.info("Creating database indexes...")
@@ -84,6 +112,8 @@ class DatabaseManager:
         await self.database.users.create_index("status")
         await self.database.users.create_index("created_at")
         await self.database.users.create_index("updated_at")
+        await self.database.users.create_index([("created_at", -1), ("_id", -1)])
+        await self.database.users.create_index([(SEARCH_TERMS_FIELD, 1), ("created_at", -1), ("_id", -1)])
 
         # Interview indexes
         await self.database.interviews.create_index("user_id")
@@ -91,17 +121,22 @@ class DatabaseManager:
         await self.database.interviews.create_index("status")
         await self.database.interviews.create_index("created_at")
         await self.database.interviews.create_index("updated_at")
-        await self.database.interviews.create_index([("user_id", 1), ("created_at", -1)])
+        await self.database.interviews.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
 
         # Resume indexes
         await self.database.resumes.create_index("user_id")
         await self.database.resumes.create_index("created_at")
         await self.database.resumes.create_index("updated_at")
+        await self.database.resumes.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+        await self.database.resume_analyses.create_index("sha256")
 
         # Live interview indexes
         await self.database.live_interviews.create_index("scheduled_at")
         await self.database.live_interviews.create_index("status")
         await self.database.live_interviews.create_index("created_at")
+        await self.database.live_interviews.create_index([("scheduled_at", -1), ("_id", -1)])
+        await self.database.live_interviews.create_index([("interviewer_id", 1), ("scheduled_at", -1), ("_id", -1)])
+        await self.database.live_interviews.create_index([("candidate_id", 1), ("scheduled_at", -1), ("_id", -1)])
 
         # Role-specific collection indexes
         await self.database.candidate_profiles.create_index("user_id", unique=True)
@@ -114,6 +149,7 @@ class DatabaseManager:
         await self.database.admin_audit_logs.create_index("timestamp")
         await self.database.admin_audit_logs.create_index("action")
         await self.database.admin_audit_logs.create_index("user_id")
+        await self.database.audit_logs.create_index([("timestamp", -1), ("_id", -1)])
 
         logger.info("Database indexes created")
 
@@ -164,7 +200,7 @@ class DatabaseManager:
             }
             del user_dict["password"]  # Remove plain password
 
-            result = await self.database.users.insert_one(user_dict)
+            result = await self.database.users.insert_one(with_search_terms(user_dict))
             logger.info(f"Created user {user_data['email']} with ID {result.inserted_id}")
 
             # Create default data for the user
@@ -174,7 +210,17 @@ class DatabaseManager:
         """Create default data for a new user."""
         logger.info(f"Creating default data for user {user_id} with role {role}")
 
-        current_time = datetime.now(timezone.utc)
+        for collection, documents in self.build_user_default_data(user_id, role).items():
+            await self.database[collection].insert_many(documents)
+
+    def build_user_default_data(
+        self,
+        user_id: str,
+        role: UserRole,
+        current_time: Optional[datetime] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Build default documents for a new user, keyed by collection name."""
+        current_time = current_time or datetime.now(timezone.utc)
 
         if role == UserRole.CANDIDATE:
             # Create candidate profile
@@ -245,12 +291,11 @@ class DatabaseManager:
                 }
             ]
 
-            # Insert role-specific data
-            await self.database.candidate_profiles.insert_one(candidate_profile)
-            await self.database.candidate_progress.insert_one(candidate_progress)
-
-            for interview in sample_interviews:
-                await self.database.interviews.insert_one(interview)
+            return {
+                "candidate_profiles": [candidate_profile],
+                "candidate_progress": [candidate_progress],
+                "interviews": sample_interviews
+            }
 
         elif role == UserRole.RECRUITER:
             # Create recruiter profile
@@ -301,12 +346,11 @@ class DatabaseManager:
                 }
             ]
 
-            # Insert role-specific data
-            await self.database.recruiter_profiles.insert_one(recruiter_profile)
-            await self.database.recruiter_analytics.insert_one(recruiter_analytics)
-
-            for interview in sample_interviews:
-                await self.database.interviews.insert_one(interview)
+            return {
+                "recruiter_profiles": [recruiter_profile],
+                "recruiter_analytics": [recruiter_analytics],
+                "interviews": sample_interviews
+            }
 
         elif role == UserRole.ADMIN:
             # Create admin audit log entry
@@ -320,7 +364,9 @@ class DatabaseManager:
                 "ip_address": "system"
             }
 
-            await self.database.admin_audit_logs.insert_one(admin_audit_entry)
+            return {"admin_audit_logs": [admin_audit_entry]}
+
+        return {}
 
     async def _create_default_data(self):
         """Create default application data."""
@@ -388,8 +434,17 @@ class DatabaseManager:
         # Delete user's interviews (but keep the user account)
         await self.database.interviews.delete_many({"user_id": user_id})
 
-        # Delete user's resumes
+        # Delete user's resumes, then release their shared files
+        shared_files = [
+            resume["sha256"]
+            async for resume in self.database.resumes.find(
+                {"user_id": user_id, "sha256": {"$exists": True}}, {"sha256": 1}
+            )
+        ]
         await self.database.resumes.delete_many({"user_id": user_id})
+        for sha256 in shared_files:
+            await resume_blobs.release(self.database, sha256)
+        await count_service.invalidate(count_service.counter_key("resumes", "user_id", user_id))
 
         # Delete user's live interviews
         await self.database.live_interviews.delete_many({
@@ -441,7 +496,7 @@ class DatabaseManager:
         collections = ["users", "interviews", "resumes", "live_interviews", "interview_templates"]
         for collection in collections:
             try:
-                count = await self.database[collection].count_documents({})
+                count = await self.database[collection].estimated_document_count()
                 stats[f"{collection}_count"] = count
             except:
                 stats[f"{collection}_count"] = 0
@@ -553,7 +608,7 @@ async def create_test_user(email: str, full_name: str, role: UserRole = UserRole
     }
     del user_dict["password"]
 
-    result = await db_manager.database.users.insert_one(user_dict)
+    result = await db_manager.database.users.insert_one(with_search_terms(user_dict))
 
     # Create default data
     await db_manager._create_user_default_data(str(result.inserted_id), role)
@@ -0,0 +1,116 @@
+"""
+Keyset (cursor) pagination for MongoDB list endpoints.
+
+A cursor is an opaque, URL-safe token holding the sort key and _id of the
+last document on a page. The next page is fetched with a range predicate
+on the sort key, so it costs the same at any depth, unlike skip().
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Response, status
+
+# Response header carrying the next cursor for endpoints that return bare lists
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _encode_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, datetime):
+        return {"t": "dt", "v": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"t": "oid", "v": str(value)}
+    return {"t": "raw", "v": value}
+
+def _decode_value(encoded: Dict[str, Any]) -> Any:
+    kind, value = encoded["t"], encoded["v"]
+    if kind == "dt":
+        return datetime.fromisoformat(value)
+    if kind == "oid":
+        return ObjectId(value)
+    if kind == "raw":
+        return value
+    raise ValueError(f"Unknown cursor value type: {kind}")
+
+def encode_cursor(sort_value: Any, doc_id: Any) -> str:
+    """Encode a (sort_key, _id) position as an opaque cursor."""
+    payload = json.dumps([_encode_value(sort_value), _encode_value(doc_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return _decode_value(sort_value), _decode_value(doc_id)
+    except (ValueError, TypeError, KeyError, InvalidId):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def cursor_query(
+    query: Dict[str, Any],
+    sort_field: str,
+    cursor: str,
+    descending: bool = True
+) -> Dict[str, Any]:
+    """
+    Add the keyset predicate for documents after the cursor position.
+    The outer range on sort_field lets MongoDB bound the index scan; the
+    $or breaks ties on _id.
+    """
+    sort_value, doc_id = decode_cursor(cursor)
+    inclusive, exclusive = ("$lte", "$lt") if descending else ("$gte", "$gt")
+    predicate = {
+        sort_field: {inclusive: sort_value},
+        "$or": [
+            {sort_field: {exclusive: sort_value}},
+            {sort_field: sort_value, "_id": {exclusive: doc_id}}
+        ]
+    }
+    return {"$and": [query, predicate]} if query else predicate
+
+async def paginate(
+    collection,
+    query: Dict[str, Any],
+    sort_field: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    descending: bool = True
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one page sorted by (sort_field, _id).
+    Returns the documents and the cursor for the next page (None on the last
+    page). skip is honoured only when no cursor is given.
+    """
+    if limit < 1:
+        # limit(0) would mean "no limit" to MongoDB
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Page size must be at least 1"
+        )
+    direction = -1 if descending else 1
+    if cursor:
+        query = cursor_query(query, sort_field, cursor, descending)
+
+    find_cursor = collection.find(query).sort([(sort_field, direction), ("_id", direction)])
+    if skip and not cursor:
+        find_cursor = find_cursor.skip(skip)
+
+    # Fetch one extra document to learn whether another page exists
+    docs = await find_cursor.limit(limit + 1).to_list(length=limit + 1)
+    if len(docs) <= limit:
+        return docs, None
+
+    docs = docs[:limit]
+    last = docs[-1]
+    return docs, encode_cursor(last.get(sort_field), last["_id"])
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Expose the next cursor on endpoints whose body is a bare list."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,19 @@
+"""
+Server-Sent Events helpers.
+"""
+import json
+from typing import Any, Optional
+
+# Headers that keep proxies from buffering or caching an event stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no"
+}
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+def sse_event(data: Any, event: Optional[str] = None) -> str:
+    """Format one SSE message with a JSON payload."""
+    message = f"event: {event}\n" if event else ""
+    return f"{message}data: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,105 @@
+"""
+Streaming upload inspection.
+
+Reads an uploaded file in fixed-size chunks while enforcing the size
+limit, hashing the content and sniffing its real type, so handlers can
+pass the chunks straight to storage without ever holding the whole file.
+"""
+import codecs
+import hashlib
+from typing import AsyncIterator, Optional
+
+CHUNK_SIZE = 256 * 1024
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+DOC = "application/msword"
+TEXT = "text/plain"
+
+# Leading bytes of each binary format
+MAGIC_NUMBERS = (
+    (b"%PDF-", PDF),
+    (b"PK\x03\x04", DOCX),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", DOC),
+)
+
+class UploadTooLargeError(Exception):
+    """Raised once an upload grows past its size limit."""
+
+class UploadContentError(Exception):
+    """Raised when an upload's content does not match the expected type."""
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Content type from a file's first bytes, or None if unrecognized."""
+    for magic, content_type in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return content_type
+    if b"\x00" in head:
+        return None
+    try:
+        # Incremental so a multi-byte character cut at the chunk edge is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+    except UnicodeDecodeError:
+        return None
+    return TEXT
+
+class UploadStream:
+    """Chunked reader over an UploadFile with size, SHA-256 and type tracking."""
+
+    def __init__(
+        self,
+        source,
+        max_size: int,
+        expected_type: Optional[str] = None,
+        chunk_size: int = CHUNK_SIZE
+    ):
+        self.source = source
+        self.max_size = max_size
+        self.expected_type = expected_type
+        self.chunk_size = chunk_size
+        self.size = 0
+        self.content_type: Optional[str] = None
+        self._hash = hashlib.sha256()
+        self._head: Optional[bytes] = None
+        self._done = False
+
+    @property
+    def sha256(self) -> str:
+        """Hex digest of everything read so far (the whole file once chunks() is exhausted)."""
+        return self._hash.hexdigest()
+
+    async def _read(self) -> bytes:
+        chunk = await self.source.read(self.chunk_size)
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise UploadTooLargeError(f"File too large. Maximum size: {self.max_size} bytes")
+        self._hash.update(chunk)
+        return chunk
+
+    async def start(self) -> None:
+        """
+        Read and check the first chunk, so a wrong or oversized declared
+        file is rejected before anything is stored.
+        """
+        if self._head is not None:
+            return
+        declared_size = getattr(self.source, "size", None)
+        if declared_size is not None and declared_size > self.max_size:
+            raise UploadTooLargeError(f"File too large. Maximum size: {self.max_size} bytes")
+
+        self._head = await self._read()
+        self.content_type = sniff_content_type(self._head)
+        if self.expected_type and self.content_type != self.expected_type:
+            raise UploadContentError("File content does not match its extension")
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """Yield the file chunk by chunk, raising UploadTooLargeError past max_size."""
+        await self.start()
+        if self._head:
+            yield self._head
+        while not self._done:
+            chunk = await self._read()
+            if not chunk:
+                self._done = True
+                break
+            yield chunk
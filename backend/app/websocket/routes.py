@@ -10,7 +10,8 @@ import asyncio
 
 from app.models.user import User
 from app.models import get_database, get_redis
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_websocket_user
+from app.jobs.events import job_events
 
 logger = logging.getLogger(__name__)
 
@@ -87,7 +88,7 @@ manager = ConnectionManager()
 async def interview_websocket(
     websocket: WebSocket,
     interview_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_websocket_user),
     db: AsyncIOMotorDatabase = Depends(get_database),
     redis_client = Depends(get_redis)
 ):
@@ -232,7 +233,7 @@ async def interview_websocket(
 async def live_interview_websocket(
     websocket: WebSocket,
     interview_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_websocket_user),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """
@@ -383,13 +384,15 @@ async def live_interview_websocket(
 @router.websocket("/notifications")
 async def notifications_websocket(
     websocket: WebSocket,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_websocket_user),
     redis_client = Depends(get_redis)
 ):
     """
-    WebSocket endpoint for real-time notifications.
+    WebSocket endpoint for real-time notifications and background job
+    status changes. Authenticate with ?token=<access token>.
     """
     await manager.connect(websocket, current_user.id, "notifications")
+    tasks = []
 
     try:
         # Subscribe to user-specific notification channel
@@ -410,8 +413,20 @@ async def notifications_websocket(
             except Exception as e:
                 logger.error(f"Notification listener error for user {current_user.id}: {e}")
 
-        # Start listening task
-        listen_task = asyncio.create_task(listen_for_notifications())
+        async def forward_job_events():
+            """Push background job status changes (resume analysis, evaluations, feedback)."""
+            async with job_events.subscribe(current_user.id) as events:
+                while True:
+                    job = await events.get()
+                    await websocket.send_json({
+                        "type": "job",
+                        "data": job,
+                        "timestamp": asyncio.get_event_loop().time()
+                    })
+
+        # Start listening tasks
+        tasks.append(asyncio.create_task(forward_job_events()))
+        tasks.append(asyncio.create_task(listen_for_notifications()))
 
         # Handle WebSocket messages
         while True:
@@ -436,6 +451,8 @@ async def notifications_websocket(
     except Exception as e:
         logger.error(f"Notifications WebSocket error for user {current_user.id}: {e}")
     finally:
+        for task in tasks:
+            task.cancel()
         manager.disconnect(current_user.id, "notifications")
 
 # Utility functions for sending notifications
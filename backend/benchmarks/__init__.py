@@ -0,0 +1,5 @@
+"""
+Standalone performance benchmarks for CandidateX backend.
+
+Run from the backend directory, e.g. ``python -m benchmarks.bench_password_hashing``.
+"""
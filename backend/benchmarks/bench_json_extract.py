@@ -0,0 +1,64 @@
+"""
+Benchmark JSON extraction from AI replies: greedy regex vs. incremental scanner.
+
+Compares the previous approach (re.search with a greedy DOTALL pattern, then
+json.loads on the span) against extract_json and a chunked JSONExtractor on
+large well-formed replies and on malformed replies that make the greedy
+pattern backtrack.
+
+Usage:
+    python -m benchmarks.bench_json_extract --size 20000
+"""
+import argparse
+import json
+import re
+import time
+
+from app.ai.json_extract import ARRAY, JSONExtractor, extract_json
+
+GREEDY_ARRAY = re.compile(r'\[.*\]', re.DOTALL)
+
+def _greedy(text: str):
+    match = GREEDY_ARRAY.search(text)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group())
+    except ValueError:
+        return None
+
+def _chunked(text: str, chunk_size: int = 64):
+    extractor = JSONExtractor(ARRAY)
+    for start in range(0, len(text), chunk_size):
+        extractor.feed(text[start:start + chunk_size])
+    return extractor.finish()
+
+def _time(fn, text: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main(args):
+    questions = [{"question_text": f"Question {i}?", "skills_assessed": ["design"]} for i in range(args.size // 50)]
+    cases = {
+        "valid-fenced": "```json\n" + json.dumps(questions) + "\n```",
+        "valid-prose": "Here you go:\n" + json.dumps(questions) + "\nLet me know [if] you need more.",
+        "truncated": json.dumps(questions)[:-10],
+        "open-brackets": "[" * args.size,
+        "unclosed-string": '["' + "a [" * (args.size // 3),
+    }
+    print(f"{'case':<16} {'chars':>9} {'greedy ms':>10} {'extract ms':>11} {'chunked ms':>11}")
+    for name, text in cases.items():
+        print(
+            f"{name:<16} {len(text):>9} "
+            f"{_time(_greedy, text, args.repeat):>10.2f} "
+            f"{_time(lambda t: extract_json(t, ARRAY), text, args.repeat):>11.2f} "
+            f"{_time(_chunked, text, args.repeat):>11.2f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
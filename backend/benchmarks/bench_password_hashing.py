@@ -0,0 +1,87 @@
+"""
+Benchmark login password verification on the event loop vs. the hashing pool.
+
+Measures verifications per second (total and per core) and the worst event
+loop stall seen by a 10 ms heartbeat task, which is what other WebSocket and
+API requests on the same worker experience.
+
+Usage:
+    python -m benchmarks.bench_password_hashing --logins 64 --concurrency 16
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict
+
+from passlib.hash import bcrypt
+
+from app.auth.hashing import PasswordHasher
+from app.auth.utils import verify_password
+
+PASSWORD = "Benchmark123!"
+
+async def _heartbeat(stop: asyncio.Event, lag: Dict[str, float]):
+    """Record the largest delay between 10 ms ticks."""
+    interval = 0.01
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag["max"] = max(lag["max"], time.perf_counter() - start - interval)
+
+async def _run(label: str, verify, logins: int, concurrency: int, cores: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+    lag = {"max": 0.0}
+    heartbeat = asyncio.create_task(_heartbeat(stop, lag))
+
+    async def login():
+        async with semaphore:
+            assert await verify()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await heartbeat
+
+    throughput = logins / elapsed
+    print(
+        f"{label:<12} {throughput:8.1f} logins/s  "
+        f"{throughput / cores:8.1f} logins/s/core  "
+        f"max loop stall {lag['max'] * 1000:8.1f} ms"
+    )
+
+async def main(args):
+    password_hash = bcrypt.using(rounds=args.rounds).hash(PASSWORD)
+    cores = os.cpu_count() or 1
+    print(f"bcrypt rounds={args.rounds} logins={args.logins} concurrency={args.concurrency} cores={cores}")
+
+    async def inline_verify():
+        return verify_password(PASSWORD, password_hash)
+
+    await _run("event-loop", inline_verify, args.logins, args.concurrency, cores)
+
+    hasher = PasswordHasher(
+        max_workers=args.workers,
+        max_queue_size=args.concurrency,
+        executor_type=args.executor
+    )
+
+    async def pooled_verify():
+        return await hasher.verify(PASSWORD, password_hash)
+
+    try:
+        await _run(f"{args.executor}-pool", pooled_verify, args.logins, args.concurrency, cores)
+    finally:
+        hasher.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,85 @@
+"""
+Benchmark per-request overhead of permission dependencies.
+
+Compares the previous check_permissions body (rebuild the role -> list dict
+and scan lists on every call) with the compiled bitmask dependency, and
+measures how long it takes to resolve check_permissions(...) at route level.
+
+Usage:
+    python -m benchmarks.bench_permissions --iterations 200000
+"""
+import argparse
+import asyncio
+import time
+
+from app.auth.dependencies import check_permissions, resource_scope
+from app.models.user import User, UserRole
+
+REQUIRED = ["manage_users", "read_all_analytics"]
+
+def legacy_check(role: UserRole, required_permissions: list) -> bool:
+    """The per-request work check_permissions did before compilation."""
+    role_permissions = {
+        UserRole.CANDIDATE: [
+            "read_own_profile", "update_own_profile", "create_interview",
+            "read_own_interviews", "take_interview", "read_own_resume",
+            "upload_resume", "read_dashboard"
+        ],
+        UserRole.RECRUITER: [
+            "read_own_profile", "update_own_profile", "create_interview",
+            "read_own_interviews", "read_candidate_profiles", "read_candidate_resumes",
+            "conduct_live_interview", "read_dashboard", "read_analytics"
+        ],
+        UserRole.ADMIN: [
+            "read_own_profile", "update_own_profile", "manage_users",
+            "manage_interviews", "manage_system", "read_all_analytics",
+            "configure_system", "audit_logs"
+        ]
+    }
+    user_permissions = role_permissions.get(role, [])
+    for permission in required_permissions:
+        if permission not in user_permissions:
+            return False
+    return True
+
+def _report(label: str, iterations: int, elapsed: float):
+    print(f"{label:<28} {elapsed / iterations * 1e9:8.0f} ns/call")
+
+async def main(args):
+    user = User(
+        _id="507f1f77bcf86cd799439011",
+        email="admin@example.com",
+        full_name="Bench Admin",
+        password_hash="hash",
+        role=UserRole.ADMIN,
+        status="active"
+    )
+    n = args.iterations
+    print(f"iterations={n}")
+
+    start = time.perf_counter()
+    for _ in range(n):
+        legacy_check(user.role, REQUIRED)
+    _report("legacy check", n, time.perf_counter() - start)
+
+    dependency = check_permissions(REQUIRED)
+    start = time.perf_counter()
+    for _ in range(n):
+        await dependency(current_user=user)
+    _report("compiled dependency", n, time.perf_counter() - start)
+
+    scope_dependency = resource_scope("interview")
+    start = time.perf_counter()
+    for _ in range(n):
+        (await scope_dependency(current_user=user)).filter({"_id": "x"})
+    _report("resource scope + filter", n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        check_permissions(REQUIRED)
+    _report("factory lookup (cached)", n, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,95 @@
+"""
+Benchmark concurrent resume uploads: buffered vs streaming.
+
+Runs N parallel uploads of a synthetic PDF into local storage under a
+temporary directory, once through the old path (read the whole file, wrap
+it in a BytesIO, write it) and once through UploadStream, and reports wall
+time, throughput and peak Python heap. Buffered peak grows with
+uploads x size; streaming peak stays near uploads x chunk size.
+
+Usage:
+    python -m benchmarks.bench_resume_upload --uploads 200 --size-mb 10
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+from app.utils.cloud_storage import CloudStorageService
+from app.utils.uploads import PDF, UploadStream
+
+class SyntheticUpload:
+    """UploadFile stand-in that produces a PDF of the given size on demand."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.filename = "resume.pdf"
+        self.content_type = PDF
+        self._position = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        remaining = self.size - self._position
+        count = remaining if size < 0 else min(size, remaining)
+        start = self._position
+        self._position += count
+        if start == 0 and count:
+            return (b"%PDF-1.7\n" + b"x" * count)[:count]
+        return b"x" * count
+
+async def buffered(storage: CloudStorageService, source: SyntheticUpload, max_size: int) -> int:
+    content = await source.read()
+    if len(content) > max_size:
+        raise ValueError("too large")
+    result = await storage.upload_file(BytesIO(content), source.filename, source.content_type, folder="resumes")
+    return result["size"]
+
+async def streaming(storage: CloudStorageService, source: SyntheticUpload, max_size: int) -> int:
+    upload = UploadStream(source, max_size, expected_type=PDF)
+    await upload.start()
+    result = await storage.upload_stream(upload.chunks(), source.filename, upload.content_type, folder="resumes")
+    return result["size"]
+
+async def run(mode, uploads: int, size: int) -> None:
+    storage = CloudStorageService()
+    sources = [SyntheticUpload(size) for _ in range(uploads)]
+    # Distinct names per upload so concurrent writes do not collide
+    for index, source in enumerate(sources):
+        source.filename = f"resume-{index}.pdf"
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    written = await asyncio.gather(*[mode(storage, source, size) for source in sources])
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total_mb = sum(written) / 2 ** 20
+    print(
+        f"{mode.__name__:>9}: {elapsed:6.2f}s  {total_mb / elapsed:8.1f} MB/s  "
+        f"peak heap {peak / 2 ** 20:8.1f} MB ({peak / uploads / 1024:7.1f} KB per upload)"
+    )
+
+async def main(args):
+    size = int(args.size_mb * 2 ** 20)
+    print(f"uploads={args.uploads} size={args.size_mb}MB")
+    modes = {"buffered": buffered, "streaming": streaming}
+    for name in (modes if args.mode == "both" else [args.mode]):
+        workdir = tempfile.mkdtemp(prefix="bench_upload_")
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            await run(modes[name], args.uploads, size)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--size-mb", type=float, default=10)
+    parser.add_argument("--mode", choices=["both", "buffered", "streaming"], default="both")
+    asyncio.run(main(parser.parse_args()))
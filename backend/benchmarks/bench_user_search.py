@@ -0,0 +1,171 @@
+"""
+Benchmark user search latency on a synthetic user base (default 1M users).
+
+By default the search_terms index is modelled in memory: one posting list
+per term in created_at order, walked the way MongoDB walks the
+(search_terms, created_at, _id) index for an $all match, followed by the
+same ranking list_users applies. Pass --mongodb-url to seed a scratch
+database and time the real query instead; the legacy unanchored $regex is
+timed there for comparison.
+
+Usage:
+    python -m benchmarks.bench_user_search --users 1000000
+    python -m benchmarks.bench_user_search --users 1000000 --mongodb-url mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from array import array
+
+from app.config import settings
+from app.users.search import SEARCH_TERMS_FIELD, build_search_terms, rank_users, search_filter
+
+FIRST_NAMES = [
+    "james", "mary", "robert", "patricia", "john", "jennifer", "michael", "linda", "david", "elizabeth",
+    "william", "barbara", "richard", "susan", "joseph", "jessica", "thomas", "sarah", "charles", "karen",
+    "priya", "arjun", "ananya", "rahul", "sneha", "wei", "mei", "hiroshi", "yuki", "sofia",
+    "mateo", "lucia", "olga", "ivan", "fatima", "omar", "amara", "kwame", "noah", "emma",
+    "liam", "olivia", "ethan", "ava", "lucas", "mia", "jose", "maria", "chen", "aisha"
+]
+LAST_NAMES = [
+    "smith", "johnson", "williams", "brown", "jones", "garcia", "miller", "davis", "rodriguez", "martinez",
+    "hernandez", "lopez", "gonzalez", "wilson", "anderson", "thomas", "taylor", "moore", "jackson", "martin",
+    "sharma", "patel", "kumar", "singh", "gupta", "wang", "li", "zhang", "tanaka", "suzuki",
+    "ivanov", "petrov", "khan", "ali", "okafor", "mensah", "silva", "santos", "rossi", "muller"
+]
+DOMAINS = ["example.com", "mail.com", "candidatex.io", "corp.net", "uni.edu"]
+QUERIES = ["priya", "pri", "john smith", "smith john", "sh", "martinez", "ivan petrov", "smith12", "candidatex", "xyzzy"]
+
+def synthetic_users(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            "email": f"{first}.{last}{i}@{rng.choice(DOMAINS)}",
+            "full_name": f"{first.title()} {last.title()}",
+            "created_at": i
+        }
+
+class InMemoryTermIndex:
+    """Posting lists of user positions, newest first, like the compound index."""
+
+    def __init__(self, users):
+        self.users = users
+        self.term_ids = {}
+        postings = []
+        # Per-user term ids stand in for the search_terms array on each document
+        self.user_terms = [None] * len(users)
+        # Iterate newest first so every posting list is in created_at desc order
+        for position in range(len(users) - 1, -1, -1):
+            user = users[position]
+            ids = array("I")
+            for term in build_search_terms(user["email"], user["full_name"]):
+                term_id = self.term_ids.setdefault(term, len(self.term_ids))
+                if term_id == len(postings):
+                    postings.append(array("I"))
+                postings[term_id].append(position)
+                ids.append(term_id)
+            self.user_terms[position] = ids
+        self.postings = postings
+
+    def find(self, terms, limit):
+        """Scan the first term's postings and filter the fetched documents on the rest, as for $all."""
+        term_ids = [self.term_ids.get(term) for term in terms]
+        if None in term_ids:
+            return []
+        first, rest = term_ids[0], term_ids[1:]
+        results = []
+        for position in self.postings[first]:
+            if rest:
+                user_terms = self.user_terms[position]
+                if not all(term_id in user_terms for term_id in rest):
+                    continue
+            results.append(self.users[position])
+            if len(results) >= limit:
+                break
+        return results
+
+def _report(label: str, timings):
+    timings = sorted(timings)
+    p50 = statistics.median(timings) * 1000
+    p95 = timings[int(len(timings) * 0.95) - 1] * 1000
+    print(f"{label:<24} p50={p50:7.2f} ms  p95={p95:7.2f} ms  max={timings[-1] * 1000:7.2f} ms")
+
+def run_in_memory(args):
+    start = time.perf_counter()
+    users = list(synthetic_users(args.users))
+    index = InMemoryTermIndex(users)
+    print(f"built index over {len(users):,} users ({len(index.term_ids):,} terms) in {time.perf_counter() - start:.1f}s")
+
+    for query in QUERIES:
+        terms = search_filter(query)[SEARCH_TERMS_FIELD]["$all"]
+        timings, matches = [], 0
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            ranked = rank_users(index.find(terms, args.candidates), query)[:args.limit]
+            timings.append(time.perf_counter() - start)
+            matches = len(ranked)
+        _report(f"{query!r} ({matches})", timings)
+
+async def run_mongodb(args):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(args.mongodb_url)
+    collection = client[args.database].users
+    if await collection.estimated_document_count() < args.users:
+        await collection.drop()
+        batch = []
+        start = time.perf_counter()
+        for user in synthetic_users(args.users):
+            user[SEARCH_TERMS_FIELD] = build_search_terms(user["email"], user["full_name"])
+            batch.append(user)
+            if len(batch) >= 10000:
+                await collection.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            await collection.insert_many(batch, ordered=False)
+        await collection.create_index([(SEARCH_TERMS_FIELD, 1), ("created_at", -1), ("_id", -1)])
+        print(f"seeded {args.users:,} users in {time.perf_counter() - start:.1f}s")
+
+    for query in QUERIES:
+        timings, matches = [], 0
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            candidates = await collection.find(search_filter(query)).sort(
+                [("created_at", -1), ("_id", -1)]
+            ).limit(args.candidates).to_list(length=args.candidates)
+            ranked = rank_users(candidates, query)[:args.limit]
+            timings.append(time.perf_counter() - start)
+            matches = len(ranked)
+        _report(f"{query!r} ({matches})", timings)
+
+    if args.legacy:
+        query = QUERIES[0]
+        timings = []
+        for _ in range(min(args.repeat, 5)):
+            start = time.perf_counter()
+            await collection.find({"$or": [
+                {"email": {"$regex": query, "$options": "i"}},
+                {"full_name": {"$regex": query, "$options": "i"}}
+            ]}).sort([("created_at", -1), ("_id", -1)]).limit(args.limit).to_list(length=args.limit)
+            timings.append(time.perf_counter() - start)
+        _report(f"legacy $regex {query!r}", timings)
+
+    client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--candidates", type=int, default=settings.USER_SEARCH_CANDIDATE_LIMIT)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--mongodb-url")
+    parser.add_argument("--database", default="candidatex_bench")
+    parser.add_argument("--legacy", action="store_true", help="also time the old $regex search (MongoDB only)")
+    args = parser.parse_args()
+    if args.mongodb_url:
+        asyncio.run(run_mongodb(args))
+    else:
+        run_in_memory(args)
@@ -0,0 +1,269 @@
+"""
+Unit tests for AI token, cost and latency metrics and per-user quotas.
+"""
+import json
+import re
+from collections import defaultdict
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.ai import routes
+from app.ai.metrics import (
+    AIMetrics, QuotaExceededError, bind_user, charged_to, estimate_tokens, report_usage
+)
+from app.ai.providers import FakeProvider
+from app.ai.router import ProviderRouter
+from app.ai.service import AIService
+
+EVALUATION = json.dumps({"score": 8, "feedback": "Good", "strengths": [], "improvements": []})
+ANSWER = "I refactored the billing service and cut its p95 latency by 40% over two months of work."
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for AI metrics."""
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = defaultdict(dict)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        value = self.values.get(key)
+        return str(value) if value is not None else None
+
+    async def incrby(self, key, amount):
+        self.values[key] = self.values.get(key, 0) + amount
+        return self.values[key]
+
+    async def hincrby(self, key, field, amount):
+        self.hashes[key][field] = self.hashes[key].get(field, 0) + amount
+        return self.hashes[key][field]
+
+    async def hgetall(self, key):
+        return {field: str(value) for field, value in self.hashes.get(key, {}).items()}
+
+    async def expire(self, key, seconds):
+        return True
+
+
+class UsageProvider(FakeProvider):
+    """Reports upstream token usage like the OpenAI provider does."""
+
+    name = "openai"
+
+    async def _generate(self, prompt, system, temperature, max_tokens):
+        text = await super()._generate(prompt, system, temperature, max_tokens)
+        report_usage(120, 30)
+        return text
+
+
+@pytest.fixture
+def metrics():
+    metrics = AIMetrics(prices_per_1k={"fake": [1.0, 2.0], "openai": [0.03, 0.06]})
+    with patch("app.ai.providers.ai_metrics", metrics), \
+            patch("app.ai.router.ai_metrics", metrics), \
+            patch("app.ai.service.ai_metrics", metrics), \
+            patch("app.ai.metrics.models.redis_client", None), \
+            patch("app.ai.result_cache.models.redis_client", None):
+        yield metrics
+
+
+def batch_reply(prompt):
+    ids = [int(match) for match in re.findall(r'"id": (\d+), "question"', prompt)]
+    return json.dumps([{"id": i, "score": 7, "feedback": "Good", "strengths": [], "improvements": []} for i in ids])
+
+
+def service_with(provider):
+    service = AIService()
+    service.google_provider = provider
+    service.openai_provider = None
+    return service
+
+
+@pytest.mark.asyncio
+class TestRecording:
+    async def test_calls_are_counted_per_provider_and_operation(self, metrics):
+        provider = FakeProvider("x" * 400)
+        await provider.generate("p" * 800, operation="evaluation")
+        await provider.generate("p" * 800, operation="evaluation")
+
+        report = metrics.report(await metrics.totals(1))
+        entry = report["providers"]["fake"]["evaluation"]
+
+        assert entry["calls"] == 2
+        assert entry["prompt_tokens"] == 2 * estimate_tokens("p" * 800)
+        assert entry["completion_tokens"] == 2 * estimate_tokens("x" * 400)
+        assert entry["cost_usd"] == round((402 / 1000) * 1.0 + (202 / 1000) * 2.0, 4)
+        assert entry["p50_ms"] == 100
+        assert sum(entry["latency_histogram_ms"].values()) == 2
+        assert report["totals"]["calls"] == 2
+
+    async def test_reported_usage_replaces_estimates(self, metrics):
+        await UsageProvider("reply").generate("prompt", operation="chat")
+
+        entry = metrics.report(await metrics.totals(1))["providers"]["openai"]["chat"]
+        assert (entry["prompt_tokens"], entry["completion_tokens"]) == (120, 30)
+
+    async def test_failed_and_streamed_calls(self, metrics):
+        with pytest.raises(RuntimeError):
+            await FakeProvider(error=RuntimeError("down")).generate("prompt", operation="questions")
+        chunks = [chunk async for chunk in FakeProvider("one two three").stream("prompt", operation="chat")]
+
+        providers = metrics.report(await metrics.totals(1))["providers"]["fake"]
+        assert providers["questions"]["failures"] == 1
+        assert providers["questions"]["prompt_tokens"] == 0
+        assert providers["chat"]["completion_tokens"] == estimate_tokens("".join(chunks))
+
+    async def test_fallback_and_parse_failure_rates(self, metrics):
+        service = service_with(FakeProvider(lambda prompt: "not json" if "broken" in prompt else EVALUATION))
+
+        await service.evaluate_response("What went well?", ANSWER)
+        await service.evaluate_response("What broke?", ANSWER + " broken")
+
+        operation = metrics.report(await metrics.totals(1))["operations"]["evaluation"]
+        assert (operation["ai"], operation["fallback"], operation["parse_failures"]) == (1, 1, 1)
+        assert operation["fallback_rate"] == 0.5
+        assert operation["parse_failure_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+class TestSharing:
+    async def test_flush_aggregates_workers(self, metrics):
+        client = FakeRedis()
+        other = AIMetrics()
+        provider = FakeProvider("reply")
+        with patch("app.ai.metrics.models.redis_client", client):
+            await provider.generate("prompt", operation="chat")
+            other.record_call("fake", "chat", "prompt", "reply", 0.3)
+            assert await metrics.flush() and await other.flush()
+            metrics.record_call("fake", "chat", "prompt", "reply", 0.3)
+
+            totals = await metrics.totals(1)
+
+        assert totals["call|fake|chat|calls"] == 3
+        assert not other._pending
+        assert metrics.get_stats()["flushes"] == 1
+
+    async def test_failed_flush_keeps_counters(self, metrics):
+        client = FakeRedis()
+        client.hincrby = MagicMock(side_effect=ConnectionError("down"))
+        metrics.record_call("fake", "chat", "prompt", "reply", 0.1)
+        with patch("app.ai.metrics.models.redis_client", client):
+            assert not await metrics.flush()
+
+        assert metrics._pending
+        assert metrics.flush_errors == 1
+
+
+@pytest.mark.asyncio
+class TestQuota:
+    async def test_user_is_refused_after_quota(self, metrics):
+        metrics.daily_token_quota = 50
+        provider = FakeProvider("x" * 200)
+        bind_user("u1")
+
+        await provider.generate("prompt", operation="chat")
+        with pytest.raises(QuotaExceededError):
+            await provider.generate("prompt", operation="chat")
+
+        assert len(provider.prompts) == 1
+        assert metrics.quota_rejections == 1
+        assert await metrics.user_usage("u1") == estimate_tokens("prompt") + estimate_tokens("x" * 200)
+
+    async def test_quota_sees_other_workers_usage(self, metrics):
+        client = FakeRedis()
+        metrics.daily_token_quota = 100
+        other = AIMetrics(daily_token_quota=100)
+        bind_user("u1")
+        with patch("app.ai.metrics.models.redis_client", client):
+            other.record_call("fake", "chat", "p" * 400, "r" * 400, 0.1)
+            await other.flush()
+
+            with pytest.raises(QuotaExceededError):
+                await metrics.check_quota()
+
+    async def test_quota_does_not_trip_breaker(self, metrics):
+        metrics.daily_token_quota = 1
+        provider = FakeProvider("reply")
+        router = ProviderRouter(lambda: [provider], failure_threshold=1)
+        bind_user("u1")
+
+        await router.generate("prompt")
+        for _ in range(3):
+            with pytest.raises(QuotaExceededError):
+                await router.generate("prompt")
+
+        assert router.health(provider).breaker.state == "closed"
+
+    async def test_chat_returns_429(self, metrics):
+        metrics.daily_token_quota = 1
+        service = service_with(FakeProvider("reply"))
+        current_user = MagicMock()
+        current_user.id = "u1"
+        current_user.role.value = "candidate"
+
+        with patch.object(routes, "ai_service", service):
+            await routes.chat_with_ai(routes.ChatRequest(message="Hi", model="gemini"), current_user)
+            with pytest.raises(HTTPException) as error:
+                await routes.chat_with_ai(routes.ChatRequest(message="Again", model="gemini"), current_user)
+
+        assert error.value.status_code == 429
+
+    async def test_unbound_calls_are_not_limited(self, metrics):
+        metrics.daily_token_quota = 1
+        provider = FakeProvider("reply")
+
+        await provider.generate("prompt")
+        await provider.generate("prompt")
+
+        assert len(provider.prompts) == 2
+
+    async def test_charged_to_restores_the_bound_user(self, metrics):
+        bind_user("u1")
+        with charged_to("u2"):
+            metrics.record_call("fake", "evaluation", "p" * 40, "r" * 40, 0.1)
+        metrics.record_call("fake", "evaluation", "p" * 40, "r" * 40, 0.1)
+
+        assert await metrics.user_usage("u1") == await metrics.user_usage("u2") == 22
+
+    async def test_batched_evaluation_is_charged_per_item(self, metrics):
+        provider = FakeProvider(batch_reply)
+        service = service_with(provider)
+        bind_user(None)
+
+        await service.evaluate_responses([("Q1", ANSWER), ("Q2", ANSWER * 3)], users=["u1", "u2"])
+
+        first, second = await metrics.user_usage("u1"), await metrics.user_usage("u2")
+        total = estimate_tokens(provider.prompts[0]) + estimate_tokens(batch_reply(provider.prompts[0]))
+        assert 0 < first < second
+        assert abs(first + second - total) <= 1
+
+    async def test_batched_item_over_quota_is_scored_offline(self, metrics):
+        metrics.daily_token_quota = 10
+        metrics.charge("u1", 10)
+        provider = FakeProvider(batch_reply)
+        bind_user(None)
+
+        results = await service_with(provider).evaluate_responses(
+            [("Q1", ANSWER), ("Q2", ANSWER + " again"), ("Q3", ANSWER + " once more")],
+            users=["u1", "u2", "u2"]
+        )
+
+        assert len(results) == 3 and all("score" in result for result in results)
+        assert "Q1" not in provider.prompts[0] and "Q2" in provider.prompts[0]
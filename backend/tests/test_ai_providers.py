@@ -0,0 +1,137 @@
+"""
+Unit tests for async AI providers.
+"""
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.ai.providers import FakeProvider, GeminiProvider, LLMProvider, OpenAIProvider, ProviderOverloadedError
+from app.ai.service import AIService
+
+EVALUATION = json.dumps({"score": 8, "feedback": "Good", "strengths": [], "improvements": []})
+
+
+def service_with(provider):
+    service = AIService()
+    service.google_provider = provider
+    service.openai_provider = None
+    return service
+
+
+def test_provider_without_generate_fails_at_construction():
+    class Incomplete(LLMProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.asyncio
+class TestProviderLimits:
+    async def test_concurrent_evaluations_do_not_serialize(self):
+        provider = FakeProvider(EVALUATION, latency=0.2, max_concurrency=100, max_queue=100)
+        service = service_with(provider)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            service.evaluate_response(f"Question {i}", "Answer") for i in range(100)
+        ])
+        elapsed = time.perf_counter() - start
+
+        assert all(result["score"] == 8 for result in results)
+        assert elapsed < 1.0
+        assert provider.peak_in_flight == 100
+
+    async def test_semaphore_caps_in_flight_requests(self):
+        provider = FakeProvider("ok", latency=0.05, max_concurrency=4, max_queue=100)
+
+        await asyncio.gather(*[provider.generate("p") for _ in range(20)])
+
+        assert provider.peak_in_flight == 4
+        assert provider.get_stats()["requests"] == 20
+
+    async def test_full_queue_rejects_new_work(self):
+        provider = FakeProvider("ok", latency=0.1, max_concurrency=1, max_queue=2)
+
+        results = await asyncio.gather(
+            *[provider.generate("p") for _ in range(5)], return_exceptions=True
+        )
+
+        rejected = [r for r in results if isinstance(r, ProviderOverloadedError)]
+        assert len(rejected) == 2
+        assert provider.rejected == 2
+
+    async def test_overload_falls_back_to_basic_evaluation(self):
+        provider = FakeProvider(EVALUATION, latency=0.1, max_concurrency=1, max_queue=0)
+        service = service_with(provider)
+
+        first, second = await asyncio.gather(
+            service.evaluate_response("Q1", "A"),
+            service.evaluate_response("Q2", "A")
+        )
+
+        assert first["score"] == 8
+        assert second["evaluator"] == "offline"
+
+    async def test_timeout_counts_as_failure(self):
+        provider = FakeProvider("ok", latency=1, timeout_seconds=0.05)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await provider.generate("p")
+
+        assert provider.failures == 1
+        assert provider.get_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+class TestClients:
+    async def test_gemini_uses_native_async_call(self):
+        client = Mock()
+        client.generate_content_async = AsyncMock(return_value=Mock(text=" hi "))
+        provider = GeminiProvider(client)
+
+        assert await provider.generate("p", system="s", temperature=0.2, max_tokens=50) == "hi"
+        args, kwargs = client.generate_content_async.await_args
+        assert args == ("s\n\np",)
+        assert kwargs["generation_config"] == {"temperature": 0.2, "max_output_tokens": 50}
+        client.generate_content.assert_not_called()
+
+    async def test_sync_gemini_client_runs_off_the_event_loop(self):
+        def slow_generate(prompt, generation_config=None):
+            time.sleep(0.2)
+            return Mock(text="done")
+
+        client = Mock(spec=["generate_content"])
+        client.generate_content = slow_generate
+        provider = GeminiProvider(client)
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        result, _ = await asyncio.gather(provider.generate("p"), ticker())
+
+        assert result == "done"
+        assert ticks == 10
+
+    async def test_openai_sends_system_and_user_messages(self):
+        message = Mock()
+        message.content = " answer "
+        client = Mock()
+        client.chat.completions.create = AsyncMock(return_value=Mock(choices=[Mock(message=message)]))
+        provider = OpenAIProvider(client, model="gpt-test")
+
+        assert await provider.generate("question", system="be brief", max_tokens=10) == "answer"
+        kwargs = client.chat.completions.create.await_args.kwargs
+        assert kwargs["model"] == "gpt-test"
+        assert kwargs["messages"] == [
+            {"role": "system", "content": "be brief"},
+            {"role": "user", "content": "question"}
+        ]
@@ -0,0 +1,133 @@
+"""
+Unit tests for recording and replaying LLM provider traffic.
+"""
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.ai.metrics import AIMetrics
+from app.ai.providers import FakeProvider
+from app.ai.replay import RecordingProvider, ReplayCorpus, ReplayMissError, ReplayProvider
+from app.ai.service import AIService
+
+EVALUATION = json.dumps({"score": 7, "feedback": "Good", "strengths": [], "improvements": []})
+ANSWER = "I migrated our billing jobs to a queue, which cut failed payments by 30% in two months."
+
+
+@pytest.fixture(autouse=True)
+def no_redis():
+    with patch("app.ai.result_cache.models.redis_client", None), \
+            patch("app.ai.metrics.models.redis_client", None):
+        yield
+
+
+async def recorded(provider=None, path=None):
+    recorder = RecordingProvider(provider or FakeProvider(lambda prompt: f"reply to {prompt}", latency=0.05))
+    await recorder.generate("first", temperature=0.3, max_tokens=100, operation="evaluation")
+    await recorder.generate("second", system="Be brief", operation="chat")
+    chunks = [chunk async for chunk in recorder.stream("third", operation="chat")]
+    if path is not None:
+        recorder.corpus.save(path)
+    return recorder.corpus, chunks
+
+
+@pytest.mark.asyncio
+class TestRecording:
+    async def test_records_calls_with_metadata(self):
+        corpus, chunks = await recorded()
+
+        first, second, third = corpus.entries
+        assert first["response"] == "reply to first"
+        assert first["operation"] == "evaluation"
+        assert first["latency"] >= 0.05
+        assert first["prompt_tokens"] > 0 and first["completion_tokens"] > 0
+        assert "prompt" not in first and first["prompt_chars"] == 5
+        assert second["key"] == ReplayCorpus.key("second", "Be brief", 0.7, 1000)
+        assert third["chunks"] == chunks and third["first_chunk_latency"] <= third["latency"]
+
+    async def test_corpus_round_trips_through_disk(self, tmp_path):
+        path = str(tmp_path / "corpus.jsonl.gz")
+        corpus, _ = await recorded(path=path)
+
+        loaded = ReplayCorpus.load(path)
+
+        assert loaded.entries == corpus.entries
+        with open(path, "rb") as f:
+            assert f.read(2) == b"\x1f\x8b"
+
+
+@pytest.mark.asyncio
+class TestReplay:
+    async def test_replays_recorded_responses(self):
+        corpus, chunks = await recorded()
+        provider = ReplayProvider(corpus, latency_scale=0, strict=True)
+
+        assert await provider.generate("first", temperature=0.3, max_tokens=100) == "reply to first"
+        assert await provider.generate("second", system="Be brief") == "reply to second"
+        assert [chunk async for chunk in provider.stream("third")] == chunks
+        assert (provider.hits, provider.misses) == (3, 0)
+
+    async def test_strict_miss_raises(self):
+        corpus, _ = await recorded()
+
+        with pytest.raises(ReplayMissError):
+            await ReplayProvider(corpus, latency_scale=0, strict=True).generate("unknown")
+
+    async def test_miss_uses_a_stable_recording_of_the_same_shape(self):
+        corpus, _ = await recorded()
+        provider = ReplayProvider(corpus, latency_scale=0)
+
+        first = await provider.generate("unknown", temperature=0.3, max_tokens=100)
+        again = await provider.generate("unknown", temperature=0.3, max_tokens=100)
+
+        assert first == again == "reply to first"
+        assert provider.misses == 2
+
+    async def test_latency_injection(self):
+        corpus = ReplayCorpus([{
+            "key": ReplayCorpus.key("slow", None, 0.7, 1000),
+            "signature": ReplayCorpus.signature(None, 0.7, 1000),
+            "latency": 0.2,
+            "response": "done"
+        }])
+
+        start = time.perf_counter()
+        await ReplayProvider(corpus, latency_scale=0.5).generate("slow")
+        elapsed = time.perf_counter() - start
+
+        assert 0.09 <= elapsed < 0.18
+        jittered = ReplayProvider(corpus, latency_jitter=0.5, seed=3)
+        repeat = ReplayProvider(corpus, latency_jitter=0.5, seed=3)
+        assert jittered._delay(0.2, "slow") == repeat._delay(0.2, "slow") != 0.2
+
+    async def test_replay_reports_recorded_tokens(self):
+        corpus = ReplayCorpus([{
+            "key": ReplayCorpus.key("q", None, 0.7, 1000),
+            "signature": ReplayCorpus.signature(None, 0.7, 1000),
+            "latency": 0.0,
+            "prompt_tokens": 321,
+            "completion_tokens": 54,
+            "response": "answer"
+        }])
+        metrics = AIMetrics()
+        with patch("app.ai.providers.ai_metrics", metrics):
+            await ReplayProvider(corpus).generate("q", operation="chat")
+
+        entry = metrics.report(await metrics.totals(1))["providers"]["replay"]["chat"]
+        assert (entry["prompt_tokens"], entry["completion_tokens"]) == (321, 54)
+
+    async def test_service_runs_against_a_recording(self):
+        recorder = RecordingProvider(FakeProvider(EVALUATION))
+        service = AIService()
+        service.google_provider, service.openai_provider = recorder, None
+        live = await service.evaluate_response("What did you improve?", ANSWER)
+
+        replayed_service = AIService()
+        replayed_service.google_provider = ReplayProvider(recorder.corpus, latency_scale=0, strict=True)
+        replayed_service.openai_provider = None
+        replayed = await replayed_service.evaluate_response("What did you improve?", ANSWER)
+
+        assert replayed == live
+        assert replayed["score"] == 7
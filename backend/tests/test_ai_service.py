@@ -88,9 +88,9 @@ class TestAIService:
         ai_service_instance = AIService()
         
         responses = [
-            {"question": "Q1", "response": "Response 1"},
-            {"question": "Q2", "response": "Response 2"},
-            {"question": "Q3", "response": "Response 3"}
+            {"question_text": "Q1", "response_text": "Response 1"},
+            {"question_text": "Q2", "response_text": "Response 2"},
+            {"question_text": "Q3", "response_text": "Response 3"}
         ]
         
         result = await ai_service_instance.generate_overall_feedback(
@@ -166,37 +166,45 @@ class TestAIService:
         assert "JSON" in prompt
         assert "overall score" in prompt.lower()
 
-    def test_basic_evaluation(self):
-        """Test basic evaluation method."""
+    def test_offline_evaluation(self):
+        """Test offline evaluation used when AI is unavailable."""
         ai_service_instance = AIService()
-        
+        question = "Tell me about a time you improved the performance of a system."
+
         # Test with short response
-        result = ai_service_instance._basic_evaluation("Short")
-        assert result["score"] >= 5.0
-        assert "Response recorded" in result["feedback"]
-        
-        # Test with longer response
-        long_response = "This is a very long response " * 10
-        result = ai_service_instance._basic_evaluation(long_response)
-        assert result["score"] > 5.0
-        assert result["score"] <= 8.0
+        short = ai_service_instance._offline("fallback", question, "Short")
+        assert short["evaluator"] == "offline"
+        assert 0 <= short["score"] < 3.0
+
+        # Test with a structured, relevant, quantified response
+        star_response = (
+            "At my previous job our checkout system was slow. My task was to improve its performance "
+            "before the holiday sale. I analyzed the traces, I refactored the slowest database queries "
+            "and I introduced a cache. As a result we reduced p95 latency by 60% and served 3x more requests."
+        )
+        result = ai_service_instance._offline("fallback", question, star_response)
+        assert result["score"] > short["score"] + 3
+        assert result["score"] <= 10.0
+        assert "Clear situation-task-action-result structure" in result["strengths"]
 
-    def test_basic_feedback(self):
-        """Test basic feedback method."""
+    def test_offline_feedback(self):
+        """Test offline feedback method."""
         ai_service_instance = AIService()
         
+        # As stored by submit_response, with question text added by feedback_responses()
         responses = [
-            {"response": "Response 1"},
-            {"response": "Response 2"},
-            {"response": ""}  # Empty response
+            {"question_text": "What is Python?", "response_text": "Python is a programming language", "time_spent": 40},
+            {"question_text": "What is Java?", "response_text": "Java is a programming language", "time_spent": 35},
+            {"question_text": "What is Go?", "response_text": "   ", "time_spent": 5}  # Blank response
         ]
         
-        result = ai_service_instance._basic_feedback(responses)
+        result = ai_service_instance._offline_feedback(responses)
         
-        assert result["overall_score"] == 66.7  # 2 out of 3 completed
+        assert 0 < result["overall_score"] < 50
         assert "Completed 2 out of 3 questions" in result["overall_feedback"]
-        assert "Completed interview" in result["strengths"]
-        assert "AI analysis not available" in result["weaknesses"]
+        assert "AI analysis not available" in result["overall_feedback"]
+        assert "1 of 3 questions left unanswered" in result["weaknesses"]
+        assert result["recommendations"]
 
     @pytest.mark.asyncio
     async def test_generate_interview_questions_with_google_mock(self):
@@ -407,7 +415,7 @@ class TestAIIntegration:
         )
         
         assert "score" in result
-        assert result["score"] >= 5.0  # Should have some base score
+        assert result["score"] == 0  # Nothing to score
         assert "feedback" in result
 
     @pytest.mark.asyncio
@@ -0,0 +1,185 @@
+"""
+Unit tests for streaming AI chat and feedback.
+"""
+import json
+from contextlib import aclosing
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.ai import routes
+from app.ai.providers import FakeProvider
+from app.ai.router import ProviderRouter
+from app.ai.service import AIService
+from app.auth.cache import user_cache
+from app.auth.utils import create_access_token
+from app.models import get_database
+
+FEEDBACK = {
+    "overall_score": 75,
+    "overall_feedback": "Solid answers overall",
+    "strengths": ["Clear structure"],
+    "weaknesses": ["Few examples"],
+    "recommendations": ["Use STAR"],
+    "communication_score": 8,
+    "technical_score": 7,
+    "problem_solving_score": 6,
+    "behavioral_score": 8
+}
+
+RESPONSES = [{"question_text": "Q1", "response_text": "A1"}]
+
+
+@pytest.fixture(autouse=True)
+def no_redis():
+    with patch("app.ai.result_cache.models.redis_client", None):
+        yield
+
+
+def service_with(provider):
+    service = AIService()
+    service.google_provider = provider
+    service.openai_provider = None
+    return service
+
+
+def user():
+    current_user = MagicMock()
+    current_user.role.value = "candidate"
+    return current_user
+
+
+@pytest.mark.asyncio
+class TestProviderStreaming:
+    async def test_stream_yields_chunks(self):
+        provider = FakeProvider("one two three")
+
+        chunks = [chunk async for chunk in provider.stream("p")]
+
+        assert chunks == ["one", " two", " three"]
+        assert provider.get_stats()["requests"] == 1
+
+    async def test_closing_early_stops_generation_and_frees_slot(self):
+        provider = FakeProvider(" ".join(["word"] * 50), latency=0.05)
+
+        async with aclosing(provider.stream("p")) as chunks:
+            async for _ in chunks:
+                break
+
+        assert provider.chunks_sent == 1
+        assert provider.cancelled == 1
+        assert provider.get_stats()["in_flight"] == 0
+
+    async def test_router_fails_over_before_first_chunk(self):
+        router = ProviderRouter(lambda: [FakeProvider(error=RuntimeError("down")), FakeProvider("ok")])
+
+        assert [chunk async for chunk in router.stream("p")] == ["ok"]
+        assert router.failovers == 1
+
+
+@pytest.mark.asyncio
+class TestFeedbackStreaming:
+    async def test_sections_arrive_before_the_reply_finishes(self):
+        provider = FakeProvider(json.dumps(FEEDBACK))
+        service = service_with(provider)
+        sent_at_first_section = None
+
+        events = []
+        async for event in service.stream_overall_feedback(RESPONSES, "Engineer", "mid"):
+            if sent_at_first_section is None:
+                sent_at_first_section = provider.chunks_sent
+            events.append(event)
+
+        assert sent_at_first_section < provider.chunks_sent
+        assert [event["section"] for event in events[:-1]] == list(FEEDBACK)
+        assert events[-1] == {"feedback": FEEDBACK}
+
+    async def test_completed_stream_is_cached(self):
+        provider = FakeProvider(json.dumps(FEEDBACK))
+        service = service_with(provider)
+
+        [event async for event in service.stream_overall_feedback(RESPONSES, "Engineer", "mid")]
+        feedback = await service.generate_overall_feedback(RESPONSES, "Engineer", "mid")
+
+        assert feedback == FEEDBACK
+        assert len(provider.prompts) == 1
+
+    async def test_unusable_reply_ends_with_basic_feedback(self):
+        service = service_with(FakeProvider("I cannot rate this"))
+
+        events = [event async for event in service.stream_overall_feedback(RESPONSES, "Engineer", "mid")]
+
+        assert "AI analysis not available" in events[-1]["feedback"]["overall_feedback"]
+        assert [event["section"] for event in events[:-1]] == list(FEEDBACK)
+
+
+@pytest.mark.asyncio
+class TestChatStreaming:
+    async def test_completed_reply_is_cached(self):
+        provider = FakeProvider("Use the STAR method")
+        with patch.object(routes, "ai_service", service_with(provider)):
+            first = [chunk async for chunk in routes.stream_ai_response("STAR?", "gemini")]
+            second = [chunk async for chunk in routes.stream_ai_response("star?", "gemini")]
+            reply = await routes.generate_ai_response("STAR?", "gemini")
+
+        assert len(first) == 4
+        assert second == ["Use the STAR method"]
+        assert reply["content"] == "Use the STAR method"
+        assert len(provider.prompts) == 1
+
+    async def test_failure_before_first_chunk_sends_fallback(self):
+        with patch.object(routes, "ai_service", service_with(FakeProvider(error=RuntimeError("down")))):
+            chunks = [chunk async for chunk in routes.stream_ai_response("star method", "gemini")]
+
+        assert "STAR method" in chunks[0]
+
+    async def test_sse_endpoint_emits_deltas_then_done(self):
+        with patch.object(routes, "ai_service", service_with(FakeProvider("Hello there"))):
+            response = await routes.stream_chat_with_ai(routes.ChatRequest(message="Hi", model="gemini"), user())
+            body = "".join([message async for message in response.body_iterator])
+
+        assert response.media_type == "text/event-stream"
+        assert body.count("event: delta") == 2
+        assert 'data: {"content": " there"}' in body
+        done = json.loads(body.split("event: done\ndata: ")[1])
+        assert done["model_used"] == "gemini"
+        assert done["conversation_id"]
+
+
+class TestChatWebSocket:
+    USER = {
+        "_id": "ws-user", "email": "ws@example.com", "full_name": "Socket User",
+        "password_hash": "x", "status": "active"
+    }
+
+    def client(self):
+        db = MagicMock()
+        db.users.find_one = AsyncMock(return_value=dict(self.USER))
+        app = FastAPI()
+        app.include_router(routes.router)
+        app.dependency_overrides[get_database] = lambda: db
+        return TestClient(app)
+
+    def setup_method(self):
+        user_cache.invalidate_local(self.USER["_id"])
+
+    def test_token_in_query_authenticates_and_streams(self):
+        token = create_access_token({"sub": self.USER["_id"], "email": self.USER["email"], "role": "candidate"})
+
+        with patch.object(routes, "ai_service", service_with(FakeProvider("Hello there"))):
+            with self.client().websocket_connect(f"/chat/ws?token={token}") as websocket:
+                websocket.send_json({"message": "Hi", "model": "gemini"})
+                messages = [websocket.receive_json() for _ in range(3)]
+
+        assert [message["type"] for message in messages] == ["delta", "delta", "done"]
+        assert "".join(message["content"] for message in messages[:2]) == "Hello there"
+
+    def test_handshake_without_valid_token_is_refused(self):
+        with pytest.raises(WebSocketDisconnect) as refused:
+            with self.client().websocket_connect("/chat/ws?token=not-a-token"):
+                pass
+
+        assert refused.value.code == 1008
@@ -0,0 +1,147 @@
+"""
+Unit tests for bulk user provisioning.
+"""
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from pymongo.errors import BulkWriteError
+
+from app.users.provisioning import (
+    BulkProvisioner, CSV_FORMAT, NDJSON_FORMAT, detect_format, iter_lines, iter_records
+)
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def make_db(existing_emails=()):
+    db = MagicMock()
+    db.users.find = MagicMock(return_value=FakeCursor([{"email": email} for email in existing_emails]))
+    db.users.insert_many = AsyncMock()
+    collections = {}
+
+    def get_collection(name):
+        collections.setdefault(name, MagicMock(insert_many=AsyncMock()))
+        return collections[name]
+
+    db.__getitem__.side_effect = get_collection
+    return db, collections
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+async def collect(provisioner, body: bytes, upload_format: str):
+    records = iter_records(iter_lines(chunks(body[:7], body[7:])), upload_format)
+    return [result async for result in provisioner.run(records)]
+
+
+@pytest.fixture
+def fake_hashing():
+    async def hash_many(passwords):
+        return [f"hashed:{password}" for password in passwords]
+
+    with patch("app.users.provisioning.password_hasher.hash_many", side_effect=hash_many) as mock:
+        yield mock
+
+
+@pytest.mark.unit
+@pytest.mark.database
+class TestBulkProvisioning:
+    """Test parsing, validation and batched inserts."""
+
+    def test_detect_format(self):
+        assert detect_format("text/csv; charset=utf-8") == CSV_FORMAT
+        assert detect_format("application/x-ndjson") == NDJSON_FORMAT
+        assert detect_format(None) == NDJSON_FORMAT
+
+    @pytest.mark.asyncio
+    async def test_ndjson_rows_are_created_in_one_batch(self, fake_hashing):
+        db, collections = make_db()
+        body = "\n".join(json.dumps(row) for row in [
+            {"email": "a@example.com", "full_name": "A", "password": "Secret123!"},
+            {"email": "b@example.com", "full_name": "B", "password": "Secret123!", "role": "recruiter"},
+        ]).encode()
+
+        results = await collect(BulkProvisioner(db, batch_size=10), body, NDJSON_FORMAT)
+
+        assert [r["status"] for r in results[:-1]] == ["created", "created"]
+        assert results[-1] == {"summary": {"total": 2, "created": 2, "failed": 0}}
+        db.users.find.assert_called_once()
+        db.users.insert_many.assert_awaited_once()
+        assert db.users.insert_many.call_args.kwargs["ordered"] is False
+        documents = db.users.insert_many.call_args.args[0]
+        assert documents[0]["password_hash"] == "hashed:Secret123!"
+        assert "password" not in documents[0]
+        assert "candidate_profiles" in collections
+        assert "recruiter_profiles" in collections
+        fake_hashing.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_csv_with_row_errors(self, fake_hashing):
+        db, _ = make_db(existing_emails=["taken@example.com"])
+        body = (
+            "\ufeffemail,full_name,password\n"
+            "new@example.com,New User,Secret123!\n"
+            "taken@example.com,Taken,Secret123!\n"
+            "new@example.com,Dupe,Secret123!\n"
+            "weak@example.com,Weak,password1\n"
+            "not-an-email,Bad,Secret123!\n"
+        ).encode()
+
+        results = await collect(BulkProvisioner(db, batch_size=100), body, CSV_FORMAT)
+        by_row = {r["row"]: r for r in results[:-1]}
+
+        assert by_row[1]["status"] == "created"
+        assert by_row[2]["error"] == "Email already registered"
+        assert by_row[3]["error"] == "Duplicate email in upload"
+        assert by_row[4]["error"] == "Password does not meet requirements"
+        assert by_row[5]["status"] == "error"
+        assert results[-1]["summary"] == {"total": 5, "created": 1, "failed": 4}
+
+    @pytest.mark.asyncio
+    async def test_insert_race_reports_duplicate(self, fake_hashing):
+        db, _ = make_db()
+        db.users.insert_many = AsyncMock(side_effect=BulkWriteError({
+            "writeErrors": [{"index": 1, "code": 11000, "errmsg": "E11000 duplicate key"}]
+        }))
+        body = (
+            b'{"email": "a@example.com", "full_name": "A", "password": "Secret123!"}\n'
+            b'{"email": "b@example.com", "full_name": "B", "password": "Secret123!"}\n'
+            b'[1, 2]\n'
+        )
+
+        results = await collect(BulkProvisioner(db, batch_size=10), body, NDJSON_FORMAT)
+        by_row = {r["row"]: r for r in results[:-1]}
+
+        assert by_row[1]["status"] == "created"
+        assert by_row[2]["error"] == "Email already registered"
+        assert by_row[3]["error"].startswith("Malformed row")
+
+    @pytest.mark.asyncio
+    async def test_row_limit(self, fake_hashing):
+        db, _ = make_db()
+        body = "\n".join(
+            json.dumps({"email": f"u{i}@example.com", "full_name": "U", "password": "Secret123!"})
+            for i in range(5)
+        ).encode()
+
+        results = await collect(BulkProvisioner(db, batch_size=2, max_rows=3), body, NDJSON_FORMAT)
+
+        assert results[-1]["summary"]["created"] == 3
+        assert results[-1]["summary"]["truncated"] is True
+        assert db.users.insert_many.await_count == 2
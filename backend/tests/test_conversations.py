@@ -0,0 +1,221 @@
+"""
+Unit tests for server-side AI chat conversations.
+"""
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.ai import routes
+from app.ai.conversations import ConversationStore, Conversation, estimate_tokens
+from app.ai.providers import FakeProvider
+from app.ai.service import AIService
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for conversations."""
+
+    def __init__(self):
+        self.values = {}
+        self.lists = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.lists.pop(key, None)
+
+    async def lrange(self, key, start, end):
+        items = self.lists.get(key, [])
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    async def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+
+    async def ltrim(self, key, start, end):
+        self.lists[key] = self.lists.get(key, [])[start:]
+
+    async def expire(self, key, seconds):
+        return True
+
+
+@pytest.fixture(autouse=True)
+def no_redis():
+    with patch("app.ai.conversations.models.redis_client", None), \
+            patch("app.ai.result_cache.models.redis_client", None):
+        yield
+
+
+def reply(prompt):
+    if prompt.startswith("Update the running summary"):
+        return "User is preparing for a backend interview."
+    return "Answer " + "x" * 200
+
+
+def make_store(provider=None, **kwargs):
+    service = AIService()
+    service.google_provider = provider or FakeProvider(reply)
+    service.openai_provider = None
+    return service, ConversationStore(service, **kwargs)
+
+
+def user():
+    current_user = MagicMock()
+    current_user.id = "u1"
+    current_user.role.value = "candidate"
+    return current_user
+
+
+async def settle(store):
+    await asyncio.gather(*list(store._background))
+
+
+class TestWindow:
+    def test_keeps_newest_turns_within_budget(self):
+        _, store = make_store(history_tokens=36)
+        turns = [{"role": "user", "content": f"message {i} " + "y" * 36} for i in range(5)]
+
+        window = store.window(Conversation("", turns))
+
+        assert window == turns[-3:]
+        assert sum(estimate_tokens(turn["content"]) for turn in window) <= 36
+
+    def test_context_puts_summary_first(self):
+        _, store = make_store()
+        context = store.context(Conversation("Earlier talk", [{"role": "user", "content": "Hi"}]))
+
+        assert context == "summary of earlier messages: Earlier talk\nuser: Hi"
+
+
+@pytest.mark.asyncio
+class TestStore:
+    async def test_record_and_load(self):
+        _, store = make_store()
+        await store.record("u1", "c1", Conversation("", []), "Hi", "Hello")
+
+        assert (await store.load("u1", "c1")).turns == [
+            {"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}
+        ]
+        assert (await store.load("u2", "c1")).turns == []
+
+    async def test_compaction_folds_old_turns_into_summary(self):
+        _, store = make_store(history_tokens=200)
+        for i in range(6):
+            await store.record("u1", "c1", await store.load("u1", "c1"), f"Question {i}", "z" * 200)
+            await settle(store)
+
+        conversation = await store.load("u1", "c1")
+        assert conversation.summary == "User is preparing for a backend interview."
+        assert sum(estimate_tokens(turn["content"]) for turn in conversation.turns) <= 200
+        assert store.compactions >= 1
+
+    async def test_failed_summary_keeps_turns(self):
+        _, store = make_store(FakeProvider(error=RuntimeError("down")), history_tokens=50, max_turns=6)
+        for i in range(5):
+            await store.record("u1", "c1", await store.load("u1", "c1"), f"Question {i}", "z" * 200)
+            await settle(store)
+
+        conversation = await store.load("u1", "c1")
+        assert conversation.summary == ""
+        assert len(conversation.turns) == 6
+        assert store.compaction_failures >= 1
+
+    async def test_redis_storage(self):
+        client = FakeRedis()
+        _, store = make_store(history_tokens=200)
+        with patch("app.ai.conversations.models.redis_client", client):
+            for i in range(6):
+                await store.record("u1", "c1", await store.load("u1", "c1"), f"Question {i}", "z" * 200)
+                await settle(store)
+
+            conversation = await store.load("u1", "c1")
+            await store.delete("u1", "c1")
+            deleted = await store.load("u1", "c1")
+
+        assert conversation.summary
+        assert conversation.turns[-1] == {"role": "assistant", "content": "z" * 200}
+        assert not store._local
+        assert deleted == Conversation("", [])
+
+
+@pytest.mark.asyncio
+class TestChatRoutes:
+    async def test_prompt_size_stays_bounded(self):
+        provider = FakeProvider(reply)
+        service, store = make_store(provider, history_tokens=300)
+
+        with patch.object(routes, "ai_service", service), patch.object(routes, "conversation_store", store):
+            first = await routes.chat_with_ai(routes.ChatRequest(message="Hi", model="gemini"), user())
+            for i in range(30):
+                response = await routes.chat_with_ai(
+                    routes.ChatRequest(message=f"Follow-up {i}", model="gemini", conversation_id=first.conversation_id),
+                    user()
+                )
+                await settle(store)
+
+        chat_prompts = [prompt for prompt in provider.prompts if not prompt.startswith("Update the running summary")]
+        system = len(routes.chat_system_prompt("gemini", "candidate"))
+        assert response.conversation_id == first.conversation_id
+        assert "backend interview" in chat_prompts[-1]
+        assert max(len(prompt) for prompt in chat_prompts) < system + (300 + 300) * 4 + 500
+
+    async def test_gpt4_gets_the_conversation_context(self):
+        openai = FakeProvider(lambda prompt: f"Reply {len(prompt)}")
+        service, store = make_store()
+        service.openai_provider = openai
+
+        with patch.object(routes, "ai_service", service), patch.object(routes, "conversation_store", store):
+            first = await routes.chat_with_ai(routes.ChatRequest(message="I am a Go developer", model="gpt-4"), user())
+            await settle(store)
+            await routes.chat_with_ai(
+                routes.ChatRequest(message="Yes", model="gpt-4", conversation_id=first.conversation_id), user()
+            )
+            # Same message in a fresh conversation is not answered from the cache
+            await routes.chat_with_ai(routes.ChatRequest(message="Yes", model="gpt-4"), user())
+
+        assert len(openai.prompts) == 3
+        assert "I am a Go developer" in openai.prompts[1]
+        assert openai.prompts[1].endswith("User: Yes\n\nAssistant:")
+        assert "I am a Go developer" not in openai.prompts[2]
+
+    async def test_client_context_keeps_stateless_behavior(self):
+        service, store = make_store()
+        request = routes.ChatRequest(message="Hi", model="gemini", context=[routes.ChatMessage(role="user", content="Earlier")])
+
+        with patch.object(routes, "ai_service", service), patch.object(routes, "conversation_store", store):
+            response = await routes.chat_with_ai(request, user())
+
+        assert response.conversation_id is None
+        assert not store._local
+
+
+class TestSystemPrompts:
+    def test_prompts_are_formatted_once(self):
+        assert routes.chat_system_prompt("gpt-4", "admin") is routes.chat_system_prompt("gpt-4", "admin")
+        assert "Current user is a admin" in routes.chat_system_prompt("gpt-4", "admin")
+
+    def test_unknown_model_uses_grok(self):
+        assert routes.chat_system_prompt("unknown", "candidate") == routes.chat_system_prompt("grok", "candidate")
@@ -0,0 +1,146 @@
+"""
+Unit tests for the count service.
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.utils.counts import CountService
+
+
+class FakeCollection:
+    def __init__(self, size):
+        self.size = size
+        self.estimated_document_count = AsyncMock(return_value=size)
+        self.count_documents = AsyncMock(side_effect=self._count)
+
+    async def _count(self, query, limit=0):
+        return min(self.size, limit) if limit else self.size
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for counters."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = str(value)
+        return True
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+    def register_script(self, script):
+        async def increment_if_exists(keys, args):
+            if keys[0] in self.values:
+                self.values[keys[0]] = str(int(self.values[keys[0]]) + int(args[0]))
+                return int(self.values[keys[0]])
+            return None
+        return increment_if_exists
+
+
+@pytest.fixture
+def redis_client():
+    client = FakeRedis()
+    with patch("app.utils.counts.models.redis_client", client):
+        yield client
+
+
+@pytest.fixture
+def no_redis():
+    with patch("app.utils.counts.models.redis_client", None):
+        yield
+
+
+@pytest.mark.asyncio
+class TestCountStrategies:
+    async def test_unfiltered_uses_estimate(self):
+        service = CountService()
+        collection = FakeCollection(1_000_000)
+
+        assert await service.count(collection, {}) == (1_000_000, False)
+        collection.count_documents.assert_not_awaited()
+
+    async def test_small_filtered_count_is_exact(self):
+        service = CountService(exact_limit=100)
+
+        assert await service.count(FakeCollection(42), {"action": "login"}) == (42, True)
+
+    async def test_large_filtered_count_is_capped(self):
+        service = CountService(exact_limit=100)
+        collection = FakeCollection(5000)
+
+        assert await service.count(collection, {"action": "login"}) == (100, False)
+        assert collection.count_documents.await_args.kwargs["limit"] == 101
+
+    async def test_count_at_limit_is_exact(self):
+        service = CountService(exact_limit=100)
+
+        assert await service.count(FakeCollection(100), {"action": "login"}) == (100, True)
+
+
+@pytest.mark.asyncio
+class TestCachedCounters:
+    async def test_miss_seeds_counter_then_hits(self, redis_client):
+        service = CountService()
+        collection = FakeCollection(7)
+        key = service.counter_key("resumes", "user_id", "u1")
+
+        assert await service.count(collection, {"user_id": "u1"}, counter_key=key) == (7, True)
+        assert await service.count(collection, {"user_id": "u1"}, counter_key=key) == (7, True)
+        assert collection.count_documents.await_count == 1
+        assert service.get_stats()["cache_hits"] == 1
+
+    async def test_write_paths_adjust_populated_counter(self, redis_client):
+        service = CountService()
+        collection = FakeCollection(3)
+        key = service.counter_key("resumes", "user_id", "u1")
+        await service.count(collection, {"user_id": "u1"}, counter_key=key)
+
+        await service.adjust(key, 1)
+        await service.adjust(key, 1)
+        await service.adjust(key, -1)
+
+        assert await service.count(collection, {"user_id": "u1"}, counter_key=key) == (4, True)
+
+    async def test_adjust_does_not_create_missing_counter(self, redis_client):
+        service = CountService()
+        key = service.counter_key("resumes", "user_id", "u1")
+
+        await service.adjust(key, 1)
+
+        assert key not in redis_client.values
+
+    async def test_invalidate_forces_rebuild(self, redis_client):
+        service = CountService()
+        collection = FakeCollection(3)
+        key = service.counter_key("resumes", "user_id", "u1")
+        await service.count(collection, {"user_id": "u1"}, counter_key=key)
+
+        await service.invalidate(key)
+        collection.size = 0
+
+        assert await service.count(collection, {"user_id": "u1"}, counter_key=key) == (0, True)
+
+    async def test_redis_errors_fall_back_to_capped_count(self):
+        client = MagicMock()
+        client.get = AsyncMock(side_effect=ConnectionError("down"))
+        service = CountService(exact_limit=10)
+
+        with patch("app.utils.counts.models.redis_client", client):
+            result = await service.count(FakeCollection(50), {"user_id": "u1"}, counter_key="k")
+
+        assert result == (10, False)
+
+    @pytest.mark.usefixtures("no_redis")
+    async def test_without_redis_uses_capped_count(self):
+        service = CountService()
+
+        await service.adjust("k", 1)
+        assert await service.count(FakeCollection(5), {"user_id": "u1"}, counter_key="k") == (5, True)
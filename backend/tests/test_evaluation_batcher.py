@@ -0,0 +1,186 @@
+"""
+Unit tests for micro-batched response evaluation.
+"""
+import asyncio
+import json
+import re
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.ai.batching import EvaluationBatcher
+from app.ai.providers import FakeProvider
+from app.ai.service import AIService
+
+
+def batch_reply(prompt):
+    """Score every item in a batch prompt by its id."""
+    ids = [int(match) for match in re.findall(r'"id": (\d+), "question"', prompt)]
+    return json.dumps([
+        {"id": i, "score": i + 1, "feedback": f"item {i}", "strengths": [], "improvements": []}
+        for i in ids
+    ])
+
+
+def make_service(response=batch_reply):
+    service = AIService()
+    service.google_provider = FakeProvider(response)
+    service.openai_provider = None
+    return service
+
+
+def make_db():
+    db = MagicMock()
+    db.interviews.bulk_write = AsyncMock()
+    return db
+
+
+def written(db):
+    """Map (interview_id, question_index) -> ai_score from every bulk_write."""
+    scores = {}
+    for call in db.interviews.bulk_write.await_args_list:
+        for operation in call.args[0]:
+            interview_id = operation._filter["_id"]
+            for key, value in operation._doc["$set"].items():
+                if key.endswith(".ai_score"):
+                    scores[(interview_id, int(key.split(".")[1]))] = value
+    return scores
+
+
+@pytest.mark.asyncio
+class TestEvaluateResponses:
+    async def test_one_call_for_many_items(self):
+        service = make_service()
+
+        results = await service.evaluate_responses([(f"Q{i}", f"A{i}") for i in range(5)])
+
+        assert [r["score"] for r in results] == [1, 2, 3, 4, 5]
+        assert len(service.google_provider.prompts) == 1
+        assert "id" not in results[0]
+
+    async def test_missing_items_fall_back_individually(self):
+        reply = json.dumps([{"id": 0, "score": 9, "feedback": "ok", "strengths": [], "improvements": []},
+                            {"id": 1, "feedback": "no score"}])
+        service = make_service(reply)
+
+        results = await service.evaluate_responses([("Q0", "A0"), ("Q1", "A1"), ("Q2", "A2")])
+
+        assert results[0]["score"] == 9
+        assert results[1]["evaluator"] == "offline"
+        assert results[2]["evaluator"] == "offline"
+
+    async def test_unparseable_batch_falls_back_for_every_item(self):
+        service = make_service("Sorry, I cannot help with that.")
+
+        results = await service.evaluate_responses([("Q0", "A0"), ("Q1", "A1")])
+
+        assert all(r["evaluator"] == "offline" for r in results)
+
+
+@pytest.mark.asyncio
+class TestEvaluationBatcher:
+    async def test_window_collects_submissions_into_one_batch(self):
+        service = make_service()
+        db = make_db()
+        batcher = EvaluationBatcher(service, window_seconds=0.05, max_batch_size=10)
+        batcher.start(db)
+
+        for i in range(4):
+            batcher.submit(f"interview-{i}", 0, "Q", "A")
+        await asyncio.sleep(0.15)
+        await batcher.stop()
+
+        assert len(service.google_provider.prompts) == 1
+        assert db.interviews.bulk_write.await_count == 1
+        assert len(written(db)) == 4
+        assert batcher.get_stats()["avg_batch_size"] == 4
+
+    async def test_size_cap_flushes_before_window(self):
+        service = make_service()
+        db = make_db()
+        batcher = EvaluationBatcher(service, window_seconds=10, max_batch_size=3)
+        batcher.start(db)
+
+        for i in range(3):
+            batcher.submit("interview", i, "Q", "A")
+        await asyncio.sleep(0.05)
+
+        assert db.interviews.bulk_write.await_count == 1
+        await batcher.stop()
+
+    async def test_flush_splits_into_capped_batches(self):
+        service = make_service()
+        db = make_db()
+        batcher = EvaluationBatcher(service, max_batch_size=4)
+        batcher._db = db
+
+        for i in range(10):
+            batcher.submit("interview", i, "Q", "A")
+
+        assert await batcher.flush() == 10
+        assert len(service.google_provider.prompts) == 3
+        assert len(written(db)) == 10
+
+    async def test_resubmitted_answer_replaces_queued_one(self):
+        service = make_service()
+        db = make_db()
+        batcher = EvaluationBatcher(service)
+        batcher._db = db
+
+        batcher.submit("interview", 0, "Q", "first")
+        batcher.submit("interview", 0, "Q", "second")
+        await batcher.flush()
+
+        assert batcher.evaluated == 1
+
+    async def test_write_failure_is_counted(self):
+        service = make_service()
+        db = make_db()
+        db.interviews.bulk_write.side_effect = RuntimeError("down")
+        batcher = EvaluationBatcher(service)
+        batcher._db = db
+
+        batcher.submit("interview", 0, "Q", "A")
+
+        assert await batcher.flush() == 0
+        assert batcher.errors == 1
+
+    async def test_evaluate_waits_for_the_written_result(self):
+        service = make_service()
+        db = make_db()
+        batcher = EvaluationBatcher(service, window_seconds=0.02)
+        batcher.start(db)
+
+        first, second = await asyncio.gather(
+            batcher.evaluate("interview-a", 0, "Q", "A"),
+            batcher.evaluate("interview-b", 0, "Q", "A")
+        )
+        await batcher.stop()
+
+        assert (first["score"], second["score"]) == (1, 2)
+        assert db.interviews.bulk_write.await_count == 1
+
+    async def test_each_item_carries_its_user(self):
+        service = make_service()
+        service.evaluate_responses = AsyncMock(wraps=service.evaluate_responses)
+        batcher = EvaluationBatcher(service, window_seconds=0.02)
+        batcher.start(make_db())
+
+        await asyncio.gather(
+            batcher.evaluate("interview-a", 0, "Q", "A", user_id="user-a"),
+            batcher.evaluate("interview-b", 0, "Q", "A", user_id="user-b")
+        )
+        await batcher.stop()
+
+        assert service.evaluate_responses.await_args.kwargs["users"] == ["user-a", "user-b"]
+
+    async def test_evaluate_raises_when_the_write_fails(self):
+        service = make_service()
+        db = make_db()
+        db.interviews.bulk_write.side_effect = RuntimeError("down")
+        batcher = EvaluationBatcher(service, window_seconds=0.02)
+        batcher.start(db)
+
+        with pytest.raises(RuntimeError):
+            await batcher.evaluate("interview", 0, "Q", "A")
+        await batcher.stop()
@@ -0,0 +1,132 @@
+"""
+Unit tests for the interview routes' background job hand-off.
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.interviews import routes
+from app.models.user import User
+
+
+def make_user(user_id="u1"):
+    return User(_id=user_id, email="candidate@example.com", full_name="Candidate", password_hash="x")
+
+
+def make_interview(responses=None, **overrides):
+    doc = {
+        "_id": "i1",
+        "user_id": "u1",
+        "status": "in_progress",
+        "job_title": "Engineer",
+        "questions": [{"question_text": f"Question {i}"} for i in range(5)],
+        "responses": responses or []
+    }
+    doc.update(overrides)
+    return doc
+
+
+def make_db(interview):
+    db = MagicMock()
+    db.interviews.find_one = AsyncMock(return_value=interview)
+    db.interviews.update_one = AsyncMock()
+    return db
+
+
+@pytest.mark.asyncio
+class TestSubmitResponse:
+    async def test_response_is_written_before_evaluation_is_queued(self):
+        db = make_db(make_interview(responses=[{"response_text": "a", "ai_score": 7}]))
+        order = []
+        db.interviews.update_one.side_effect = lambda *args, **kwargs: order.append("write")
+
+        with patch.object(routes, "job_queue") as queue:
+            queue.enqueue = AsyncMock(side_effect=lambda *args, **kwargs: order.append("enqueue") or "job-1")
+            result = await routes.submit_response("i1", 0, "new answer", 30, current_user=make_user(), db=db)
+
+        assert order == ["write", "enqueue"]
+        assert result["job_id"] == "job-1"
+        update = db.interviews.update_one.await_args.args[1]["$set"]
+        assert "responses" not in update
+        assert update["responses.0.response_text"] == "new answer"
+        assert update["responses.0.time_spent"] == 30
+        assert queue.enqueue.await_args.args[1]["user_id"] == "u1"
+
+    async def test_skipped_questions_are_padded_with_empty_responses(self):
+        db = make_db(make_interview(responses=[{"response_text": "a"}]))
+
+        with patch.object(routes, "job_queue") as queue:
+            queue.enqueue = AsyncMock(return_value="job-1")
+            await routes.submit_response("i1", 3, "answer", None, current_user=make_user(), db=db)
+
+        pad, write = db.interviews.update_one.await_args_list
+        assert pad.args[0] == {"_id": "i1", "responses": {"$size": 1}}
+        assert pad.args[1] == {"$push": {"responses": {"$each": [{}, {}]}}}
+        assert write.args[1]["$set"]["responses.3.response_text"] == "answer"
+
+
+@pytest.mark.asyncio
+class TestEvaluateResponseJob:
+    async def test_batched_evaluation_is_charged_to_the_candidate(self):
+        with patch.object(routes, "evaluation_batcher") as batcher, patch.object(routes, "bind_user") as bind:
+            batcher.running = True
+            batcher.evaluate = AsyncMock(return_value={"score": 7})
+            result = await routes.evaluate_response_background("i1", 0, "Q", "A", user_id="u1")
+
+        bind.assert_called_once_with("u1")
+        assert batcher.evaluate.await_args.kwargs["user_id"] == "u1"
+        assert result["ai_score"] == 7
+
+
+class TestFeedbackResponses:
+    def test_responses_get_their_question_text(self):
+        interview = routes.InterviewSession(**make_interview(responses=[{"response_text": "a"}, {}]))
+
+        responses = routes.feedback_responses(interview)
+
+        assert responses == [
+            {"question_text": "Question 0", "response_text": "a"},
+            {"question_text": "Question 1"}
+        ]
+
+    def test_good_answer_scores_offline(self):
+        interview = routes.InterviewSession(**make_interview(responses=[{
+            "response_text": "In my last role I led the migration of our billing service to Python, "
+                             "which cut p95 latency by 40% and removed two on-call incidents a month.",
+            "time_spent": 90
+        }]))
+
+        feedback = routes.ai_service.offline_scorer.feedback(routes.feedback_responses(interview))
+
+        assert feedback["overall_score"] > 0
+        assert "Completed 1 out of 1 questions" in feedback["overall_feedback"]
+        assert not any("unanswered" in weakness for weakness in feedback["weaknesses"])
+
+
+@pytest.mark.asyncio
+class TestCompleteInterview:
+    async def complete(self, stream_feedback):
+        db = make_db(make_interview())
+        redis_client = MagicMock()
+        redis_client.delete = AsyncMock()
+
+        with patch.object(routes, "job_queue") as queue:
+            queue.enqueue = AsyncMock(return_value="job-1")
+            result = await routes.complete_interview(
+                "i1", stream_feedback, current_user=make_user(), db=db, redis_client=redis_client
+            )
+        return result, queue.enqueue.await_args
+
+    async def test_feedback_job_runs_right_away_without_streaming(self):
+        result, call = await self.complete(stream_feedback=False)
+
+        assert call.args[0] == "interview.feedback"
+        assert call.kwargs["delay_seconds"] == 0
+        assert result["job_id"] == "job-1"
+
+    async def test_streamed_feedback_still_gets_a_delayed_job(self):
+        result, call = await self.complete(stream_feedback=True)
+
+        assert call.args[0] == "interview.feedback"
+        assert call.kwargs["delay_seconds"] == routes.settings.FEEDBACK_STREAM_FALLBACK_SECONDS > 0
+        assert result["feedback_stream"].endswith("/i1/feedback/stream")
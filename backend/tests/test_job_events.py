@@ -0,0 +1,197 @@
+"""
+Unit tests for pushing job status changes to clients.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.auth.cache import user_cache
+from app.auth.utils import create_access_token
+from app.jobs.events import EVENTS_CHANNEL, JobEvents
+from app.jobs.queue import JobQueue
+from app.jobs.routes import wait_for_job
+from app.models import get_database, get_redis
+from app.models.user import UserRole
+from app.websocket import routes as websocket_routes
+
+
+@pytest.fixture(autouse=True)
+def no_redis():
+    with patch("app.jobs.queue.models.redis_client", None), \
+            patch("app.jobs.events.models.redis_client", None):
+        yield
+
+
+@pytest.fixture
+def events():
+    events = JobEvents(subscriber_buffer=2)
+    with patch("app.jobs.queue.job_events", events), patch("app.jobs.routes.job_events", events):
+        yield events
+
+
+def make_queue():
+    return JobQueue(retry_base_seconds=0.01, poll_interval_seconds=0.01)
+
+
+@pytest.mark.asyncio
+class TestJobEvents:
+    async def test_owner_receives_completion_with_result(self, events):
+        queue = make_queue()
+
+        async def process(resume_id):
+            return {"resume_id": resume_id, "processing_status": "completed"}
+
+        queue.register("resume.process", process)
+        async with events.subscribe("owner") as owner, events.subscribe("other") as other:
+            queue.start()
+            try:
+                job_id = await queue.enqueue("resume.process", {"resume_id": "r1"}, user_id="owner")
+                event = await asyncio.wait_for(owner.get(), timeout=1)
+            finally:
+                await queue.stop()
+
+            assert event["id"] == job_id
+            assert event["status"] == "succeeded"
+            assert event["result"] == {"resume_id": "r1", "processing_status": "completed"}
+            assert "payload" not in event
+            assert other.empty()
+
+    async def test_retries_and_dead_letters_are_pushed(self, events):
+        queue = make_queue()
+
+        async def broken():
+            raise RuntimeError("down")
+
+        queue.register("broken", broken, max_attempts=2)
+        async with events.subscribe("owner") as owner:
+            queue.start()
+            try:
+                await queue.enqueue("broken", {}, user_id="owner")
+                first = await asyncio.wait_for(owner.get(), timeout=1)
+                second = await asyncio.wait_for(owner.get(), timeout=1)
+            finally:
+                await queue.stop()
+
+        assert (first["status"], second["status"]) == ("retrying", "dead")
+        assert second["error"] == "RuntimeError: down"
+
+    async def test_slow_subscriber_drops_oldest_events(self, events):
+        async with events.subscribe("owner") as owner:
+            for i in range(3):
+                await events.publish({"id": str(i), "user_id": "owner", "status": "succeeded"})
+
+            assert [owner.get_nowait()["id"] for _ in range(owner.qsize())] == ["1", "2"]
+        assert events.dropped == 1
+        assert events.get_stats()["subscribers"] == 0
+
+    async def test_publishes_through_redis_when_listening(self, events):
+        client = MagicMock()
+        client.publish = AsyncMock()
+        events._listener_task = MagicMock()
+
+        with patch("app.jobs.events.models.redis_client", client):
+            async with events.subscribe("owner") as owner:
+                await events.publish({"id": "j1", "user_id": "owner", "status": "succeeded"})
+
+                assert client.publish.await_args.args[0] == EVENTS_CHANNEL
+                # Delivered by the listener, not twice
+                assert owner.empty()
+
+
+@pytest.mark.asyncio
+class TestWaitForJob:
+    async def test_returns_as_soon_as_the_job_finishes(self, events):
+        queue = make_queue()
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "done"
+
+        queue.register("slow", slow)
+        queue.start()
+        user = SimpleNamespace(id="owner", role=UserRole.CANDIDATE)
+        try:
+            job_id = await queue.enqueue("slow", {}, user_id="owner")
+            with patch("app.jobs.routes.job_queue", queue):
+                waiter = asyncio.create_task(wait_for_job(job_id, timeout=5, current_user=user))
+                await asyncio.sleep(0.05)
+                assert not waiter.done()
+                release.set()
+                job = await asyncio.wait_for(waiter, timeout=1)
+        finally:
+            await queue.stop()
+
+        assert (job["status"], job["result"]) == ("succeeded", "done")
+
+    async def test_times_out_with_the_current_status(self, events):
+        queue = make_queue()
+
+        async def noop():
+            pass
+
+        queue.register("noop", noop)
+        job_id = await queue.enqueue("noop", {}, user_id="owner")
+        user = SimpleNamespace(id="owner", role=UserRole.CANDIDATE)
+
+        with patch("app.jobs.routes.job_queue", queue):
+            job = await wait_for_job(job_id, timeout=0, current_user=user)
+
+        assert job["status"] == "queued"
+
+
+async def _silent():
+    """Redis pub/sub listener that never receives anything."""
+    await asyncio.Event().wait()
+    yield
+
+
+class TestNotificationsWebSocket:
+    USER = {
+        "_id": "ws-user", "email": "ws@example.com", "full_name": "Socket User",
+        "password_hash": "x", "status": "active"
+    }
+
+    def client(self):
+        db = MagicMock()
+        db.users.find_one = AsyncMock(return_value=dict(self.USER))
+        pubsub = MagicMock()
+        pubsub.subscribe = AsyncMock()
+        pubsub.listen = MagicMock(return_value=_silent())
+        redis_client = MagicMock()
+        redis_client.pubsub.return_value = pubsub
+
+        app = FastAPI()
+        app.include_router(websocket_routes.router)
+        app.dependency_overrides[get_database] = lambda: db
+        app.dependency_overrides[get_redis] = lambda: redis_client
+        return TestClient(app)
+
+    def test_job_events_are_pushed_over_the_socket(self, events):
+        user_cache.invalidate_local(self.USER["_id"])
+        token = create_access_token({"sub": self.USER["_id"], "email": self.USER["email"], "role": "candidate"})
+
+        with patch.object(websocket_routes, "job_events", events), self.client() as client:
+            with client.websocket_connect(f"/notifications?token={token}") as websocket:
+                # The pong proves the connection's job subscription is in place
+                websocket.send_json({"type": "ping"})
+                assert websocket.receive_json()["type"] == "pong"
+
+                client.portal.call(events.publish, {"id": "j1", "user_id": "ws-user", "status": "succeeded"})
+                message = websocket.receive_json()
+
+        assert message["type"] == "job"
+        assert message["data"]["id"] == "j1"
+        assert message["data"]["status"] == "succeeded"
+
+    def test_handshake_without_token_is_refused(self):
+        with pytest.raises(WebSocketDisconnect) as refused:
+            with self.client().websocket_connect("/notifications"):
+                pass
+
+        assert refused.value.code == 1008
@@ -0,0 +1,212 @@
+"""
+Unit tests for the durable background job queue.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.jobs.queue import PRIORITY_HIGH, PRIORITY_LOW, JobQueue, UnknownJobTypeError
+from app.jobs import worker
+from app.jobs.routes import get_job_status
+from app.models.user import UserRole
+
+
+@pytest.fixture(autouse=True)
+def no_redis():
+    with patch("app.jobs.queue.models.redis_client", None):
+        yield
+
+
+def make_queue(**kwargs):
+    kwargs.setdefault("retry_base_seconds", 0.01)
+    kwargs.setdefault("poll_interval_seconds", 0.01)
+    return JobQueue(**kwargs)
+
+
+async def wait_for_status(queue, job_id, status, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await queue.get(job_id)
+        if job["status"] == status or asyncio.get_running_loop().time() > deadline:
+            return job
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+class TestJobQueue:
+    async def test_runs_handler_with_payload_and_stores_result(self):
+        queue = make_queue()
+
+        async def add(a, b):
+            return a + b
+
+        queue.register("add", add)
+        queue.start()
+        try:
+            job_id = await queue.enqueue("add", {"a": 2, "b": 3}, user_id="u1")
+            job = await wait_for_status(queue, job_id, "succeeded")
+        finally:
+            await queue.stop()
+
+        assert job["result"] == 5
+        assert job["user_id"] == "u1"
+        assert queue.succeeded["add"] == 1
+
+    async def test_higher_priority_jobs_run_first(self):
+        queue = make_queue()
+        order = []
+
+        async def record(name):
+            order.append(name)
+
+        queue.register("record", record)
+        await queue.enqueue("record", {"name": "bulk"}, priority=PRIORITY_LOW)
+        await queue.enqueue("record", {"name": "normal"})
+        last = await queue.enqueue("record", {"name": "live"}, priority=PRIORITY_HIGH)
+        queue.start()
+        try:
+            await wait_for_status(queue, last, "succeeded")
+            await asyncio.sleep(0.05)
+        finally:
+            await queue.stop()
+
+        assert order == ["live", "normal", "bulk"]
+
+    async def test_failed_job_is_retried_with_backoff(self):
+        queue = make_queue()
+        calls = []
+
+        async def flaky():
+            calls.append(asyncio.get_running_loop().time())
+            if len(calls) < 3:
+                raise RuntimeError("provider down")
+            return "ok"
+
+        queue.register("flaky", flaky, max_attempts=3)
+        queue.start()
+        try:
+            job_id = await queue.enqueue("flaky", {})
+            job = await wait_for_status(queue, job_id, "succeeded")
+        finally:
+            await queue.stop()
+
+        assert job["attempts"] == 3
+        assert queue.retried["flaky"] == 2
+        assert calls[1] - calls[0] >= 0.005
+
+    async def test_backoff_grows_exponentially_up_to_the_cap(self):
+        queue = make_queue(retry_base_seconds=2, retry_max_seconds=10)
+
+        assert 1 <= queue.backoff(1) <= 2
+        assert 4 <= queue.backoff(3) <= 8
+        assert 5 <= queue.backoff(10) <= 10
+
+    async def test_exhausted_job_is_dead_lettered_and_can_be_requeued(self):
+        queue = make_queue()
+        fail = True
+
+        async def broken():
+            if fail:
+                raise ValueError("bad payload")
+
+        queue.register("broken", broken, max_attempts=2)
+        queue.start()
+        try:
+            job_id = await queue.enqueue("broken", {})
+            job = await wait_for_status(queue, job_id, "dead")
+            assert job["error"] == "ValueError: bad payload"
+            assert [dead["id"] for dead in await queue.dead_jobs()] == [job_id]
+
+            fail = False
+            assert await queue.requeue_dead(job_id)
+            job = await wait_for_status(queue, job_id, "succeeded")
+        finally:
+            await queue.stop()
+
+        assert job["attempts"] == 1
+        assert await queue.dead_jobs() == []
+
+    async def test_idempotency_key_returns_the_first_job(self):
+        queue = make_queue()
+
+        async def noop():
+            pass
+
+        queue.register("noop", noop)
+        first = await queue.enqueue("noop", {}, idempotency_key="interview-1")
+        again = await queue.enqueue("noop", {}, idempotency_key="interview-1")
+        other = await queue.enqueue("noop", {}, idempotency_key="interview-2")
+
+        assert first == again != other
+        assert queue.enqueued["noop"] == 2
+        assert queue.duplicates["noop"] == 1
+
+    async def test_unknown_job_type_is_rejected(self):
+        with pytest.raises(UnknownJobTypeError):
+            await make_queue().enqueue("missing", {})
+
+    async def test_stop_puts_unfinished_jobs_back(self):
+        queue = make_queue(shutdown_grace_seconds=0.05)
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        queue.register("slow", slow)
+        queue.start()
+        job_id = await queue.enqueue("slow", {})
+        await asyncio.wait_for(started.wait(), timeout=1)
+        await queue.stop()
+
+        job = await queue.get(job_id)
+        assert job["status"] == "queued"
+        assert job["attempts"] == 0
+        assert (await queue.get_stats())["depths"]["default"]["ready"] == 1
+
+
+@pytest.mark.asyncio
+class TestJobRoutes:
+    async def test_job_status_is_visible_to_its_owner_only(self):
+        queue = make_queue()
+
+        async def noop():
+            pass
+
+        queue.register("noop", noop)
+        job_id = await queue.enqueue("noop", {}, user_id="owner")
+        owner = SimpleNamespace(id="owner", role=UserRole.CANDIDATE)
+        other = SimpleNamespace(id="other", role=UserRole.CANDIDATE)
+
+        with patch("app.jobs.routes.job_queue", queue):
+            job = await get_job_status(job_id, current_user=owner)
+            with pytest.raises(HTTPException) as exc:
+                await get_job_status(job_id, current_user=other)
+
+        assert job["status"] == "queued"
+        assert "payload" not in job
+        assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+class TestWorker:
+    async def test_worker_runs_ai_metrics_and_closes_ai_service(self):
+        db_manager = MagicMock(connect=AsyncMock(), disconnect=AsyncMock())
+        ai_metrics = MagicMock(stop=AsyncMock())
+        ai_service = MagicMock(close=AsyncMock())
+        job_queue = MagicMock(stop=AsyncMock())
+        loop = asyncio.get_running_loop()
+
+        with patch.object(worker, "db_manager", db_manager), patch.object(worker, "models"), \
+                patch.object(worker, "ai_metrics", ai_metrics), patch.object(worker, "ai_service", ai_service), \
+                patch.object(worker, "job_queue", job_queue), \
+                patch.object(loop, "add_signal_handler", lambda sig, callback: callback()):
+            await worker.main(SimpleNamespace(pool=["feedback"], concurrency=None))
+
+        ai_metrics.start.assert_called_once_with()
+        ai_metrics.stop.assert_awaited_once()
+        ai_service.close.assert_awaited_once()
+        job_queue.start.assert_called_once_with(["feedback"])
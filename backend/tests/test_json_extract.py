@@ -0,0 +1,177 @@
+"""
+Unit, fuzz and timing tests for incremental JSON extraction.
+"""
+import json
+import random
+import time
+
+import pytest
+
+from app.ai.json_extract import ARRAY, OBJECT, JSONExtractor, extract_json, strip_code_fences
+from app.ai.schemas import OverallFeedback, ResponseEvaluation, validate_output, validate_questions
+
+EVALUATION = {"score": 7.5, "feedback": "Clear {but} short", "strengths": ["a]b"], "improvements": ["quote \" here"]}
+QUESTIONS = [{"question_text": f"Question {i}?", "skills_assessed": ["x"]} for i in range(5)]
+
+
+def chunked(text, rng):
+    """Split text at random points."""
+    cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(1, 40))))
+    return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+class TestExtractJson:
+    def test_plain_json(self):
+        assert extract_json(json.dumps(EVALUATION), OBJECT) == EVALUATION
+
+    def test_code_fence(self):
+        fenced = "```json\n" + json.dumps(QUESTIONS, indent=2) + "\n```"
+
+        assert strip_code_fences(fenced).startswith("[")
+        assert extract_json(fenced, ARRAY) == QUESTIONS
+
+    def test_prose_and_trailing_garbage(self):
+        text = "Sure! Here is {my take}:\n" + json.dumps(EVALUATION) + "\nHope this helps } ] {"
+
+        assert extract_json(text, OBJECT) == EVALUATION
+
+    def test_first_balanced_value_wins_over_greedy_span(self):
+        text = '{"score": 5, "feedback": "a"} and later {"score": 9}'
+
+        assert extract_json(text, OBJECT)["score"] == 5
+
+    def test_brackets_inside_strings_are_ignored(self):
+        text = 'Result: {"feedback": "use } and ] freely \\" still string", "score": 3}'
+
+        assert extract_json(text, OBJECT)["score"] == 3
+
+    def test_truncated_array_keeps_complete_items(self):
+        text = json.dumps(QUESTIONS)[:-40]
+
+        assert extract_json(text, ARRAY) == QUESTIONS[:len(extract_json(text, ARRAY))]
+        assert 0 < len(extract_json(text, ARRAY)) < len(QUESTIONS)
+
+    def test_no_json(self):
+        assert extract_json("I cannot help with that.", OBJECT) is None
+        assert extract_json("", ARRAY) is None
+
+    def test_candidate_limit(self):
+        extractor = JSONExtractor(OBJECT, max_candidates=3)
+        extractor.feed("{]" * 10 + json.dumps(EVALUATION))
+
+        assert extractor.finish() is None
+        assert extractor.done
+
+
+class TestIncremental:
+    def test_members_are_reported_as_they_complete(self):
+        extractor = JSONExtractor(OBJECT)
+        extractor.feed('{"overall_score": 80, "strengths": ["a", ')
+        assert extractor.drain() == [("overall_score", 80)]
+
+        extractor.feed('"b"], "weaknesses": []}')
+        assert extractor.drain() == [("strengths", ["a", "b"]), ("weaknesses", [])]
+        assert extractor.done
+
+    def test_escape_split_across_chunks(self):
+        extractor = JSONExtractor(OBJECT)
+        for chunk in ['{"feedback": "a\\', '"} still \\"string\\"', '", "score": 2}']:
+            extractor.feed(chunk)
+
+        assert extractor.finish() == {"feedback": 'a"} still "string"', "score": 2}
+
+    def test_input_cap_stops_scanning(self):
+        extractor = JSONExtractor(ARRAY, max_chars=100)
+        extractor.feed(json.dumps(QUESTIONS * 10))
+
+        assert extractor.truncated
+        assert extractor.finish() == QUESTIONS[:1]
+
+
+class TestFuzz:
+    @pytest.mark.parametrize("seed", range(200))
+    def test_random_chunking_and_noise(self, seed):
+        rng = random.Random(seed)
+        noise = "".join(rng.choice("abc {}[]\",:\\\n") for _ in range(rng.randint(0, 60)))
+        value = rng.choice([EVALUATION, {"items": QUESTIONS}, {"n": rng.random(), "s": noise}])
+        prefix = noise.replace("{", "(")
+        text = prefix + json.dumps(value) + noise
+
+        extractor = JSONExtractor(OBJECT)
+        for chunk in chunked(text, rng):
+            extractor.feed(chunk)
+
+        assert extractor.finish() == value
+        assert dict(extractor.drain()) == value
+
+    @pytest.mark.parametrize("seed", range(200))
+    def test_random_truncation_never_raises(self, seed):
+        rng = random.Random(seed)
+        text = json.dumps(QUESTIONS)
+        text = text[:rng.randint(0, len(text))]
+
+        result = extract_json(text, ARRAY)
+
+        assert result is None or result == QUESTIONS[:len(result)]
+
+    @pytest.mark.parametrize("seed", range(100))
+    def test_random_garbage_never_raises(self, seed):
+        rng = random.Random(seed)
+        text = "".join(rng.choice('{}[]",:\\ a1') for _ in range(rng.randint(0, 500)))
+
+        for root in (OBJECT, ARRAY):
+            extract_json(text, root)
+
+
+class TestAdversarialInputs:
+    """Inputs that make the greedy DOTALL regex backtrack or grab the wrong span."""
+
+    @pytest.mark.parametrize("text", [
+        "[" * 200_000,
+        "{" * 200_000,
+        "{" + '"a": "' * 100_000,
+        '{"a": 1,' * 100_000,
+        "[" + "]" * 200_000,
+        "x" * 500_000 + "{",
+        ("{]" * 100_000),
+        '"' + "\\" * 200_001,
+        "```" + " " * 200_000 + "x",
+        "\n" * 200_000 + "```json",
+    ])
+    def test_large_adversarial_input_is_linear(self, text):
+        start = time.perf_counter()
+        for root in (OBJECT, ARRAY):
+            extract_json(text, root)
+
+        assert time.perf_counter() - start < 2.0
+
+    def test_large_valid_reply_with_noise(self):
+        payload = [{"question_text": "q" * 200, "skills_assessed": ["s"] * 20} for _ in range(2000)]
+        text = "Here you go:\n```json\n" + json.dumps(payload) + "\n```\n" + "} ] trailing " * 10_000
+
+        start = time.perf_counter()
+        assert extract_json(text, ARRAY) == payload
+        assert time.perf_counter() - start < 2.0
+
+
+class TestSchemas:
+    def test_evaluation_coerces_and_defaults(self):
+        assert validate_output(ResponseEvaluation, {"score": "8"}) == {
+            "score": 8.0, "feedback": "", "strengths": [], "improvements": []
+        }
+
+    def test_evaluation_rejects_missing_or_out_of_range_score(self):
+        assert validate_output(ResponseEvaluation, {"feedback": "x"}) is None
+        assert validate_output(ResponseEvaluation, {"score": 75}) is None
+        assert validate_output(ResponseEvaluation, ["not", "a", "dict"]) is None
+
+    def test_feedback_keeps_extra_fields(self):
+        feedback = validate_output(OverallFeedback, {"overall_score": 70, "summary_title": "Good"})
+
+        assert feedback["summary_title"] == "Good"
+
+    def test_invalid_questions_are_dropped(self):
+        questions = validate_questions([{"question_text": "Why?"}, {"text": "no question_text"}, "junk"])
+
+        assert [question["question_text"] for question in questions] == ["Why?"]
+        assert validate_questions([{"text": "x"}]) is None
@@ -0,0 +1,109 @@
+"""
+Unit tests for login lockout and deferred last-login writes.
+"""
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.auth.lockout import LoginThrottle, LastLoginRecorder
+
+
+@pytest.fixture
+def no_redis():
+    with patch("app.auth.lockout.models.redis_client", None):
+        yield
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+@pytest.mark.security
+@pytest.mark.usefixtures("no_redis")
+class TestLoginThrottle:
+    """Test sliding-window lockout using the in-memory fallback."""
+
+    @pytest.mark.asyncio
+    async def test_account_locks_after_max_attempts(self):
+        throttle = LoginThrottle(max_attempts=3, ip_max_attempts=100, window_seconds=60, lockout_seconds=120)
+
+        assert not await throttle.record_failure("User@Example.com", "1.1.1.1")
+        assert not await throttle.record_failure("user@example.com", "1.1.1.2")
+        assert await throttle.check("user@example.com", None) == (0, True)
+
+        assert await throttle.record_failure("user@example.com", "1.1.1.3")
+        retry_after, _ = await throttle.check("user@example.com", "9.9.9.9")
+        assert 0 < retry_after <= 121
+        assert throttle.get_stats()["lockouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_ip_locks_across_accounts(self):
+        throttle = LoginThrottle(max_attempts=100, ip_max_attempts=2, window_seconds=60, lockout_seconds=60)
+
+        await throttle.record_failure("a@example.com", "2.2.2.2")
+        await throttle.record_failure("b@example.com", "2.2.2.2")
+
+        retry_after, _ = await throttle.check("c@example.com", "2.2.2.2")
+        assert retry_after > 0
+        assert (await throttle.check("c@example.com", "3.3.3.3"))[0] == 0
+
+    @pytest.mark.asyncio
+    async def test_window_slides(self):
+        throttle = LoginThrottle(max_attempts=2, ip_max_attempts=100, window_seconds=10, lockout_seconds=60)
+        await throttle.record_failure("user@example.com", None)
+
+        with patch("app.auth.lockout.time.time", return_value=time.time() + 20):
+            assert not await throttle.record_failure("user@example.com", None)
+
+    @pytest.mark.asyncio
+    async def test_reset_clears_lock(self):
+        throttle = LoginThrottle(max_attempts=1, ip_max_attempts=100, window_seconds=60, lockout_seconds=60)
+        await throttle.record_failure("user@example.com", None)
+        assert (await throttle.check("user@example.com", None))[0] > 0
+
+        await throttle.reset("user@example.com")
+        assert await throttle.check("user@example.com", None) == (0, False)
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestLastLoginRecorder:
+    """Test batching of last_login writes."""
+
+    @pytest.mark.asyncio
+    async def test_flush_coalesces_per_user(self):
+        db = MagicMock()
+        db.users.bulk_write = AsyncMock()
+        recorder = LastLoginRecorder(flush_interval_seconds=3600)
+        recorder._db = db
+
+        recorder.record("u1")
+        recorder.record("u2")
+        recorder.record("u1")
+
+        assert await recorder.flush() == 2
+        operations = db.users.bulk_write.call_args.args[0]
+        assert len(operations) == 2
+        assert db.users.bulk_write.call_args.kwargs["ordered"] is False
+        assert recorder.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_pending(self):
+        db = MagicMock()
+        db.users.bulk_write = AsyncMock(side_effect=Exception("mongo down"))
+        recorder = LastLoginRecorder(flush_interval_seconds=3600)
+        recorder._db = db
+
+        recorder.record("u1")
+        assert await recorder.flush() == 0
+        assert recorder.get_stats()["pending"] == 1
+        assert recorder.get_stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_remaining(self):
+        db = MagicMock()
+        db.users.bulk_write = AsyncMock()
+        recorder = LastLoginRecorder(flush_interval_seconds=3600)
+        recorder.start(db)
+        recorder.record("u1")
+
+        await recorder.stop()
+        db.users.bulk_write.assert_awaited_once()
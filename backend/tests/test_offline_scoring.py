@@ -0,0 +1,137 @@
+"""
+Unit tests for offline rubric scoring and how AIService routes work to it.
+"""
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.ai.providers import FakeProvider
+from app.ai.scoring import FEATURES, OfflineScorer
+from app.ai.service import AIService
+
+QUESTION = "Tell me about a time you improved the performance of a system."
+STAR_ANSWER = (
+    "At my previous job our checkout system was slow. My task was to improve its performance before the "
+    "holiday sale. I analyzed the traces, I refactored the slowest database queries and I introduced a cache. "
+    "As a result we reduced p95 latency by 60% and served 3x more requests."
+)
+OFF_TOPIC = "I enjoy hiking on weekends and cooking pasta with friends."
+
+EVALUATION = json.dumps({"score": 8, "feedback": "Good", "strengths": [], "improvements": []})
+BATCH_EVALUATION = json.dumps([{"id": 0, "score": 7, "feedback": "Good", "strengths": [], "improvements": []}])
+
+
+@pytest.fixture(autouse=True)
+def no_redis():
+    with patch("app.ai.result_cache.models.redis_client", None):
+        yield
+
+
+def service_with(provider):
+    service = AIService()
+    service.google_provider = provider
+    service.openai_provider = None
+    return service
+
+
+class TestFeatures:
+    def test_features_are_bounded_and_ordered(self):
+        matrix, counts, _ = OfflineScorer().features([(QUESTION, STAR_ANSWER), (QUESTION, OFF_TOPIC), (QUESTION, "")])
+
+        assert matrix.shape == (3, len(FEATURES))
+        assert ((matrix >= 0) & (matrix <= 1)).all()
+        assert matrix[0, 0] > 0.8 and matrix[1, 0] == 0
+        assert matrix[0, 1] >= 0.75
+        assert not matrix[2].any()
+        assert list(counts) == [len(STAR_ANSWER.split()), 10, 0]
+
+    def test_batch_matches_single_scoring(self):
+        scorer = OfflineScorer()
+        items = [(QUESTION, STAR_ANSWER), (QUESTION, OFF_TOPIC), ("What is Python?", "Python is a language")]
+
+        batch = scorer.score_batch(items)
+
+        assert [result["score"] for result in batch] == [scorer.score(*item)["score"] for item in items]
+        assert batch[0]["score"] > batch[2]["score"] > batch[1]["score"]
+
+    def test_filler_words_lower_communication(self):
+        scorer = OfflineScorer()
+        clean = scorer.score(QUESTION, STAR_ANSWER)
+        filler = scorer.score(QUESTION, "Um, you know, basically " + STAR_ANSWER.replace(". ", ". Um, like, I guess "))
+
+        assert filler["communication_score"] < clean["communication_score"]
+        assert any("filler" in improvement for improvement in filler["improvements"])
+
+    def test_large_batch_is_fast(self):
+        scorer = OfflineScorer()
+        items = [(f"{QUESTION} ({i})", STAR_ANSWER) for i in range(2000)]
+
+        start = time.perf_counter()
+        results = scorer.score_batch(items)
+
+        assert len(results) == 2000
+        assert time.perf_counter() - start < 2.0
+
+
+@pytest.mark.asyncio
+class TestRouting:
+    async def test_empty_answer_skips_the_provider(self):
+        provider = FakeProvider(EVALUATION)
+        service = service_with(provider)
+
+        result = await service.evaluate_response(QUESTION, "   ")
+
+        assert result["score"] == 0
+        assert provider.prompts == []
+        assert service.offline_scorer.used["first_pass"] == 1
+
+    async def test_lower_confidence_threshold_settles_short_answers(self):
+        provider = FakeProvider(BATCH_EVALUATION)
+        service = service_with(provider)
+        service.offline_first_pass_confidence = 0.9
+
+        results = await service.evaluate_responses([(QUESTION, "Yes"), (QUESTION, STAR_ANSWER), (QUESTION, "")])
+
+        assert results[0]["evaluator"] == "offline" and results[2]["evaluator"] == "offline"
+        assert results[1]["score"] == 7
+        assert len(provider.prompts) == 1
+
+    async def test_saturated_providers_overflow_to_offline(self):
+        provider = FakeProvider(EVALUATION, latency=0.2, max_concurrency=1, max_queue=100)
+        service = service_with(provider)
+        service.offline_overflow_queue = 1
+
+        first = asyncio.create_task(service.evaluate_response("Q1", STAR_ANSWER))
+        second = asyncio.create_task(service.evaluate_response("Q2", STAR_ANSWER))
+        await asyncio.sleep(0.05)
+        overflow = await service.evaluate_response("Q3", STAR_ANSWER)
+
+        assert overflow["evaluator"] == "offline"
+        assert [(await first)["score"], (await second)["score"]] == [8, 8]
+        assert len(provider.prompts) == 2
+        assert service.offline_scorer.used["overflow"] == 1
+
+    async def test_negative_queue_disables_overflow(self):
+        provider = FakeProvider(EVALUATION, latency=0.05, max_concurrency=1, max_queue=100)
+        service = service_with(provider)
+        service.offline_overflow_queue = -1
+
+        results = await asyncio.gather(*[service.evaluate_response(f"Q{i}", STAR_ANSWER) for i in range(4)])
+
+        assert all(result["score"] == 8 for result in results)
+
+    async def test_no_provider_feedback_is_offline(self):
+        service = service_with(None)
+
+        feedback = await service.generate_overall_feedback(
+            [{"question_text": QUESTION, "response_text": STAR_ANSWER}, {"question_text": QUESTION, "response_text": OFF_TOPIC}],
+            "Engineer",
+            "mid"
+        )
+
+        assert feedback["evaluator"] == "offline"
+        assert 0 < feedback["overall_score"] < 100
+        assert "Answers drift from the question" not in feedback["weaknesses"]
@@ -0,0 +1,158 @@
+"""
+Unit tests for keyset pagination.
+"""
+import inspect
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, Response
+
+from app.utils.pagination import (
+    NEXT_CURSOR_HEADER, cursor_query, decode_cursor, encode_cursor, paginate, set_next_cursor
+)
+
+OPERATORS = {
+    "$lt": lambda a, b: a < b,
+    "$lte": lambda a, b: a <= b,
+    "$gt": lambda a, b: a > b,
+    "$gte": lambda a, b: a >= b,
+}
+
+
+def matches(doc, query):
+    """Evaluate the subset of MongoDB query syntax used by the paginator."""
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not all(OPERATORS[op](doc.get(key), value) for op, value in condition.items()):
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+        self.skipped = 0
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.docs = sorted(self.docs, key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def skip(self, n):
+        self.skipped = n
+        self.docs = self.docs[n:]
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs[:length]
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query):
+        self.queries.append(query)
+        return FakeCursor([doc for doc in self.docs if matches(doc, query)])
+
+
+@pytest.mark.unit
+class TestCursorEncoding:
+    """Test opaque cursor round trips."""
+
+    def test_round_trip(self):
+        created_at = datetime(2024, 5, 1, 12, 30, 15, 123000)
+        doc_id = ObjectId()
+        assert decode_cursor(encode_cursor(created_at, doc_id)) == (created_at, doc_id)
+        assert decode_cursor(encode_cursor(42, "string-id")) == (42, "string-id")
+
+    def test_invalid_cursor(self):
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor("not-a-cursor")
+        assert exc_info.value.status_code == 400
+
+    def test_query_is_combined(self):
+        query = cursor_query({"user_id": "u1"}, "created_at", encode_cursor(5, "a"))
+        assert query["$and"][0] == {"user_id": "u1"}
+        assert query["$and"][1]["created_at"] == {"$lte": 5}
+
+
+@pytest.mark.unit
+class TestPaginate:
+    """Test walking pages with ties on the sort key."""
+
+    @pytest.mark.asyncio
+    async def test_walks_all_pages_without_gaps(self):
+        base = datetime(2024, 1, 1)
+        docs = [
+            {"_id": ObjectId(), "user_id": "u1", "created_at": base + timedelta(minutes=i // 3)}
+            for i in range(10)
+        ] + [{"_id": ObjectId(), "user_id": "u2", "created_at": base}]
+        collection = FakeCollection(docs)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await paginate(collection, {"user_id": "u1"}, "created_at", 4, cursor=cursor)
+            seen.extend(doc["_id"] for doc in page)
+            if cursor is None:
+                break
+
+        expected = sorted(
+            (d for d in docs if d["user_id"] == "u1"),
+            key=lambda d: (d["created_at"], d["_id"]),
+            reverse=True
+        )
+        assert seen == [d["_id"] for d in expected]
+
+    @pytest.mark.asyncio
+    async def test_skip_is_kept_for_backward_compatibility(self):
+        docs = [{"_id": i, "created_at": i} for i in range(5)]
+        page, next_cursor = await paginate(FakeCollection(docs), {}, "created_at", 2, skip=2)
+        assert [doc["_id"] for doc in page] == [2, 1]
+        assert next_cursor is not None
+
+    @pytest.mark.asyncio
+    async def test_last_page_has_no_cursor(self):
+        docs = [{"_id": i, "created_at": i} for i in range(2)]
+        page, next_cursor = await paginate(FakeCollection(docs), {}, "created_at", 2)
+        assert len(page) == 2
+        assert next_cursor is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("limit", [0, -1])
+    async def test_page_size_below_one_is_rejected(self, limit):
+        docs = [{"_id": i, "created_at": i} for i in range(3)]
+        with pytest.raises(HTTPException) as error:
+            await paginate(FakeCollection(docs), {}, "created_at", limit)
+        assert error.value.status_code == 400
+
+    def test_list_endpoints_bound_the_page_size(self):
+        from app.interviews.routes import list_user_interviews
+        from app.live.routes import list_live_interviews
+        from app.resume.routes import list_user_resumes
+
+        for endpoint in (list_user_interviews, list_user_resumes, list_live_interviews):
+            limit = inspect.signature(endpoint).parameters["limit"].default
+            bounds = {type(item).__name__: item for item in limit.metadata}
+            assert (bounds["Ge"].ge, bounds["Le"].le) == (1, 100)
+
+    def test_next_cursor_header(self):
+        response = Response()
+        set_next_cursor(response, None)
+        assert NEXT_CURSOR_HEADER not in response.headers
+        set_next_cursor(response, "abc")
+        assert response.headers[NEXT_CURSOR_HEADER] == "abc"
@@ -0,0 +1,72 @@
+"""
+Unit tests for the password hashing pool.
+"""
+import asyncio
+import pytest
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+
+from app.auth.hashing import PasswordHasher
+from app.config import settings
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+@pytest.mark.security
+class TestPasswordHasher:
+    """Test hashing off the event loop, rehashing and load shedding."""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify(self):
+        hasher = PasswordHasher(max_workers=2, max_queue_size=2)
+        try:
+            password_hash = await hasher.hash("Secret123!")
+            assert await hasher.verify("Secret123!", password_hash)
+            assert not await hasher.verify("wrong", password_hash)
+            assert hasher.get_stats()["completed"] == 3
+        finally:
+            hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_hash_many_respects_capacity(self):
+        hasher = PasswordHasher(max_workers=2, max_queue_size=0)
+        try:
+            password_hashes = await hasher.hash_many([f"Secret{i}!" for i in range(5)])
+            assert len(password_hashes) == 5
+            assert await hasher.verify("Secret3!", password_hashes[3])
+            assert hasher.get_stats()["rejected"] == 0
+        finally:
+            hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rehash_when_cost_changes(self):
+        hasher = PasswordHasher(max_workers=1, max_queue_size=1)
+        old_hash = bcrypt.using(rounds=4).hash("Secret123!")
+        try:
+            valid, new_hash = await hasher.verify_and_update("Secret123!", old_hash)
+            assert valid
+            assert new_hash is not None
+            assert f"${settings.BCRYPT_ROUNDS:02d}$" in new_hash
+
+            valid, new_hash = await hasher.verify_and_update("Secret123!", new_hash)
+            assert valid
+            assert new_hash is None
+        finally:
+            hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_load_shedding_when_saturated(self):
+        hasher = PasswordHasher(max_workers=1, max_queue_size=0, retry_after_seconds=2)
+        try:
+            first = asyncio.create_task(hasher.hash("Secret123!"))
+            await asyncio.sleep(0)
+
+            with pytest.raises(HTTPException) as exc_info:
+                await hasher.hash("Another123!")
+
+            assert exc_info.value.status_code == 503
+            assert exc_info.value.headers["Retry-After"] == "2"
+            assert hasher.get_stats()["rejected"] == 1
+            await first
+        finally:
+            hasher.shutdown()
@@ -0,0 +1,98 @@
+"""
+Unit tests for the compiled permission engine.
+"""
+import pytest
+from fastapi import HTTPException
+
+from app.auth.dependencies import (
+    check_permissions, resource_scope, get_current_user_with_role, get_current_admin
+)
+from app.auth.permissions import (
+    compile_permissions, has_permissions, missing_permissions, RESOURCE_PERMISSIONS
+)
+from app.models.user import User, UserRole
+
+
+def make_user(role: UserRole, user_id: str = "507f1f77bcf86cd799439011") -> User:
+    return User(
+        _id=user_id,
+        email=f"{role.value}@example.com",
+        full_name="Permission User",
+        password_hash="hash",
+        role=role,
+        status="active"
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+@pytest.mark.security
+class TestPermissionRegistry:
+    """Test compiled role masks."""
+
+    def test_role_masks(self):
+        mask = compile_permissions(["manage_users", "audit_logs"])
+        assert has_permissions(UserRole.ADMIN, mask)
+        assert not has_permissions(UserRole.RECRUITER, mask)
+        assert missing_permissions(UserRole.RECRUITER, mask) == ["audit_logs", "manage_users"]
+
+    def test_unknown_permission_rejected(self):
+        with pytest.raises(ValueError):
+            compile_permissions(["manage_everything"])
+
+    def test_resource_permissions_are_registered(self):
+        for own_permission, any_permission in RESOURCE_PERMISSIONS.values():
+            compile_permissions([own_permission, any_permission])
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+@pytest.mark.security
+class TestPermissionDependencies:
+    """Test cached dependency factories."""
+
+    def test_dependencies_are_cached(self):
+        assert check_permissions(["manage_users"]) is check_permissions(["manage_users"])
+        assert check_permissions(["audit_logs", "manage_users"]) is \
+            check_permissions(["manage_users", "audit_logs"])
+        assert get_current_user_with_role(UserRole.ADMIN) is get_current_admin
+        assert resource_scope("interview") is resource_scope("interview")
+
+    @pytest.mark.asyncio
+    async def test_check_permissions(self):
+        dependency = check_permissions(["manage_users"])
+        admin = make_user(UserRole.ADMIN)
+        assert await dependency(current_user=admin) is admin
+
+        with pytest.raises(HTTPException) as exc_info:
+            await dependency(current_user=make_user(UserRole.CANDIDATE))
+        assert exc_info.value.status_code == 403
+        assert "manage_users" in exc_info.value.detail
+
+    @pytest.mark.asyncio
+    async def test_role_dependency(self):
+        admin = make_user(UserRole.ADMIN)
+        assert await get_current_admin(current_user=admin) is admin
+
+        with pytest.raises(HTTPException):
+            await get_current_admin(current_user=make_user(UserRole.RECRUITER))
+
+    @pytest.mark.asyncio
+    async def test_resource_scope_own_vs_any(self):
+        dependency = resource_scope("interview")
+
+        candidate_scope = await dependency(current_user=make_user(UserRole.CANDIDATE, "u1"))
+        assert candidate_scope.filter({"_id": "i1"}) == {"_id": "i1", "user_id": "u1"}
+        assert candidate_scope.can_access("u1")
+        assert not candidate_scope.can_access("u2")
+
+        admin_scope = await dependency(current_user=make_user(UserRole.ADMIN, "a1"))
+        assert admin_scope.filter({"_id": "i1"}) == {"_id": "i1"}
+        assert admin_scope.can_access("u2")
+
+    @pytest.mark.asyncio
+    async def test_resource_scope_requires_own_permission(self):
+        dependency = resource_scope("resume")
+        with pytest.raises(HTTPException) as exc_info:
+            await dependency(current_user=make_user(UserRole.ADMIN))
+        assert exc_info.value.status_code == 403
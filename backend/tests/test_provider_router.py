@@ -0,0 +1,180 @@
+"""
+Unit tests for latency-aware provider routing.
+"""
+import asyncio
+import gc
+import json
+import time
+
+import pytest
+
+from app.ai.providers import FakeProvider
+from app.ai.router import CircuitBreaker, NoProviderAvailableError, ProviderRouter
+from app.ai.service import AIService
+
+EVALUATION = json.dumps({"score": 8, "feedback": "Good", "strengths": [], "improvements": []})
+
+
+def make_router(*providers, **kwargs):
+    return ProviderRouter(lambda: list(providers), **kwargs)
+
+
+def warm(router, provider, latency, samples=20):
+    for _ in range(samples):
+        router.health(provider).record_success(latency)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+
+        assert not breaker.allow()
+        assert breaker.opened == 1
+
+    def test_half_open_probe_closes_or_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+        breaker.record_failure()
+
+        assert breaker.allow()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        breaker.record_failure()
+        breaker.allow()
+        breaker.record_failure()
+        assert breaker.opened == 3
+
+    def test_half_open_admits_a_single_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+        breaker.record_failure()
+
+        probe = breaker.acquire()
+        assert probe
+        assert breaker.acquire() is None
+        assert not breaker.allow()
+
+        # A probe that ends without an outcome (e.g. cancelled) frees the slot
+        breaker.release(probe)
+        second = breaker.acquire()
+        assert second and second != probe
+        breaker.record_success()
+        assert breaker.acquire() == 0 and breaker.acquire() == 0
+
+
+@pytest.mark.asyncio
+class TestProviderRouter:
+    async def test_prefers_configured_order_until_warm(self):
+        first, second = FakeProvider("first"), FakeProvider("second")
+        router = make_router(first, second)
+
+        assert await router.generate("p") == "first"
+
+    async def test_routes_to_fastest_provider(self):
+        slow, fast = FakeProvider("slow"), FakeProvider("fast")
+        router = make_router(slow, fast)
+        warm(router, slow, 2.0)
+        warm(router, fast, 0.1)
+
+        assert await router.generate("p") == "fast"
+        assert router.get_stats()["providers"]["fake"]["routed"] == 1
+
+    async def test_hedges_slow_primary_and_cancels_loser(self):
+        slow = FakeProvider("slow", latency=1.0)
+        fast = FakeProvider("fast", latency=0.01)
+        router = make_router(slow, fast, hedge_default_seconds=0.05)
+
+        start = time.perf_counter()
+        assert await router.generate("p") == "fast"
+
+        assert time.perf_counter() - start < 0.5
+        assert router.hedges == 1
+        assert router.hedge_wins == 1
+        await asyncio.sleep(0.01)
+        assert slow.get_stats()["in_flight"] == 0
+
+    async def test_hedge_delay_follows_primary_p95(self):
+        provider = FakeProvider()
+        router = make_router(provider, min_samples=20)
+        warm(router, provider, 0.2, samples=19)
+        router.health(provider).record_success(3.0)
+
+        assert router.hedge_delay(provider) == 3.0
+
+    async def test_failure_fails_over_to_alternate(self):
+        broken = FakeProvider(error=RuntimeError("down"))
+        router = make_router(broken, FakeProvider("ok"))
+
+        assert await router.generate("p") == "ok"
+        assert router.failovers == 1
+        assert router.hedge_wins == 0
+
+    async def test_open_breakers_short_circuit(self):
+        broken = FakeProvider(error=RuntimeError("down"))
+        router = make_router(broken, failure_threshold=2)
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await router.generate("p")
+
+        with pytest.raises(NoProviderAvailableError):
+            await router.generate("p")
+        assert len(broken.prompts) == 2
+        assert router.short_circuits == 1
+
+    async def test_recovering_provider_gets_one_probe(self):
+        provider = FakeProvider("ok", latency=0.05)
+        router = make_router(provider, failure_threshold=1, reset_seconds=0)
+        router.health(provider).record_failure()
+
+        results = await asyncio.gather(*[router.generate("p") for _ in range(5)], return_exceptions=True)
+
+        assert results.count("ok") == 1
+        assert sum(isinstance(result, NoProviderAvailableError) for result in results) == 4
+        assert len(provider.prompts) == 1
+        assert router.health(provider).breaker.state == CircuitBreaker.CLOSED
+
+    async def test_failed_hedge_loser_is_not_reported_as_unhandled(self):
+        class Stubborn(FakeProvider):
+            async def generate(self, prompt, system=None, temperature=0.7, max_tokens=1000, operation="generate"):
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    raise RuntimeError("connection reset")
+
+        loop = asyncio.get_running_loop()
+        unhandled = []
+        previous = loop.get_exception_handler()
+        loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+        try:
+            router = make_router(Stubborn(), FakeProvider("fast", latency=0.01), hedge_default_seconds=0.02)
+            assert await router.generate("p") == "fast"
+            await asyncio.sleep(0.02)
+            gc.collect()
+        finally:
+            loop.set_exception_handler(previous)
+
+        assert unhandled == []
+
+
+@pytest.mark.asyncio
+class TestServiceDegradation:
+    async def test_open_breaker_degrades_to_basic_paths_without_calling(self):
+        service = AIService()
+        provider = FakeProvider(EVALUATION, error=RuntimeError("down"))
+        service.google_provider = provider
+        service.openai_provider = None
+        service.router.failure_threshold = 1
+
+        await service.evaluate_response("Q1", "A")
+        result = await service.evaluate_response("Q2", "A")
+        questions = await service.generate_interview_questions("Engineer", None, "mid", 3, "technical", "mixed")
+
+        assert result["evaluator"] == "offline"
+        assert len(questions) == 3
+        assert len(provider.prompts) == 1
@@ -0,0 +1,155 @@
+"""
+Unit tests for the AI question set cache.
+"""
+import asyncio
+import itertools
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.ai.providers import FakeProvider
+from app.ai.question_cache import QuestionSetCache, QuestionSetRequest, canonical_title
+from app.ai.service import AIService
+
+
+@pytest.fixture(autouse=True)
+def no_redis():
+    with patch("app.ai.question_cache.models.redis_client", None):
+        yield
+
+
+def make_cache(**kwargs):
+    counter = itertools.count()
+
+    def reply(prompt):
+        n = next(counter)
+        return json.dumps([{"question_text": f"Variant {n} question {i}"} for i in range(5)])
+
+    service = AIService()
+    service.google_provider = FakeProvider(reply)
+    service.openai_provider = None
+    return QuestionSetCache(service, **kwargs)
+
+
+def request_args(title="Software Engineer", description=None):
+    return (title, description, "mid", 5, "technical")
+
+
+class TestKeys:
+    def test_canonical_title_folds_spelling_and_order(self):
+        assert canonical_title("Sr. Software Eng") == canonical_title("software engineer")
+        assert canonical_title("Engineer, Software") == canonical_title("Software Engineer")
+        assert canonical_title("SWE") == "engineer software"
+
+    def test_digest_depends_on_every_input(self):
+        base = QuestionSetRequest.build("Engineer", None, "mid", 5, "technical")
+
+        assert base.digest == QuestionSetRequest.build(" engineer ", "", "MID", 5, "Technical").digest
+        assert base.digest != QuestionSetRequest.build("Engineer", None, "senior", 5, "technical").digest
+        assert base.digest != QuestionSetRequest.build("Engineer", None, "mid", 6, "technical").digest
+        assert base.digest != QuestionSetRequest.build("Engineer", "Go services", "mid", 5, "technical").digest
+        assert base.digest != QuestionSetRequest.build("Engineer", None, "mid", 5, "technical", "ai_mock").digest
+
+
+@pytest.mark.asyncio
+class TestQuestionSetCache:
+    async def test_miss_then_hit_after_fill(self):
+        cache = make_cache()
+
+        assert await cache.get("u1", *request_args()) is None
+        await cache.fill(*request_args())
+        questions = await cache.get("u1", *request_args("Sr Software Eng"))
+
+        assert questions[0]["question_text"].startswith("Variant 0")
+        assert cache.get_stats()["hits"] == 1
+
+    async def test_variants_rotate_per_user(self):
+        cache = make_cache(variants=3)
+        for _ in range(3):
+            await cache.fill(*request_args())
+
+        seen = [(await cache.get("u1", *request_args()))[0]["question_text"] for _ in range(3)]
+
+        assert len(set(seen)) == 3
+        assert (await cache.get("u1", *request_args()))[0]["question_text"] == seen[0]
+
+    async def test_variant_count_is_capped(self):
+        cache = make_cache(variants=2)
+        for _ in range(4):
+            await cache.fill(*request_args())
+
+        assert len(await cache._load(QuestionSetRequest.build(*request_args()[:2], "mid", 5, "technical").digest)) == 2
+
+    async def test_partial_key_is_topped_up_in_background(self):
+        cache = make_cache(variants=2)
+        await cache.fill(*request_args())
+
+        await cache.get("u1", *request_args())
+        await asyncio.gather(*cache._background)
+
+        assert cache.generated == 2
+
+    async def test_near_duplicate_title_reuses_cached_set(self):
+        cache = make_cache(title_similarity=0.85)
+        await cache.fill(*request_args("Software Engineer"))
+
+        questions = await cache.get("u1", *request_args("Software Engineers"))
+
+        assert questions is not None
+        assert cache.near_hits == 1
+
+    async def test_descriptions_are_matched_exactly(self):
+        cache = make_cache()
+        await cache.fill(*request_args(description="Build APIs in Go"))
+
+        assert await cache.get("u1", *request_args(description="Build  apis in go")) is not None
+        assert await cache.get("u1", *request_args(description="Build UIs in React")) is None
+
+    async def test_cached_sets_are_copies(self):
+        cache = make_cache()
+        await cache.fill(*request_args())
+
+        (await cache.get("u1", *request_args()))[0]["question_text"] = "changed"
+
+        assert (await cache.get("u2", *request_args()))[0]["question_text"] != "changed"
+
+    async def test_expired_sets_are_dropped(self):
+        cache = make_cache(ttl_seconds=0)
+        await cache.fill(*request_args())
+
+        assert await cache.get("u1", *request_args()) is None
+
+    async def test_failed_generation_is_not_cached(self):
+        cache = make_cache()
+        cache.service.google_provider = FakeProvider("not json")
+
+        assert await cache.fill(*request_args()) is None
+        assert cache.generated == 0
+
+    async def test_warm_fills_popular_requests(self):
+        cache = make_cache(variants=2, warm_top=1)
+        for _ in range(3):
+            await cache.get("u1", *request_args("Data Scientist"))
+        await cache.get("u1", *request_args("Chef"))
+
+        assert await cache.warm() == 2
+        assert await cache.get("u1", *request_args("Data Scientist")) is not None
+        assert await cache.get("u1", *request_args("Chef")) is None
+
+    async def test_interview_type_reaches_generation_and_the_key(self):
+        cache = make_cache()
+        cache.service.generate_question_set = AsyncMock(wraps=cache.service.generate_question_set)
+
+        await cache.fill(*request_args(), "ai_mock")
+
+        assert cache.service.generate_question_set.await_args.args[-1] == "ai_mock"
+        assert await cache.get("u1", *request_args(), "ai_mock") is not None
+        assert await cache.get("u1", *request_args(), "mock") is None
+
+    async def test_warm_keeps_the_interview_type(self):
+        cache = make_cache(variants=1, warm_top=1)
+        await cache.get("u1", *request_args(), "ai_mock")
+
+        assert await cache.warm() == 1
+        assert await cache.get("u1", *request_args(), "ai_mock") is not None
@@ -0,0 +1,173 @@
+"""
+Unit tests for the AI result cache.
+"""
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.ai.providers import FakeProvider
+from app.ai.result_cache import AIResultCache
+from app.ai.service import AIService
+
+EVALUATION = json.dumps({"score": 8, "feedback": "Good", "strengths": [], "improvements": []})
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for cached results."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        return True
+
+
+@pytest.fixture
+def redis_client():
+    client = FakeRedis()
+    with patch("app.ai.result_cache.models.redis_client", client):
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def no_redis():
+    with patch("app.ai.result_cache.models.redis_client", None):
+        yield
+
+
+def service_with(provider):
+    service = AIService()
+    service.google_provider = provider
+    service.openai_provider = None
+    return service
+
+
+class TestKeys:
+    def test_key_ignores_case_and_whitespace(self):
+        assert AIResultCache.key("m", "Sys", "What is  STAR?\n", 0.7) == AIResultCache.key("m", "sys", "what is star?", 0.7)
+
+    def test_key_depends_on_model_system_and_temperature(self):
+        base = AIResultCache.key("m", "sys", "prompt", 0.7)
+
+        assert base != AIResultCache.key("other", "sys", "prompt", 0.7)
+        assert base != AIResultCache.key("m", "other", "prompt", 0.7)
+        assert base != AIResultCache.key("m", "sys", "prompt", 0.3)
+
+
+@pytest.mark.asyncio
+class TestAIResultCache:
+    async def test_concurrent_identical_requests_share_one_call(self):
+        provider = FakeProvider(EVALUATION, latency=0.05)
+        service = service_with(provider)
+
+        results = await asyncio.gather(*[service.evaluate_response("Q", "A") for _ in range(20)])
+
+        assert all(result["score"] == 8 for result in results)
+        assert len(provider.prompts) == 1
+        stats = service.result_cache.get_stats()["operations"]["evaluation"]
+        assert stats["coalesced"] == 19
+        assert stats["misses"] == 1
+
+    async def test_repeat_request_is_served_locally(self):
+        provider = FakeProvider(EVALUATION)
+        service = service_with(provider)
+
+        await service.evaluate_response("Q", "A")
+        await service.evaluate_response("Q", "  a ")
+
+        assert len(provider.prompts) == 1
+        assert service.result_cache.get_stats()["operations"]["evaluation"]["hit_rate"] == 0.5
+
+    async def test_unusable_replies_are_not_cached(self):
+        provider = FakeProvider("not json")
+        service = service_with(provider)
+
+        first = await service.evaluate_response("Q", "A")
+        await service.evaluate_response("Q", "A")
+
+        assert first["evaluator"] == "offline"
+        assert len(provider.prompts) == 2
+
+    async def test_failure_reaches_every_waiter_and_is_not_cached(self):
+        cache = AIResultCache()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("down")
+
+        results = await asyncio.gather(
+            *[cache.get_or_compute("chat", "k", compute) for _ in range(3)], return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len(calls) == 1
+        assert cache.get_stats()["in_flight"] == 0
+
+    async def test_cancelled_caller_does_not_cancel_shared_call(self):
+        cache = AIResultCache()
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        first = asyncio.create_task(cache.get_or_compute("chat", "k", compute))
+        second = asyncio.create_task(cache.get_or_compute("chat", "k", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "answer"
+
+    async def test_results_are_copies(self):
+        service = service_with(FakeProvider(EVALUATION))
+
+        (await service.evaluate_response("Q", "A"))["strengths"].append("changed")
+
+        assert (await service.evaluate_response("Q", "A"))["strengths"] == []
+
+    async def test_lru_evicts_oldest(self):
+        cache = AIResultCache(max_size=2)
+
+        async def compute():
+            return "value"
+
+        for key in ("a", "b", "c"):
+            await cache.get_or_compute("chat", key, compute)
+
+        assert cache.get_stats()["size"] == 2
+        assert cache.evictions == 1
+
+    async def test_redis_tier_is_shared_between_workers(self, redis_client):
+        first = service_with(FakeProvider(EVALUATION))
+        second_provider = FakeProvider(EVALUATION)
+        second = service_with(second_provider)
+
+        await first.evaluate_response("Q", "A")
+        result = await second.evaluate_response("Q", "A")
+
+        assert result["score"] == 8
+        assert second_provider.prompts == []
+        assert second.result_cache.get_stats()["operations"]["evaluation"]["shared_hits"] == 1
+
+    async def test_batch_only_sends_uncached_items(self, redis_client):
+        provider = FakeProvider(EVALUATION)
+        service = service_with(provider)
+        await service.evaluate_response("Q0", "A0")
+
+        provider.response = json.dumps([{"id": 0, "score": 6, "feedback": "ok", "strengths": [], "improvements": []}])
+        results = await service.evaluate_responses([("Q0", "A0"), ("Q1", "A1")])
+
+        assert [result["score"] for result in results] == [8, 6]
+        assert '"Q0"' not in provider.prompts[-1]
+        assert (await service.evaluate_response("Q1", "A1"))["score"] == 6
+        assert len(provider.prompts) == 2
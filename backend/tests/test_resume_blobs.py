@@ -0,0 +1,156 @@
+"""
+Unit tests for content-addressed resume storage and analysis reuse.
+"""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pymongo import ReturnDocument
+
+from app.resume import blobs
+from app.resume.blobs import ResumeBlobStore
+from app.resume.routes import process_resume_background
+
+SHA = "ab" * 32
+
+
+class _Result:
+    def __init__(self, upserted_id=None, deleted_count=0):
+        self.upserted_id = upserted_id
+        self.deleted_count = deleted_count
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        if isinstance(condition, dict) and "$lte" in condition:
+            if doc.get(field) is None or doc[field] > condition["$lte"]:
+                return False
+        elif doc.get(field) != condition:
+            return False
+    return True
+
+
+class _Collection:
+    """Just enough of a Motor collection for the blob store."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def _find(self, query):
+        return next((doc for doc in self.docs.values() if _matches(doc, query)), None)
+
+    def _apply(self, doc, update, inserting=False):
+        for field, amount in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + amount
+        doc.update(update.get("$set", {}))
+        if inserting:
+            doc.update(update.get("$setOnInsert", {}))
+
+    async def find_one(self, query):
+        doc = self._find(query)
+        return dict(doc) if doc else None
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self._find(query)
+        if doc is not None:
+            self._apply(doc, update)
+            return _Result()
+        if not upsert:
+            return _Result()
+        doc = dict(query)
+        self._apply(doc, update, inserting=True)
+        self.docs[doc.get("_id", doc.get("id"))] = doc
+        return _Result(upserted_id=doc.get("_id"))
+
+    async def find_one_and_update(self, query, update, return_document=ReturnDocument.BEFORE):
+        doc = self._find(query)
+        if doc is None:
+            return None
+        self._apply(doc, update)
+        return dict(doc)
+
+    async def find_one_and_delete(self, query):
+        doc = self._find(query)
+        if doc is not None:
+            del self.docs[doc["_id"]]
+        return doc
+
+    async def delete_many(self, query):
+        doomed = [key for key, doc in self.docs.items() if _matches(doc, query)]
+        for key in doomed:
+            del self.docs[key]
+        return _Result(deleted_count=len(doomed))
+
+
+class _Database:
+    def __init__(self):
+        self.collections = {}
+
+    def __getattr__(self, name):
+        return self.collections.setdefault(name, _Collection())
+
+
+def storage(path):
+    return {"storage_type": "local", "file_path": path}
+
+
+@pytest.fixture
+def cloud():
+    with patch.object(blobs, "cloud_storage") as cloud:
+        cloud.delete_file = AsyncMock(return_value=True)
+        yield cloud
+
+
+@pytest.mark.asyncio
+class TestResumeBlobStore:
+    async def test_duplicate_upload_reuses_the_stored_file(self, cloud):
+        db, store = _Database(), ResumeBlobStore()
+
+        first, created = await store.acquire(db, SHA, storage("uploads/resumes/a.pdf"), 100, "application/pdf")
+        second, duplicate_created = await store.acquire(db, SHA, storage("uploads/resumes/b.pdf"), 100, "application/pdf")
+
+        assert (created, duplicate_created) == (True, False)
+        assert first == second == storage("uploads/resumes/a.pdf")
+        cloud.delete_file.assert_awaited_once_with("uploads/resumes/b.pdf")
+        assert db.resume_blobs.docs[SHA]["refcount"] == 2
+
+    async def test_file_is_deleted_with_its_last_reference(self, cloud):
+        db, store = _Database(), ResumeBlobStore()
+        await store.acquire(db, SHA, storage("uploads/resumes/a.pdf"), 100, "application/pdf")
+        await store.acquire(db, SHA, storage("uploads/resumes/b.pdf"), 100, "application/pdf")
+        await store.save_analysis(db, SHA, {"ats_score": 80})
+        cloud.delete_file.reset_mock()
+
+        assert not await store.release(db, SHA)
+        cloud.delete_file.assert_not_awaited()
+
+        assert await store.release(db, SHA)
+        cloud.delete_file.assert_awaited_once_with("uploads/resumes/a.pdf")
+        assert db.resume_blobs.docs == {}
+        assert db.resume_analyses.docs == {}
+
+    async def test_analysis_is_keyed_by_analyzer_version(self, cloud):
+        db, store = _Database(), ResumeBlobStore()
+        await store.save_analysis(db, SHA, {"ats_score": 80})
+
+        assert await store.get_analysis(db, SHA) == {"ats_score": 80}
+        with patch.object(blobs, "ANALYZER_VERSION", blobs.ANALYZER_VERSION + 1):
+            assert await store.get_analysis(db, SHA) is None
+        assert store.get_stats()["analysis_hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+class TestProcessResume:
+    async def test_cached_analysis_skips_download_and_parsing(self, cloud):
+        db = _Database()
+        db.resumes.docs["r1"] = {"id": "r1", "sha256": SHA, "processing_status": "pending"}
+        await blobs.resume_blobs.save_analysis(db, SHA, {"ats_score": 80})
+
+        with patch("app.resume.routes.get_database", AsyncMock(return_value=db)), \
+                patch("app.resume.routes.cloud_storage") as routes_cloud:
+            routes_cloud.download_file = AsyncMock()
+            result = await process_resume_background("r1")
+
+        routes_cloud.download_file.assert_not_awaited()
+        assert result["ats_score"] == 80
+        assert db.resumes.docs["r1"]["processing_status"] == "completed"
+        assert db.resumes.docs["r1"]["analysis"] == {"ats_score": 80}
@@ -0,0 +1,107 @@
+"""
+Unit tests for verified-token memoization.
+"""
+import time
+from datetime import timedelta
+
+import pytest
+from unittest.mock import patch
+
+from app.auth import utils
+from app.auth.cache import TokenCache
+from app.auth.utils import create_access_token, create_refresh_token, verify_token
+from app.models.user import TokenData, UserRole
+
+
+def make_token_data(user_id: str) -> TokenData:
+    return TokenData(user_id=user_id, email=f"{user_id}@example.com", role=UserRole.CANDIDATE)
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestTokenCache:
+    """Test bounded, expiry-aware token caching and revocation."""
+
+    def test_entries_expire_with_token(self):
+        cache = TokenCache(max_size=10)
+        cache.set("t1", "access", make_token_data("u1"), time.time() + 60)
+        cache.set("t2", "access", make_token_data("u1"), time.time() + 60)
+        assert cache.get("t1", "access").user_id == "u1"
+
+        with patch("app.auth.cache.time.time", return_value=time.time() + 120):
+            assert cache.get("t1", "access") is None
+
+        stats = cache.get_stats()
+        assert stats["expirations"] == 1
+        assert stats["size"] == 1
+
+    def test_token_type_must_match(self):
+        cache = TokenCache(max_size=10)
+        cache.set("t1", "refresh", make_token_data("u1"), time.time() + 60)
+        assert cache.get("t1", "access") is None
+        assert cache.get("t1", "refresh") is not None
+
+    def test_lru_bound(self):
+        cache = TokenCache(max_size=2)
+        for i in range(3):
+            cache.set(f"t{i}", "access", make_token_data(f"u{i}"), time.time() + 60)
+
+        assert cache.get("t0", "access") is None
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get_stats()["size"] == 2
+
+    def test_revoke_single_and_per_user(self):
+        cache = TokenCache(max_size=10)
+        cache.set("a1", "access", make_token_data("u1"), time.time() + 60)
+        cache.set("a2", "access", make_token_data("u1"), time.time() + 60)
+        cache.set("b1", "access", make_token_data("u2"), time.time() + 60)
+
+        cache.revoke("a1")
+        assert cache.get("a1", "access") is None
+
+        cache.revoke_user("u1")
+        assert cache.get("a2", "access") is None
+        assert cache.get("b1", "access") is not None
+        assert cache.get_stats()["revocations"] == 2
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestVerifyTokenMemoization:
+    """Test that verify_token reuses decoded tokens."""
+
+    def setup_method(self):
+        utils.token_cache.clear()
+
+    def test_repeat_verification_skips_decode(self):
+        token = create_access_token({"sub": "u1", "email": "u1@example.com", "role": "candidate"})
+
+        with patch("app.auth.utils.jwt.decode", wraps=utils.jwt.decode) as decode:
+            first = verify_token(token)
+            second = verify_token(token)
+
+        assert first == second
+        assert decode.call_count == 1
+        assert utils.token_cache.get_stats()["hits"] == 1
+
+    def test_wrong_type_is_rejected_from_cache(self):
+        token = create_refresh_token({"sub": "u1", "email": "u1@example.com", "role": "candidate"})
+        assert verify_token(token, "refresh") is not None
+        assert verify_token(token, "access") is None
+
+    def test_expired_tokens_are_not_cached(self):
+        token = create_access_token(
+            {"sub": "u1", "email": "u1@example.com", "role": "candidate"},
+            expires_delta=timedelta(seconds=-1)
+        )
+        assert verify_token(token) is None
+        assert utils.token_cache.get_stats()["size"] == 0
+
+    def test_revoked_user_tokens_are_decoded_again(self):
+        token = create_access_token({"sub": "u1", "email": "u1@example.com", "role": "candidate"})
+        verify_token(token)
+        utils.revoke_user_tokens("u1")
+
+        with patch("app.auth.utils.jwt.decode", wraps=utils.jwt.decode) as decode:
+            assert verify_token(token) is not None
+        assert decode.call_count == 1
@@ -0,0 +1,102 @@
+"""
+Unit tests for jti revocation and the Bloom filter fast path.
+"""
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.auth.revocation import BloomFilter, TokenRevocationStore, REVOCATION_STREAM
+from app.auth.utils import create_access_token, verify_token
+
+TOKEN_CLAIMS = {"sub": "u1", "email": "u1@example.com", "role": "candidate"}
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestBloomFilter:
+    """Test membership and false-positive rate."""
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"jti-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        assert all(item in bloom for item in items)
+
+    def test_false_positive_rate_within_bounds(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        assert false_positives / 10000 < 0.03
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+@pytest.mark.security
+class TestTokenRevocationStore:
+    """Test revocation without Redis and stream replay."""
+
+    @pytest.mark.asyncio
+    async def test_revoke_single_token(self):
+        store = TokenRevocationStore(bloom_capacity=100)
+        token = create_access_token(TOKEN_CLAIMS)
+        other = create_access_token(TOKEN_CLAIMS)
+        token_data = verify_token(token)
+
+        assert token_data.jti
+        assert not await store.is_revoked(token_data)
+
+        await store.revoke_token(token_data, token)
+        assert await store.is_revoked(verify_token(token))
+        assert not await store.is_revoked(verify_token(other))
+
+    @pytest.mark.asyncio
+    async def test_revoke_user_only_affects_older_tokens(self):
+        store = TokenRevocationStore(bloom_capacity=100)
+        old_token = verify_token(create_access_token(TOKEN_CLAIMS))
+
+        await store.revoke_user("u1")
+        time.sleep(0.01)
+        new_token = verify_token(create_access_token(TOKEN_CLAIMS))
+
+        assert await store.is_revoked(old_token)
+        assert not await store.is_revoked(new_token)
+
+    @pytest.mark.asyncio
+    async def test_bloom_hit_confirmed_against_redis(self):
+        redis_client = MagicMock()
+        redis_client.exists = AsyncMock(return_value=0)
+        store = TokenRevocationStore(bloom_capacity=100)
+        store._redis_client = redis_client
+        store._bloom.add("collides")
+
+        token_data = verify_token(create_access_token(TOKEN_CLAIMS))
+        token_data.jti = "collides"
+
+        assert not await store.is_revoked(token_data)
+        assert store.get_stats()["false_positives"] == 1
+        redis_client.exists.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_rebuild_from_stream(self):
+        until = str(time.time() + 60)
+        redis_client = MagicMock()
+        redis_client.xrange = AsyncMock(side_effect=[
+            [
+                ("1-0", {"kind": "jti", "id": "revoked-jti", "until": until}),
+                ("2-0", {"kind": "jti", "id": "expired-jti", "until": str(time.time() - 1)}),
+                ("3-0", {"kind": "user", "id": "u2", "before": str(time.time()), "until": until})
+            ],
+            []
+        ])
+        store = TokenRevocationStore(bloom_capacity=100)
+        store._redis_client = redis_client
+
+        await store._rebuild()
+
+        assert "revoked-jti" in store._bloom
+        assert "expired-jti" not in store._bloom
+        assert store._last_id == "3-0"
+        assert store.get_stats()["revoked_users"] == 1
+        assert redis_client.xrange.call_args_list[0].args[0] == REVOCATION_STREAM
@@ -0,0 +1,136 @@
+"""
+Unit tests for streaming resume uploads.
+"""
+import asyncio
+import hashlib
+import io
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from app.utils.cloud_storage import ChunkReader, CloudStorageService
+from app.utils.uploads import (
+    DOC, DOCX, PDF, TEXT, UploadContentError, UploadStream, UploadTooLargeError, sniff_content_type
+)
+
+PDF_BYTES = b"%PDF-1.7\n" + b"resume text " * 5000
+
+
+def upload_file(content: bytes, declare_size: bool = False) -> UploadFile:
+    return UploadFile(io.BytesIO(content), filename="resume.pdf", size=len(content) if declare_size else None)
+
+
+class TestSniffContentType:
+    def test_recognizes_resume_formats(self):
+        assert sniff_content_type(PDF_BYTES[:64]) == PDF
+        assert sniff_content_type(b"PK\x03\x04\x14\x00") == DOCX
+        assert sniff_content_type(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1\x00") == DOC
+        assert sniff_content_type("Jane Doe, Software Engineer".encode()) == TEXT
+
+    def test_text_cut_inside_a_character_is_still_text(self):
+        assert sniff_content_type("Zoë".encode()[:-1]) == TEXT
+
+    def test_binary_is_unrecognized(self):
+        assert sniff_content_type(b"\x7fELF\x02\x01\x00") is None
+        assert sniff_content_type(b"\xff\xfe\xfa") is None
+
+
+@pytest.mark.asyncio
+class TestUploadStream:
+    async def test_chunks_reassemble_file_with_hash_and_type(self):
+        upload = UploadStream(upload_file(PDF_BYTES), max_size=len(PDF_BYTES), expected_type=PDF, chunk_size=4096)
+
+        chunks = [chunk async for chunk in upload.chunks()]
+
+        assert b"".join(chunks) == PDF_BYTES
+        assert max(len(chunk) for chunk in chunks) == 4096
+        assert upload.size == len(PDF_BYTES)
+        assert upload.sha256 == hashlib.sha256(PDF_BYTES).hexdigest()
+        assert upload.content_type == PDF
+
+    async def test_rejects_as_soon_as_limit_is_passed(self):
+        source = upload_file(PDF_BYTES)
+        upload = UploadStream(source, max_size=10000, chunk_size=4096)
+
+        with pytest.raises(UploadTooLargeError):
+            async for _ in upload.chunks():
+                pass
+
+        assert upload.size == 12288
+        assert source.file.tell() == 12288
+
+    async def test_declared_size_is_rejected_before_reading(self):
+        source = upload_file(PDF_BYTES, declare_size=True)
+
+        with pytest.raises(UploadTooLargeError):
+            await UploadStream(source, max_size=1000).start()
+        assert source.file.tell() == 0
+
+    async def test_content_must_match_expected_type(self):
+        upload = UploadStream(upload_file(b"MZ\x90\x00\x03\x00"), max_size=1000, expected_type=PDF)
+
+        with pytest.raises(UploadContentError):
+            await upload.start()
+
+
+@pytest.mark.asyncio
+class TestStreamToLocal:
+    async def test_writes_file_in_chunks(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        upload = UploadStream(upload_file(PDF_BYTES), max_size=len(PDF_BYTES), chunk_size=4096)
+
+        storage = CloudStorageService()
+        result = await storage.upload_stream(upload.chunks(), "resume.pdf", PDF, folder="resumes")
+
+        assert result["size"] == len(PDF_BYTES)
+        assert Path(result["file_path"]).read_bytes() == PDF_BYTES
+        assert await storage.download_file(result["file_path"]) == PDF_BYTES
+
+    async def test_oversized_upload_leaves_nothing_behind(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        upload = UploadStream(upload_file(PDF_BYTES), max_size=10000, chunk_size=4096)
+
+        with pytest.raises(UploadTooLargeError):
+            await CloudStorageService().upload_stream(upload.chunks(), "resume.pdf", PDF, folder="resumes")
+
+        assert list((tmp_path / "uploads" / "resumes").iterdir()) == []
+
+
+@pytest.mark.asyncio
+class TestStreamToFirebase:
+    @pytest.fixture
+    def storage(self):
+        with patch("app.utils.cloud_storage.settings.FIREBASE_CONFIG", {"project_id": "candidatex"}):
+            storage = CloudStorageService()
+            storage.firebase_bucket = MagicMock()
+            yield storage
+
+    async def test_reader_reassembles_chunks_from_a_thread(self):
+        upload = UploadStream(upload_file(PDF_BYTES), max_size=len(PDF_BYTES), chunk_size=4096)
+        reader = ChunkReader(upload.chunks(), asyncio.get_running_loop())
+
+        parts = []
+        while part := await asyncio.to_thread(reader.read, 10000):
+            parts.append(part)
+
+        assert b"".join(parts) == PDF_BYTES
+        assert max(len(part) for part in parts) == 10000
+        assert reader.tell() == len(PDF_BYTES)
+
+    async def test_firebase_only_uploads_go_to_firebase(self, storage, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        upload = UploadStream(upload_file(PDF_BYTES), max_size=len(PDF_BYTES), chunk_size=4096)
+
+        result = await storage.upload_stream(upload.chunks(), "resume.pdf", PDF, folder="resumes")
+
+        assert result["storage_type"] == "firebase"
+        assert result["size"] == len(PDF_BYTES)
+        assert not (tmp_path / "uploads").exists()
+
+    async def test_oversized_upload_fails_the_firebase_upload(self, storage):
+        upload = UploadStream(upload_file(PDF_BYTES), max_size=10000, chunk_size=4096)
+
+        with pytest.raises(UploadTooLargeError):
+            await storage.upload_stream(upload.chunks(), "resume.pdf", PDF, folder="resumes")
@@ -0,0 +1,77 @@
+"""
+Unit tests for the authenticated-user cache.
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.auth.cache import UserCache, USER_CACHE_CHANNEL, INVALIDATE_ALL
+from app.models.user import User
+
+
+def make_user(user_id: str) -> User:
+    return User(
+        _id=user_id,
+        email=f"{user_id}@example.com",
+        full_name="Cached User",
+        password_hash="hash",
+        status="active"
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestUserCache:
+    """Test TTL/LRU behaviour and invalidation."""
+
+    def test_hit_and_miss_counters(self):
+        cache = UserCache(max_size=10, ttl_seconds=60)
+        assert cache.get("u1") is None
+
+        cache.set(make_user("u1"))
+        assert cache.get("u1").email == "u1@example.com"
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        cache = UserCache(max_size=2, ttl_seconds=60)
+        cache.set(make_user("u1"))
+        cache.set(make_user("u2"))
+        cache.get("u1")  # u2 becomes least recently used
+        cache.set(make_user("u3"))
+
+        assert cache.get("u2") is None
+        assert cache.get("u1") is not None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        cache = UserCache(max_size=10, ttl_seconds=30)
+        with patch("app.auth.cache.time.monotonic", return_value=100.0):
+            cache.set(make_user("u1"))
+        with patch("app.auth.cache.time.monotonic", return_value=131.0):
+            assert cache.get("u1") is None
+
+        assert cache.get_stats()["expirations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_publishes_to_redis(self):
+        cache = UserCache()
+        cache._redis_client = AsyncMock()
+        cache.set(make_user("u1"))
+
+        await cache.invalidate("u1")
+
+        assert cache.get("u1") is None
+        cache._redis_client.publish.assert_awaited_once_with(USER_CACHE_CHANNEL, "u1")
+
+    def test_invalidate_all(self):
+        cache = UserCache()
+        cache.set(make_user("u1"))
+        cache.set(make_user("u2"))
+
+        cache.invalidate_local(INVALIDATE_ALL)
+
+        assert cache.get_stats()["size"] == 0
+        assert cache.get_stats()["invalidations"] == 2
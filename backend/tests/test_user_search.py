@@ -0,0 +1,116 @@
+"""
+Unit tests for indexed user search.
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.user import User, UserUpdate
+from app.users import routes
+from app.users.search import (
+    MAX_PREFIX_LENGTH, SEARCH_TERMS_FIELD, build_search_terms, normalize_tokens,
+    rank_users, search_filter, with_search_terms
+)
+
+
+def user(email, full_name):
+    return with_search_terms({"email": email, "full_name": full_name})
+
+
+def matches(doc, search):
+    """Evaluate the $all filter the way MongoDB does."""
+    return all(term in doc[SEARCH_TERMS_FIELD] for term in search_filter(search)[SEARCH_TERMS_FIELD]["$all"])
+
+
+class TestTerms:
+    def test_normalize_folds_case_and_accents(self):
+        assert normalize_tokens("José  O'Brien-Müller") == ["jose", "o", "brien", "muller"]
+
+    def test_terms_cover_name_and_email_prefixes(self):
+        terms = build_search_terms("jane.doe+work@example.com", "Jane Doe")
+
+        for term in ["j", "ja", "jane", "d", "doe", "work", "exam", "example", "com"]:
+            assert term in terms
+        assert "ane" not in terms
+
+    def test_long_tokens_are_truncated(self):
+        terms = build_search_terms("x@example.com", "Wolfeschlegelsteinhausen")
+
+        assert max(len(term) for term in terms) == MAX_PREFIX_LENGTH
+
+    def test_search_without_tokens_has_no_filter(self):
+        assert search_filter("  @.- ") is None
+
+    def test_filter_leads_with_longest_term(self):
+        assert search_filter("Jo Smith")[SEARCH_TERMS_FIELD]["$all"] == ["smith", "jo"]
+
+
+class TestMatching:
+    def test_prefix_match_on_any_token(self):
+        doc = user("jane.doe@example.com", "Jane Doe")
+
+        assert matches(doc, "doe")
+        assert matches(doc, "Ja")
+        assert matches(doc, "jane.doe@exa")
+        assert not matches(doc, "ane")
+
+    def test_every_token_must_match(self):
+        doc = user("jane.doe@example.com", "Jane Doe")
+
+        assert matches(doc, "doe jane")
+        assert not matches(doc, "jane smith")
+
+    def test_long_query_tokens_are_checked_when_ranking(self):
+        doc = user("x@example.com", "Wolfeschlegelsteinhausen")
+
+        assert matches(doc, "wolfeschlegelsteinhausenberger")
+        assert rank_users([doc], "wolfeschlegelsteinhausenberger") == []
+        assert rank_users([doc], "wolfeschlegelsteinhausen") == [doc]
+
+
+class TestRanking:
+    def test_exact_email_ranks_first(self):
+        prefix = user("ann.lee@example.com", "Ann Lee")
+        exact = user("ann@example.com", "Annabel Smith")
+
+        assert rank_users([prefix, exact], "ann@example.com")[0] is exact
+
+    def test_whole_word_beats_prefix(self):
+        prefix = user("a@example.com", "Annabel Smith")
+        word = user("b@example.com", "Ann Smith")
+
+        assert rank_users([prefix, word], "ann") == [word, prefix]
+
+    def test_ties_keep_recency_order(self):
+        newer = user("a@example.com", "Ann Smith")
+        older = user("b@example.com", "Ann Smith")
+
+        assert rank_users([newer, older], "smith") == [newer, older]
+
+
+@pytest.mark.asyncio
+class TestAdminUpdate:
+    async def update(self, user_data):
+        doc = user("jane.doe@example.com", "Jane Doe")
+        doc.update({"_id": "u1", "password_hash": "x"})
+        db = MagicMock()
+        db.users.find_one = AsyncMock(return_value=doc)
+        db.users.update_one = AsyncMock(return_value=MagicMock(modified_count=1))
+        admin = User(_id="admin", email="admin@example.com", full_name="Admin", password_hash="x")
+
+        with patch.object(routes, "user_cache") as cache:
+            cache.invalidate = AsyncMock()
+            await routes.update_user("u1", user_data, current_user=admin, db=db)
+        return db.users.update_one.await_args.args[1]["$set"]
+
+    async def test_renaming_a_user_rebuilds_search_terms(self):
+        update = await self.update(UserUpdate(full_name="Jane Smith"))
+
+        terms = update[SEARCH_TERMS_FIELD]
+        assert terms == build_search_terms("jane.doe@example.com", "Jane Smith")
+        assert "smith" in terms
+
+    async def test_other_fields_leave_search_terms_alone(self):
+        update = await self.update(UserUpdate(bio="Hello"))
+
+        assert SEARCH_TERMS_FIELD not in update